@@ -16,9 +16,18 @@ if config.config_file_name is not None:
 
 # Use a variável de ambiente DATABASE_URL para o Alembic
 import os
+from sqlmodel import SQLModel
 from app.core.config import settings
 from app.core.database import engine
-from app.models import *
+from app.models import (
+    entidade, usuario, fornecedor, tipo_certidao, certidao_fornecedor, contrato,
+    fiscal_designado, ocorrencia_fiscalizacao, cronograma_fisico_fin, penalidade,
+    matriz_riscos, auditoria_global, curva_s_contrato, matriz_riscos_resumo,
+    fornecedor_score, penalidade_resumo, execucao_financeira, execucao_financeira_mensal,
+    importacao_arquivo, fornecedor_duplicidade
+)
+
+config.set_main_option("sqlalchemy.url", settings.DATABASE_URL.replace("%", "%%"))
 
 # add your model's MetaData object here
 # for 'autogenerate' support
@@ -0,0 +1,105 @@
+"""entidade_id desnormalizado nas tabelas filhas de contrato
+
+Adiciona entidade_id em matriz_riscos, cronograma_fisico_fin, penalidade,
+ocorrencia_fiscalizacao e fiscal_designado, cria os índices
+(entidade_id, contrato_id, ...) e preenche os registros existentes em lotes.
+
+Revision ID: a1c9e2f4b301
+Revises:
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a1c9e2f4b301'
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# tabela -> (nome do índice, colunas)
+INDICES = {
+    "matriz_riscos": ("idx_matriz_riscos_entidade_contrato", ["entidade_id", "contrato_id", "status"]),
+    "cronograma_fisico_fin": ("idx_cronograma_entidade_contrato", ["entidade_id", "contrato_id", "data_prevista"]),
+    "penalidade": ("idx_penalidade_entidade_contrato", ["entidade_id", "contrato_id", "created_at"]),
+    "ocorrencia_fiscalizacao": ("idx_ocorrencia_entidade_contrato", ["entidade_id", "contrato_id", "data_ocorrencia"]),
+    "fiscal_designado": ("idx_fiscal_entidade_contrato", ["entidade_id", "contrato_id", "usuario_id"]),
+}
+
+# Ids por UPDATE no backfill
+TAMANHO_LOTE = 5000
+
+
+def preencher_entidade_id(bind, tabela: str) -> int:
+    """
+    Copia contrato.entidade_id para tabela.entidade_id em faixas de
+    TAMANHO_LOTE ids da chave primária; cada faixa é um UPDATE curto,
+    confirmado isoladamente no autocommit_block. Cópia congelada de
+    BackfillService.preencher_entidade_id nesta revisão.
+    """
+    inicio, fim = bind.execute(
+        sa.text(f"SELECT MIN(id), MAX(id) FROM {tabela} WHERE entidade_id IS NULL")
+    ).first()
+    if inicio is None:
+        return 0
+
+    total = 0
+    atualizar = sa.text(
+        f"UPDATE {tabela} SET entidade_id = "
+        f"(SELECT contrato.entidade_id FROM contrato WHERE contrato.id = {tabela}.contrato_id) "
+        f"WHERE id >= :inicio AND id < :fim AND entidade_id IS NULL"
+    )
+    while inicio <= fim:
+        total += bind.execute(atualizar, {"inicio": inicio, "fim": inicio + TAMANHO_LOTE}).rowcount or 0
+        inicio += TAMANHO_LOTE
+    return total
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    postgres = bind.dialect.name == "postgresql"
+    inspector = sa.inspect(bind)
+
+    # 1. Coluna nula (operação apenas de catálogo) e FK sem validação imediata.
+    # Tabelas que já têm a coluna (criadas por create_all) ficam de fora, e
+    # só as FKs criadas aqui são validadas no passo 2.
+    fks_criadas = []
+    for tabela in INDICES:
+        colunas = {coluna["name"] for coluna in inspector.get_columns(tabela)}
+        if "entidade_id" in colunas:
+            continue
+        op.add_column(tabela, sa.Column("entidade_id", sa.Integer(), nullable=True))
+        if postgres:
+            op.execute(
+                f"ALTER TABLE {tabela} ADD CONSTRAINT fk_{tabela}_entidade_id "
+                f"FOREIGN KEY (entidade_id) REFERENCES entidade (id) NOT VALID"
+            )
+            fks_criadas.append(tabela)
+
+    # 2. Índices e backfill fora da transação da migração, lote a lote
+    with op.get_context().autocommit_block():
+        for tabela, (nome, colunas) in INDICES.items():
+            op.create_index(
+                nome, tabela, colunas,
+                if_not_exists=True,
+                postgresql_concurrently=True
+            )
+
+        for tabela in INDICES:
+            preencher_entidade_id(bind, tabela)
+
+        for tabela in fks_criadas:
+            op.execute(f"ALTER TABLE {tabela} VALIDATE CONSTRAINT fk_{tabela}_entidade_id")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for tabela, (nome, _) in INDICES.items():
+        op.drop_index(nome, table_name=tabela, if_exists=True)
+        with op.batch_alter_table(tabela) as batch_op:
+            batch_op.drop_column("entidade_id")
@@ -0,0 +1,123 @@
+"""resumo de penalidades e índice por contrato/status/data
+
+Cria idx_penalidade_contrato_status_data e penalidade_resumo (quantidade e
+valor das penalidades por contrato, mês, tipo e status), preenchida com um
+GROUP BY sobre penalidade. No PostgreSQL, reaplica as políticas de tenant
+para incluir a nova tabela.
+
+Revision ID: a3d8f6c1b247
+Revises: f1b3d5e7a920
+Create Date: 2026-10-19 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from app.core.tenant_rls import instalar_politicas_rls
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3d8f6c1b247'
+down_revision: Union[str, Sequence[str], None] = 'f1b3d5e7a920'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Tenant corrente (GUC app.entidade_id), congelado como nesta revisão
+_TENANT_ATUAL = "NULLIF(current_setting('app.entidade_id', true), '')::integer"
+
+# Política de tenant só nas tabelas criadas nesta revisão
+TABELAS_TENANT = {
+    "penalidade_resumo": f"entidade_id = {_TENANT_ATUAL}",
+}
+
+penalidade = sa.table(
+    "penalidade",
+    sa.column("id", sa.Integer()),
+    sa.column("entidade_id", sa.Integer()),
+    sa.column("contrato_id", sa.Integer()),
+    sa.column("tipo", sa.String()),
+    sa.column("status", sa.String()),
+    sa.column("valor_multa", sa.Numeric(18, 2)),
+    sa.column("data_aplicacao", sa.Date()),
+    sa.column("created_at", sa.DateTime()),
+)
+penalidade_resumo = sa.table(
+    "penalidade_resumo",
+    sa.column("entidade_id", sa.Integer()),
+    sa.column("contrato_id", sa.Integer()),
+    sa.column("ano", sa.Integer()),
+    sa.column("mes", sa.Integer()),
+    sa.column("tipo", sa.String()),
+    sa.column("status", sa.String()),
+    sa.column("quantidade", sa.Integer()),
+    sa.column("valor_total", sa.Numeric(18, 2)),
+)
+
+
+def preencher_resumo(bind):
+    """Cópia congelada de PenalidadeService._agrupar nesta revisão, para todas as entidades"""
+    referencia = sa.func.coalesce(penalidade.c.data_aplicacao, penalidade.c.created_at)
+    ano = sa.extract("year", referencia)
+    mes = sa.extract("month", referencia)
+    agrupado = (
+        sa.select(
+            penalidade.c.entidade_id,
+            penalidade.c.contrato_id,
+            ano,
+            mes,
+            penalidade.c.tipo,
+            penalidade.c.status,
+            sa.func.count(),
+            sa.func.coalesce(sa.func.sum(penalidade.c.valor_multa), 0)
+        )
+        .where(penalidade.c.entidade_id.is_not(None))
+        .group_by(
+            penalidade.c.entidade_id, penalidade.c.contrato_id, ano, mes,
+            penalidade.c.tipo, penalidade.c.status
+        )
+    )
+    bind.execute(penalidade_resumo.delete())
+    bind.execute(penalidade_resumo.insert().from_select(
+        ["entidade_id", "contrato_id", "ano", "mes", "tipo", "status", "quantidade", "valor_total"],
+        agrupado
+    ))
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        "idx_penalidade_contrato_status_data", "penalidade",
+        ["contrato_id", "status", "data_aplicacao"], if_not_exists=True
+    )
+
+    bind = op.get_bind()
+    if not sa.inspect(bind).has_table("penalidade_resumo"):
+        op.create_table(
+            "penalidade_resumo",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("entidade_id", sa.Integer(), sa.ForeignKey("entidade.id"), nullable=False),
+            sa.Column("contrato_id", sa.Integer(), sa.ForeignKey("contrato.id"), nullable=False),
+            sa.Column("ano", sa.Integer(), nullable=False),
+            sa.Column("mes", sa.Integer(), nullable=False),
+            sa.Column("tipo", sa.String(length=30), nullable=False),
+            sa.Column("status", sa.String(length=20), nullable=False),
+            sa.Column("quantidade", sa.Integer(), nullable=False),
+            sa.Column("valor_total", sa.Numeric(18, 2), nullable=False),
+        )
+        op.create_index(
+            "idx_penalidade_resumo_grupo", "penalidade_resumo",
+            ["entidade_id", "contrato_id", "ano", "mes", "tipo", "status"], unique=True
+        )
+
+    preencher_resumo(bind)
+
+    if bind.dialect.name == "postgresql":
+        instalar_politicas_rls(bind, tabelas=TABELAS_TENANT)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("idx_penalidade_resumo_grupo", table_name="penalidade_resumo", if_exists=True)
+    op.drop_table("penalidade_resumo")
+    op.drop_index("idx_penalidade_contrato_status_data", table_name="penalidade", if_exists=True)
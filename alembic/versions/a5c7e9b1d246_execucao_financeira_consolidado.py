@@ -0,0 +1,59 @@
+"""marca de consolidação nos lançamentos de execução financeira
+
+Adiciona execucao_financeira.consolidado e o índice dos lançamentos
+pendentes, que substitui a marca d'água por ultimo_lancamento_id na
+consolidação mensal. Todos os lançamentos existentes começam pendentes: a
+próxima consolidação refaz a série de todos os contratos uma vez.
+
+Revision ID: a5c7e9b1d246
+Revises: f2c4a6e8b035
+Create Date: 2026-10-19 22:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a5c7e9b1d246'
+down_revision: Union[str, Sequence[str], None] = 'f2c4a6e8b035'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    colunas = {coluna["name"] for coluna in sa.inspect(bind).get_columns("execucao_financeira")}
+    if "consolidado" not in colunas:
+        # Com default constante, no PostgreSQL é só uma alteração de catálogo
+        op.add_column(
+            "execucao_financeira",
+            sa.Column("consolidado", sa.Boolean(), nullable=False, server_default=sa.false())
+        )
+
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "idx_execucao_financeira_pendente", "execucao_financeira", ["contrato_id", "id"],
+            if_not_exists=True,
+            postgresql_where=sa.text("NOT consolidado"),
+            postgresql_concurrently=True
+        )
+        op.drop_index(
+            "idx_execucao_mensal_ultimo_lancamento", table_name="execucao_financeira_mensal",
+            if_exists=True,
+            postgresql_concurrently=True
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_index(
+        "idx_execucao_mensal_ultimo_lancamento", "execucao_financeira_mensal",
+        ["ultimo_lancamento_id"], if_not_exists=True
+    )
+    op.drop_index("idx_execucao_financeira_pendente", table_name="execucao_financeira", if_exists=True)
+    with op.batch_alter_table("execucao_financeira") as batch_op:
+        batch_op.drop_column("consolidado")
@@ -0,0 +1,59 @@
+"""políticas de Row Level Security por tenant
+
+Instala o papel restrito e as políticas tenant_isolation usadas pelo modo
+TENANT_RLS_ENABLED. Apenas PostgreSQL; em outros bancos não faz nada.
+
+Revision ID: b7d3f0a2c415
+Revises: a1c9e2f4b301
+Create Date: 2026-10-19 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from app.core.tenant_rls import instalar_politicas_rls, remover_politicas_rls
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7d3f0a2c415'
+down_revision: Union[str, Sequence[str], None] = 'a1c9e2f4b301'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Tenant corrente (GUC app.entidade_id), congelado como nesta revisão
+_TENANT_ATUAL = "NULLIF(current_setting('app.entidade_id', true), '')::integer"
+
+# Tabelas de tenant existentes nesta revisão; as criadas depois instalam a
+# própria política na migração que as cria
+TABELAS_TENANT = {
+    "entidade": f"id = {_TENANT_ATUAL}",
+    "usuario": f"entidade_id = {_TENANT_ATUAL}",
+    "fornecedor": f"entidade_id = {_TENANT_ATUAL}",
+    "contrato": f"entidade_id = {_TENANT_ATUAL}",
+    "auditoria_global": f"entidade_id = {_TENANT_ATUAL}",
+    "matriz_riscos": f"entidade_id = {_TENANT_ATUAL}",
+    "cronograma_fisico_fin": f"entidade_id = {_TENANT_ATUAL}",
+    "penalidade": f"entidade_id = {_TENANT_ATUAL}",
+    "ocorrencia_fiscalizacao": f"entidade_id = {_TENANT_ATUAL}",
+    "fiscal_designado": f"entidade_id = {_TENANT_ATUAL}",
+    "certidao_fornecedor": (
+        f"fornecedor_id IN (SELECT id FROM fornecedor WHERE entidade_id = {_TENANT_ATUAL})"
+    ),
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql":
+        return
+    instalar_politicas_rls(bind, tabelas=TABELAS_TENANT)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql":
+        return
+    remover_politicas_rls(bind, tabelas=TABELAS_TENANT)
@@ -0,0 +1,124 @@
+"""livro de execução financeira dos contratos
+
+Cria execucao_financeira (lançamentos, somente inclusão) e
+execucao_financeira_mensal (série mensal consolidada). O valor_executado
+atual de cada contrato vira um lançamento SALDO_INICIAL, para que a soma do
+livro coincida com o total do contrato. A série mensal nasce vazia e é
+preenchida pela primeira execução de consolidar_execucao_financeira, que
+encontra todos os lançamentos ainda não consolidados.
+No PostgreSQL, reaplica as políticas de tenant para incluir as novas tabelas.
+
+Revision ID: b9e4c7a2d358
+Revises: a3d8f6c1b247
+Create Date: 2026-10-19 17:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from app.core.tenant_rls import instalar_politicas_rls
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b9e4c7a2d358'
+down_revision: Union[str, Sequence[str], None] = 'a3d8f6c1b247'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Tenant corrente (GUC app.entidade_id), congelado como nesta revisão
+_TENANT_ATUAL = "NULLIF(current_setting('app.entidade_id', true), '')::integer"
+
+# Política de tenant só nas tabelas criadas nesta revisão
+TABELAS_TENANT = {
+    "execucao_financeira": f"entidade_id = {_TENANT_ATUAL}",
+    "execucao_financeira_mensal": f"entidade_id = {_TENANT_ATUAL}",
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+
+    if not inspector.has_table("execucao_financeira"):
+        op.create_table(
+            "execucao_financeira",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("entidade_id", sa.Integer(), sa.ForeignKey("entidade.id"), nullable=False),
+            sa.Column("contrato_id", sa.Integer(), sa.ForeignKey("contrato.id"), nullable=False),
+            sa.Column("tipo", sa.String(length=20), nullable=False),
+            sa.Column("data_lancamento", sa.Date(), nullable=False),
+            sa.Column("valor", sa.Numeric(18, 2), nullable=False),
+            sa.Column("documento", sa.String(length=100), nullable=True),
+            sa.Column("descricao", sa.String(), nullable=True),
+            sa.Column("origem", sa.String(length=20), nullable=False),
+            sa.Column("usuario_id", sa.Integer(), sa.ForeignKey("usuario.id"), nullable=True),
+            sa.Column("created_at", sa.DateTime(), nullable=False),
+        )
+        op.create_index(
+            "idx_execucao_financeira_contrato_data", "execucao_financeira",
+            ["contrato_id", "data_lancamento", "id"]
+        )
+        op.create_index(
+            "idx_execucao_financeira_entidade_data", "execucao_financeira",
+            ["entidade_id", "data_lancamento"]
+        )
+
+        contrato = sa.table(
+            "contrato",
+            sa.column("id"), sa.column("entidade_id"), sa.column("valor_executado"), sa.column("data_inicio")
+        )
+        lancamento = sa.table(
+            "execucao_financeira",
+            sa.column("entidade_id"), sa.column("contrato_id"), sa.column("tipo"), sa.column("data_lancamento"),
+            sa.column("valor"), sa.column("descricao"), sa.column("origem"), sa.column("created_at")
+        )
+        op.execute(lancamento.insert().from_select(
+            ["entidade_id", "contrato_id", "tipo", "data_lancamento", "valor", "descricao", "origem", "created_at"],
+            sa.select(
+                contrato.c.entidade_id,
+                contrato.c.id,
+                sa.literal("SALDO_INICIAL"),
+                sa.func.coalesce(contrato.c.data_inicio, sa.func.current_date()),
+                contrato.c.valor_executado,
+                sa.literal("Valor executado anterior ao livro de execução"),
+                sa.literal("MIGRACAO"),
+                sa.func.current_timestamp()
+            ).where(contrato.c.valor_executado.is_not(None), contrato.c.valor_executado != 0)
+        ))
+
+    if not inspector.has_table("execucao_financeira_mensal"):
+        op.create_table(
+            "execucao_financeira_mensal",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("entidade_id", sa.Integer(), sa.ForeignKey("entidade.id"), nullable=False),
+            sa.Column("contrato_id", sa.Integer(), sa.ForeignKey("contrato.id"), nullable=False),
+            sa.Column("competencia", sa.Date(), nullable=False),
+            sa.Column("valor_mes", sa.Numeric(18, 2), nullable=False),
+            sa.Column("valor_acumulado", sa.Numeric(18, 2), nullable=False),
+            sa.Column("lancamentos", sa.Integer(), nullable=False),
+            sa.Column("ultimo_lancamento_id", sa.Integer(), nullable=False),
+            sa.Column("updated_at", sa.DateTime(), nullable=False),
+        )
+        op.create_index(
+            "idx_execucao_mensal_contrato_competencia", "execucao_financeira_mensal",
+            ["contrato_id", "competencia"], unique=True
+        )
+        op.create_index(
+            "idx_execucao_mensal_ultimo_lancamento", "execucao_financeira_mensal",
+            ["ultimo_lancamento_id"]
+        )
+
+    if bind.dialect.name == "postgresql":
+        instalar_politicas_rls(bind, tabelas=TABELAS_TENANT)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("idx_execucao_mensal_ultimo_lancamento", table_name="execucao_financeira_mensal", if_exists=True)
+    op.drop_index("idx_execucao_mensal_contrato_competencia", table_name="execucao_financeira_mensal", if_exists=True)
+    op.drop_table("execucao_financeira_mensal")
+    op.drop_index("idx_execucao_financeira_entidade_data", table_name="execucao_financeira", if_exists=True)
+    op.drop_index("idx_execucao_financeira_contrato_data", table_name="execucao_financeira", if_exists=True)
+    op.drop_table("execucao_financeira")
@@ -0,0 +1,144 @@
+"""série materializada da curva S por contrato
+
+Cria curva_s_contrato e calcula as séries a partir de cronograma_fisico_fin.
+No PostgreSQL, reaplica as políticas de tenant para incluir a nova tabela.
+
+Revision ID: c4e8a1d7f902
+Revises: b7d3f0a2c415
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from collections import defaultdict
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from app.core.tenant_rls import instalar_politicas_rls
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4e8a1d7f902'
+down_revision: Union[str, Sequence[str], None] = 'b7d3f0a2c415'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Tenant corrente (GUC app.entidade_id), congelado como nesta revisão
+_TENANT_ATUAL = "NULLIF(current_setting('app.entidade_id', true), '')::integer"
+
+# Política de tenant só nas tabelas criadas nesta revisão
+TABELAS_TENANT = {
+    "curva_s_contrato": f"entidade_id = {_TENANT_ATUAL}",
+}
+
+CENTAVO = Decimal("0.01")
+
+cronograma = sa.table(
+    "cronograma_fisico_fin",
+    sa.column("contrato_id", sa.Integer()),
+    sa.column("entidade_id", sa.Integer()),
+    sa.column("percentual_planejado", sa.Numeric(5, 2)),
+    sa.column("percentual_executado", sa.Numeric(5, 2)),
+    sa.column("data_prevista", sa.Date()),
+    sa.column("data_realizada", sa.Date()),
+)
+curva_s = sa.table(
+    "curva_s_contrato",
+    sa.column("entidade_id", sa.Integer()),
+    sa.column("contrato_id", sa.Integer()),
+    sa.column("competencia", sa.Date()),
+    sa.column("planejado_mes", sa.Numeric(7, 2)),
+    sa.column("executado_mes", sa.Numeric(7, 2)),
+    sa.column("planejado_acumulado", sa.Numeric(7, 2)),
+    sa.column("executado_acumulado", sa.Numeric(7, 2)),
+    sa.column("updated_at", sa.DateTime()),
+)
+
+
+def _proximo_mes(competencia: date) -> date:
+    if competencia.month == 12:
+        return competencia.replace(year=competencia.year + 1, month=1)
+    return competencia.replace(month=competencia.month + 1)
+
+
+def _serie(etapas, hoje: date):
+    """Cópia congelada de CurvaSService.calcular_serie nesta revisão"""
+    planejado = defaultdict(Decimal)
+    executado = defaultdict(Decimal)
+    for etapa in etapas:
+        peso = Decimal(etapa.percentual_planejado or 0)
+        if etapa.data_prevista:
+            planejado[etapa.data_prevista.replace(day=1)] += peso
+        concluido = peso * Decimal(etapa.percentual_executado or 0) / 100
+        if concluido:
+            executado[(etapa.data_realizada or hoje).replace(day=1)] += concluido
+
+    meses = set(planejado) | set(executado)
+    if not meses:
+        return
+    planejado_acumulado = executado_acumulado = Decimal("0")
+    competencia, fim = min(meses), max(meses)
+    while competencia <= fim:
+        planejado_acumulado += planejado[competencia]
+        executado_acumulado += executado[competencia]
+        yield {
+            "competencia": competencia,
+            "planejado_mes": planejado[competencia].quantize(CENTAVO),
+            "executado_mes": executado[competencia].quantize(CENTAVO),
+            "planejado_acumulado": planejado_acumulado.quantize(CENTAVO),
+            "executado_acumulado": executado_acumulado.quantize(CENTAVO),
+        }
+        competencia = _proximo_mes(competencia)
+
+
+def preencher_curva_s(bind):
+    """Séries de todos os contratos a partir do cronograma, sem depender do código da aplicação"""
+    etapas_por_contrato = defaultdict(list)
+    for etapa in bind.execute(
+        sa.select(cronograma).where(cronograma.c.entidade_id.is_not(None)).order_by(cronograma.c.contrato_id)
+    ):
+        etapas_por_contrato[(etapa.entidade_id, etapa.contrato_id)].append(etapa)
+
+    bind.execute(curva_s.delete())
+    hoje, agora = date.today(), datetime.utcnow()
+    for (entidade_id, contrato_id), etapas in etapas_por_contrato.items():
+        linhas = [
+            {**ponto, "entidade_id": entidade_id, "contrato_id": contrato_id, "updated_at": agora}
+            for ponto in _serie(etapas, hoje)
+        ]
+        if linhas:
+            bind.execute(curva_s.insert(), linhas)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    if not sa.inspect(bind).has_table("curva_s_contrato"):
+        op.create_table(
+            "curva_s_contrato",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("entidade_id", sa.Integer(), sa.ForeignKey("entidade.id"), nullable=False),
+            sa.Column("contrato_id", sa.Integer(), sa.ForeignKey("contrato.id"), nullable=False),
+            sa.Column("competencia", sa.Date(), nullable=False),
+            sa.Column("planejado_mes", sa.Numeric(7, 2), nullable=False),
+            sa.Column("executado_mes", sa.Numeric(7, 2), nullable=False),
+            sa.Column("planejado_acumulado", sa.Numeric(7, 2), nullable=False),
+            sa.Column("executado_acumulado", sa.Numeric(7, 2), nullable=False),
+            sa.Column("updated_at", sa.DateTime(), nullable=False),
+        )
+        op.create_index(
+            "idx_curva_s_entidade_contrato_competencia", "curva_s_contrato",
+            ["entidade_id", "contrato_id", "competencia"], unique=True
+        )
+
+    preencher_curva_s(bind)
+
+    if bind.dialect.name == "postgresql":
+        instalar_politicas_rls(bind, tabelas=TABELAS_TENANT)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("idx_curva_s_entidade_contrato_competencia", table_name="curva_s_contrato", if_exists=True)
+    op.drop_table("curva_s_contrato")
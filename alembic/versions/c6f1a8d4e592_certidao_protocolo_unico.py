@@ -0,0 +1,116 @@
+"""certidão única por fornecedor, tipo e protocolo
+
+Cria idx_certidao_fornecedor_protocolo (único, só para linhas com
+numero_protocolo), chave do INSERT ... ON CONFLICT da carga em lote de
+certidões. Certidões repetidas com o mesmo fornecedor, tipo e protocolo são
+o mesmo documento: antes do índice, mantém-se apenas a mais recente (maior id).
+As removidas são copiadas antes para certidao_fornecedor_duplicada (com o id
+da certidão mantida), listadas no log da migração e registradas em
+auditoria_global, uma linha por entidade.
+
+Revision ID: c6f1a8d4e592
+Revises: b9e4c7a2d358
+Create Date: 2026-10-19 18:00:00.000000
+
+"""
+import logging
+from collections import defaultdict
+from datetime import datetime
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+logger = logging.getLogger("alembic.runtime.migration")
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c6f1a8d4e592'
+down_revision: Union[str, Sequence[str], None] = 'b9e4c7a2d358'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Certidões repetidas (todas menos a de maior id do grupo) e a que fica no lugar
+DUPLICADAS = """
+    SELECT c.*, m.mantida_id
+    FROM certidao_fornecedor c
+    JOIN (
+        SELECT fornecedor_id, tipo_certidao_id, numero_protocolo, MAX(id) AS mantida_id
+        FROM certidao_fornecedor
+        WHERE numero_protocolo IS NOT NULL
+        GROUP BY fornecedor_id, tipo_certidao_id, numero_protocolo
+        HAVING COUNT(*) > 1
+    ) m ON m.fornecedor_id = c.fornecedor_id
+       AND m.tipo_certidao_id = c.tipo_certidao_id
+       AND m.numero_protocolo = c.numero_protocolo
+    WHERE c.id <> m.mantida_id
+"""
+
+auditoria = sa.table(
+    "auditoria_global",
+    sa.column("entidade_id", sa.Integer()),
+    sa.column("acao", sa.String()),
+    sa.column("tabela_afetada", sa.String()),
+    sa.column("dados_antes", sa.JSON()),
+    sa.column("dados_depois", sa.JSON()),
+    sa.column("timestamp", sa.DateTime()),
+)
+
+
+def remover_duplicadas(bind):
+    """Copia, registra e remove as certidões repetidas antes do índice único"""
+    duplicadas = bind.execute(sa.text(
+        f"SELECT d.id, d.mantida_id, d.fornecedor_id, d.tipo_certidao_id, d.numero_protocolo, f.entidade_id "
+        f"FROM ({DUPLICADAS}) d LEFT JOIN fornecedor f ON f.id = d.fornecedor_id ORDER BY d.id"
+    )).all()
+    if not duplicadas:
+        return
+
+    if sa.inspect(bind).has_table("certidao_fornecedor_duplicada"):
+        op.execute(f"INSERT INTO certidao_fornecedor_duplicada {DUPLICADAS}")
+    else:
+        op.execute(f"CREATE TABLE certidao_fornecedor_duplicada AS {DUPLICADAS}")
+
+    por_entidade = defaultdict(list)
+    for linha in duplicadas:
+        logger.warning(
+            f"Certidão {linha.id} removida: repete a {linha.mantida_id} (fornecedor {linha.fornecedor_id}, "
+            f"tipo {linha.tipo_certidao_id}, protocolo {linha.numero_protocolo})"
+        )
+        por_entidade[linha.entidade_id].append({"id": linha.id, "mantida_id": linha.mantida_id})
+    agora = datetime.utcnow()
+    bind.execute(auditoria.insert(), [
+        {
+            "entidade_id": entidade_id,
+            "acao": "REMOCAO_CERTIDOES_DUPLICADAS",
+            "tabela_afetada": "certidao_fornecedor",
+            "dados_antes": {"certidoes": certidoes},
+            "dados_depois": {"copia": "certidao_fornecedor_duplicada"},
+            "timestamp": agora,
+        }
+        for entidade_id, certidoes in por_entidade.items()
+    ])
+
+    ids = [linha.id for linha in duplicadas]
+    certidao = sa.table("certidao_fornecedor", sa.column("id", sa.Integer()))
+    for inicio in range(0, len(ids), 1000):
+        bind.execute(certidao.delete().where(certidao.c.id.in_(ids[inicio:inicio + 1000])))
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    remover_duplicadas(op.get_bind())
+    op.create_index(
+        "idx_certidao_fornecedor_protocolo", "certidao_fornecedor",
+        ["fornecedor_id", "tipo_certidao_id", "numero_protocolo"],
+        unique=True,
+        sqlite_where=sa.text("numero_protocolo IS NOT NULL"),
+        postgresql_where=sa.text("numero_protocolo IS NOT NULL"),
+        if_not_exists=True
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema. A cópia certidao_fornecedor_duplicada é mantida."""
+    op.drop_index("idx_certidao_fornecedor_protocolo", table_name="certidao_fornecedor", if_exists=True)
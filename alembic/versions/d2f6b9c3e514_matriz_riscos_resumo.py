@@ -0,0 +1,75 @@
+"""resumo da matriz de riscos para o mapa de calor
+
+Cria matriz_riscos_resumo (riscos ativos por contrato e célula
+probabilidade x impacto) e a preenche com um GROUP BY sobre matriz_riscos.
+No PostgreSQL, reaplica as políticas de tenant para incluir a nova tabela.
+
+Revision ID: d2f6b9c3e514
+Revises: c4e8a1d7f902
+Create Date: 2026-10-19 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from app.core.tenant_rls import instalar_politicas_rls
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd2f6b9c3e514'
+down_revision: Union[str, Sequence[str], None] = 'c4e8a1d7f902'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Tenant corrente (GUC app.entidade_id), congelado como nesta revisão
+_TENANT_ATUAL = "NULLIF(current_setting('app.entidade_id', true), '')::integer"
+
+# Política de tenant só nas tabelas criadas nesta revisão
+TABELAS_TENANT = {
+    "matriz_riscos_resumo": f"entidade_id = {_TENANT_ATUAL}",
+}
+
+# Resumo inicial: riscos ATIVOS por contrato e célula da grade 5x5 (como
+# MatrizRiscosService._agrupar nesta revisão)
+PREENCHER_RESUMO = """
+    INSERT INTO matriz_riscos_resumo (entidade_id, contrato_id, probabilidade, impacto, quantidade)
+    SELECT entidade_id, contrato_id, probabilidade, impacto, COUNT(*)
+    FROM matriz_riscos
+    WHERE status = 'ATIVO'
+      AND entidade_id IS NOT NULL
+      AND probabilidade BETWEEN 1 AND 5
+      AND impacto BETWEEN 1 AND 5
+    GROUP BY entidade_id, contrato_id, probabilidade, impacto
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    if not sa.inspect(bind).has_table("matriz_riscos_resumo"):
+        op.create_table(
+            "matriz_riscos_resumo",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("entidade_id", sa.Integer(), sa.ForeignKey("entidade.id"), nullable=False),
+            sa.Column("contrato_id", sa.Integer(), sa.ForeignKey("contrato.id"), nullable=False),
+            sa.Column("probabilidade", sa.Integer(), nullable=False),
+            sa.Column("impacto", sa.Integer(), nullable=False),
+            sa.Column("quantidade", sa.Integer(), nullable=False),
+        )
+        op.create_index(
+            "idx_matriz_riscos_resumo_celula", "matriz_riscos_resumo",
+            ["entidade_id", "contrato_id", "probabilidade", "impacto"], unique=True
+        )
+
+    op.execute("DELETE FROM matriz_riscos_resumo")
+    op.execute(PREENCHER_RESUMO)
+
+    if bind.dialect.name == "postgresql":
+        instalar_politicas_rls(bind, tabelas=TABELAS_TENANT)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("idx_matriz_riscos_resumo_celula", table_name="matriz_riscos_resumo", if_exists=True)
+    op.drop_table("matriz_riscos_resumo")
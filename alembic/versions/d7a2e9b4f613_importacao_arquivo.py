@@ -0,0 +1,74 @@
+"""importação de planilhas legadas
+
+Cria importacao_arquivo (planilhas CSV/XLSX enviadas e o progresso do
+processamento em background). No PostgreSQL, reaplica as políticas de
+tenant para incluir a nova tabela.
+
+Revision ID: d7a2e9b4f613
+Revises: c6f1a8d4e592
+Create Date: 2026-10-19 19:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from app.core.tenant_rls import instalar_politicas_rls
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd7a2e9b4f613'
+down_revision: Union[str, Sequence[str], None] = 'c6f1a8d4e592'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Tenant corrente (GUC app.entidade_id), congelado como nesta revisão
+_TENANT_ATUAL = "NULLIF(current_setting('app.entidade_id', true), '')::integer"
+
+# Política de tenant só nas tabelas criadas nesta revisão
+TABELAS_TENANT = {
+    "importacao_arquivo": f"entidade_id = {_TENANT_ATUAL}",
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+
+    if not inspector.has_table("importacao_arquivo"):
+        op.create_table(
+            "importacao_arquivo",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("entidade_id", sa.Integer(), sa.ForeignKey("entidade.id"), nullable=False),
+            sa.Column("usuario_id", sa.Integer(), sa.ForeignKey("usuario.id"), nullable=False),
+            sa.Column("tipo", sa.String(length=20), nullable=False),
+            sa.Column("formato", sa.String(length=10), nullable=False),
+            sa.Column("nome_arquivo", sa.String(length=255), nullable=False),
+            sa.Column("caminho", sa.String(length=500), nullable=False),
+            sa.Column("tamanho_bytes", sa.Integer(), nullable=False),
+            sa.Column("status", sa.String(length=20), nullable=False),
+            sa.Column("task_id", sa.String(length=50), nullable=True),
+            sa.Column("bytes_processados", sa.Integer(), nullable=False),
+            sa.Column("linhas_lidas", sa.Integer(), nullable=False),
+            sa.Column("linhas_importadas", sa.Integer(), nullable=False),
+            sa.Column("linhas_com_erro", sa.Integer(), nullable=False),
+            sa.Column("erros", sa.String(), nullable=True),
+            sa.Column("mensagem", sa.String(), nullable=True),
+            sa.Column("created_at", sa.DateTime(), nullable=False),
+            sa.Column("iniciado_em", sa.DateTime(), nullable=True),
+            sa.Column("concluido_em", sa.DateTime(), nullable=True),
+        )
+        op.create_index(
+            "idx_importacao_entidade_created", "importacao_arquivo",
+            ["entidade_id", "created_at"]
+        )
+
+    if bind.dialect.name == "postgresql":
+        instalar_politicas_rls(bind, tabelas=TABELAS_TENANT)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("idx_importacao_entidade_created", table_name="importacao_arquivo", if_exists=True)
+    op.drop_table("importacao_arquivo")
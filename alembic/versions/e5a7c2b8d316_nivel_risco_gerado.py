@@ -0,0 +1,71 @@
+"""nivel_score e nivel_risco como colunas geradas em matriz_riscos
+
+nivel_risco deixa de ser gravado pela aplicação: passa a ser calculado pelo
+banco, junto com nivel_score (probabilidade * impacto), e os índices
+(contrato_id, nivel_risco, status) e (entidade_id, nivel_score) passam a
+atender filtro e ordenação.
+
+PostgreSQL: um único ALTER TABLE troca a coluna e adiciona as geradas
+STORED; a reescrita da tabela já preenche todas as linhas existentes.
+SQLite: ALTER TABLE só aceita colunas geradas VIRTUAL, calculadas na
+leitura e materializadas nos índices.
+
+Revision ID: e5a7c2b8d316
+Revises: d2f6b9c3e514
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from app.models.matriz_riscos import NIVEL_RISCO_SQL, NIVEL_SCORE_SQL
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5a7c2b8d316'
+down_revision: Union[str, Sequence[str], None] = 'd2f6b9c3e514'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDICES = {
+    "idx_matriz_riscos_contrato_nivel": ["contrato_id", "nivel_risco", "status"],
+    "idx_matriz_riscos_entidade_score": ["entidade_id", "nivel_score"],
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    colunas = {coluna["name"] for coluna in sa.inspect(bind).get_columns("matriz_riscos")}
+    if "nivel_score" not in colunas:
+        if bind.dialect.name == "postgresql":
+            op.execute(
+                "ALTER TABLE matriz_riscos "
+                "DROP COLUMN nivel_risco, "
+                f"ADD COLUMN nivel_score integer GENERATED ALWAYS AS ({NIVEL_SCORE_SQL}) STORED, "
+                f"ADD COLUMN nivel_risco varchar(20) GENERATED ALWAYS AS ({NIVEL_RISCO_SQL}) STORED"
+            )
+        else:
+            op.execute("ALTER TABLE matriz_riscos DROP COLUMN nivel_risco")
+            op.execute(f"ALTER TABLE matriz_riscos ADD COLUMN nivel_score INTEGER GENERATED ALWAYS AS ({NIVEL_SCORE_SQL}) VIRTUAL")
+            op.execute(f"ALTER TABLE matriz_riscos ADD COLUMN nivel_risco VARCHAR(20) GENERATED ALWAYS AS ({NIVEL_RISCO_SQL}) VIRTUAL")
+
+    with op.get_context().autocommit_block():
+        for nome, colunas_indice in INDICES.items():
+            op.create_index(
+                nome, "matriz_riscos", colunas_indice,
+                if_not_exists=True,
+                postgresql_concurrently=True
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for nome in INDICES:
+        op.drop_index(nome, table_name="matriz_riscos", if_exists=True)
+    op.execute("ALTER TABLE matriz_riscos RENAME COLUMN nivel_risco TO nivel_risco_gerado")
+    op.add_column("matriz_riscos", sa.Column("nivel_risco", sa.String(20), nullable=True))
+    op.execute("UPDATE matriz_riscos SET nivel_risco = nivel_risco_gerado")
+    op.drop_column("matriz_riscos", "nivel_risco_gerado")
+    op.drop_column("matriz_riscos", "nivel_score")
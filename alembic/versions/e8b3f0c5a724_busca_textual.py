@@ -0,0 +1,35 @@
+"""busca textual em contratos e fornecedores
+
+PostgreSQL: habilita unaccent e btree_gin, cria a configuração de busca
+sentinela_pt (português sem acentos), as colunas geradas busca_vetor
+(tsvector STORED, preenchidas na reescrita da tabela) e os índices GIN
+(entidade_id, busca_vetor).
+SQLite: cria as tabelas FTS5 contrato_busca e fornecedor_busca, com
+triggers de manutenção, e indexa as linhas existentes.
+
+Revision ID: e8b3f0c5a724
+Revises: d7a2e9b4f613
+Create Date: 2026-10-19 20:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+from app.core.busca_textual import instalar_busca_textual, remover_busca_textual
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e8b3f0c5a724'
+down_revision: Union[str, Sequence[str], None] = 'd7a2e9b4f613'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    instalar_busca_textual(op.get_bind())
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    remover_busca_textual(op.get_bind())
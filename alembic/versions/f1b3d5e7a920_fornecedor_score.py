@@ -0,0 +1,125 @@
+"""score composto de risco dos fornecedores
+
+Cria fornecedor_score e calcula os scores de todas as entidades em uma
+passada. No PostgreSQL, reaplica as políticas de tenant para incluir a
+nova tabela.
+
+Revision ID: f1b3d5e7a920
+Revises: e5a7c2b8d316
+Create Date: 2026-10-19 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from app.core.tenant_rls import instalar_politicas_rls
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f1b3d5e7a920'
+down_revision: Union[str, Sequence[str], None] = 'e5a7c2b8d316'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Tenant corrente (GUC app.entidade_id), congelado como nesta revisão
+_TENANT_ATUAL = "NULLIF(current_setting('app.entidade_id', true), '')::integer"
+
+# Política de tenant só nas tabelas criadas nesta revisão
+TABELAS_TENANT = {
+    "fornecedor_score": f"entidade_id = {_TENANT_ATUAL}",
+}
+
+# Scores iniciais, com os pesos desta revisão (FornecedorScoreService._consulta):
+# certidão vencida 10 (teto 30), impedimento 30, penalidade aplicada 5
+# (teto 25), risco alto (probabilidade × impacto > 15) 5 (teto 15)
+PREENCHER_SCORES = """
+    INSERT INTO fornecedor_score (
+        fornecedor_id, entidade_id, score,
+        pontos_certidoes, pontos_impedimento, pontos_penalidades, pontos_riscos,
+        certidoes_vencidas, impedido, penalidades_aplicadas, valor_multas,
+        riscos_ativos, riscos_altos, exposicao_riscos, calculado_em
+    )
+    SELECT
+        id, entidade_id, pontos_certidoes + pontos_impedimento + pontos_penalidades + pontos_riscos,
+        pontos_certidoes, pontos_impedimento, pontos_penalidades, pontos_riscos,
+        certidoes_vencidas, pontos_impedimento > 0, penalidades_aplicadas, valor_multas,
+        riscos_ativos, riscos_altos, exposicao_riscos, CURRENT_TIMESTAMP
+    FROM (
+        SELECT
+            f.id,
+            f.entidade_id,
+            CASE WHEN COALESCE(f.total_certidoes_vencidas, 0) * 10 > 30
+                 THEN 30 ELSE COALESCE(f.total_certidoes_vencidas, 0) * 10 END AS pontos_certidoes,
+            CASE WHEN (f.motivo_impedimento IS NOT NULL AND f.motivo_impedimento <> '')
+                      OR f.situacao_cadastral <> 'ATIVO'
+                 THEN 30 ELSE 0 END AS pontos_impedimento,
+            CASE WHEN COALESCE(p.quantidade, 0) * 5 > 25 THEN 25 ELSE COALESCE(p.quantidade, 0) * 5 END AS pontos_penalidades,
+            CASE WHEN COALESCE(r.altos, 0) * 5 > 15 THEN 15 ELSE COALESCE(r.altos, 0) * 5 END AS pontos_riscos,
+            COALESCE(f.total_certidoes_vencidas, 0) AS certidoes_vencidas,
+            COALESCE(p.quantidade, 0) AS penalidades_aplicadas,
+            COALESCE(p.valor, 0) AS valor_multas,
+            COALESCE(r.ativos, 0) AS riscos_ativos,
+            COALESCE(r.altos, 0) AS riscos_altos,
+            COALESCE(r.exposicao, 0) AS exposicao_riscos
+        FROM fornecedor f
+        LEFT JOIN (
+            SELECT c.fornecedor_id, COUNT(pe.id) AS quantidade, SUM(pe.valor_multa) AS valor
+            FROM penalidade pe
+            JOIN contrato c ON c.id = pe.contrato_id
+            WHERE pe.status = 'APLICADA'
+            GROUP BY c.fornecedor_id
+        ) p ON p.fornecedor_id = f.id
+        LEFT JOIN (
+            SELECT
+                c.fornecedor_id,
+                SUM(m.quantidade) AS ativos,
+                SUM(CASE WHEN m.probabilidade * m.impacto > 15 THEN m.quantidade ELSE 0 END) AS altos,
+                SUM(m.quantidade * m.probabilidade * m.impacto) AS exposicao
+            FROM matriz_riscos_resumo m
+            JOIN contrato c ON c.id = m.contrato_id
+            GROUP BY c.fornecedor_id
+        ) r ON r.fornecedor_id = f.id
+        WHERE f.entidade_id IS NOT NULL
+    ) scores
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    if not sa.inspect(bind).has_table("fornecedor_score"):
+        op.create_table(
+            "fornecedor_score",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("fornecedor_id", sa.Integer(), sa.ForeignKey("fornecedor.id"), nullable=False),
+            sa.Column("entidade_id", sa.Integer(), sa.ForeignKey("entidade.id"), nullable=False),
+            sa.Column("score", sa.Integer(), nullable=False),
+            sa.Column("pontos_certidoes", sa.Integer(), nullable=False),
+            sa.Column("pontos_impedimento", sa.Integer(), nullable=False),
+            sa.Column("pontos_penalidades", sa.Integer(), nullable=False),
+            sa.Column("pontos_riscos", sa.Integer(), nullable=False),
+            sa.Column("certidoes_vencidas", sa.Integer(), nullable=False),
+            sa.Column("impedido", sa.Boolean(), nullable=False),
+            sa.Column("penalidades_aplicadas", sa.Integer(), nullable=False),
+            sa.Column("valor_multas", sa.Numeric(18, 2), nullable=False),
+            sa.Column("riscos_ativos", sa.Integer(), nullable=False),
+            sa.Column("riscos_altos", sa.Integer(), nullable=False),
+            sa.Column("exposicao_riscos", sa.Integer(), nullable=False),
+            sa.Column("calculado_em", sa.DateTime(), nullable=False),
+        )
+        op.create_index("idx_fornecedor_score_fornecedor", "fornecedor_score", ["fornecedor_id"], unique=True)
+        op.create_index("idx_fornecedor_score_ranking", "fornecedor_score", ["entidade_id", "score", "fornecedor_id"])
+
+    op.execute("DELETE FROM fornecedor_score")
+    op.execute(PREENCHER_SCORES)
+
+    if bind.dialect.name == "postgresql":
+        instalar_politicas_rls(bind, tabelas=TABELAS_TENANT)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("idx_fornecedor_score_ranking", table_name="fornecedor_score", if_exists=True)
+    op.drop_index("idx_fornecedor_score_fornecedor", table_name="fornecedor_score", if_exists=True)
+    op.drop_table("fornecedor_score")
@@ -0,0 +1,79 @@
+"""detecção de fornecedores duplicados
+
+Cria fornecedor_duplicidade (pares candidatos para revisão) e o índice
+(entidade_id, raiz do CNPJ) em fornecedor. No PostgreSQL, habilita pg_trgm,
+cria a função de normalização de razão social e o índice GIN de trigramas
+sobre ela, e reaplica as políticas de tenant para incluir a nova tabela.
+
+Revision ID: f2c4a6e8b035
+Revises: e8b3f0c5a724
+Create Date: 2026-10-19 21:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from app.core.busca_textual import NORMALIZAR_NOME, instalar_busca_textual
+from app.core.tenant_rls import instalar_politicas_rls
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2c4a6e8b035'
+down_revision: Union[str, Sequence[str], None] = 'e8b3f0c5a724'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Tenant corrente (GUC app.entidade_id), congelado como nesta revisão
+_TENANT_ATUAL = "NULLIF(current_setting('app.entidade_id', true), '')::integer"
+
+# Política de tenant só nas tabelas criadas nesta revisão
+TABELAS_TENANT = {
+    "fornecedor_duplicidade": f"entidade_id = {_TENANT_ATUAL}",
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+
+    if not inspector.has_table("fornecedor_duplicidade"):
+        op.create_table(
+            "fornecedor_duplicidade",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("entidade_id", sa.Integer(), sa.ForeignKey("entidade.id"), nullable=False),
+            sa.Column("fornecedor_id", sa.Integer(), sa.ForeignKey("fornecedor.id"), nullable=False),
+            sa.Column("fornecedor_duplicado_id", sa.Integer(), sa.ForeignKey("fornecedor.id"), nullable=False),
+            sa.Column("similaridade", sa.Float(), nullable=False),
+            sa.Column("motivo", sa.String(length=20), nullable=False),
+            sa.Column("status", sa.String(length=20), nullable=False),
+            sa.Column("created_at", sa.DateTime(), nullable=False),
+            sa.Column("updated_at", sa.DateTime(), nullable=False),
+        )
+        op.create_index(
+            "idx_fornecedor_duplicidade_par", "fornecedor_duplicidade",
+            ["fornecedor_id", "fornecedor_duplicado_id"], unique=True
+        )
+        op.create_index(
+            "idx_fornecedor_duplicidade_entidade_status", "fornecedor_duplicidade",
+            ["entidade_id", "status"]
+        )
+
+    # Índice da raiz do CNPJ e, no PostgreSQL, pg_trgm + índice de trigramas
+    instalar_busca_textual(bind)
+
+    if bind.dialect.name == "postgresql":
+        instalar_politicas_rls(bind, tabelas=TABELAS_TENANT)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    bind = op.get_bind()
+    op.execute("DROP INDEX IF EXISTS idx_fornecedor_cnpj_raiz")
+    if bind.dialect.name == "postgresql":
+        op.execute("DROP INDEX IF EXISTS idx_fornecedor_nome_trgm")
+        op.execute(f"DROP FUNCTION IF EXISTS {NORMALIZAR_NOME}(text)")
+    op.drop_index("idx_fornecedor_duplicidade_entidade_status", table_name="fornecedor_duplicidade", if_exists=True)
+    op.drop_index("idx_fornecedor_duplicidade_par", table_name="fornecedor_duplicidade", if_exists=True)
+    op.drop_table("fornecedor_duplicidade")
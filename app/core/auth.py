@@ -4,6 +4,7 @@ from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlmodel import Session, select
 from app.core.database import get_session
 from app.core.security import decode_access_token
+from app.core.tenant_rls import definir_tenant_sessao
 from app.models.usuario import Usuario
 
 security = HTTPBearer()
@@ -57,6 +58,9 @@ async def get_current_user(
             detail="Usuário inativo"
         )
     
+    # Contexto de tenant para o modo RLS (no-op quando desabilitado)
+    definir_tenant_sessao(session, usuario)
+    
     return usuario
 
 async def get_current_active_user(
@@ -0,0 +1,148 @@
+"""
+Índices de busca textual de contratos e fornecedores
+
+PostgreSQL: coluna gerada `busca_vetor` (tsvector STORED) em cada tabela,
+calculada com a configuração TEXTO_BUSCA (português + unaccent), e índice
+GIN composto (entidade_id, busca_vetor) via btree_gin, para que o filtro
+de tenant e o casamento do texto sejam resolvidos na mesma varredura.
+
+Para a detecção de fornecedores duplicados, o PostgreSQL também recebe um
+índice GIN de trigramas (pg_trgm) sobre a razão social normalizada por
+NORMALIZAR_NOME (minúsculas, sem acentos e sem sufixos societários), e
+ambos os dialetos um índice (entidade_id, raiz do CNPJ).
+
+SQLite (testes e desenvolvimento): tabela virtual FTS5 `<tabela>_busca` com
+conteúdo externo, mantida por triggers de INSERT/UPDATE/DELETE, com
+tokenizador unicode61 sem acentos.
+
+As colunas indexadas ficam fora dos modelos SQLModel; a instalação é feita
+por create_db_and_tables e pela migração correspondente.
+"""
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+# Configuração de busca textual do PostgreSQL (cópia de portuguese com unaccent)
+TEXTO_BUSCA = "sentinela_pt"
+
+# Função SQL (IMMUTABLE, indexável) que normaliza razões sociais no PostgreSQL
+NORMALIZAR_NOME = "sentinela_normalizar_nome"
+
+# Sufixos societários ignorados na comparação de razões sociais
+SUFIXOS_SOCIETARIOS = ("ltda", "me", "epp", "eireli", "sa", "s a", "mei", "ss")
+
+# tabela -> colunas indexadas com o peso de cada uma no ranking (A > B)
+TABELAS_BUSCA = {
+    "contrato": {"numero_contrato": "A", "objeto": "B"},
+    "fornecedor": {"razao_social": "A", "nome_fantasia": "A"},
+}
+
+
+def tabela_fts(tabela: str) -> str:
+    """Nome da tabela FTS5 de uma tabela indexada (SQLite)"""
+    return f"{tabela}_busca"
+
+
+def _vetor_sql(colunas: dict) -> str:
+    return " || ".join(
+        f"setweight(to_tsvector('{TEXTO_BUSCA}'::regconfig, coalesce({coluna}, '')), '{peso}')"
+        for coluna, peso in colunas.items()
+    )
+
+
+def _instalar_postgresql(connection: Connection):
+    connection.execute(text("CREATE EXTENSION IF NOT EXISTS unaccent"))
+    connection.execute(text("CREATE EXTENSION IF NOT EXISTS btree_gin"))
+    connection.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+    existe = connection.execute(
+        text("SELECT 1 FROM pg_ts_config WHERE cfgname = :nome"), {"nome": TEXTO_BUSCA}
+    ).first()
+    if not existe:
+        connection.execute(text(f"CREATE TEXT SEARCH CONFIGURATION {TEXTO_BUSCA} (COPY = portuguese)"))
+        connection.execute(text(
+            f"ALTER TEXT SEARCH CONFIGURATION {TEXTO_BUSCA} "
+            "ALTER MAPPING FOR hword, hword_part, word WITH unaccent, portuguese_stem"
+        ))
+
+    for tabela, colunas in TABELAS_BUSCA.items():
+        connection.execute(text(
+            f"ALTER TABLE {tabela} ADD COLUMN IF NOT EXISTS busca_vetor tsvector "
+            f"GENERATED ALWAYS AS ({_vetor_sql(colunas)}) STORED"
+        ))
+        connection.execute(text(
+            f"CREATE INDEX IF NOT EXISTS idx_{tabela}_busca ON {tabela} USING gin (entidade_id, busca_vetor)"
+        ))
+
+    sufixos = "|".join(sufixo.replace(" ", "\\s") for sufixo in SUFIXOS_SOCIETARIOS)
+    connection.execute(text(
+        f"CREATE OR REPLACE FUNCTION {NORMALIZAR_NOME}(nome text) RETURNS text "
+        "LANGUAGE sql IMMUTABLE PARALLEL SAFE AS $$ "
+        "SELECT btrim(regexp_replace(regexp_replace("
+        "lower(public.unaccent('public.unaccent'::regdictionary, coalesce(nome, ''))), "
+        f"'[^a-z0-9]+', ' ', 'g'), '\\m({sufixos})\\M', '', 'g')) $$"
+    ))
+    connection.execute(text(
+        "CREATE INDEX IF NOT EXISTS idx_fornecedor_nome_trgm ON fornecedor "
+        f"USING gin (entidade_id, {NORMALIZAR_NOME}(razao_social) gin_trgm_ops)"
+    ))
+
+
+def _instalar_sqlite(connection: Connection):
+    for tabela, colunas in TABELAS_BUSCA.items():
+        fts = tabela_fts(tabela)
+        nomes = ", ".join(colunas)
+        novos = ", ".join(f"new.{coluna}" for coluna in colunas)
+        antigos = ", ".join(f"old.{coluna}" for coluna in colunas)
+        existe = connection.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :nome"), {"nome": fts}
+        ).first()
+
+        connection.execute(text(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5({nomes}, content='{tabela}', "
+            "content_rowid='id', tokenize='unicode61 remove_diacritics 2')"
+        ))
+        connection.execute(text(
+            f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {tabela} BEGIN "
+            f"INSERT INTO {fts}(rowid, {nomes}) VALUES (new.id, {novos}); END"
+        ))
+        connection.execute(text(
+            f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {tabela} BEGIN "
+            f"INSERT INTO {fts}({fts}, rowid, {nomes}) VALUES ('delete', old.id, {antigos}); END"
+        ))
+        connection.execute(text(
+            f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF {nomes} ON {tabela} BEGIN "
+            f"INSERT INTO {fts}({fts}, rowid, {nomes}) VALUES ('delete', old.id, {antigos}); "
+            f"INSERT INTO {fts}(rowid, {nomes}) VALUES (new.id, {novos}); END"
+        ))
+        if not existe:
+            # Indexa as linhas que já existiam antes da tabela FTS
+            connection.execute(text(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')"))
+
+
+def instalar_busca_textual(connection: Connection):
+    """Cria (se ainda não existirem) as estruturas de busca textual do dialeto em uso"""
+    if connection.dialect.name in ("postgresql", "sqlite"):
+        connection.execute(text(
+            "CREATE INDEX IF NOT EXISTS idx_fornecedor_cnpj_raiz ON fornecedor (entidade_id, substr(cnpj, 1, 8))"
+        ))
+    if connection.dialect.name == "postgresql":
+        _instalar_postgresql(connection)
+    elif connection.dialect.name == "sqlite":
+        _instalar_sqlite(connection)
+
+
+def remover_busca_textual(connection: Connection):
+    """Remove índices, colunas geradas, tabelas FTS e triggers de busca textual"""
+    connection.execute(text("DROP INDEX IF EXISTS idx_fornecedor_cnpj_raiz"))
+    for tabela in TABELAS_BUSCA:
+        if connection.dialect.name == "postgresql":
+            connection.execute(text(f"DROP INDEX IF EXISTS idx_{tabela}_busca"))
+            connection.execute(text(f"ALTER TABLE {tabela} DROP COLUMN IF EXISTS busca_vetor"))
+        elif connection.dialect.name == "sqlite":
+            fts = tabela_fts(tabela)
+            for sufixo in ("ai", "ad", "au"):
+                connection.execute(text(f"DROP TRIGGER IF EXISTS {fts}_{sufixo}"))
+            connection.execute(text(f"DROP TABLE IF EXISTS {fts}"))
+    if connection.dialect.name == "postgresql":
+        connection.execute(text("DROP INDEX IF EXISTS idx_fornecedor_nome_trgm"))
+        connection.execute(text(f"DROP FUNCTION IF EXISTS {NORMALIZAR_NOME}(text)"))
+        connection.execute(text(f"DROP TEXT SEARCH CONFIGURATION IF EXISTS {TEXTO_BUSCA}"))
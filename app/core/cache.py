@@ -0,0 +1,170 @@
+"""
+Cache compartilhado da aplicação
+
+Usa o Redis de REDIS_URL quando disponível, para que todos os workers vejam
+os mesmos valores e as mesmas invalidações. Se o Redis não responder, cai
+para um dicionário em memória com TTL (por processo) e só tenta reconectar
+após REDIS_RETRY_SEGUNDOS, evitando pagar o timeout de conexão em toda
+requisição.
+
+Chaves gravadas ou removidas só na memória durante a queda ficam pendentes
+e são apagadas do Redis na primeira conexão bem-sucedida: o valor que o
+Redis guarda delas é anterior à queda e os outros workers não o serviriam
+mais como atual (versões de ETag, resumos invalidados).
+"""
+import json
+import logging
+import threading
+import time
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import redis
+
+from app.core.config import settings
+from app.core.metricas import CACHE_CONSULTAS
+
+logger = logging.getLogger(__name__)
+
+REDIS_RETRY_SEGUNDOS = 30
+
+
+class Cache:
+    """Cache chave/valor JSON com TTL, Redis com fallback em memória"""
+
+    def __init__(self, url: str):
+        self._redis = redis.Redis.from_url(
+            url,
+            decode_responses=True,
+            socket_connect_timeout=0.2,
+            socket_timeout=0.5
+        )
+        self._memoria: Dict[str, Tuple[float, str]] = {}
+        self._pendentes: Set[str] = set()
+        self._lock = threading.Lock()
+        self._redis_indisponivel_ate = 0.0
+
+    def _cliente(self) -> Optional[redis.Redis]:
+        if time.monotonic() < self._redis_indisponivel_ate:
+            return None
+        if self._pendentes:
+            with self._lock:
+                pendentes, self._pendentes = self._pendentes, set()
+            try:
+                self._redis.delete(*pendentes)
+            except redis.RedisError as e:
+                with self._lock:
+                    self._pendentes |= pendentes
+                self._falha_redis(e)
+                return None
+        return self._redis
+
+    def _falha_redis(self, erro: Exception):
+        logger.warning(f"Redis indisponível, usando cache em memória: {erro}")
+        self._redis_indisponivel_ate = time.monotonic() + REDIS_RETRY_SEGUNDOS
+
+    def get(self, chave: str) -> Optional[Any]:
+        """Retorna o valor desserializado ou None se ausente/expirado"""
+        cliente = self._cliente()
+        if cliente is not None:
+            try:
+                valor = cliente.get(chave)
+                CACHE_CONSULTAS.labels("miss" if valor is None else "hit", "redis").inc()
+                return json.loads(valor) if valor is not None else None
+            except redis.RedisError as e:
+                self._falha_redis(e)
+
+        with self._lock:
+            item = self._memoria.get(chave)
+            if item is not None and item[0] <= time.monotonic():
+                del self._memoria[chave]
+                item = None
+        CACHE_CONSULTAS.labels("miss" if item is None else "hit", "memoria").inc()
+        return json.loads(item[1]) if item is not None else None
+
+    def get_many(self, chaves: List[str]) -> List[Optional[Any]]:
+        """Valores de várias chaves (None para as ausentes) em uma ida ao Redis (MGET)"""
+        if not chaves:
+            return []
+        cliente = self._cliente()
+        if cliente is not None:
+            try:
+                return [json.loads(valor) if valor is not None else None for valor in cliente.mget(chaves)]
+            except redis.RedisError as e:
+                self._falha_redis(e)
+        return [self.get(chave) for chave in chaves]
+
+    def set(self, chave: str, valor: Any, ttl: Optional[int]):
+        """Grava o valor serializado em JSON com expiração em segundos (None: sem expiração)"""
+        serializado = json.dumps(valor, default=str)
+        cliente = self._cliente()
+        if cliente is not None:
+            try:
+                cliente.set(chave, serializado, ex=ttl)
+                return
+            except redis.RedisError as e:
+                self._falha_redis(e)
+
+        with self._lock:
+            self._memoria[chave] = (time.monotonic() + ttl if ttl is not None else float("inf"), serializado)
+            self._pendentes.add(chave)
+
+    def set_se_ausente(self, chave: str, valor: Any) -> Any:
+        """
+        Grava o valor (sem expiração) só se a chave não existir (SET NX) e
+        retorna o valor que ficou gravado, o novo ou o de quem gravou antes
+        """
+        serializado = json.dumps(valor, default=str)
+        cliente = self._cliente()
+        if cliente is not None:
+            try:
+                if cliente.set(chave, serializado, nx=True):
+                    return valor
+                atual = cliente.get(chave)
+                return json.loads(atual) if atual is not None else valor
+            except redis.RedisError as e:
+                self._falha_redis(e)
+
+        with self._lock:
+            item = self._memoria.get(chave)
+            if item is None or item[0] <= time.monotonic():
+                item = self._memoria[chave] = (float("inf"), serializado)
+                self._pendentes.add(chave)
+        return json.loads(item[1])
+
+    def incr(self, chave: str) -> int:
+        """Incrementa um contador inteiro (sem expiração) e retorna o novo valor"""
+        cliente = self._cliente()
+        if cliente is not None:
+            try:
+                return cliente.incr(chave)
+            except redis.RedisError as e:
+                self._falha_redis(e)
+
+        with self._lock:
+            item = self._memoria.get(chave)
+            valor = int(json.loads(item[1])) + 1 if item and item[0] > time.monotonic() else 1
+            self._memoria[chave] = (float("inf"), json.dumps(valor))
+            self._pendentes.add(chave)
+        return valor
+
+    def delete(self, *chaves: str):
+        """Remove as chaves (nos dois backends, para não servir valor antigo após reconexão)"""
+        if not chaves:
+            return
+        removido_no_redis = False
+        cliente = self._cliente()
+        if cliente is not None:
+            try:
+                cliente.delete(*chaves)
+                removido_no_redis = True
+            except redis.RedisError as e:
+                self._falha_redis(e)
+
+        with self._lock:
+            for chave in chaves:
+                self._memoria.pop(chave, None)
+            if not removido_no_redis:
+                self._pendentes.update(chaves)
+
+
+cache = Cache(settings.REDIS_URL)
@@ -1,4 +1,6 @@
 from celery import Celery
+from celery.schedules import crontab
+from celery.signals import worker_process_init
 import os
 from app.core.config import settings
 
@@ -7,7 +9,7 @@ celery_app = Celery(
     "sentinela_api",
     broker=os.getenv("REDIS_URL", "redis://localhost:6379/0"),
     backend=os.getenv("REDIS_URL", "redis://localhost:6379/0"),
-    include=["app.tasks"]
+    include=["app.tasks", "app.tasks.tasks"]
 )
 
 # Configurações do Celery
@@ -21,6 +23,22 @@ celery_app.conf.update(
         "app.tasks.*": {"queue": "sentinela"},
     },
     beat_schedule={
+        "varredura-certidoes-vencidas": {
+            "task": "app.tasks.tasks.varrer_certidoes_vencidas",
+            "schedule": crontab(hour=1, minute=0),  # Todos os dias à 1:00
+        },
+        "recalculo-scores-fornecedores": {
+            "task": "app.tasks.tasks.recalcular_scores_fornecedores",
+            "schedule": crontab(hour=1, minute=30),  # Todos os dias à 1:30
+        },
+        "consolidacao-execucao-financeira": {
+            "task": "app.tasks.tasks.consolidar_execucao_financeira",
+            "schedule": crontab(minute=15),  # A cada hora, aos 15 minutos
+        },
+        "deteccao-fornecedores-duplicados": {
+            "task": "app.tasks.tasks.detectar_fornecedores_duplicados",
+            "schedule": crontab(hour=2, minute=30),  # Todos os dias às 2:30
+        },
         # Tarefas agendadas podem ser definidas aqui
         # "cleanup-old-audits": {
         #     "task": "app.tasks.cleanup_old_audits",
@@ -29,6 +47,13 @@ celery_app.conf.update(
     }
 )
 
+@worker_process_init.connect
+def iniciar_rastreamento_worker(**kwargs):
+    """Rastreamento em cada processo do worker (o exportador em lote não sobrevive ao fork)"""
+    from app.core.rastreamento import configurar_rastreamento
+    configurar_rastreamento()
+
+
 # Configuração para desenvolvimento
 if os.getenv("ENVIRONMENT") == "development":
     celery_app.conf.update(
@@ -0,0 +1,238 @@
+"""
+Compressão das respostas HTTP (middleware ASGI puro)
+
+Escolhe o algoritmo pelo Accept-Encoding do cliente (maior q; empate
+resolvido pela ordem de COMPRESSAO_ALGORITMOS) entre br, zstd e gzip. br e
+zstd dependem dos pacotes brotli e zstandard; sem eles, só o gzip é
+oferecido.
+
+- Respostas menores que COMPRESSAO_MINIMO_BYTES seguem sem compressão (o
+  custo não compensa); as partes iniciais do corpo ficam retidas até que
+  o mínimo seja atingido ou o corpo termine.
+- Respostas em partes (StreamingResponse) são comprimidas parte a parte,
+  com flush a cada parte, para que o cliente receba os dados à medida que
+  são gerados; Content-Length é removido.
+- Conteúdo já comprimido (imagens, vídeo, zip, xlsx, pdf...), respostas
+  com Content-Encoding, 204/304, HEAD e text/event-stream passam direto.
+
+Por ser ASGI puro (sem BaseHTTPMiddleware), não acumula além desse mínimo
+o corpo das respostas em partes nem cria tarefas extras por requisição.
+"""
+import zlib
+from typing import Dict, List, Optional
+
+from app.core.config import settings
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - pacote opcional
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - pacote opcional
+    zstandard = None
+
+# Tipos que já chegam comprimidos (ou que não devem ser retidos em buffer)
+TIPOS_SEM_COMPRESSAO = (
+    "image/", "video/", "audio/", "font/woff",
+    "application/zip", "application/gzip", "application/x-gzip", "application/x-7z-compressed",
+    "application/x-rar-compressed", "application/zstd", "application/pdf", "application/octet-stream",
+    "application/vnd.openxmlformats-officedocument", "text/event-stream",
+)
+
+
+class _Gzip:
+    def __init__(self):
+        self._objeto = zlib.compressobj(settings.COMPRESSAO_NIVEL_GZIP, zlib.DEFLATED, 31)
+
+    def comprimir(self, dados: bytes) -> bytes:
+        return self._objeto.compress(dados) + self._objeto.flush(zlib.Z_SYNC_FLUSH)
+
+    def finalizar(self, dados: bytes = b"") -> bytes:
+        return self._objeto.compress(dados) + self._objeto.flush(zlib.Z_FINISH)
+
+
+class _Brotli:
+    def __init__(self):
+        self._objeto = brotli.Compressor(quality=settings.COMPRESSAO_NIVEL_BROTLI)
+
+    def comprimir(self, dados: bytes) -> bytes:
+        return self._objeto.process(dados) + self._objeto.flush()
+
+    def finalizar(self, dados: bytes = b"") -> bytes:
+        return self._objeto.process(dados) + self._objeto.finish()
+
+
+class _Zstd:
+    def __init__(self):
+        self._objeto = zstandard.ZstdCompressor(level=settings.COMPRESSAO_NIVEL_ZSTD).compressobj()
+
+    def comprimir(self, dados: bytes) -> bytes:
+        return self._objeto.compress(dados) + self._objeto.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finalizar(self, dados: bytes = b"") -> bytes:
+        return self._objeto.compress(dados) + self._objeto.flush()
+
+
+def compressores_disponiveis() -> Dict[str, type]:
+    """Algoritmos suportados neste processo, na ordem de preferência configurada"""
+    suportados = {"gzip": _Gzip}
+    if brotli is not None:
+        suportados["br"] = _Brotli
+    if zstandard is not None:
+        suportados["zstd"] = _Zstd
+    ordem = [nome.strip() for nome in settings.COMPRESSAO_ALGORITMOS.split(",") if nome.strip()]
+    return {nome: suportados[nome] for nome in ordem if nome in suportados}
+
+
+def escolher_algoritmo(accept_encoding: str, disponiveis: List[str]) -> Optional[str]:
+    """
+    Algoritmo aceito com maior q (q=0 recusa; `*` vale para os não citados).
+    Empates ficam com o primeiro de `disponiveis`.
+    """
+    pesos = {}
+    for item in accept_encoding.lower().split(","):
+        nome, _, parametros = item.strip().partition(";")
+        q = 1.0
+        for parametro in parametros.split(";"):
+            chave, _, valor = parametro.strip().partition("=")
+            if chave == "q":
+                try:
+                    q = float(valor)
+                except ValueError:
+                    q = 0.0
+        if nome.strip():
+            pesos[nome.strip()] = q
+
+    melhor, melhor_q = None, 0.0
+    for nome in disponiveis:
+        q = pesos.get(nome, pesos.get("*", 0.0))
+        if q > melhor_q:
+            melhor, melhor_q = nome, q
+    return melhor
+
+
+class CompressaoMiddleware:
+    """Comprime as respostas HTTP conforme o Accept-Encoding (br/zstd/gzip)"""
+
+    def __init__(self, app, minimo_bytes: Optional[int] = None):
+        self.app = app
+        self.minimo_bytes = settings.COMPRESSAO_MINIMO_BYTES if minimo_bytes is None else minimo_bytes
+        self.compressores = compressores_disponiveis()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] == "HEAD":
+            await self.app(scope, receive, send)
+            return
+
+        accept_encoding = ""
+        for nome, valor in scope["headers"]:
+            if nome == b"accept-encoding":
+                accept_encoding = valor.decode("latin-1")
+                break
+        algoritmo = escolher_algoritmo(accept_encoding, list(self.compressores)) if accept_encoding else None
+        if algoritmo is None:
+            await self.app(scope, receive, send)
+            return
+
+        await _RespostaComprimida(self, algoritmo, send).executar(scope, receive)
+
+
+class _RespostaComprimida:
+    """Estado de uma resposta: decide se comprime ao juntar o mínimo de bytes"""
+
+    def __init__(self, middleware: CompressaoMiddleware, algoritmo: str, send):
+        self.middleware = middleware
+        self.algoritmo = algoritmo
+        self.send = send
+        self.inicio = None
+        self.compressor = None
+        self.direto = False
+        self.pendente: List[bytes] = []
+        self.tamanho_pendente = 0
+
+    async def executar(self, scope, receive):
+        await self.middleware.app(scope, receive, self.enviar)
+
+    def _cabecalho(self, nome: bytes) -> Optional[bytes]:
+        for chave, valor in self.inicio["headers"]:
+            if chave.lower() == nome:
+                return valor
+        return None
+
+    def _comprimivel(self) -> bool:
+        if self.inicio["status"] in (204, 304) or self._cabecalho(b"content-encoding") is not None:
+            return False
+        tipo = (self._cabecalho(b"content-type") or b"").decode("latin-1").lower()
+        return not tipo.startswith(TIPOS_SEM_COMPRESSAO)
+
+    def _cabecalhos_comprimidos(self, tamanho: Optional[int]) -> List:
+        cabecalhos = []
+        vary = None
+        for chave, valor in self.inicio["headers"]:
+            nome = chave.lower()
+            if nome == b"content-length":
+                continue
+            if nome == b"vary":
+                vary = valor
+                continue
+            if nome == b"etag" and not valor.startswith(b"W/"):
+                # A representação comprimida não é idêntica byte a byte
+                valor = b"W/" + valor
+            cabecalhos.append((chave, valor))
+        cabecalhos.append((b"content-encoding", self.algoritmo.encode()))
+        cabecalhos.append((b"vary", vary + b", Accept-Encoding" if vary else b"Accept-Encoding"))
+        if tamanho is not None:
+            cabecalhos.append((b"content-length", str(tamanho).encode()))
+        return cabecalhos
+
+    async def enviar(self, mensagem):
+        tipo = mensagem["type"]
+        if tipo == "http.response.start":
+            # Retém o início até decidir se o corpo será comprimido
+            self.inicio = mensagem
+            return
+        if tipo != "http.response.body" or self.direto:
+            await self.send(mensagem)
+            return
+
+        corpo = mensagem.get("body", b"")
+        mais = mensagem.get("more_body", False)
+
+        if self.compressor is None:
+            if not self._comprimivel():
+                self.direto = True
+                await self.send(self.inicio)
+                await self.send(mensagem)
+                return
+
+            # Acumula partes até atingir o mínimo ou o fim do corpo (atrás de
+            # BaseHTTPMiddleware, mesmo respostas pequenas chegam em partes)
+            self.pendente.append(corpo)
+            self.tamanho_pendente += len(corpo)
+            if mais and self.tamanho_pendente < self.middleware.minimo_bytes:
+                return
+            corpo, self.pendente = b"".join(self.pendente), []
+
+            if not mais and len(corpo) < self.middleware.minimo_bytes:
+                self.direto = True
+                await self.send(self.inicio)
+                await self.send({"type": "http.response.body", "body": corpo})
+                return
+
+            self.compressor = self.middleware.compressores[self.algoritmo]()
+            if not mais:
+                comprimido = self.compressor.finalizar(corpo)
+                await self.send({**self.inicio, "headers": self._cabecalhos_comprimidos(len(comprimido))})
+                await self.send({"type": "http.response.body", "body": comprimido})
+                return
+            await self.send({**self.inicio, "headers": self._cabecalhos_comprimidos(None)})
+
+        if mais:
+            comprimido = self.compressor.comprimir(corpo) if corpo else b""
+            if comprimido:
+                await self.send({"type": "http.response.body", "body": comprimido, "more_body": True})
+        else:
+            comprimido = self.compressor.finalizar(corpo)
+            await self.send({"type": "http.response.body", "body": comprimido})
@@ -17,6 +17,58 @@ class Settings:
     APP_VERSION: str = os.getenv("APP_VERSION", "1.0.0")
     ENVIRONMENT: str = os.getenv("ENVIRONMENT", "production")
     
+    # Multi-tenant: isolamento via Row Level Security do PostgreSQL
+    TENANT_RLS_ENABLED: bool = os.getenv("TENANT_RLS_ENABLED", "false").lower() == "true"
+    TENANT_RLS_ROLE: str = os.getenv("TENANT_RLS_ROLE", "sentinela_tenant")
+    
+    # Redis (cache compartilhado entre workers)
+    REDIS_URL: str = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+    
+    # Dashboard: validade (segundos) dos agregados em cache por entidade
+    DASHBOARD_CACHE_TTL: int = int(os.getenv("DASHBOARD_CACHE_TTL", "60"))
+    
+    # Análise de atraso dos cronogramas: validade (segundos) do cache por entidade
+    ANALISE_CACHE_TTL: int = int(os.getenv("ANALISE_CACHE_TTL", "300"))
+    
+    # Importação de planilhas: diretório compartilhado entre API e workers,
+    # linhas por lote gravado, erros guardados por importação e tamanho máximo
+    IMPORTACAO_DIR: str = os.getenv("IMPORTACAO_DIR", "./uploads/importacoes")
+    IMPORTACAO_LOTE: int = int(os.getenv("IMPORTACAO_LOTE", "1000"))
+    IMPORTACAO_MAX_ERROS: int = int(os.getenv("IMPORTACAO_MAX_ERROS", "100"))
+    IMPORTACAO_MAX_BYTES: int = int(os.getenv("IMPORTACAO_MAX_BYTES", str(2 * 1024 ** 3)))
+    
+    # Compressão das respostas: algoritmos em ordem de preferência (br, zstd,
+    # gzip), tamanho mínimo em bytes e nível de cada algoritmo
+    COMPRESSAO_ALGORITMOS: str = os.getenv("COMPRESSAO_ALGORITMOS", "br,zstd,gzip")
+    COMPRESSAO_MINIMO_BYTES: int = int(os.getenv("COMPRESSAO_MINIMO_BYTES", "1024"))
+    COMPRESSAO_NIVEL_BROTLI: int = int(os.getenv("COMPRESSAO_NIVEL_BROTLI", "4"))
+    COMPRESSAO_NIVEL_ZSTD: int = int(os.getenv("COMPRESSAO_NIVEL_ZSTD", "3"))
+    COMPRESSAO_NIVEL_GZIP: int = int(os.getenv("COMPRESSAO_NIVEL_GZIP", "6"))
+    
+    # Consultas SQL: limite (ms) para o log de consultas lentas e cabeçalho
+    # Server-Timing com número de consultas e tempo no banco por requisição
+    SQL_LENTA_MS: float = float(os.getenv("SQL_LENTA_MS", "200"))
+    SQL_SERVER_TIMING: bool = os.getenv("SQL_SERVER_TIMING", "true").lower() == "true"
+    
+    # Rastreamento OpenTelemetry: exportador (otlp, console ou memoria) e
+    # amostragem na cauda (traces com erro ou acima de TRACING_LENTO_MS
+    # sempre; os demais na proporção TRACING_PROPORCAO)
+    TRACING_HABILITADO: bool = os.getenv("TRACING_HABILITADO", "false").lower() == "true"
+    TRACING_SERVICO: str = os.getenv("TRACING_SERVICO", "sentinela-api")
+    TRACING_EXPORTADOR: str = os.getenv("TRACING_EXPORTADOR", "otlp")
+    TRACING_PROPORCAO: float = float(os.getenv("TRACING_PROPORCAO", "0.1"))
+    TRACING_LENTO_MS: float = float(os.getenv("TRACING_LENTO_MS", "1000"))
+    
+    # Perfilador por amostragem (/admin/perfil): intervalo entre amostras,
+    # duração máxima de uma sessão e validade do token de X-Perfil-Token
+    PERFIL_INTERVALO_MS: float = float(os.getenv("PERFIL_INTERVALO_MS", "5"))
+    PERFIL_MAX_SEGUNDOS: int = int(os.getenv("PERFIL_MAX_SEGUNDOS", "60"))
+    PERFIL_TOKEN_MINUTOS: int = int(os.getenv("PERFIL_TOKEN_MINUTOS", "15"))
+    
+    # Token exigido em /metrics (Authorization: Bearer); vazio deixa aberto,
+    # para quando o acesso já é restrito na rede
+    METRICAS_TOKEN: str = os.getenv("METRICAS_TOKEN", "")
+    
     # CORS
     CORS_ORIGINS: list = [
         "http://localhost:3000",
@@ -0,0 +1,159 @@
+"""
+Contabilidade das consultas SQL por requisição
+
+Eventos do SQLAlchemy (em todos os engines) somam, para a requisição em
+curso, o número de consultas, o tempo total no banco e a consulta mais
+lenta. ConsultasMiddleware abre a contagem e devolve o resultado no
+cabeçalho Server-Timing (visível no DevTools do navegador):
+
+    Server-Timing: db;dur=12.4;desc="5 consultas", db-max;dur=6.1;desc="3f2a9c01d4e7"
+
+A descrição de db-max é a impressão da consulta mais lenta, a mesma do log
+de consultas lentas (acima de SQL_LENTA_MS), que registra o SQL com os
+parâmetros como marcadores e só os tipos dos valores, nunca os valores.
+
+Nos testes, orcamento_consultas falha quando um trecho (uma chamada à API
+pelo TestClient, por exemplo) executa mais consultas que o previsto.
+"""
+import hashlib
+import logging
+import re
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class EstatisticasConsultas:
+    """Consultas de uma requisição: quantidade, tempo total e a mais lenta"""
+
+    def __init__(self):
+        self.total = 0
+        self.segundos = 0.0
+        self.mais_lenta: Optional[str] = None
+        self.mais_lenta_segundos = 0.0
+
+    def registrar(self, instrucao: str, segundos: float):
+        self.total += 1
+        self.segundos += segundos
+        if segundos >= self.mais_lenta_segundos:
+            self.mais_lenta, self.mais_lenta_segundos = instrucao, segundos
+
+    def server_timing(self) -> str:
+        valor = f'db;dur={self.segundos * 1000:.1f};desc="{self.total} consultas"'
+        if self.mais_lenta is not None:
+            valor += f', db-max;dur={self.mais_lenta_segundos * 1000:.1f};desc="{impressao_sql(self.mais_lenta)}"'
+        return valor
+
+
+# Estatísticas da requisição em curso (o objeto é compartilhado com as
+# threads do threadpool e as tarefas do anyio, que copiam o contexto)
+_estatisticas: ContextVar[Optional[EstatisticasConsultas]] = ContextVar("estatisticas_consultas", default=None)
+
+
+def normalizar_sql(instrucao: str) -> str:
+    return re.sub(r"\s+", " ", instrucao).strip()
+
+
+def impressao_sql(instrucao: str) -> str:
+    """Identificador curto e estável do SQL (sem valores), para correlacionar log e Server-Timing"""
+    return hashlib.sha1(normalizar_sql(instrucao).encode()).hexdigest()[:12]
+
+
+def tipos_parametros(parametros) -> str:
+    """Tipos dos parâmetros vinculados, sem os valores (podem conter dados pessoais)"""
+    if isinstance(parametros, (list, tuple)) and parametros and isinstance(parametros[0], (dict, list, tuple)):
+        return f"{len(parametros)} linhas de ({tipos_parametros(parametros[0])})"
+    if isinstance(parametros, dict):
+        return ", ".join(f"{nome}: {type(valor).__name__}" for nome, valor in parametros.items())
+    if isinstance(parametros, (list, tuple)):
+        return ", ".join(type(valor).__name__ for valor in parametros)
+    return ""
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _antes(conn, cursor, statement, parameters, context, executemany):
+    # No contexto de execução, que morre com a instrução: se ela falhar,
+    # after_cursor_execute não roda e nada fica pendurado na conexão do pool
+    if context is not None:
+        context._inicio_consulta = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _depois(conn, cursor, statement, parameters, context, executemany):
+    inicio = getattr(context, "_inicio_consulta", None)
+    if inicio is None:
+        return
+    segundos = time.perf_counter() - inicio
+    estatisticas = _estatisticas.get()
+    if estatisticas is not None:
+        estatisticas.registrar(statement, segundos)
+    if segundos * 1000 >= settings.SQL_LENTA_MS:
+        logger.warning(
+            f"Consulta lenta ({segundos * 1000:.1f} ms) [{impressao_sql(statement)}] "
+            f"{normalizar_sql(statement)} | parâmetros: {tipos_parametros(parameters)}"
+        )
+
+
+class ConsultasMiddleware:
+    """Middleware ASGI que conta as consultas da requisição e devolve Server-Timing"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.SQL_SERVER_TIMING:
+            await self.app(scope, receive, send)
+            return
+
+        estatisticas = EstatisticasConsultas()
+        token = _estatisticas.set(estatisticas)
+
+        async def enviar(mensagem):
+            if mensagem["type"] == "http.response.start":
+                cabecalhos = list(mensagem.get("headers", []))
+                cabecalhos.append((b"server-timing", estatisticas.server_timing().encode()))
+                mensagem = {**mensagem, "headers": cabecalhos}
+            await send(mensagem)
+
+        try:
+            await self.app(scope, receive, enviar)
+        finally:
+            _estatisticas.reset(token)
+
+
+class OrcamentoExcedido(AssertionError):
+    pass
+
+
+@contextmanager
+def orcamento_consultas(maximo: int):
+    """
+    Para testes: falha se o bloco executar mais de `maximo` consultas.
+    Conta as consultas de todas as threads (o TestClient atende em outra
+    thread), então não deve haver outra atividade no banco durante o bloco.
+
+        with orcamento_consultas(5):
+            client.post("/fiscais-designados/", ...)
+    """
+    instrucoes: List[str] = []
+
+    def contar(conn, cursor, statement, parameters, context, executemany):
+        instrucoes.append(normalizar_sql(statement))
+
+    event.listen(Engine, "after_cursor_execute", contar)
+    try:
+        yield instrucoes
+    finally:
+        event.remove(Engine, "after_cursor_execute", contar)
+    if len(instrucoes) > maximo:
+        raise OrcamentoExcedido(
+            f"{len(instrucoes)} consultas (orçamento: {maximo}):\n" + "\n".join(instrucoes)
+        )
@@ -1,5 +1,8 @@
 from sqlmodel import create_engine, SQLModel, Session
 from app.core.config import settings
+from app.core.busca_textual import instalar_busca_textual
+from app.core.metricas import instrumentar_pool
+import app.core.consultas  # noqa: F401 - registra a contagem e o log de consultas lentas
 
 # Criar engine do banco de dados
 engine = create_engine(
@@ -9,10 +12,13 @@ engine = create_engine(
     pool_size=10,
     max_overflow=20,
 )
+instrumentar_pool(engine)
 
 def create_db_and_tables():
-    """Cria todas as tabelas no banco de dados"""
+    """Cria todas as tabelas no banco de dados e os índices de busca textual"""
     SQLModel.metadata.create_all(engine)
+    with engine.begin() as connection:
+        instalar_busca_textual(connection)
 
 def get_session():
     """Dependency para obter sessão do banco de dados"""
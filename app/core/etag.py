@@ -0,0 +1,126 @@
+"""
+ETags fracos e respostas 304 para leituras repetidas
+
+Cada coleção (tabela) tem uma versão no cache compartilhado
+(`versao:<tabela>`), trocada por um valor aleatório novo após o commit de
+qualquer transação que inseriu, alterou ou removeu linhas dela, seja pelo
+ORM (session.add/delete) ou por INSERT/UPDATE/DELETE em massa executados
+pela sessão. Não é um contador: se o Redis for esvaziado (FLUSHDB, restart
+sem persistência, despejo de chaves), um contador recomeçaria de 1 e
+repetiria versões já vistas pelos clientes, gerando 304 com dados
+desatualizados. Versão ausente na leitura também é semeada com um valor
+aleatório (SET NX), para que todos os workers adotem o mesmo.
+
+A dependência etag_condicional lê as versões das coleções da rota com um
+único MGET, antes de qualquer consulta de dados, e deriva o ETag delas, do
+usuário e da URL. Se o cliente enviar o mesmo valor em If-None-Match, a
+rota responde 304 sem consultar nem serializar as linhas.
+
+As versões precisam do Redis para valer entre workers: no fallback em
+memória cada processo tem as suas, e um worker não vê as escritas dos
+outros. Versões gravadas durante a queda são apagadas do Redis na
+reconexão (ver app.core.cache), para que os ETags emitidos antes da queda
+deixem de casar. Escritas feitas fora da sessão (SQL direto na conexão, outro
+sistema) não invalidam os ETags.
+"""
+import hashlib
+import hmac
+import secrets
+from typing import Set
+
+from fastapi import Depends, HTTPException, Request, Response, status
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.core.auth import get_current_user
+from app.core.cache import cache
+from app.core.config import settings
+from app.models.usuario import Usuario
+
+COLECOES_INFO_KEY = "etag_colecoes_alteradas"
+
+
+def chave_versao(colecao: str) -> str:
+    """Chave da versão de uma coleção no cache"""
+    return f"versao:{colecao}"
+
+
+def _nova_versao() -> str:
+    return secrets.token_hex(8)
+
+
+def _colecoes_alteradas(session: Session) -> Set[str]:
+    return session.info.setdefault(COLECOES_INFO_KEY, set())
+
+
+@event.listens_for(Session, "after_flush")
+def _registrar_flush(session, flush_context):
+    """Anota as tabelas das instâncias gravadas no flush"""
+    alteradas = _colecoes_alteradas(session)
+    for instancia in (*session.new, *session.dirty, *session.deleted):
+        tabela = getattr(instancia, "__tablename__", None)
+        if tabela:
+            alteradas.add(tabela)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _registrar_execucao(orm_execute_state):
+    """Anota a tabela de INSERT/UPDATE/DELETE em massa executados pela sessão"""
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        tabela = getattr(orm_execute_state.statement, "table", None)
+        if tabela is not None:
+            _colecoes_alteradas(orm_execute_state.session).add(tabela.name)
+
+
+@event.listens_for(Session, "after_commit")
+def _publicar_versoes(session):
+    """Publica as novas versões só depois que os dados estão visíveis"""
+    alteradas = session.info.pop(COLECOES_INFO_KEY, None)
+    for colecao in sorted(alteradas or ()):
+        cache.set(chave_versao(colecao), _nova_versao(), ttl=None)
+
+
+@event.listens_for(Session, "after_rollback")
+def _descartar_versoes(session):
+    session.info.pop(COLECOES_INFO_KEY, None)
+
+
+def calcular_etag(versoes: list, usuario: Usuario, request: Request) -> str:
+    """
+    ETag fraco (W/"...") das versões, do usuário e da URL. O HMAC com
+    SECRET_KEY impede que quem nunca recebeu a resposta monte o valor.
+    """
+    base = "|".join([
+        ",".join(str(versao) for versao in versoes),
+        str(usuario.id), usuario.perfil, str(usuario.entidade_id),
+        request.url.path, request.url.query
+    ])
+    digest = hmac.new(settings.SECRET_KEY.encode(), base.encode(), hashlib.sha1).hexdigest()
+    return f'W/"{digest[:20]}"'
+
+
+def etag_condicional(*colecoes: str):
+    """
+    Dependência para rotas GET cujo corpo só muda quando mudam as `colecoes`.
+
+    Usar em `dependencies=[Depends(etag_condicional("contrato"))]`: grava o
+    ETag na resposta ou, se If-None-Match já o contém, interrompe com 304.
+    """
+    chaves = [chave_versao(colecao) for colecao in colecoes]
+
+    def verificar_etag(
+        request: Request,
+        response: Response,
+        current_user: Usuario = Depends(get_current_user)
+    ):
+        versoes = [
+            versao if versao is not None else cache.set_se_ausente(chave, _nova_versao())
+            for chave, versao in zip(chaves, cache.get_many(chaves))
+        ]
+        etag = calcular_etag(versoes, current_user, request)
+        if_none_match = request.headers.get("if-none-match", "")
+        if etag in (valor.strip() for valor in if_none_match.split(",")):
+            raise HTTPException(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+        response.headers["ETag"] = etag
+
+    return verificar_etag
@@ -0,0 +1,140 @@
+"""
+Métricas Prometheus da aplicação (/metrics)
+
+- Requisições HTTP: contador e histograma de latência por método, rota
+  (template, ex.: /contratos/{contrato_id}, nunca a URL crua) e status.
+- Pool do SQLAlchemy: conexões em uso e em overflow do engine de
+  app.core.database, atualizadas nos eventos de checkout/checkin.
+- PNCP: latência e erros por recurso consultado (números trocados por :id).
+- Celery: profundidade das filas no Redis, lida no momento da coleta.
+- Cache: consultas por resultado (hit/miss) e backend; a taxa de acerto é
+  hit / (hit + miss) no Prometheus.
+
+Com vários workers do uvicorn/gunicorn, defina PROMETHEUS_MULTIPROC_DIR
+(diretório vazio a cada deploy, compartilhado pelos workers): cada processo
+grava suas métricas em arquivos e /metrics agrega todos. Sem a variável,
+as métricas são só do processo que atendeu a coleta.
+"""
+import os
+import re
+import time
+
+import redis
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram, REGISTRY, generate_latest, multiprocess
+)
+from prometheus_client.core import GaugeMetricFamily
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+
+# Filas do Celery observadas (a padrão e a de app.tasks.*)
+FILAS_CELERY = ("celery", "sentinela")
+
+# Rótulo de rotas sem correspondência (404), para não criar uma série por URL
+ROTA_DESCONHECIDA = "desconhecida"
+
+REQUISICOES = Counter(
+    "sentinela_http_requisicoes_total", "Requisições HTTP atendidas", ["metodo", "rota", "status"]
+)
+LATENCIA = Histogram(
+    "sentinela_http_requisicao_segundos", "Latência das requisições HTTP", ["metodo", "rota", "status"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+)
+POOL_EM_USO = Gauge(
+    "sentinela_db_pool_conexoes_em_uso", "Conexões do pool em uso (checked out)", multiprocess_mode="livesum"
+)
+POOL_OVERFLOW = Gauge(
+    "sentinela_db_pool_overflow", "Conexões abertas além de pool_size", multiprocess_mode="livesum"
+)
+PNCP_LATENCIA = Histogram(
+    "sentinela_pncp_requisicao_segundos", "Latência das consultas ao PNCP", ["recurso"],
+    buckets=(0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+)
+PNCP_ERROS = Counter(
+    "sentinela_pncp_erros_total", "Consultas ao PNCP com erro", ["recurso", "tipo"]
+)
+CACHE_CONSULTAS = Counter(
+    "sentinela_cache_consultas_total", "Consultas ao cache compartilhado", ["resultado", "backend"]
+)
+
+
+def recurso_pncp(endpoint: str) -> str:
+    """Endpoint do PNCP sem identificadores (CNPJ, números), para rotular métricas"""
+    return re.sub(r"\d+", ":id", endpoint.split("?", 1)[0])
+
+
+def instrumentar_pool(engine: Engine):
+    """Atualiza os gauges do pool a cada checkout/checkin de conexão"""
+    def atualizar(*_):
+        pool = engine.pool
+        if hasattr(pool, "checkedout"):
+            POOL_EM_USO.set(pool.checkedout())
+            POOL_OVERFLOW.set(max(pool.overflow(), 0))
+
+    event.listen(engine, "checkout", atualizar)
+    event.listen(engine, "checkin", atualizar)
+
+
+class ColetorFilasCelery:
+    """Profundidade das filas do Celery (LLEN no broker Redis) no momento da coleta"""
+
+    def collect(self):
+        familia = GaugeMetricFamily(
+            "sentinela_celery_fila_tamanho", "Tarefas aguardando na fila do Celery", labels=["fila"]
+        )
+        try:
+            cliente = redis.Redis.from_url(settings.REDIS_URL, socket_connect_timeout=0.2, socket_timeout=0.5)
+            with cliente.pipeline() as pipe:
+                for fila in FILAS_CELERY:
+                    pipe.llen(fila)
+                tamanhos = pipe.execute()
+        except redis.RedisError:
+            return
+        for fila, tamanho in zip(FILAS_CELERY, tamanhos):
+            familia.add_metric([fila], tamanho)
+        yield familia
+
+
+REGISTRY.register(ColetorFilasCelery())
+
+
+def gerar_metricas() -> bytes:
+    """Texto de exposição do Prometheus (agregado entre processos no modo multiprocess)"""
+    if not os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        return generate_latest(REGISTRY)
+    registro = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registro)
+    registro.register(ColetorFilasCelery())
+    return generate_latest(registro)
+
+
+class MetricasMiddleware:
+    """Middleware ASGI que mede cada requisição HTTP pelo template da rota"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        inicio = time.perf_counter()
+
+        async def enviar(mensagem):
+            nonlocal status
+            if mensagem["type"] == "http.response.start":
+                status = mensagem["status"]
+            await send(mensagem)
+
+        try:
+            await self.app(scope, receive, enviar)
+        finally:
+            # O roteador do FastAPI grava a rota encontrada no scope
+            rota = getattr(scope.get("route"), "path", ROTA_DESCONHECIDA)
+            rotulos = (scope["method"], rota, str(status))
+            REQUISICOES.labels(*rotulos).inc()
+            LATENCIA.labels(*rotulos).observe(time.perf_counter() - inicio)
@@ -0,0 +1,172 @@
+"""
+Perfilador por amostragem do processo (worker do uvicorn)
+
+Uma thread lê periodicamente as pilhas de todas as threads do processo
+(sys._current_frames) e conta quantas vezes cada pilha aparece. Nada é
+instalado no interpretador (sem sys.setprofile), então o custo é só o da
+thread amostradora enquanto ela existe e zero fora de uma sessão.
+
+O resultado é um arquivo do speedscope (https://www.speedscope.app), com um
+perfil por thread: a do event loop mostra as rotas async e o middleware; as
+do threadpool, as rotas síncronas e o acesso ao banco.
+
+Duas formas de uso (app.routes.perfil):
+- sessão de N segundos no worker que atender a chamada (ROOT);
+- perfil de uma requisição: com o cabeçalho X-Perfil-Token (assinado, emitido
+  para um ROOT), PerfilRequisicaoMiddleware amostra o processo durante a
+  requisição, guarda o arquivo no cache e devolve o id em X-Perfil-Id.
+  Requisições concorrentes no mesmo worker aparecem nas suas threads.
+"""
+import hashlib
+import hmac
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+from app.core.cache import cache
+from app.core.config import settings
+
+CABECALHO_TOKEN = b"x-perfil-token"
+CHAVE_PERFIL = "perfil:{}"
+# Perfis por requisição ficam no cache por este tempo
+PERFIL_TTL_SEGUNDOS = 600
+
+# Uma sessão por processo: duas amostradoras só dobrariam o custo
+_sessao = threading.Lock()
+
+
+class SessaoOcupada(Exception):
+    pass
+
+
+class AmostradorPilhas:
+    """Amostra as pilhas de todas as threads do processo a cada `intervalo` segundos"""
+
+    def __init__(self, intervalo: float):
+        self.intervalo = intervalo
+        self.amostras: Dict[str, Counter] = {}
+        self._parar = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.inicio = 0.0
+        self.fim = 0.0
+
+    def iniciar(self):
+        if not _sessao.acquire(blocking=False):
+            raise SessaoOcupada("Já existe uma sessão de perfil ativa neste worker")
+        self.inicio = time.perf_counter()
+        self._thread = threading.Thread(target=self._amostrar, name="perfilador", daemon=True)
+        self._thread.start()
+
+    def parar(self):
+        self._parar.set()
+        self._thread.join()
+        self.fim = time.perf_counter()
+        _sessao.release()
+
+    def _amostrar(self):
+        propria = threading.get_ident()
+        while not self._parar.wait(self.intervalo):
+            nomes = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == propria:
+                    continue
+                pilha = []
+                while frame is not None:
+                    codigo = frame.f_code
+                    pilha.append((codigo.co_name, codigo.co_filename, codigo.co_firstlineno))
+                    frame = frame.f_back
+                nome = nomes.get(ident, str(ident))
+                self.amostras.setdefault(nome, Counter())[tuple(reversed(pilha))] += 1
+
+    def speedscope(self, nome: str) -> dict:
+        """Perfil no formato de arquivo do speedscope (tipo sampled, em segundos)"""
+        quadros: List[dict] = []
+        indices: Dict[Tuple[str, str, int], int] = {}
+        perfis = []
+        for thread, contagem in sorted(self.amostras.items()):
+            amostras, pesos = [], []
+            for pilha, vezes in contagem.items():
+                caminho = []
+                for quadro in pilha:
+                    if quadro not in indices:
+                        indices[quadro] = len(quadros)
+                        quadros.append({"name": quadro[0], "file": quadro[1], "line": quadro[2]})
+                    caminho.append(indices[quadro])
+                amostras.append(caminho)
+                pesos.append(round(vezes * self.intervalo, 6))
+            perfis.append({
+                "type": "sampled", "name": thread, "unit": "seconds",
+                "startValue": 0, "endValue": round(self.fim - self.inicio, 6),
+                "samples": amostras, "weights": pesos,
+            })
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": nome,
+            "exporter": settings.APP_NAME,
+            "activeProfileIndex": 0,
+            "shared": {"frames": quadros},
+            "profiles": perfis,
+        }
+
+
+def _assinatura(usuario_id: int, expira_em: int) -> str:
+    mensagem = f"perfil:{usuario_id}:{expira_em}".encode()
+    return hmac.new(settings.SECRET_KEY.encode(), mensagem, hashlib.sha256).hexdigest()
+
+
+def emitir_token(usuario_id: int) -> Tuple[str, int]:
+    """Token do cabeçalho X-Perfil-Token e o instante (epoch) em que expira"""
+    expira_em = int(time.time()) + settings.PERFIL_TOKEN_MINUTOS * 60
+    return f"{usuario_id}.{expira_em}.{_assinatura(usuario_id, expira_em)}", expira_em
+
+
+def validar_token(token: str) -> bool:
+    try:
+        usuario_id, expira_em, assinatura = token.split(".")
+        usuario_id, expira_em = int(usuario_id), int(expira_em)
+    except ValueError:
+        return False
+    if expira_em < time.time():
+        return False
+    return hmac.compare_digest(assinatura, _assinatura(usuario_id, expira_em))
+
+
+class PerfilRequisicaoMiddleware:
+    """Perfil de uma requisição com X-Perfil-Token válido; sem o cabeçalho, só repassa"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        token = None
+        if scope["type"] == "http":
+            for nome, valor in scope["headers"]:
+                if nome == CABECALHO_TOKEN:
+                    token = valor.decode("latin-1")
+                    break
+        if token is None or not validar_token(token):
+            await self.app(scope, receive, send)
+            return
+
+        perfil_id = uuid.uuid4().hex
+
+        async def enviar(mensagem):
+            if mensagem["type"] == "http.response.start":
+                mensagem = {**mensagem, "headers": [*mensagem.get("headers", []), (b"x-perfil-id", perfil_id.encode())]}
+            await send(mensagem)
+
+        amostrador = AmostradorPilhas(settings.PERFIL_INTERVALO_MS / 1000)
+        try:
+            amostrador.iniciar()
+        except SessaoOcupada:
+            await self.app(scope, receive, send)
+            return
+        try:
+            await self.app(scope, receive, enviar)
+        finally:
+            amostrador.parar()
+            nome = f"{scope['method']} {scope['path']}"
+            cache.set(CHAVE_PERFIL.format(perfil_id), amostrador.speedscope(nome), ttl=PERFIL_TTL_SEGUNDOS)
@@ -0,0 +1,178 @@
+"""
+Rastreamento distribuído (OpenTelemetry)
+
+Instrumenta a aplicação FastAPI, o engine do SQLAlchemy, os clientes httpx
+(entre eles o do PNCPService) e as tarefas do Celery. O contexto do trace
+segue da API para o worker nos cabeçalhos da mensagem da tarefa, então uma
+sincronização com o PNCP aparece como um único trace: requisição, SQL,
+publicação, execução no worker e chamadas HTTP ao PNCP.
+
+Amostragem na cauda (AmostragemCauda): os spans de cada trace ficam retidos
+até o fim do span raiz do processo; o trace é exportado se tiver erro, se
+durar mais que TRACING_LENTO_MS ou, para os demais, numa fração
+TRACING_PROPORCAO. A fração usa os bits do trace_id, então API e worker
+mantêm os mesmos traces comuns sem se comunicar.
+
+Exportadores (TRACING_EXPORTADOR): otlp (OTEL_EXPORTER_OTLP_ENDPOINT),
+console ou memoria (InMemorySpanExporter, para testes; ver spans_memoria).
+
+Desligado por padrão (TRACING_HABILITADO); sem os pacotes opentelemetry-*,
+configurar_rastreamento só registra um aviso.
+"""
+import logging
+import threading
+from collections import OrderedDict
+from typing import List, Optional
+
+from app.core.config import settings
+
+try:
+    from opentelemetry import trace
+    from opentelemetry.instrumentation.celery import CeleryInstrumentor
+    from opentelemetry.instrumentation.fastapi import FastAPIInstrumentor
+    from opentelemetry.instrumentation.httpx import HTTPXClientInstrumentor
+    from opentelemetry.instrumentation.sqlalchemy import SQLAlchemyInstrumentor
+    from opentelemetry.sdk.resources import Resource
+    from opentelemetry.sdk.trace import ReadableSpan, SpanProcessor, TracerProvider
+    from opentelemetry.sdk.trace.export import (
+        BatchSpanProcessor, ConsoleSpanExporter, SimpleSpanProcessor, SpanExporter
+    )
+    from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+    from opentelemetry.trace import StatusCode
+except ImportError:  # pragma: no cover - pacotes opcionais
+    trace = None
+    SpanProcessor = object
+
+logger = logging.getLogger(__name__)
+
+# Rotas que não geram traces
+URLS_EXCLUIDAS = "/health,/ready,/metrics"
+
+_provedor = None
+_exportador_memoria = None
+
+
+class AmostragemCauda(SpanProcessor):
+    """
+    Retém os spans de cada trace até o fim do span raiz local e então decide
+    se o trace inteiro segue para `destino` (erro, lentidão ou proporção).
+    """
+
+    def __init__(self, destino: "SpanProcessor", proporcao: float, lento_ms: float, max_traces: int = 2048):
+        self.destino = destino
+        self.limite_trace_id = int(max(0.0, min(proporcao, 1.0)) * (2 ** 64 - 1))
+        self.lento_ns = lento_ms * 1_000_000
+        self.max_traces = max_traces
+        self._pendentes: "OrderedDict[int, List[ReadableSpan]]" = OrderedDict()
+        # Decisões já tomadas, para spans que terminam depois da raiz
+        self._decididos: "OrderedDict[int, bool]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def on_start(self, span, parent_context=None):
+        pass
+
+    def _manter(self, spans: List["ReadableSpan"], raiz: "ReadableSpan") -> bool:
+        if any(span.status.status_code == StatusCode.ERROR for span in spans):
+            return True
+        if raiz.end_time - raiz.start_time >= self.lento_ns:
+            return True
+        # Mesmo critério do TraceIdRatioBased: 64 bits baixos do trace_id
+        return (raiz.context.trace_id & (2 ** 64 - 1)) < self.limite_trace_id
+
+    def on_end(self, span: "ReadableSpan"):
+        trace_id = span.context.trace_id
+        raiz = span.parent is None or span.parent.is_remote
+        with self._lock:
+            decisao = self._decididos.get(trace_id)
+            if decisao is None:
+                self._pendentes.setdefault(trace_id, []).append(span)
+                if not raiz:
+                    while len(self._pendentes) > self.max_traces:
+                        self._pendentes.popitem(last=False)
+                    return
+                spans = self._pendentes.pop(trace_id)
+                decisao = self._manter(spans, span)
+                self._decididos[trace_id] = decisao
+                while len(self._decididos) > self.max_traces:
+                    self._decididos.popitem(last=False)
+            else:
+                spans = [span]
+        if decisao:
+            for pendente in spans:
+                self.destino.on_end(pendente)
+
+    def shutdown(self):
+        self.destino.shutdown()
+
+    def force_flush(self, timeout_millis: int = 30000) -> bool:
+        return self.destino.force_flush(timeout_millis)
+
+
+def _exportador() -> "SpanExporter":
+    global _exportador_memoria
+    if settings.TRACING_EXPORTADOR == "memoria":
+        _exportador_memoria = InMemorySpanExporter()
+        return _exportador_memoria
+    if settings.TRACING_EXPORTADOR == "console":
+        return ConsoleSpanExporter()
+    from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+    return OTLPSpanExporter()
+
+
+def configurar_rastreamento(app=None, exportador: Optional["SpanExporter"] = None, forcar: bool = False):
+    """
+    Liga o rastreamento no processo (na API, com `app`; no worker do Celery,
+    sem) e retorna o TracerProvider, ou None se desligado/indisponível.
+    Um `exportador` explícito (testes) é usado sem lote e dispensa
+    TRACING_HABILITADO com `forcar`.
+    """
+    global _provedor
+    if not (settings.TRACING_HABILITADO or forcar):
+        return None
+    if trace is None:
+        logger.warning("Rastreamento habilitado, mas os pacotes opentelemetry não estão instalados")
+        return None
+    if _provedor is not None:
+        return _provedor
+
+    from app.core.database import engine
+
+    if exportador is None:
+        exportador = _exportador()
+    processador = (
+        SimpleSpanProcessor(exportador) if isinstance(exportador, InMemorySpanExporter)
+        else BatchSpanProcessor(exportador)
+    )
+    _provedor = TracerProvider(resource=Resource.create({"service.name": settings.TRACING_SERVICO}))
+    _provedor.add_span_processor(
+        AmostragemCauda(processador, settings.TRACING_PROPORCAO, settings.TRACING_LENTO_MS)
+    )
+    trace.set_tracer_provider(_provedor)
+
+    if app is not None:
+        FastAPIInstrumentor.instrument_app(app, tracer_provider=_provedor, excluded_urls=URLS_EXCLUIDAS)
+        # A pilha de middlewares é montada na primeira requisição; força a remontagem
+        app.middleware_stack = None
+    SQLAlchemyInstrumentor().instrument(engine=engine, tracer_provider=_provedor)
+    HTTPXClientInstrumentor().instrument(tracer_provider=_provedor)
+    CeleryInstrumentor().instrument(tracer_provider=_provedor)
+    return _provedor
+
+
+def encerrar_rastreamento(app=None):
+    """Remove a instrumentação e descarrega os spans pendentes"""
+    global _provedor
+    if _provedor is None:
+        return
+    if app is not None:
+        FastAPIInstrumentor.uninstrument_app(app)
+    SQLAlchemyInstrumentor().uninstrument()
+    HTTPXClientInstrumentor().uninstrument()
+    CeleryInstrumentor().uninstrument()
+    _provedor.shutdown()
+    _provedor = None
+
+
+def spans_memoria() -> list:
+    """Spans exportados com TRACING_EXPORTADOR=memoria"""
+    return list(_exportador_memoria.get_finished_spans()) if _exportador_memoria is not None else []
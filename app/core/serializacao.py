@@ -0,0 +1,101 @@
+"""
+Serialização rápida de listagens
+
+Com `response_model=List[XRead]`, o FastAPI revalida cada linha no modelo
+Pydantic e a converte com jsonable_encoder antes do json.dumps. Para dados
+que vêm direto do banco essa validação é redundante e domina a CPU em
+páginas de 100 linhas com Decimal e datas.
+
+O caminho rápido é opcional, por rota: a consulta seleciona só as colunas
+do modelo de leitura (colunas_read), sem montar instâncias do ORM, e as
+tuplas são serializadas com orjson (resposta_linhas). O response_model da
+rota continua documentando o esquema no OpenAPI.
+
+Com projecao_campos, o cliente escolhe as colunas (`?fields=id,status`) e
+o SELECT já sai reduzido, economizando leitura no banco e bytes na rede.
+
+A saída é a mesma do caminho padrão: Decimal como string ("150.00"), date
+e datetime em ISO 8601 (UTC como "Z"), UTF-8 sem escapes e sem espaços.
+Só use em rotas cujo modelo de leitura tem os mesmos tipos das colunas
+(nenhuma conversão é feita).
+"""
+from decimal import Decimal
+from typing import Any, Iterable, List, Optional, Type
+
+import orjson
+from fastapi import HTTPException, Query, Response, status
+from sqlmodel import SQLModel
+
+# Mesmo formato de datetime do Pydantic (UTC como "Z")
+OPCOES_ORJSON = orjson.OPT_UTC_Z
+
+
+def _padrao(valor: Any):
+    if isinstance(valor, Decimal):
+        return str(valor)
+    raise TypeError(f"Tipo não serializável: {type(valor).__name__}")
+
+
+def dumps(conteudo: Any) -> bytes:
+    """JSON (bytes) no formato das respostas da API"""
+    return orjson.dumps(conteudo, default=_padrao, option=OPCOES_ORJSON)
+
+
+class RespostaJSONRapida(Response):
+    """Resposta JSON renderizada com orjson, sem passar por jsonable_encoder"""
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def colunas_read(modelo_read: Type[SQLModel], modelo: Type[SQLModel], campos: Optional[List[str]] = None) -> List:
+    """
+    Colunas de `modelo` correspondentes aos campos do modelo de leitura, na
+    mesma ordem (ou só as de `campos`, já validados por projecao_campos)
+    """
+    return [getattr(modelo, campo) for campo in (campos or modelo_read.model_fields)]
+
+
+def projecao_campos(modelo_read: Type[SQLModel]):
+    """
+    Dependência do parâmetro `fields` das listagens: lista separada por
+    vírgulas de campos do modelo de leitura. Retorna os campos na ordem do
+    modelo (None quando ausente, isto é, todos), para que a consulta
+    selecione só essas colunas.
+    """
+    disponiveis = list(modelo_read.model_fields)
+
+    def validar_campos(
+        fields: Optional[str] = Query(
+            None, description=f"Campos retornados, separados por vírgula: {', '.join(disponiveis)}"
+        )
+    ) -> Optional[List[str]]:
+        if not fields:
+            return None
+        pedidos = {campo.strip() for campo in fields.split(",") if campo.strip()}
+        invalidos = sorted(pedidos.difference(disponiveis))
+        if invalidos:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Campos inválidos em fields: {', '.join(invalidos)}"
+            )
+        return [campo for campo in disponiveis if campo in pedidos] or None
+
+    return validar_campos
+
+
+def resposta_linhas(linhas: Iterable, response: Optional[Response] = None) -> RespostaJSONRapida:
+    """
+    Lista de objetos JSON a partir das linhas de
+    session.execute(select(*colunas)) (Row mesmo com uma coluna só). Os
+    cabeçalhos já definidos em `response` (o Response injetado pelo FastAPI,
+    por exemplo com o ETag) são copiados para a resposta.
+    """
+    resposta = RespostaJSONRapida([linha._asdict() for linha in linhas])
+    if response is not None:
+        for nome, valor in response.headers.items():
+            if nome != "content-length":
+                resposta.headers[nome] = valor
+    return resposta
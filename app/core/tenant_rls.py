@@ -0,0 +1,133 @@
+"""
+Isolamento multi-tenant via Row Level Security (RLS) do PostgreSQL
+
+Modo opcional (TENANT_RLS_ENABLED=true): o tenant do usuário autenticado é
+gravado na sessão e, a cada transação, enviado ao banco como GUCs locais
+(app.entidade_id / app.is_root). Usuários não-ROOT assumem o papel
+TENANT_RLS_ROLE durante a transação, e as políticas desse papel filtram as
+linhas dentro do planner com `entidade_id = <tenant>`, usando os índices
+por entidade.
+
+ROOT e sessões sem usuário (login, middleware de auditoria, tarefas Celery,
+migrações) continuam com o papel dono das tabelas e não são filtrados.
+"""
+from typing import Dict
+from sqlalchemy import event, text
+from sqlalchemy.engine import Connection
+from sqlmodel import Session
+from app.core.config import settings
+from app.models.usuario import Usuario
+
+# Chave em Session.info com o contexto de tenant da requisição
+TENANT_INFO_KEY = "tenant"
+
+# Tenant corrente, lido do GUC definido em cada transação
+_TENANT_ATUAL = "NULLIF(current_setting('app.entidade_id', true), '')::integer"
+
+# tabela -> condição de pertencimento ao tenant
+TABELAS_TENANT = {
+    "entidade": f"id = {_TENANT_ATUAL}",
+    "usuario": f"entidade_id = {_TENANT_ATUAL}",
+    "fornecedor": f"entidade_id = {_TENANT_ATUAL}",
+    "contrato": f"entidade_id = {_TENANT_ATUAL}",
+    "auditoria_global": f"entidade_id = {_TENANT_ATUAL}",
+    "matriz_riscos": f"entidade_id = {_TENANT_ATUAL}",
+    "cronograma_fisico_fin": f"entidade_id = {_TENANT_ATUAL}",
+    "penalidade": f"entidade_id = {_TENANT_ATUAL}",
+    "ocorrencia_fiscalizacao": f"entidade_id = {_TENANT_ATUAL}",
+    "fiscal_designado": f"entidade_id = {_TENANT_ATUAL}",
+    "curva_s_contrato": f"entidade_id = {_TENANT_ATUAL}",
+    "matriz_riscos_resumo": f"entidade_id = {_TENANT_ATUAL}",
+    "fornecedor_score": f"entidade_id = {_TENANT_ATUAL}",
+    "penalidade_resumo": f"entidade_id = {_TENANT_ATUAL}",
+    "execucao_financeira": f"entidade_id = {_TENANT_ATUAL}",
+    "execucao_financeira_mensal": f"entidade_id = {_TENANT_ATUAL}",
+    "importacao_arquivo": f"entidade_id = {_TENANT_ATUAL}",
+    "fornecedor_duplicidade": f"entidade_id = {_TENANT_ATUAL}",
+    "certidao_fornecedor": (
+        f"fornecedor_id IN (SELECT id FROM fornecedor WHERE entidade_id = {_TENANT_ATUAL})"
+    ),
+}
+
+POLITICA = "tenant_isolation"
+
+
+def rls_ativo(connection: Connection) -> bool:
+    """Verifica se o modo RLS está habilitado e a conexão é PostgreSQL"""
+    return settings.TENANT_RLS_ENABLED and connection.dialect.name == "postgresql"
+
+
+def _aplicar_contexto(connection: Connection, entidade_id, is_root: bool):
+    """
+    Grava o tenant como GUCs locais à transação e, para não-ROOT, assume o
+    papel restrito. SET LOCAL/set_config(..., true) expiram no fim da
+    transação, então a conexão volta limpa para o pool.
+    """
+    connection.execute(
+        text("SELECT set_config('app.entidade_id', :entidade_id, true), set_config('app.is_root', :is_root, true)"),
+        {"entidade_id": str(entidade_id or ""), "is_root": "true" if is_root else "false"}
+    )
+    if not is_root:
+        connection.execute(text(f'SET LOCAL ROLE "{settings.TENANT_RLS_ROLE}"'))
+
+
+def definir_tenant_sessao(session: Session, usuario: Usuario):
+    """
+    Associa o usuário autenticado à sessão. As próximas transações recebem o
+    contexto automaticamente; a transação já aberta recebe agora.
+    """
+    contexto = (usuario.entidade_id, usuario.perfil == "ROOT")
+    session.info[TENANT_INFO_KEY] = contexto
+
+    if settings.TENANT_RLS_ENABLED and session.in_transaction():
+        connection = session.connection()
+        if rls_ativo(connection):
+            _aplicar_contexto(connection, *contexto)
+
+
+@event.listens_for(Session, "after_begin")
+def _aplicar_tenant_na_transacao(session, transaction, connection):
+    """Reaplica o contexto de tenant em cada transação iniciada pela sessão"""
+    contexto = session.info.get(TENANT_INFO_KEY)
+    if contexto is None or not rls_ativo(connection):
+        return
+    _aplicar_contexto(connection, *contexto)
+
+
+def instalar_politicas_rls(connection: Connection, papel: str = None, tabelas: Dict[str, str] = None):
+    """
+    Cria o papel restrito, concede acesso às tabelas e (re)cria a política de
+    isolamento nas tabelas de tenant. Migrações passam em `tabelas` a lista
+    congelada das tabelas que existem naquela revisão (tabela -> condição);
+    sem ela, vale TABELAS_TENANT atual.
+    """
+    papel = papel or settings.TENANT_RLS_ROLE
+    tabelas = TABELAS_TENANT if tabelas is None else tabelas
+
+    existe = connection.execute(text("SELECT 1 FROM pg_roles WHERE rolname = :papel"), {"papel": papel}).first()
+    if not existe:
+        connection.execute(text(f'CREATE ROLE "{papel}" NOLOGIN'))
+    connection.execute(text(f'GRANT "{papel}" TO CURRENT_USER'))
+    connection.execute(text(f'GRANT USAGE ON SCHEMA public TO "{papel}"'))
+    connection.execute(text(f'GRANT SELECT, INSERT, UPDATE, DELETE ON ALL TABLES IN SCHEMA public TO "{papel}"'))
+    connection.execute(text(f'GRANT USAGE, SELECT ON ALL SEQUENCES IN SCHEMA public TO "{papel}"'))
+    connection.execute(text(
+        f'ALTER DEFAULT PRIVILEGES IN SCHEMA public GRANT SELECT, INSERT, UPDATE, DELETE ON TABLES TO "{papel}"'
+    ))
+    connection.execute(text(
+        f'ALTER DEFAULT PRIVILEGES IN SCHEMA public GRANT USAGE, SELECT ON SEQUENCES TO "{papel}"'
+    ))
+
+    for tabela, condicao in tabelas.items():
+        connection.execute(text(f"ALTER TABLE {tabela} ENABLE ROW LEVEL SECURITY"))
+        connection.execute(text(f"DROP POLICY IF EXISTS {POLITICA} ON {tabela}"))
+        connection.execute(text(
+            f'CREATE POLICY {POLITICA} ON {tabela} TO "{papel}" USING ({condicao}) WITH CHECK ({condicao})'
+        ))
+
+
+def remover_politicas_rls(connection: Connection, tabelas: Dict[str, str] = None):
+    """Remove as políticas e desabilita RLS nas tabelas de tenant (ou só em `tabelas`)"""
+    for tabela in (TABELAS_TENANT if tabelas is None else tabelas):
+        connection.execute(text(f"DROP POLICY IF EXISTS {POLITICA} ON {tabela}"))
+        connection.execute(text(f"ALTER TABLE {tabela} DISABLE ROW LEVEL SECURITY"))
@@ -1,7 +1,7 @@
 from typing import Optional
 from datetime import datetime, date
 from sqlmodel import SQLModel, Field
-from sqlalchemy import Index
+from sqlalchemy import Index, text
 
 class CertidaoFornecedor(SQLModel, table=True):
     __tablename__ = "certidao_fornecedor"
@@ -22,6 +22,13 @@ class CertidaoFornecedor(SQLModel, table=True):
     __table_args__ = (
         Index('idx_certidao_fornecedor_validade', 'fornecedor_id', 'data_validade'),
         Index('idx_certidao_situacao', 'situacao'),
+        Index('idx_certidao_validade_fornecedor', 'data_validade', 'fornecedor_id'),
+        Index(
+            'idx_certidao_fornecedor_protocolo', 'fornecedor_id', 'tipo_certidao_id', 'numero_protocolo',
+            unique=True,
+            sqlite_where=text('numero_protocolo IS NOT NULL'),
+            postgresql_where=text('numero_protocolo IS NOT NULL')
+        ),
     )
 
 class CertidaoFornecedorCreate(SQLModel):
@@ -2,12 +2,14 @@ from typing import Optional
 from datetime import date
 from decimal import Decimal
 from sqlmodel import SQLModel, Field
+from sqlalchemy import Index
 
 class CronogramaFisicoFin(SQLModel, table=True):
     __tablename__ = "cronograma_fisico_fin"
     
     id: Optional[int] = Field(default=None, primary_key=True)
     contrato_id: int = Field(foreign_key="contrato.id", nullable=False)
+    entidade_id: Optional[int] = Field(default=None, foreign_key="entidade.id")
     etapa: Optional[str] = Field(default=None, max_length=255)
     percentual_planejado: Optional[Decimal] = Field(default=None, max_digits=5, decimal_places=2)
     percentual_executado: Decimal = Field(default=Decimal("0.00"), max_digits=5, decimal_places=2)
@@ -15,6 +17,10 @@ class CronogramaFisicoFin(SQLModel, table=True):
     data_realizada: Optional[date] = Field(default=None)
     status: Optional[str] = Field(default=None, max_length=20)
 
+    __table_args__ = (
+        Index('idx_cronograma_entidade_contrato', 'entidade_id', 'contrato_id', 'data_prevista'),
+    )
+
 class CronogramaFisicoFinCreate(SQLModel):
     contrato_id: int
     etapa: Optional[str] = None
@@ -30,6 +36,7 @@ class CronogramaFisicoFinUpdate(SQLModel):
 class CronogramaFisicoFinRead(SQLModel):
     id: int
     contrato_id: int
+    entidade_id: Optional[int]
     etapa: Optional[str]
     percentual_planejado: Optional[Decimal]
     percentual_executado: Decimal
@@ -0,0 +1,27 @@
+from typing import Optional
+from datetime import datetime, date
+from decimal import Decimal
+from sqlmodel import SQLModel, Field
+from sqlalchemy import Index
+
+class CurvaSContrato(SQLModel, table=True):
+    """
+    Série mensal materializada da curva S (planejado x executado) de um contrato.
+    Uma linha por contrato e competência (primeiro dia do mês), contígua do
+    primeiro ao último mês do cronograma; mantida por CurvaSService.
+    """
+    __tablename__ = "curva_s_contrato"
+    
+    id: Optional[int] = Field(default=None, primary_key=True)
+    entidade_id: int = Field(foreign_key="entidade.id", nullable=False)
+    contrato_id: int = Field(foreign_key="contrato.id", nullable=False)
+    competencia: date = Field(nullable=False)
+    planejado_mes: Decimal = Field(default=Decimal("0.00"), max_digits=7, decimal_places=2)
+    executado_mes: Decimal = Field(default=Decimal("0.00"), max_digits=7, decimal_places=2)
+    planejado_acumulado: Decimal = Field(default=Decimal("0.00"), max_digits=7, decimal_places=2)
+    executado_acumulado: Decimal = Field(default=Decimal("0.00"), max_digits=7, decimal_places=2)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+    __table_args__ = (
+        Index('idx_curva_s_entidade_contrato_competencia', 'entidade_id', 'contrato_id', 'competencia', unique=True),
+    )
@@ -0,0 +1,56 @@
+from typing import Optional
+from datetime import datetime, date
+from decimal import Decimal
+from sqlmodel import SQLModel, Field
+from sqlalchemy import Index, text
+
+class ExecucaoFinanceira(SQLModel, table=True):
+    """
+    Lançamento do livro de execução financeira do contrato (somente inclusão;
+    só a marca `consolidado` muda depois). Valor positivo executa, negativo
+    estorna; a soma dos lançamentos é mantida em contrato.valor_executado por
+    ExecucaoFinanceiraService.
+    """
+    __tablename__ = "execucao_financeira"
+    
+    id: Optional[int] = Field(default=None, primary_key=True)
+    entidade_id: int = Field(foreign_key="entidade.id", nullable=False)
+    contrato_id: int = Field(foreign_key="contrato.id", nullable=False)
+    tipo: str = Field(max_length=20, nullable=False)  # MEDICAO, PAGAMENTO, ESTORNO, AJUSTE, SALDO_INICIAL
+    data_lancamento: date = Field(nullable=False)
+    valor: Decimal = Field(max_digits=18, decimal_places=2, nullable=False)
+    documento: Optional[str] = Field(default=None, max_length=100)
+    descricao: Optional[str] = Field(default=None)
+    origem: str = Field(default="MANUAL", max_length=20)  # MANUAL, MIGRACAO
+    usuario_id: Optional[int] = Field(default=None, foreign_key="usuario.id")
+    consolidado: bool = Field(default=False)  # já incluído na série mensal
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
+    __table_args__ = (
+        Index('idx_execucao_financeira_contrato_data', 'contrato_id', 'data_lancamento', 'id'),
+        Index('idx_execucao_financeira_entidade_data', 'entidade_id', 'data_lancamento'),
+        Index(
+            'idx_execucao_financeira_pendente', 'contrato_id', 'id',
+            postgresql_where=text('NOT consolidado')
+        ),
+    )
+
+class ExecucaoFinanceiraCreate(SQLModel):
+    tipo: str
+    data_lancamento: date
+    valor: Decimal
+    documento: Optional[str] = None
+    descricao: Optional[str] = None
+
+class ExecucaoFinanceiraRead(SQLModel):
+    id: int
+    entidade_id: int
+    contrato_id: int
+    tipo: str
+    data_lancamento: date
+    valor: Decimal
+    documento: Optional[str]
+    descricao: Optional[str]
+    origem: str
+    usuario_id: Optional[int]
+    created_at: datetime
@@ -0,0 +1,28 @@
+from typing import Optional
+from datetime import datetime, date
+from decimal import Decimal
+from sqlmodel import SQLModel, Field
+from sqlalchemy import Index
+
+class ExecucaoFinanceiraMensal(SQLModel, table=True):
+    """
+    Consolidação mensal do livro de execução financeira: valor do mês e
+    acumulado por contrato e competência (primeiro dia do mês). Gerada pela
+    rotina de consolidação a partir dos lançamentos ainda não consolidados
+    (ExecucaoFinanceira.consolidado).
+    """
+    __tablename__ = "execucao_financeira_mensal"
+    
+    id: Optional[int] = Field(default=None, primary_key=True)
+    entidade_id: int = Field(foreign_key="entidade.id", nullable=False)
+    contrato_id: int = Field(foreign_key="contrato.id", nullable=False)
+    competencia: date = Field(nullable=False)
+    valor_mes: Decimal = Field(default=Decimal("0.00"), max_digits=18, decimal_places=2)
+    valor_acumulado: Decimal = Field(default=Decimal("0.00"), max_digits=18, decimal_places=2)
+    lancamentos: int = Field(default=0)
+    ultimo_lancamento_id: int = Field(default=0)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+    __table_args__ = (
+        Index('idx_execucao_mensal_contrato_competencia', 'contrato_id', 'competencia', unique=True),
+    )
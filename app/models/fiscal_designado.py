@@ -8,6 +8,7 @@ class FiscalDesignado(SQLModel, table=True):
     
     id: Optional[int] = Field(default=None, primary_key=True)
     contrato_id: int = Field(foreign_key="contrato.id", nullable=False)
+    entidade_id: Optional[int] = Field(default=None, foreign_key="entidade.id")
     usuario_id: int = Field(foreign_key="usuario.id", nullable=False)
     tipo_fiscal: str = Field(max_length=20, nullable=False)  # TITULAR | SUPLENTE
     data_designacao: date = Field(nullable=False)
@@ -16,6 +17,7 @@ class FiscalDesignado(SQLModel, table=True):
 
     __table_args__ = (
         Index('idx_fiscal_contrato_usuario', 'contrato_id', 'usuario_id', unique=True),
+        Index('idx_fiscal_entidade_contrato', 'entidade_id', 'contrato_id', 'usuario_id'),
     )
 
 class FiscalDesignadoCreate(SQLModel):
@@ -28,6 +30,7 @@ class FiscalDesignadoCreate(SQLModel):
 class FiscalDesignadoRead(SQLModel):
     id: int
     contrato_id: int
+    entidade_id: Optional[int]
     usuario_id: int
     tipo_fiscal: str
     data_designacao: date
@@ -25,6 +25,7 @@ class Fornecedor(SQLModel, table=True):
     __table_args__ = (
         Index('idx_fornecedor_entidade_cnpj', 'entidade_id', 'cnpj', unique=True),
         Index('idx_fornecedor_cnpj', 'cnpj'),
+        Index('idx_fornecedor_entidade_id', 'entidade_id', 'id'),
     )
 
 class FornecedorCreate(SQLModel):
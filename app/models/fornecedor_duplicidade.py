@@ -0,0 +1,32 @@
+from typing import List, Optional
+from datetime import datetime
+from sqlmodel import SQLModel, Field
+from sqlalchemy import Index
+
+class FornecedorDuplicidade(SQLModel, table=True):
+    """
+    Par de fornecedores da mesma entidade candidato a duplicidade (mesma
+    raiz de CNPJ ou razão social semelhante), gerado pela detecção em lote
+    de FornecedorDuplicidadeService e revisado pelo gestor.
+    fornecedor_id é sempre o menor id do par.
+    """
+    __tablename__ = "fornecedor_duplicidade"
+    
+    id: Optional[int] = Field(default=None, primary_key=True)
+    entidade_id: int = Field(foreign_key="entidade.id", nullable=False)
+    fornecedor_id: int = Field(foreign_key="fornecedor.id", nullable=False)
+    fornecedor_duplicado_id: int = Field(foreign_key="fornecedor.id", nullable=False)
+    similaridade: float = Field(default=0.0)  # similaridade de trigramas das razões sociais (0 a 1)
+    motivo: str = Field(max_length=20, nullable=False)  # CNPJ_RAIZ | NOME
+    status: str = Field(default="PENDENTE", max_length=20)  # PENDENTE | DESCARTADO | MESCLADO
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+    __table_args__ = (
+        Index('idx_fornecedor_duplicidade_par', 'fornecedor_id', 'fornecedor_duplicado_id', unique=True),
+        Index('idx_fornecedor_duplicidade_entidade_status', 'entidade_id', 'status'),
+    )
+
+class FornecedorMesclagem(SQLModel):
+    fornecedor_id: int
+    duplicados: List[int]
@@ -0,0 +1,35 @@
+from typing import Optional
+from datetime import datetime
+from decimal import Decimal
+from sqlmodel import SQLModel, Field
+from sqlalchemy import Index
+
+class FornecedorScore(SQLModel, table=True):
+    """
+    Score composto de risco do fornecedor (0 a 100, maior = mais arriscado)
+    com a decomposição por componente e os valores de origem.
+    Mantido por FornecedorScoreService.
+    """
+    __tablename__ = "fornecedor_score"
+    
+    id: Optional[int] = Field(default=None, primary_key=True)
+    fornecedor_id: int = Field(foreign_key="fornecedor.id", nullable=False)
+    entidade_id: int = Field(foreign_key="entidade.id", nullable=False)
+    score: int = Field(default=0, nullable=False)
+    pontos_certidoes: int = Field(default=0)
+    pontos_impedimento: int = Field(default=0)
+    pontos_penalidades: int = Field(default=0)
+    pontos_riscos: int = Field(default=0)
+    certidoes_vencidas: int = Field(default=0)
+    impedido: bool = Field(default=False)
+    penalidades_aplicadas: int = Field(default=0)
+    valor_multas: Decimal = Field(default=Decimal("0.00"), max_digits=18, decimal_places=2)
+    riscos_ativos: int = Field(default=0)
+    riscos_altos: int = Field(default=0)
+    exposicao_riscos: int = Field(default=0)
+    calculado_em: datetime = Field(default_factory=datetime.utcnow)
+
+    __table_args__ = (
+        Index('idx_fornecedor_score_fornecedor', 'fornecedor_id', unique=True),
+        Index('idx_fornecedor_score_ranking', 'entidade_id', 'score', 'fornecedor_id'),
+    )
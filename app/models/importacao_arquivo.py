@@ -0,0 +1,56 @@
+from typing import Optional
+from datetime import datetime
+from sqlmodel import SQLModel, Field
+from sqlalchemy import Index
+
+class ImportacaoArquivo(SQLModel, table=True):
+    """
+    Importação de planilha (CSV ou XLSX) de dados legados: arquivo gravado
+    em IMPORTACAO_DIR e processado em background pela tarefa importar_arquivo,
+    que atualiza aqui o progresso e os primeiros erros por linha.
+    """
+    __tablename__ = "importacao_arquivo"
+    
+    id: Optional[int] = Field(default=None, primary_key=True)
+    entidade_id: int = Field(foreign_key="entidade.id", nullable=False)
+    usuario_id: int = Field(foreign_key="usuario.id", nullable=False)
+    tipo: str = Field(max_length=20, nullable=False)  # CONTRATOS | FISCAIS | CRONOGRAMAS
+    formato: str = Field(max_length=10, nullable=False)  # CSV | XLSX
+    nome_arquivo: str = Field(max_length=255, nullable=False)
+    caminho: str = Field(max_length=500, nullable=False)
+    tamanho_bytes: int = Field(default=0)
+    status: str = Field(default="PENDENTE", max_length=20)  # PENDENTE | PROCESSANDO | CONCLUIDA | FALHOU
+    task_id: Optional[str] = Field(default=None, max_length=50)
+    bytes_processados: int = Field(default=0)
+    linhas_lidas: int = Field(default=0)
+    linhas_importadas: int = Field(default=0)
+    linhas_com_erro: int = Field(default=0)
+    erros: Optional[str] = Field(default=None)  # JSON: [{"linha": n, "erro": "..."}], limitado a IMPORTACAO_MAX_ERROS
+    mensagem: Optional[str] = Field(default=None)
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    iniciado_em: Optional[datetime] = Field(default=None)
+    concluido_em: Optional[datetime] = Field(default=None)
+
+    __table_args__ = (
+        Index('idx_importacao_entidade_created', 'entidade_id', 'created_at'),
+    )
+
+class ImportacaoArquivoRead(SQLModel):
+    id: int
+    entidade_id: int
+    usuario_id: int
+    tipo: str
+    formato: str
+    nome_arquivo: str
+    tamanho_bytes: int
+    status: str
+    task_id: Optional[str]
+    bytes_processados: int
+    linhas_lidas: int
+    linhas_importadas: int
+    linhas_com_erro: int
+    erros: Optional[str]
+    mensagem: Optional[str]
+    created_at: datetime
+    iniciado_em: Optional[datetime]
+    concluido_em: Optional[datetime]
@@ -1,19 +1,52 @@
 from typing import Optional
 from sqlmodel import SQLModel, Field
+from sqlalchemy import Column, Computed, Index, Integer, String
+
+# Expressões das colunas geradas pelo banco (usadas também na migração)
+NIVEL_SCORE_SQL = "probabilidade * impacto"
+NIVEL_RISCO_SQL = (
+    "CASE WHEN probabilidade IS NULL OR impacto IS NULL THEN NULL "
+    "WHEN probabilidade * impacto <= 5 THEN 'BAIXO' "
+    "WHEN probabilidade * impacto <= 15 THEN 'MÉDIO' "
+    "ELSE 'ALTO' END"
+)
+
+def classificar_nivel(score: int) -> str:
+    """Mesma faixa de NIVEL_RISCO_SQL, para agregados já calculados"""
+    if score <= 5:
+        return "BAIXO"
+    if score <= 15:
+        return "MÉDIO"
+    return "ALTO"
 
 class MatrizRiscos(SQLModel, table=True):
     __tablename__ = "matriz_riscos"
     
     id: Optional[int] = Field(default=None, primary_key=True)
     contrato_id: int = Field(foreign_key="contrato.id", nullable=False)
+    entidade_id: Optional[int] = Field(default=None, foreign_key="entidade.id")
     risco_descricao: Optional[str] = Field(default=None)
     probabilidade: Optional[int] = Field(default=None)  # 1 a 5
     impacto: Optional[int] = Field(default=None)  # 1 a 5
-    nivel_risco: Optional[str] = Field(default=None, max_length=20)
+    # Calculados pelo banco a partir de probabilidade e impacto
+    nivel_score: Optional[int] = Field(
+        default=None,
+        sa_column=Column(Integer, Computed(NIVEL_SCORE_SQL, persisted=True))
+    )
+    nivel_risco: Optional[str] = Field(
+        default=None,
+        sa_column=Column(String(20), Computed(NIVEL_RISCO_SQL, persisted=True))
+    )
     medida_mitigacao: Optional[str] = Field(default=None)
     responsavel_id: Optional[int] = Field(default=None, foreign_key="usuario.id")
     status: str = Field(default="ATIVO", max_length=20)
 
+    __table_args__ = (
+        Index('idx_matriz_riscos_entidade_contrato', 'entidade_id', 'contrato_id', 'status'),
+        Index('idx_matriz_riscos_contrato_nivel', 'contrato_id', 'nivel_risco', 'status'),
+        Index('idx_matriz_riscos_entidade_score', 'entidade_id', 'nivel_score'),
+    )
+
 class MatrizRiscosCreate(SQLModel):
     contrato_id: int
     risco_descricao: Optional[str] = None
@@ -31,9 +64,11 @@ class MatrizRiscosUpdate(SQLModel):
 class MatrizRiscosRead(SQLModel):
     id: int
     contrato_id: int
+    entidade_id: Optional[int]
     risco_descricao: Optional[str]
     probabilidade: Optional[int]
     impacto: Optional[int]
+    nivel_score: Optional[int]
     nivel_risco: Optional[str]
     medida_mitigacao: Optional[str]
     responsavel_id: Optional[int]
@@ -0,0 +1,22 @@
+from typing import Optional
+from sqlmodel import SQLModel, Field
+from sqlalchemy import Index
+
+class MatrizRiscosResumo(SQLModel, table=True):
+    """
+    Resumo da matriz de riscos: quantidade de riscos ATIVOS por contrato e
+    célula (probabilidade x impacto) da grade 5x5. Mantido por
+    MatrizRiscosService a cada escrita em matriz_riscos.
+    """
+    __tablename__ = "matriz_riscos_resumo"
+    
+    id: Optional[int] = Field(default=None, primary_key=True)
+    entidade_id: int = Field(foreign_key="entidade.id", nullable=False)
+    contrato_id: int = Field(foreign_key="contrato.id", nullable=False)
+    probabilidade: int = Field(nullable=False)
+    impacto: int = Field(nullable=False)
+    quantidade: int = Field(default=0, nullable=False)
+
+    __table_args__ = (
+        Index('idx_matriz_riscos_resumo_celula', 'entidade_id', 'contrato_id', 'probabilidade', 'impacto', unique=True),
+    )
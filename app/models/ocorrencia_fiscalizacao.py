@@ -1,12 +1,14 @@
 from typing import Optional
 from datetime import datetime
 from sqlmodel import SQLModel, Field, Column, JSON
+from sqlalchemy import Index
 
 class OcorrenciaFiscalizacao(SQLModel, table=True):
     __tablename__ = "ocorrencia_fiscalizacao"
     
     id: Optional[int] = Field(default=None, primary_key=True)
     contrato_id: int = Field(foreign_key="contrato.id", nullable=False)
+    entidade_id: Optional[int] = Field(default=None, foreign_key="entidade.id")
     fiscal_id: int = Field(foreign_key="usuario.id", nullable=False)
     data_ocorrencia: datetime = Field(nullable=False)
     tipo_ocorrencia: Optional[str] = Field(default=None, max_length=50)
@@ -17,6 +19,10 @@ class OcorrenciaFiscalizacao(SQLModel, table=True):
     assinatura_contratada: Optional[bool] = Field(default=False)
     created_at: datetime = Field(default_factory=datetime.utcnow)
 
+    __table_args__ = (
+        Index('idx_ocorrencia_entidade_contrato', 'entidade_id', 'contrato_id', 'data_ocorrencia'),
+    )
+
 class OcorrenciaFiscalizacaoCreate(SQLModel):
     contrato_id: int
     fiscal_id: int
@@ -31,6 +37,7 @@ class OcorrenciaFiscalizacaoCreate(SQLModel):
 class OcorrenciaFiscalizacaoRead(SQLModel):
     id: int
     contrato_id: int
+    entidade_id: Optional[int]
     fiscal_id: int
     data_ocorrencia: datetime
     tipo_ocorrencia: Optional[str]
@@ -2,12 +2,14 @@ from typing import Optional
 from datetime import datetime, date
 from decimal import Decimal
 from sqlmodel import SQLModel, Field
+from sqlalchemy import Index
 
 class Penalidade(SQLModel, table=True):
     __tablename__ = "penalidade"
     
     id: Optional[int] = Field(default=None, primary_key=True)
     contrato_id: int = Field(foreign_key="contrato.id", nullable=False)
+    entidade_id: Optional[int] = Field(default=None, foreign_key="entidade.id")
     tipo: str = Field(max_length=30, nullable=False)
     valor_multa: Optional[Decimal] = Field(default=None, max_digits=18, decimal_places=2)
     data_aplicacao: Optional[date] = Field(default=None)
@@ -17,6 +19,11 @@ class Penalidade(SQLModel, table=True):
     recurso_apresentado: bool = Field(default=False)
     created_at: datetime = Field(default_factory=datetime.utcnow)
 
+    __table_args__ = (
+        Index('idx_penalidade_entidade_contrato', 'entidade_id', 'contrato_id', 'created_at'),
+        Index('idx_penalidade_contrato_status_data', 'contrato_id', 'status', 'data_aplicacao'),
+    )
+
 class PenalidadeCreate(SQLModel):
     contrato_id: int
     tipo: str
@@ -32,6 +39,7 @@ class PenalidadeUpdate(SQLModel):
 class PenalidadeRead(SQLModel):
     id: int
     contrato_id: int
+    entidade_id: Optional[int]
     tipo: str
     valor_multa: Optional[Decimal]
     data_aplicacao: Optional[date]
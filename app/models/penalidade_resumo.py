@@ -0,0 +1,26 @@
+from typing import Optional
+from decimal import Decimal
+from sqlmodel import SQLModel, Field
+from sqlalchemy import Index
+
+class PenalidadeResumo(SQLModel, table=True):
+    """
+    Resumo das penalidades por contrato, mês de aplicação, tipo e status:
+    quantidade e soma de valor_multa. Mantido por PenalidadeService a cada
+    escrita em penalidade.
+    """
+    __tablename__ = "penalidade_resumo"
+    
+    id: Optional[int] = Field(default=None, primary_key=True)
+    entidade_id: int = Field(foreign_key="entidade.id", nullable=False)
+    contrato_id: int = Field(foreign_key="contrato.id", nullable=False)
+    ano: int = Field(nullable=False)
+    mes: int = Field(nullable=False)
+    tipo: str = Field(max_length=30, nullable=False)
+    status: str = Field(max_length=20, nullable=False)
+    quantidade: int = Field(default=0, nullable=False)
+    valor_total: Decimal = Field(default=Decimal("0"), max_digits=18, decimal_places=2)
+
+    __table_args__ = (
+        Index('idx_penalidade_resumo_grupo', 'entidade_id', 'contrato_id', 'ano', 'mes', 'tipo', 'status', unique=True),
+    )
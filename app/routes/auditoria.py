@@ -1,9 +1,10 @@
 from typing import List, Optional
 from datetime import datetime, date
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
 from sqlmodel import Session, select, col
 from app.core.database import get_session
 from app.core.auth import get_current_user, require_perfil
+from app.core.serializacao import colunas_read, projecao_campos, resposta_linhas
 from app.models.auditoria_global import AuditoriaGlobal, AuditoriaGlobalRead
 from app.models.usuario import Usuario
 
@@ -11,6 +12,7 @@ router = APIRouter(prefix="/auditoria", tags=["Auditoria"])
 
 @router.get("", response_model=List[AuditoriaGlobalRead])
 async def list_auditoria(
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
     entidade_id: Optional[int] = None,
@@ -19,6 +21,7 @@ async def list_auditoria(
     acao: Optional[str] = None,
     data_inicio: Optional[date] = None,
     data_fim: Optional[date] = None,
+    campos: Optional[List[str]] = Depends(projecao_campos(AuditoriaGlobalRead)),
     session: Session = Depends(get_session),
     current_user: Usuario = Depends(require_perfil("ROOT", "GESTOR", "AUDITOR"))
 ):
@@ -27,7 +30,7 @@ async def list_auditoria(
     Apenas usuários ROOT, GESTOR e AUDITOR têm acesso.
     """
     
-    statement = select(AuditoriaGlobal)
+    statement = select(*colunas_read(AuditoriaGlobalRead, AuditoriaGlobal, campos))
     
     # Filtros
     if entidade_id:
@@ -55,9 +58,9 @@ async def list_auditoria(
     statement = statement.order_by(AuditoriaGlobal.timestamp.desc())
     statement = statement.offset(skip).limit(limit)
     
-    auditorias = session.exec(statement).all()
+    auditorias = session.execute(statement).all()
     
-    return auditorias
+    return resposta_linhas(auditorias, response)
 
 @router.get("/{auditoria_id}", response_model=AuditoriaGlobalRead)
 async def get_auditoria(
@@ -5,6 +5,7 @@ from sqlmodel import Session, select
 from app.core.database import get_session
 from app.core.security import verify_password, create_access_token, get_password_hash
 from app.core.auth import get_current_user
+from app.core.etag import etag_condicional
 from app.core.totp import generate_totp_secret, generate_totp_uri, generate_qr_code, verify_totp
 from app.core.config import settings
 from app.models.usuario import Usuario, UsuarioCreate, UsuarioUpdate, UsuarioRead, UsuarioLogin
@@ -99,7 +100,7 @@ async def register(usuario_data: UsuarioCreate, session: Session = Depends(get_s
     
     return usuario
 
-@router.get("/me", response_model=UsuarioRead)
+@router.get("/me", response_model=UsuarioRead, dependencies=[Depends(etag_condicional("usuario"))])
 async def get_me(current_user: Usuario = Depends(get_current_user)):
     """Retorna dados do usuário autenticado"""
     return current_user
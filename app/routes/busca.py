@@ -0,0 +1,48 @@
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlmodel import Session
+from app.core.database import get_session
+from app.core.auth import get_current_user
+from app.models.usuario import Usuario
+from app.services.busca_service import BuscaService
+
+router = APIRouter(prefix="/busca", tags=["Busca"])
+
+TIPOS_BUSCA = ("contratos", "fornecedores")
+
+@router.get("")
+async def buscar(
+    q: str = Query(..., min_length=2, max_length=200),
+    tipo: Optional[str] = None,
+    entidade_id: Optional[int] = None,
+    limit: int = Query(20, ge=1, le=100),
+    session: Session = Depends(get_session),
+    current_user: Usuario = Depends(get_current_user)
+):
+    """
+    Busca textual em contratos (número e objeto) e fornecedores (razão
+    social e nome fantasia), ordenada por relevância.
+
+    Todas as palavras de `q` devem aparecer, casando por prefixo e sem
+    diferenciar acentos. `tipo` restringe a "contratos" ou "fornecedores".
+    ROOT pode informar entidade_id (sem ele, busca em todas as entidades);
+    demais perfis buscam sempre na própria entidade (403 se o usuário não
+    tem entidade).
+    """
+
+    if tipo is not None and tipo not in TIPOS_BUSCA:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Tipo inválido. Use: {', '.join(TIPOS_BUSCA)}"
+        )
+
+    if current_user.perfil != "ROOT":
+        if current_user.entidade_id is None:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Usuário não vinculado a nenhuma entidade."
+            )
+        entidade_id = current_user.entidade_id
+
+    tipos = [tipo] if tipo else list(TIPOS_BUSCA)
+    return BuscaService.buscar(session, q, entidade_id, tipos, limit)
@@ -1,12 +1,17 @@
 from typing import List, Optional
-from datetime import date, datetime
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from datetime import date, datetime, timedelta
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
 from sqlmodel import Session, select
+from sqlalchemy import func, case, tuple_, true
 from app.core.database import get_session
 from app.core.auth import get_current_user
+from app.core.etag import etag_condicional
+from app.core.serializacao import colunas_read, projecao_campos, resposta_linhas
+from app.core.guards import apply_tenant_filter, check_tenant_access
 from app.models.certidao_fornecedor import CertidaoFornecedor, CertidaoFornecedorCreate, CertidaoFornecedorRead
 from app.models.fornecedor import Fornecedor
 from app.models.usuario import Usuario
+from app.services.carga_lote_service import CargaLoteService, LIMITE_LOTE
 
 router = APIRouter(prefix="/certidoes-fornecedor", tags=["Certidões de Fornecedor"])
 
@@ -51,19 +56,57 @@ async def create_certidao(
     
     return certidao
 
-@router.get("", response_model=List[CertidaoFornecedorRead])
+@router.post("/bulk")
+async def create_certidoes_bulk(
+    itens: List[CertidaoFornecedorCreate],
+    atualizar_existentes: bool = True,
+    session: Session = Depends(get_session),
+    current_user: Usuario = Depends(get_current_user)
+):
+    """
+    Cria ou atualiza até LIMITE_LOTE certidões em uma requisição.
+    Certidão com o mesmo fornecedor, tipo e numero_protocolo é atualizada
+    (ou recusada com atualizar_existentes=false). Retorna o resultado de cada
+    item na ordem enviada: CRIADO, ATUALIZADO ou ERRO com o motivo.
+    """
+    
+    # Verifica permissão
+    if current_user.perfil not in ["ROOT", "GESTOR", "APOIO"]:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Sem permissão para criar certidão"
+        )
+    
+    if len(itens) > LIMITE_LOTE:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Lote excede o limite de {LIMITE_LOTE} itens"
+        )
+    
+    resultado = CargaLoteService.certidoes(session, itens, current_user, atualizar_existentes)
+    session.commit()
+    
+    return resultado
+
+@router.get("", response_model=List[CertidaoFornecedorRead], dependencies=[Depends(etag_condicional("certidao_fornecedor", "fornecedor"))])
 async def list_certidoes(
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=100),
     fornecedor_id: Optional[int] = None,
     tipo_certidao_id: Optional[int] = None,
     situacao: Optional[str] = None,
+    campos: Optional[List[str]] = Depends(projecao_campos(CertidaoFornecedorRead)),
     session: Session = Depends(get_session),
     current_user: Usuario = Depends(get_current_user)
 ):
     """Lista certidões de fornecedores"""
     
-    statement = select(CertidaoFornecedor)
+    # Filtro de tenant via fornecedor (idx_fornecedor_entidade_id -> idx_certidao_fornecedor_validade)
+    statement = select(*colunas_read(CertidaoFornecedorRead, CertidaoFornecedor, campos)).join(
+        Fornecedor, Fornecedor.id == CertidaoFornecedor.fornecedor_id
+    )
+    statement = apply_tenant_filter(statement, Fornecedor, current_user)
     
     if fornecedor_id:
         statement = statement.where(CertidaoFornecedor.fornecedor_id == fornecedor_id)
@@ -75,11 +118,115 @@ async def list_certidoes(
         statement = statement.where(CertidaoFornecedor.situacao == situacao)
     
     statement = statement.offset(skip).limit(limit)
-    certidoes = session.exec(statement).all()
+    certidoes = session.execute(statement).all()
     
-    return certidoes
+    return resposta_linhas(certidoes, response)
+
+# Faixas de vencimento (em dias) retornadas pelo calendário de certidões
+FAIXAS_VENCIMENTO = (7, 15, 30)
+
+@router.get("/vencendo")
+async def list_certidoes_vencendo(
+    dias: int = Query(30, ge=1, le=365),
+    limit: int = Query(50, ge=1, le=100),
+    apos_data_validade: Optional[date] = None,
+    apos_id: Optional[int] = None,
+    entidade_id: Optional[int] = None,
+    session: Session = Depends(get_session),
+    current_user: Usuario = Depends(get_current_user)
+):
+    """
+    Calendário de vencimento de certidões de todos os fornecedores da entidade.
+    Retorna contagens por faixa (7/15/30 dias) e a lista paginada por cursor
+    (data_validade, id) em uma única consulta.
+    """
+
+    hoje = date.today()
+    limite_data = hoje + timedelta(days=dias)
+
+    def filtro_base(statement):
+        statement = statement.join(Fornecedor, Fornecedor.id == CertidaoFornecedor.fornecedor_id).where(
+            CertidaoFornecedor.data_validade >= hoje,
+            CertidaoFornecedor.data_validade <= limite_data
+        )
+        statement = apply_tenant_filter(statement, Fornecedor, current_user)
+        if entidade_id:
+            statement = statement.where(Fornecedor.entidade_id == entidade_id)
+        return statement
 
-@router.get("/{certidao_id}", response_model=CertidaoFornecedorRead)
+    # Contagens por faixa sobre todo o horizonte
+    colunas_faixas = [
+        func.coalesce(
+            func.sum(case((CertidaoFornecedor.data_validade <= hoje + timedelta(days=faixa), 1), else_=0)), 0
+        ).label(f"ate_{faixa}_dias")
+        for faixa in FAIXAS_VENCIMENTO
+    ]
+    contagem = filtro_base(
+        select(func.count(CertidaoFornecedor.id).label("total"), *colunas_faixas).select_from(CertidaoFornecedor)
+    ).subquery("contagem")
+
+    # Página de detalhes, paginada por cursor (data_validade, id)
+    detalhes = filtro_base(
+        select(
+            CertidaoFornecedor.id,
+            CertidaoFornecedor.fornecedor_id,
+            CertidaoFornecedor.tipo_certidao_id,
+            CertidaoFornecedor.numero_protocolo,
+            CertidaoFornecedor.data_validade,
+            CertidaoFornecedor.situacao,
+            Fornecedor.entidade_id,
+            Fornecedor.razao_social
+        ).select_from(CertidaoFornecedor)
+    )
+    if apos_data_validade and apos_id:
+        detalhes = detalhes.where(
+            tuple_(CertidaoFornecedor.data_validade, CertidaoFornecedor.id) > tuple_(apos_data_validade, apos_id)
+        )
+    detalhes = detalhes.order_by(
+        CertidaoFornecedor.data_validade, CertidaoFornecedor.id
+    ).limit(limit + 1).subquery("detalhes")
+
+    # Contagem LEFT JOIN detalhes: contagens chegam mesmo quando a página está vazia
+    statement = select(contagem, detalhes).select_from(
+        contagem.outerjoin(detalhes, true())
+    ).order_by(detalhes.c.data_validade, detalhes.c.id)
+    rows = session.exec(statement).all()
+
+    primeira = rows[0]._mapping if rows else {}
+    certidoes = [
+        {
+            "id": row.id,
+            "fornecedor_id": row.fornecedor_id,
+            "razao_social": row.razao_social,
+            "entidade_id": row.entidade_id,
+            "tipo_certidao_id": row.tipo_certidao_id,
+            "numero_protocolo": row.numero_protocolo,
+            "data_validade": row.data_validade,
+            "dias_para_vencer": (row.data_validade - hoje).days,
+            "situacao": row.situacao
+        }
+        for row in rows if row.id is not None
+    ]
+
+    proximo_cursor = None
+    if len(certidoes) > limit:
+        certidoes = certidoes[:limit]
+        ultima = certidoes[-1]
+        proximo_cursor = {"apos_data_validade": ultima["data_validade"], "apos_id": ultima["id"]}
+
+    return {
+        "data_referencia": hoje,
+        "dias": dias,
+        "total": primeira.get("total") or 0,
+        "faixas": {
+            str(faixa): primeira.get(f"ate_{faixa}_dias") or 0
+            for faixa in FAIXAS_VENCIMENTO if faixa <= dias
+        },
+        "certidoes": certidoes,
+        "proximo_cursor": proximo_cursor
+    }
+
+@router.get("/{certidao_id}", response_model=CertidaoFornecedorRead, dependencies=[Depends(etag_condicional("certidao_fornecedor", "fornecedor"))])
 async def get_certidao(
     certidao_id: int,
     session: Session = Depends(get_session),
@@ -94,6 +241,11 @@ async def get_certidao(
             detail="Certidão não encontrada"
         )
     
+    # Verifica acesso ao tenant do fornecedor
+    fornecedor = session.get(Fornecedor, certidao.fornecedor_id)
+    if fornecedor:
+        check_tenant_access(fornecedor, current_user)
+    
     return certidao
 
 @router.get("/fornecedor/{fornecedor_id}/vencidas", response_model=List[CertidaoFornecedorRead])
@@ -104,10 +256,13 @@ async def get_certidoes_vencidas(
 ):
     """Lista certidões vencidas de um fornecedor"""
     
-    statement = select(CertidaoFornecedor).where(
+    statement = select(CertidaoFornecedor).join(
+        Fornecedor, Fornecedor.id == CertidaoFornecedor.fornecedor_id
+    ).where(
         CertidaoFornecedor.fornecedor_id == fornecedor_id,
         CertidaoFornecedor.data_validade < date.today()
     )
+    statement = apply_tenant_filter(statement, Fornecedor, current_user)
     
     certidoes = session.exec(statement).all()
     return certidoes
@@ -1,8 +1,10 @@
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
 from sqlmodel import Session, select
 from app.core.database import get_session
 from app.core.auth import get_current_user
+from app.core.etag import etag_condicional
+from app.core.serializacao import colunas_read, projecao_campos, resposta_linhas
 from app.core.guards import (
     apply_tenant_filter,
     check_tenant_access,
@@ -10,7 +12,13 @@ from app.core.guards import (
     TenantGuard
 )
 from app.models.contrato import Contrato, ContratoCreate, ContratoUpdate, ContratoRead
+from app.models.execucao_financeira import ExecucaoFinanceira, ExecucaoFinanceiraCreate, ExecucaoFinanceiraRead
 from app.models.usuario import Usuario
+from app.services.dashboard_service import DashboardService
+from app.services.analise_cronograma_service import AnaliseCronogramaService
+from app.services.execucao_financeira_service import ExecucaoFinanceiraService, TIPOS_LANCAMENTO
+from app.services.fornecedor_score_service import FornecedorScoreService
+from app.services.carga_lote_service import CargaLoteService, LIMITE_LOTE
 from datetime import datetime
 
 router = APIRouter(prefix="/contratos", tags=["Contratos"])
@@ -44,23 +52,57 @@ async def create_contrato(
     contrato = Contrato(**data_dict)
     session.add(contrato)
     session.commit()
+    DashboardService.invalidar(contrato.entidade_id)
     session.refresh(contrato)
     
     return contrato
 
-@router.get("", response_model=List[ContratoRead])
+@router.post("/bulk")
+async def create_contratos_bulk(
+    itens: List[ContratoCreate],
+    atualizar_existentes: bool = True,
+    session: Session = Depends(get_session),
+    current_user: Usuario = Depends(get_current_user)
+):
+    """
+    Cria ou atualiza até LIMITE_LOTE contratos em uma requisição.
+    Número já existente na entidade é atualizado (ou recusado com
+    atualizar_existentes=false). Retorna o resultado de cada item na ordem
+    enviada: CRIADO, ATUALIZADO ou ERRO com o motivo.
+    """
+    
+    # Apenas GESTOR ou ROOT podem criar contratos
+    require_gestor_or_root(current_user)
+    
+    if len(itens) > LIMITE_LOTE:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Lote excede o limite de {LIMITE_LOTE} itens"
+        )
+    
+    resultado = CargaLoteService.contratos(session, itens, current_user, atualizar_existentes)
+    session.commit()
+    for entidade_id in resultado.pop("entidades"):
+        DashboardService.invalidar(entidade_id)
+        AnaliseCronogramaService.invalidar(entidade_id)
+    
+    return resultado
+
+@router.get("", response_model=List[ContratoRead], dependencies=[Depends(etag_condicional("contrato"))])
 async def list_contratos(
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=100),
     entidade_id: Optional[int] = None,
     fornecedor_id: Optional[int] = None,
     status: Optional[str] = None,
+    campos: Optional[List[str]] = Depends(projecao_campos(ContratoRead)),
     session: Session = Depends(get_session),
     current_user: Usuario = Depends(get_current_user)
 ):
     """Lista contratos"""
     
-    statement = select(Contrato)
+    statement = select(*colunas_read(ContratoRead, Contrato, campos))
     
     # Aplica filtro de tenant (ROOT vê tudo, outros só da entidade)
     statement = apply_tenant_filter(statement, Contrato, current_user)
@@ -76,11 +118,11 @@ async def list_contratos(
         statement = statement.where(Contrato.status == status)
     
     statement = statement.offset(skip).limit(limit)
-    contratos = session.exec(statement).all()
+    contratos = session.execute(statement).all()
     
-    return contratos
+    return resposta_linhas(contratos, response)
 
-@router.get("/{contrato_id}", response_model=ContratoRead)
+@router.get("/{contrato_id}", response_model=ContratoRead, dependencies=[Depends(etag_condicional("contrato"))])
 async def get_contrato(
     contrato_id: int,
     session: Session = Depends(get_session),
@@ -123,13 +165,24 @@ async def update_contrato(
     check_tenant_access(contrato, current_user)
     
     update_data = contrato_data.model_dump(exclude_unset=True)
+    
+    # O total executado só muda via livro de execução: a diferença vira um AJUSTE
+    valor_executado = update_data.pop("valor_executado", None)
+    if valor_executado is not None:
+        ExecucaoFinanceiraService.ajustar_total(session, contrato, valor_executado, usuario_id=current_user.id)
+    
+    fornecedor_anterior = contrato.fornecedor_id
     for key, value in update_data.items():
         setattr(contrato, key, value)
     
     contrato.updated_at = datetime.utcnow()
     
     session.add(contrato)
+    # Penalidades e riscos do contrato contam para o fornecedor anterior e o atual
+    FornecedorScoreService.recalcular(session, fornecedor_ids=[fornecedor_anterior, contrato.fornecedor_id])
     session.commit()
+    DashboardService.invalidar(contrato.entidade_id)
+    AnaliseCronogramaService.invalidar(contrato.entidade_id)
     session.refresh(contrato)
     
     return contrato
@@ -160,5 +213,111 @@ async def delete_contrato(
     
     session.add(contrato)
     session.commit()
+    DashboardService.invalidar(contrato.entidade_id)
+    AnaliseCronogramaService.invalidar(contrato.entidade_id)
     
     return {"message": "Contrato cancelado com sucesso"}
+
+@router.post("/{contrato_id}/execucao", response_model=ExecucaoFinanceiraRead)
+async def create_lancamento_execucao(
+    contrato_id: int,
+    lancamento_data: ExecucaoFinanceiraCreate,
+    session: Session = Depends(get_session),
+    current_user: Usuario = Depends(get_current_user)
+):
+    """
+    Registra medição, pagamento, estorno ou ajuste no livro de execução
+    financeira do contrato. O lançamento não pode ser alterado depois;
+    correções são feitas com ESTORNO ou AJUSTE.
+    """
+    
+    # Apenas GESTOR ou ROOT podem lançar execução
+    require_gestor_or_root(current_user)
+    
+    contrato = session.get(Contrato, contrato_id)
+    if not contrato:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Contrato não encontrado"
+        )
+    
+    # Verifica acesso ao tenant
+    check_tenant_access(contrato, current_user)
+    
+    if lancamento_data.tipo not in TIPOS_LANCAMENTO:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Tipo de lançamento inválido. Use: {', '.join(sorted(TIPOS_LANCAMENTO))}"
+        )
+    if not lancamento_data.valor:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Valor do lançamento não pode ser zero"
+        )
+    
+    lancamento = ExecucaoFinanceiraService.lancar(
+        session,
+        contrato,
+        **lancamento_data.model_dump(),
+        usuario_id=current_user.id
+    )
+    session.commit()
+    DashboardService.invalidar(contrato.entidade_id)
+    session.refresh(lancamento)
+    
+    return lancamento
+
+@router.get("/{contrato_id}/execucao/lancamentos", response_model=List[ExecucaoFinanceiraRead])
+async def list_lancamentos_execucao(
+    contrato_id: int,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=100),
+    session: Session = Depends(get_session),
+    current_user: Usuario = Depends(get_current_user)
+):
+    """Lista os lançamentos do livro de execução, do mais recente para o mais antigo"""
+    
+    contrato = session.get(Contrato, contrato_id)
+    if not contrato:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Contrato não encontrado"
+        )
+    
+    # Verifica acesso ao tenant
+    check_tenant_access(contrato, current_user)
+    
+    statement = (
+        select(ExecucaoFinanceira)
+        .where(ExecucaoFinanceira.contrato_id == contrato_id)
+        .order_by(ExecucaoFinanceira.data_lancamento.desc(), ExecucaoFinanceira.id.desc())
+        .offset(skip)
+        .limit(limit)
+    )
+    
+    return session.exec(statement).all()
+
+@router.get("/{contrato_id}/execucao")
+async def get_resumo_execucao(
+    contrato_id: int,
+    meses: int = Query(12, ge=1, le=120),
+    session: Session = Depends(get_session),
+    current_user: Usuario = Depends(get_current_user)
+):
+    """
+    Saldo do contrato, ritmo mensal de execução (média dos últimos meses
+    fechados), previsão de esgotamento do saldo e a série mensal consolidada.
+    A série é atualizada pela rotina de consolidação (consolidado_em).
+    """
+    
+    contrato = session.get(Contrato, contrato_id)
+    if not contrato:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Contrato não encontrado"
+        )
+    
+    # Verifica acesso ao tenant
+    check_tenant_access(contrato, current_user)
+    
+    return ExecucaoFinanceiraService.resumo(session, contrato, meses)
@@ -1,12 +1,17 @@
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
 from sqlmodel import Session, select
 from app.core.database import get_session
 from app.core.auth import get_current_user, require_perfil
-from app.core.guards import check_tenant_access, require_gestor_or_root
+from app.core.etag import etag_condicional
+from app.core.serializacao import colunas_read, projecao_campos, resposta_linhas
+from app.core.guards import apply_tenant_filter, check_tenant_access, require_gestor_or_root
 from app.models.cronograma_fisico_fin import CronogramaFisicoFin, CronogramaFisicoFinCreate, CronogramaFisicoFinUpdate, CronogramaFisicoFinRead
 from app.models.contrato import Contrato
 from app.models.usuario import Usuario
+from app.services.dashboard_service import DashboardService
+from app.services.curva_s_service import CurvaSService
+from app.services.analise_cronograma_service import AnaliseCronogramaService
 from datetime import datetime
 
 router = APIRouter(prefix="/cronogramas", tags=["Cronogramas Físico-Financeiro"])
@@ -30,25 +35,33 @@ async def create_cronograma(
     # Verifica acesso ao tenant
     check_tenant_access(contrato, current_user)
     
-    cronograma = CronogramaFisicoFin(**cronograma_data.model_dump())
+    cronograma = CronogramaFisicoFin(**cronograma_data.model_dump(), entidade_id=contrato.entidade_id)
     session.add(cronograma)
+    CurvaSService.atualizar_contrato(session, cronograma.contrato_id, cronograma.entidade_id)
     session.commit()
+    DashboardService.invalidar(cronograma.entidade_id)
+    AnaliseCronogramaService.invalidar(cronograma.entidade_id)
     session.refresh(cronograma)
     
     return cronograma
 
-@router.get("", response_model=List[CronogramaFisicoFinRead])
+@router.get("", response_model=List[CronogramaFisicoFinRead], dependencies=[Depends(etag_condicional("cronograma_fisico_fin"))])
 async def list_cronogramas(
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=100),
     contrato_id: Optional[int] = None,
     status: Optional[str] = None,
+    campos: Optional[List[str]] = Depends(projecao_campos(CronogramaFisicoFinRead)),
     session: Session = Depends(get_session),
     current_user: Usuario = Depends(get_current_user)
 ):
     """Lista etapas do cronograma"""
     
-    statement = select(CronogramaFisicoFin)
+    statement = select(*colunas_read(CronogramaFisicoFinRead, CronogramaFisicoFin, campos))
+    
+    # Aplica filtro de tenant (ROOT vê tudo, outros só da entidade)
+    statement = apply_tenant_filter(statement, CronogramaFisicoFin, current_user)
     
     if contrato_id:
         statement = statement.where(CronogramaFisicoFin.contrato_id == contrato_id)
@@ -57,11 +70,79 @@ async def list_cronogramas(
         statement = statement.where(CronogramaFisicoFin.status == status)
     
     statement = statement.offset(skip).limit(limit)
-    cronogramas = session.exec(statement).all()
+    cronogramas = session.execute(statement).all()
+    
+    return resposta_linhas(cronogramas, response)
+
+@router.get("/curva-s")
+async def get_curvas_s(
+    contrato_id: Optional[List[int]] = Query(None),
+    entidade_id: Optional[int] = None,
+    session: Session = Depends(get_session),
+    current_user: Usuario = Depends(get_current_user)
+):
+    """
+    Curvas S (planejado x executado, mensal e acumulado) dos contratos,
+    lidas da série materializada. Aceita vários contrato_id; sem filtro,
+    retorna todos os contratos da entidade.
+    """
+    
+    if current_user.perfil != "ROOT":
+        if current_user.entidade_id is None:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Usuário não vinculado a nenhuma entidade."
+            )
+        entidade_id = current_user.entidade_id
+    
+    return {
+        "entidade_id": entidade_id,
+        "contratos": CurvaSService.series_contratos(session, entidade_id, contrato_id)
+    }
+
+@router.get("/curva-s/carteira")
+async def get_curva_s_carteira(
+    entidade_id: Optional[int] = None,
+    session: Session = Depends(get_session),
+    current_user: Usuario = Depends(get_current_user)
+):
+    """Curva S da carteira, ponderada pelo valor global dos contratos"""
+    
+    if current_user.perfil != "ROOT":
+        if current_user.entidade_id is None:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Usuário não vinculado a nenhuma entidade."
+            )
+        entidade_id = current_user.entidade_id
     
-    return cronogramas
+    return CurvaSService.serie_carteira(session, entidade_id)
 
-@router.get("/{cronograma_id}", response_model=CronogramaFisicoFinRead)
+@router.get("/atrasos")
+async def get_atrasos_cronograma(
+    limite_pontos: float = Query(10, ge=0, le=100),
+    apenas_sinalizados: bool = True,
+    entidade_id: Optional[int] = None,
+    session: Session = Depends(get_session),
+    current_user: Usuario = Depends(require_perfil("ROOT", "GESTOR", "AUDITOR"))
+):
+    """
+    Análise de atraso por contrato: desvio entre planejado e executado,
+    etapas vencidas sem realização, deslizamento médio e previsão de conclusão.
+    Sinaliza contratos com desvio acima de `limite_pontos` ou etapa vencida.
+    """
+    
+    if current_user.perfil != "ROOT":
+        if current_user.entidade_id is None:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Usuário não vinculado a nenhuma entidade."
+            )
+        entidade_id = current_user.entidade_id
+    
+    return AnaliseCronogramaService.analisar(session, entidade_id, limite_pontos, apenas_sinalizados)
+
+@router.get("/{cronograma_id}", response_model=CronogramaFisicoFinRead, dependencies=[Depends(etag_condicional("cronograma_fisico_fin"))])
 async def get_cronograma(
     cronograma_id: int,
     session: Session = Depends(get_session),
@@ -76,6 +157,9 @@ async def get_cronograma(
             detail="Etapa do cronograma não encontrada"
         )
     
+    # Verifica acesso ao tenant
+    check_tenant_access(cronograma, current_user)
+    
     return cronograma
 
 @router.put("/{cronograma_id}", response_model=CronogramaFisicoFinRead)
@@ -94,12 +178,18 @@ async def update_cronograma(
             detail="Etapa do cronograma não encontrada"
         )
     
+    # Verifica acesso ao tenant
+    check_tenant_access(cronograma, current_user)
+    
     update_data = cronograma_data.model_dump(exclude_unset=True)
     for key, value in update_data.items():
         setattr(cronograma, key, value)
     
     session.add(cronograma)
+    CurvaSService.atualizar_contrato(session, cronograma.contrato_id, cronograma.entidade_id)
     session.commit()
+    DashboardService.invalidar(cronograma.entidade_id)
+    AnaliseCronogramaService.invalidar(cronograma.entidade_id)
     session.refresh(cronograma)
     
     return cronograma
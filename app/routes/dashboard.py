@@ -0,0 +1,37 @@
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlmodel import Session
+from app.core.database import get_session
+from app.core.auth import require_perfil
+from app.models.usuario import Usuario
+from app.services.dashboard_service import DashboardService
+
+router = APIRouter(prefix="/dashboard", tags=["Dashboard"])
+
+@router.get("/gestor")
+async def get_dashboard_gestor(
+    entidade_id: Optional[int] = None,
+    atualizar: bool = False,
+    session: Session = Depends(get_session),
+    current_user: Usuario = Depends(require_perfil("ROOT", "GESTOR", "AUDITOR"))
+):
+    """
+    Indicadores do painel do gestor: total de contratos, médias de execução
+    física e financeira, contratos atrasados e no prazo.
+
+    Calculados no banco em uma única consulta e mantidos em cache por
+    entidade (DASHBOARD_CACHE_TTL). `atualizado_em` informa quando os números
+    foram calculados; `atualizar=true` ignora o cache.
+    ROOT pode informar entidade_id (sem ele, consolida todas as entidades);
+    demais perfis veem sempre a própria entidade.
+    """
+
+    if current_user.perfil != "ROOT":
+        if current_user.entidade_id is None:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Usuário não vinculado a nenhuma entidade."
+            )
+        entidade_id = current_user.entidade_id
+
+    return DashboardService.resumo_gestor(session, entidade_id, forcar=atualizar)
@@ -1,8 +1,10 @@
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
 from sqlmodel import Session, select
 from app.core.database import get_session
 from app.core.auth import get_current_user, require_perfil
+from app.core.etag import etag_condicional
+from app.core.serializacao import colunas_read, projecao_campos, resposta_linhas
 from app.core.guards import require_root, RootGuard
 from app.models.entidade import Entidade, EntidadeCreate, EntidadeUpdate, EntidadeRead
 from app.models.usuario import Usuario
@@ -33,17 +35,19 @@ async def create_entidade(
     
     return entidade
 
-@router.get("", response_model=List[EntidadeRead])
+@router.get("", response_model=List[EntidadeRead], dependencies=[Depends(etag_condicional("entidade"))])
 async def list_entidades(
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=100),
     status: Optional[str] = None,
+    campos: Optional[List[str]] = Depends(projecao_campos(EntidadeRead)),
     session: Session = Depends(get_session),
     current_user: Usuario = Depends(get_current_user)
 ):
     """Lista entidades"""
     
-    statement = select(Entidade)
+    statement = select(*colunas_read(EntidadeRead, Entidade, campos))
     
     if status:
         statement = statement.where(Entidade.status == status)
@@ -53,11 +57,11 @@ async def list_entidades(
         statement = statement.where(Entidade.id == current_user.entidade_id)
     
     statement = statement.offset(skip).limit(limit)
-    entidades = session.exec(statement).all()
+    entidades = session.execute(statement).all()
     
-    return entidades
+    return resposta_linhas(entidades, response)
 
-@router.get("/{entidade_id}", response_model=EntidadeRead)
+@router.get("/{entidade_id}", response_model=EntidadeRead, dependencies=[Depends(etag_condicional("entidade"))])
 async def get_entidade(
     entidade_id: int,
     session: Session = Depends(get_session),
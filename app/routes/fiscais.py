@@ -1,9 +1,11 @@
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
 from sqlmodel import Session, select
 from app.core.database import get_session
 from app.core.auth import get_current_user, require_perfil
-from app.core.guards import check_tenant_access, require_gestor_or_root
+from app.core.etag import etag_condicional
+from app.core.serializacao import colunas_read, projecao_campos, resposta_linhas
+from app.core.guards import apply_tenant_filter, check_tenant_access, require_gestor_or_root
 from app.models.fiscal_designado import FiscalDesignado, FiscalDesignadoCreate, FiscalDesignadoRead
 from app.models.contrato import Contrato
 from app.models.usuario import Usuario
@@ -48,27 +50,32 @@ async def create_fiscal_designado(
             detail="Fiscal já designado para este contrato"
         )
     
-    fiscal = FiscalDesignado(**fiscal_data.model_dump())
+    fiscal = FiscalDesignado(**fiscal_data.model_dump(), entidade_id=contrato.entidade_id)
     session.add(fiscal)
     session.commit()
     session.refresh(fiscal)
     
     return fiscal
 
-@router.get("", response_model=List[FiscalDesignadoRead])
+@router.get("", response_model=List[FiscalDesignadoRead], dependencies=[Depends(etag_condicional("fiscal_designado"))])
 async def list_fiscais_designados(
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=100),
     contrato_id: Optional[int] = None,
     usuario_id: Optional[int] = None,
     tipo_fiscal: Optional[str] = None,
     ativo: Optional[bool] = None,
+    campos: Optional[List[str]] = Depends(projecao_campos(FiscalDesignadoRead)),
     session: Session = Depends(get_session),
     current_user: Usuario = Depends(get_current_user)
 ):
     """Lista fiscais designados"""
     
-    statement = select(FiscalDesignado)
+    statement = select(*colunas_read(FiscalDesignadoRead, FiscalDesignado, campos))
+    
+    # Aplica filtro de tenant (ROOT vê tudo, outros só da entidade)
+    statement = apply_tenant_filter(statement, FiscalDesignado, current_user)
     
     if contrato_id:
         statement = statement.where(FiscalDesignado.contrato_id == contrato_id)
@@ -83,11 +90,11 @@ async def list_fiscais_designados(
         statement = statement.where(FiscalDesignado.ativo == ativo)
     
     statement = statement.offset(skip).limit(limit)
-    fiscais = session.exec(statement).all()
+    fiscais = session.execute(statement).all()
     
-    return fiscais
+    return resposta_linhas(fiscais, response)
 
-@router.get("/{fiscal_id}", response_model=FiscalDesignadoRead)
+@router.get("/{fiscal_id}", response_model=FiscalDesignadoRead, dependencies=[Depends(etag_condicional("fiscal_designado"))])
 async def get_fiscal_designado(
     fiscal_id: int,
     session: Session = Depends(get_session),
@@ -102,6 +109,9 @@ async def get_fiscal_designado(
             detail="Fiscal designado não encontrado"
         )
     
+    # Verifica acesso ao tenant
+    check_tenant_access(fiscal, current_user)
+    
     return fiscal
 
 @router.delete("/{fiscal_id}")
@@ -119,6 +129,9 @@ async def delete_fiscal_designado(
             detail="Fiscal designado não encontrado"
         )
     
+    # Verifica acesso ao tenant
+    check_tenant_access(fiscal, current_user)
+    
     fiscal.ativo = False
     session.add(fiscal)
     session.commit()
@@ -1,8 +1,10 @@
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
 from sqlmodel import Session, select
 from app.core.database import get_session
 from app.core.auth import get_current_user
+from app.core.etag import etag_condicional
+from app.core.serializacao import colunas_read, projecao_campos, resposta_linhas
 from app.core.guards import (
     apply_tenant_filter,
     check_tenant_access,
@@ -10,7 +12,13 @@ from app.core.guards import (
     TenantGuard
 )
 from app.models.fornecedor import Fornecedor, FornecedorCreate, FornecedorUpdate, FornecedorRead
+from app.models.fornecedor_duplicidade import FornecedorMesclagem
 from app.models.usuario import Usuario
+from app.services.fornecedor_duplicidade_service import FornecedorDuplicidadeService
+from app.services.dashboard_service import DashboardService
+from app.services.analise_cronograma_service import AnaliseCronogramaService
+from app.services.fornecedor_score_service import FornecedorScoreService
+from app.services.carga_lote_service import CargaLoteService, LIMITE_LOTE
 from datetime import datetime
 
 router = APIRouter(prefix="/fornecedores", tags=["Fornecedores"])
@@ -48,25 +56,61 @@ async def create_fornecedor(
     
     fornecedor = Fornecedor(**data_dict)
     session.add(fornecedor)
+    session.flush()
+    FornecedorScoreService.recalcular(session, fornecedor_ids=[fornecedor.id])
     session.commit()
     session.refresh(fornecedor)
     
     return fornecedor
 
-@router.get("", response_model=List[FornecedorRead])
+@router.post("/bulk")
+async def create_fornecedores_bulk(
+    itens: List[FornecedorCreate],
+    atualizar_existentes: bool = True,
+    session: Session = Depends(get_session),
+    current_user: Usuario = Depends(get_current_user)
+):
+    """
+    Cria ou atualiza até LIMITE_LOTE fornecedores em uma requisição.
+    CNPJ já cadastrado na entidade é atualizado (ou recusado com
+    atualizar_existentes=false). Retorna o resultado de cada item na ordem
+    enviada: CRIADO, ATUALIZADO ou ERRO com o motivo.
+    """
+    
+    # Verifica permissão (ROOT, GESTOR ou APOIO)
+    if current_user.perfil not in ["ROOT", "GESTOR", "APOIO"]:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Sem permissão para criar fornecedor"
+        )
+    
+    if len(itens) > LIMITE_LOTE:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Lote excede o limite de {LIMITE_LOTE} itens"
+        )
+    
+    resultado = CargaLoteService.fornecedores(session, itens, current_user, atualizar_existentes)
+    session.commit()
+    
+    return resultado
+
+@router.get("", response_model=List[FornecedorRead], dependencies=[Depends(etag_condicional("fornecedor"))])
 async def list_fornecedores(
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=100),
     entidade_id: Optional[int] = None,
     situacao_cadastral: Optional[str] = None,
     regularidade_geral: Optional[str] = None,
     ativo: Optional[bool] = None,
+    campos: Optional[List[str]] = Depends(projecao_campos(FornecedorRead)),
     session: Session = Depends(get_session),
     current_user: Usuario = Depends(get_current_user)
 ):
     """Lista fornecedores"""
     
-    statement = select(Fornecedor)
+    statement = select(*colunas_read(FornecedorRead, Fornecedor, campos))
     
     # Aplica filtro de tenant
     statement = apply_tenant_filter(statement, Fornecedor, current_user)
@@ -85,11 +129,157 @@ async def list_fornecedores(
         statement = statement.where(Fornecedor.ativo == ativo)
     
     statement = statement.offset(skip).limit(limit)
-    fornecedores = session.exec(statement).all()
+    fornecedores = session.execute(statement).all()
+    
+    return resposta_linhas(fornecedores, response)
+
+@router.get("/ranking-risco")
+async def get_ranking_risco_fornecedores(
+    limit: int = Query(50, ge=1, le=100),
+    apos_score: Optional[int] = None,
+    apos_id: Optional[int] = None,
+    entidade_id: Optional[int] = None,
+    session: Session = Depends(get_session),
+    current_user: Usuario = Depends(get_current_user)
+):
+    """
+    Fornecedores ordenados pelo score composto de risco (certidões vencidas,
+    impedimento, penalidades aplicadas e riscos altos dos contratos), com a
+    decomposição por componente. Paginação por cursor (apos_score, apos_id).
+    """
+    
+    if current_user.perfil != "ROOT":
+        if current_user.entidade_id is None:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Usuário não vinculado a nenhuma entidade."
+            )
+        entidade_id = current_user.entidade_id
+    
+    return FornecedorScoreService.ranking(session, entidade_id, limit, apos_score, apos_id)
+
+@router.get("/duplicatas")
+async def list_fornecedores_duplicados(
+    entidade_id: Optional[int] = None,
+    session: Session = Depends(get_session),
+    current_user: Usuario = Depends(get_current_user)
+):
+    """
+    Grupos de fornecedores possivelmente duplicados (mesma raiz de CNPJ ou
+    razão social semelhante) aguardando revisão, com os pares que os ligam e
+    o principal sugerido. A detecção roda diariamente ou em /duplicatas/detectar.
+    """
+    
+    if current_user.perfil != "ROOT":
+        if current_user.entidade_id is None:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Usuário não vinculado a nenhuma entidade."
+            )
+        entidade_id = current_user.entidade_id
+    
+    return FornecedorDuplicidadeService.grupos(session, entidade_id)
+
+@router.post("/duplicatas/detectar")
+async def detectar_fornecedores_duplicados(
+    entidade_id: Optional[int] = None,
+    session: Session = Depends(get_session),
+    current_user: Usuario = Depends(get_current_user)
+):
+    """Executa agora a detecção de duplicados da entidade (ROOT sem entidade_id: todas)"""
+    
+    require_gestor_or_root(current_user)
+    
+    if current_user.perfil != "ROOT":
+        if current_user.entidade_id is None:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Usuário não vinculado a nenhuma entidade."
+            )
+        entidade_id = current_user.entidade_id
+    
+    return FornecedorDuplicidadeService.detectar(session, entidade_id)
+
+@router.post("/duplicatas/mesclar")
+async def mesclar_fornecedores(
+    dados: FornecedorMesclagem,
+    session: Session = Depends(get_session),
+    current_user: Usuario = Depends(get_current_user)
+):
+    """
+    Mescla os duplicados no fornecedor principal: contratos e certidões
+    passam para o principal, os duplicados são desativados e a mesclagem é
+    registrada na auditoria.
+    """
+    
+    require_gestor_or_root(current_user)
+    
+    principal = session.get(Fornecedor, dados.fornecedor_id)
+    if not principal:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Fornecedor não encontrado"
+        )
+    
+    check_tenant_access(principal, current_user)
+    
+    duplicados_ids = sorted(set(dados.duplicados) - {principal.id})
+    duplicados = session.exec(select(Fornecedor).where(Fornecedor.id.in_(duplicados_ids))).all()
+    if not duplicados_ids or len(duplicados) != len(duplicados_ids) or any(
+        f.entidade_id != principal.entidade_id or not f.ativo for f in duplicados
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Duplicados devem ser fornecedores ativos da mesma entidade do principal"
+        )
+    
+    FornecedorDuplicidadeService.mesclar(session, principal, duplicados, current_user.id)
+    session.commit()
+    # Contratos mudaram de fornecedor: agregados em cache da entidade ficam obsoletos
+    DashboardService.invalidar(principal.entidade_id)
+    AnaliseCronogramaService.invalidar(principal.entidade_id)
+    
+    return {
+        "message": "Fornecedores mesclados com sucesso",
+        "fornecedor_id": principal.id,
+        "mesclados": [f.id for f in duplicados]
+    }
+
+@router.post("/duplicatas/descartar")
+async def descartar_fornecedores_duplicados(
+    dados: FornecedorMesclagem,
+    session: Session = Depends(get_session),
+    current_user: Usuario = Depends(get_current_user)
+):
+    """Marca os pares entre esses fornecedores como não duplicados (não voltam a ser sugeridos)"""
+    
+    require_gestor_or_root(current_user)
+    
+    principal = session.get(Fornecedor, dados.fornecedor_id)
+    if not principal:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Fornecedor não encontrado"
+        )
+    
+    check_tenant_access(principal, current_user)
+    
+    duplicados_ids = sorted(set(dados.duplicados) - {principal.id})
+    duplicados = session.exec(select(Fornecedor).where(Fornecedor.id.in_(duplicados_ids))).all()
+    if not duplicados_ids or len(duplicados) != len(duplicados_ids) or any(
+        f.entidade_id != principal.entidade_id or not f.ativo for f in duplicados
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Duplicados devem ser fornecedores ativos da mesma entidade do principal"
+        )
+    
+    FornecedorDuplicidadeService.descartar(session, [principal.id] + [f.id for f in duplicados])
+    session.commit()
     
-    return fornecedores
+    return {"message": "Pares descartados com sucesso"}
 
-@router.get("/{fornecedor_id}", response_model=FornecedorRead)
+@router.get("/{fornecedor_id}", response_model=FornecedorRead, dependencies=[Depends(etag_condicional("fornecedor"))])
 async def get_fornecedor(
     fornecedor_id: int,
     session: Session = Depends(get_session),
@@ -149,6 +339,7 @@ async def update_fornecedor(
     fornecedor.updated_at = datetime.utcnow()
     
     session.add(fornecedor)
+    FornecedorScoreService.recalcular(session, fornecedor_ids=[fornecedor.id])
     session.commit()
     session.refresh(fornecedor)
     
@@ -0,0 +1,165 @@
+import os
+import uuid
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, status, Query, UploadFile, File, Form
+from sqlmodel import Session, select
+from celery.result import AsyncResult
+from app.core.config import settings
+from app.core.database import get_session
+from app.core.auth import require_perfil
+from app.core.guards import check_tenant_access
+from app.models.importacao_arquivo import ImportacaoArquivo, ImportacaoArquivoRead
+from app.models.usuario import Usuario
+from app.services.importacao_service import TIPOS_IMPORTACAO, FORMATOS_IMPORTACAO
+from app.tasks.tasks import importar_arquivo
+
+router = APIRouter(prefix="/importacoes", tags=["Importações"])
+
+# Tamanho dos blocos copiados do upload para o disco
+BLOCO_UPLOAD = 1024 * 1024
+
+@router.post("", status_code=status.HTTP_202_ACCEPTED)
+async def create_importacao(
+    tipo: str = Form(...),
+    entidade_id: Optional[int] = Form(None),
+    arquivo: UploadFile = File(...),
+    session: Session = Depends(get_session),
+    current_user: Usuario = Depends(require_perfil("ROOT", "GESTOR"))
+):
+    """
+    Recebe uma planilha CSV ou XLSX de dados legados e agenda a importação.
+
+    tipo: CONTRATOS, FISCAIS ou CRONOGRAMAS. O arquivo é copiado em blocos
+    para IMPORTACAO_DIR e processado pela tarefa importar_arquivo; o
+    progresso fica em /importacoes/{id} e em status_url. A importação só
+    inclui registros: contrato com número já cadastrado na entidade não é
+    alterado e a linha é reportada com erro.
+    ROOT informa entidade_id; demais perfis importam para a própria entidade.
+    """
+
+    tipo = tipo.upper()
+    if tipo not in TIPOS_IMPORTACAO:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Tipo inválido. Use: {', '.join(sorted(TIPOS_IMPORTACAO))}"
+        )
+
+    formato = FORMATOS_IMPORTACAO.get(os.path.splitext(arquivo.filename or "")[1].lower())
+    if not formato:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Formato não suportado. Envie um arquivo .csv ou .xlsx"
+        )
+
+    if current_user.perfil != "ROOT":
+        entidade_id = current_user.entidade_id
+    if entidade_id is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="entidade_id é obrigatório"
+        )
+
+    # Copia o upload em blocos (sem carregar o arquivo inteiro na memória)
+    os.makedirs(settings.IMPORTACAO_DIR, exist_ok=True)
+    caminho = os.path.join(settings.IMPORTACAO_DIR, f"{uuid.uuid4().hex}{os.path.splitext(arquivo.filename)[1].lower()}")
+    tamanho = 0
+    with open(caminho, "wb") as destino:
+        while bloco := await arquivo.read(BLOCO_UPLOAD):
+            tamanho += len(bloco)
+            if tamanho > settings.IMPORTACAO_MAX_BYTES:
+                destino.close()
+                os.remove(caminho)
+                raise HTTPException(
+                    status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                    detail=f"Arquivo excede o limite de {settings.IMPORTACAO_MAX_BYTES} bytes"
+                )
+            destino.write(bloco)
+
+    importacao = ImportacaoArquivo(
+        entidade_id=entidade_id,
+        usuario_id=current_user.id,
+        tipo=tipo,
+        formato=formato,
+        nome_arquivo=arquivo.filename[:255],
+        caminho=caminho,
+        tamanho_bytes=tamanho
+    )
+    session.add(importacao)
+    session.commit()
+    session.refresh(importacao)
+
+    task = importar_arquivo.delay(importacao.id)
+    importacao.task_id = task.id
+    session.add(importacao)
+    session.commit()
+
+    return {
+        "message": "Importação iniciada em background",
+        "importacao_id": importacao.id,
+        "task_id": task.id,
+        "status_url": f"/importacoes/task/{task.id}"
+    }
+
+@router.get("", response_model=List[ImportacaoArquivoRead])
+async def list_importacoes(
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=100),
+    session: Session = Depends(get_session),
+    current_user: Usuario = Depends(require_perfil("ROOT", "GESTOR"))
+):
+    """Lista as importações, das mais recentes para as mais antigas"""
+
+    statement = select(ImportacaoArquivo)
+    if current_user.perfil != "ROOT":
+        statement = statement.where(ImportacaoArquivo.entidade_id == current_user.entidade_id)
+
+    statement = statement.order_by(ImportacaoArquivo.created_at.desc()).offset(skip).limit(limit)
+    return session.exec(statement).all()
+
+@router.get("/task/{task_id}")
+async def get_importacao_task_status(
+    task_id: str,
+    current_user: Usuario = Depends(require_perfil("ROOT", "GESTOR"))
+):
+    """
+    Status da tarefa de importação no Celery. Durante o processamento
+    (PROGRESS), `unidade` indica o que `current`/`total` medem: em CSV,
+    "bytes" (bytes lidos e tamanho do arquivo); em XLSX, "linhas" (linhas
+    lidas, com `total` nulo, pois a planilha é lida em fluxo).
+    """
+
+    task_result = AsyncResult(task_id)
+    info = task_result.info if isinstance(task_result.info, dict) else {}
+
+    response = {
+        "task_id": task_id,
+        "status": task_result.status,
+        "unidade": info.get("unidade"),
+        "current": info.get("current"),
+        "total": info.get("total"),
+        "info": info
+    }
+
+    if task_result.failed():
+        response["error"] = str(task_result.result)
+
+    return response
+
+@router.get("/{importacao_id}", response_model=ImportacaoArquivoRead)
+async def get_importacao(
+    importacao_id: int,
+    session: Session = Depends(get_session),
+    current_user: Usuario = Depends(require_perfil("ROOT", "GESTOR"))
+):
+    """Progresso e erros (primeiras IMPORTACAO_MAX_ERROS linhas) de uma importação"""
+
+    importacao = session.get(ImportacaoArquivo, importacao_id)
+    if not importacao:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Importação não encontrada"
+        )
+
+    check_tenant_access(importacao, current_user)
+
+    return importacao
@@ -1,12 +1,16 @@
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
 from sqlmodel import Session, select
 from app.core.database import get_session
 from app.core.auth import get_current_user, require_perfil
-from app.core.guards import check_tenant_access, require_gestor_or_root
+from app.core.etag import etag_condicional
+from app.core.serializacao import colunas_read, projecao_campos, resposta_linhas
+from app.core.guards import apply_tenant_filter, check_tenant_access, require_gestor_or_root
 from app.models.matriz_riscos import MatrizRiscos, MatrizRiscosCreate, MatrizRiscosUpdate, MatrizRiscosRead
 from app.models.contrato import Contrato
 from app.models.usuario import Usuario
+from app.services.matriz_riscos_service import MatrizRiscosService
+from app.services.fornecedor_score_service import FornecedorScoreService
 
 router = APIRouter(prefix="/matriz-riscos", tags=["Matriz de Riscos"])
 
@@ -29,37 +33,41 @@ async def create_risco(
     # Verifica acesso ao tenant
     check_tenant_access(contrato, current_user)
     
-    risco = MatrizRiscos(**risco_data.model_dump())
-    
-    # Calcula nível de risco se probabilidade e impacto forem fornecidos
-    if risco.probabilidade and risco.impacto:
-        nivel = risco.probabilidade * risco.impacto
-        if nivel <= 5:
-            risco.nivel_risco = "BAIXO"
-        elif nivel <= 15:
-            risco.nivel_risco = "MÉDIO"
-        else:
-            risco.nivel_risco = "ALTO"
+    # nivel_score/nivel_risco são colunas geradas pelo banco
+    risco = MatrizRiscos(**risco_data.model_dump(), entidade_id=contrato.entidade_id)
     
     session.add(risco)
+    MatrizRiscosService.atualizar_resumo_contrato(session, risco.contrato_id)
+    FornecedorScoreService.recalcular_por_contrato(session, risco.contrato_id)
     session.commit()
     session.refresh(risco)
     
     return risco
 
-@router.get("", response_model=List[MatrizRiscosRead])
+@router.get("", response_model=List[MatrizRiscosRead], dependencies=[Depends(etag_condicional("matriz_riscos"))])
 async def list_riscos(
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=100),
     contrato_id: Optional[int] = None,
     nivel_risco: Optional[str] = None,
     status: Optional[str] = None,
+    ordenar_por_nivel: bool = False,
+    campos: Optional[List[str]] = Depends(projecao_campos(MatrizRiscosRead)),
     session: Session = Depends(get_session),
     current_user: Usuario = Depends(get_current_user)
 ):
-    """Lista riscos da matriz"""
+    """
+    Lista riscos da matriz.
+    Com contrato_id, o filtro por nivel_risco/status usa o índice
+    (contrato_id, nivel_risco, status); ordenar_por_nivel traz os de maior
+    nivel_score primeiro.
+    """
+    
+    statement = select(*colunas_read(MatrizRiscosRead, MatrizRiscos, campos))
     
-    statement = select(MatrizRiscos)
+    # Aplica filtro de tenant (ROOT vê tudo, outros só da entidade)
+    statement = apply_tenant_filter(statement, MatrizRiscos, current_user)
     
     if contrato_id:
         statement = statement.where(MatrizRiscos.contrato_id == contrato_id)
@@ -70,12 +78,38 @@ async def list_riscos(
     if status:
         statement = statement.where(MatrizRiscos.status == status)
     
+    if ordenar_por_nivel:
+        statement = statement.order_by(MatrizRiscos.nivel_score.desc(), MatrizRiscos.id)
+    
     statement = statement.offset(skip).limit(limit)
-    riscos = session.exec(statement).all()
+    riscos = session.execute(statement).all()
     
-    return riscos
+    return resposta_linhas(riscos, response)
+
+@router.get("/heatmap")
+async def get_heatmap_riscos(
+    top: int = Query(10, ge=1, le=100),
+    entidade_id: Optional[int] = None,
+    session: Session = Depends(get_session),
+    current_user: Usuario = Depends(get_current_user)
+):
+    """
+    Mapa de calor da matriz de riscos: grade 5x5 probabilidade x impacto com
+    a quantidade de riscos ativos, totais por nível e os contratos de maior
+    exposição. Lido da tabela resumo, mantida a cada escrita na matriz.
+    """
+    
+    if current_user.perfil != "ROOT":
+        if current_user.entidade_id is None:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Usuário não vinculado a nenhuma entidade."
+            )
+        entidade_id = current_user.entidade_id
+    
+    return MatrizRiscosService.heatmap(session, entidade_id, top)
 
-@router.get("/{risco_id}", response_model=MatrizRiscosRead)
+@router.get("/{risco_id}", response_model=MatrizRiscosRead, dependencies=[Depends(etag_condicional("matriz_riscos"))])
 async def get_risco(
     risco_id: int,
     session: Session = Depends(get_session),
@@ -90,6 +124,9 @@ async def get_risco(
             detail="Risco não encontrado"
         )
     
+    # Verifica acesso ao tenant
+    check_tenant_access(risco, current_user)
+    
     return risco
 
 @router.put("/{risco_id}", response_model=MatrizRiscosRead)
@@ -108,21 +145,16 @@ async def update_risco(
             detail="Risco não encontrado"
         )
     
+    # Verifica acesso ao tenant
+    check_tenant_access(risco, current_user)
+    
     update_data = risco_data.model_dump(exclude_unset=True)
     for key, value in update_data.items():
         setattr(risco, key, value)
     
-    # Recalcula nível de risco se probabilidade ou impacto mudaram
-    if risco.probabilidade and risco.impacto:
-        nivel = risco.probabilidade * risco.impacto
-        if nivel <= 5:
-            risco.nivel_risco = "BAIXO"
-        elif nivel <= 15:
-            risco.nivel_risco = "MÉDIO"
-        else:
-            risco.nivel_risco = "ALTO"
-    
     session.add(risco)
+    MatrizRiscosService.atualizar_resumo_contrato(session, risco.contrato_id)
+    FornecedorScoreService.recalcular_por_contrato(session, risco.contrato_id)
     session.commit()
     session.refresh(risco)
     
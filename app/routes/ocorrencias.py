@@ -1,10 +1,12 @@
 from typing import List, Optional
 from datetime import datetime
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
 from sqlmodel import Session, select
 from app.core.database import get_session
 from app.core.auth import get_current_user
-from app.core.guards import check_tenant_access, require_fiscal_access
+from app.core.etag import etag_condicional
+from app.core.serializacao import colunas_read, projecao_campos, resposta_linhas
+from app.core.guards import apply_tenant_filter, check_tenant_access, require_fiscal_access
 from app.models.ocorrencia_fiscalizacao import OcorrenciaFiscalizacao, OcorrenciaFiscalizacaoCreate, OcorrenciaFiscalizacaoRead
 from app.models.contrato import Contrato
 from app.models.usuario import Usuario
@@ -33,15 +35,16 @@ async def create_ocorrencia(
     # Verifica acesso ao tenant
     check_tenant_access(contrato, current_user)
     
-    ocorrencia = OcorrenciaFiscalizacao(**ocorrencia_data.model_dump())
+    ocorrencia = OcorrenciaFiscalizacao(**ocorrencia_data.model_dump(), entidade_id=contrato.entidade_id)
     session.add(ocorrencia)
     session.commit()
     session.refresh(ocorrencia)
     
     return ocorrencia
 
-@router.get("", response_model=List[OcorrenciaFiscalizacaoRead])
+@router.get("", response_model=List[OcorrenciaFiscalizacaoRead], dependencies=[Depends(etag_condicional("ocorrencia_fiscalizacao"))])
 async def list_ocorrencias(
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=100),
     contrato_id: Optional[int] = None,
@@ -49,12 +52,16 @@ async def list_ocorrencias(
     tipo_ocorrencia: Optional[str] = None,
     data_inicio: Optional[datetime] = None,
     data_fim: Optional[datetime] = None,
+    campos: Optional[List[str]] = Depends(projecao_campos(OcorrenciaFiscalizacaoRead)),
     session: Session = Depends(get_session),
     current_user: Usuario = Depends(get_current_user)
 ):
     """Lista ocorrências de fiscalização"""
     
-    statement = select(OcorrenciaFiscalizacao)
+    statement = select(*colunas_read(OcorrenciaFiscalizacaoRead, OcorrenciaFiscalizacao, campos))
+    
+    # Aplica filtro de tenant (ROOT vê tudo, outros só da entidade)
+    statement = apply_tenant_filter(statement, OcorrenciaFiscalizacao, current_user)
     
     if contrato_id:
         statement = statement.where(OcorrenciaFiscalizacao.contrato_id == contrato_id)
@@ -72,11 +79,11 @@ async def list_ocorrencias(
         statement = statement.where(OcorrenciaFiscalizacao.data_ocorrencia <= data_fim)
     
     statement = statement.offset(skip).limit(limit).order_by(OcorrenciaFiscalizacao.data_ocorrencia.desc())
-    ocorrencias = session.exec(statement).all()
+    ocorrencias = session.execute(statement).all()
     
-    return ocorrencias
+    return resposta_linhas(ocorrencias, response)
 
-@router.get("/{ocorrencia_id}", response_model=OcorrenciaFiscalizacaoRead)
+@router.get("/{ocorrencia_id}", response_model=OcorrenciaFiscalizacaoRead, dependencies=[Depends(etag_condicional("ocorrencia_fiscalizacao"))])
 async def get_ocorrencia(
     ocorrencia_id: int,
     session: Session = Depends(get_session),
@@ -91,4 +98,7 @@ async def get_ocorrencia(
             detail="Ocorrência não encontrada"
         )
     
+    # Verifica acesso ao tenant
+    check_tenant_access(ocorrencia, current_user)
+    
     return ocorrencia
@@ -1,12 +1,17 @@
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from datetime import date
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
 from sqlmodel import Session, select
 from app.core.database import get_session
 from app.core.auth import get_current_user, require_perfil
-from app.core.guards import check_tenant_access, require_gestor_or_root
+from app.core.etag import etag_condicional
+from app.core.serializacao import colunas_read, projecao_campos, resposta_linhas
+from app.core.guards import apply_tenant_filter, check_tenant_access, require_gestor_or_root
 from app.models.penalidade import Penalidade, PenalidadeCreate, PenalidadeUpdate, PenalidadeRead
 from app.models.contrato import Contrato
 from app.models.usuario import Usuario
+from app.services.fornecedor_score_service import FornecedorScoreService
+from app.services.penalidade_service import PenalidadeService
 
 router = APIRouter(prefix="/penalidades", tags=["Penalidades"])
 
@@ -29,26 +34,33 @@ async def create_penalidade(
     # Verifica acesso ao tenant
     check_tenant_access(contrato, current_user)
     
-    penalidade = Penalidade(**penalidade_data.model_dump())
+    penalidade = Penalidade(**penalidade_data.model_dump(), entidade_id=contrato.entidade_id)
     session.add(penalidade)
+    PenalidadeService.atualizar_resumo_contrato(session, penalidade.contrato_id)
+    FornecedorScoreService.recalcular_por_contrato(session, penalidade.contrato_id)
     session.commit()
     session.refresh(penalidade)
     
     return penalidade
 
-@router.get("", response_model=List[PenalidadeRead])
+@router.get("", response_model=List[PenalidadeRead], dependencies=[Depends(etag_condicional("penalidade"))])
 async def list_penalidades(
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=100),
     contrato_id: Optional[int] = None,
     tipo: Optional[str] = None,
     status: Optional[str] = None,
+    campos: Optional[List[str]] = Depends(projecao_campos(PenalidadeRead)),
     session: Session = Depends(get_session),
     current_user: Usuario = Depends(get_current_user)
 ):
     """Lista penalidades"""
     
-    statement = select(Penalidade)
+    statement = select(*colunas_read(PenalidadeRead, Penalidade, campos))
+    
+    # Aplica filtro de tenant (ROOT vê tudo, outros só da entidade)
+    statement = apply_tenant_filter(statement, Penalidade, current_user)
     
     if contrato_id:
         statement = statement.where(Penalidade.contrato_id == contrato_id)
@@ -60,11 +72,41 @@ async def list_penalidades(
         statement = statement.where(Penalidade.status == status)
     
     statement = statement.offset(skip).limit(limit).order_by(Penalidade.created_at.desc())
-    penalidades = session.exec(statement).all()
+    penalidades = session.execute(statement).all()
     
-    return penalidades
+    return resposta_linhas(penalidades, response)
+
+@router.get("/resumo")
+async def get_resumo_penalidades(
+    entidade_id: Optional[int] = None,
+    contrato_id: Optional[int] = None,
+    fornecedor_id: Optional[int] = None,
+    data_inicio: Optional[date] = None,
+    data_fim: Optional[date] = None,
+    top: int = Query(10, ge=1, le=100),
+    session: Session = Depends(get_session),
+    current_user: Usuario = Depends(require_perfil("ROOT", "GESTOR", "AUDITOR"))
+):
+    """
+    Totais de penalidades e multas (quantidade e valor) por status, tipo,
+    mês de aplicação, contrato e fornecedor, lidos da tabela resumo
+    penalidade_resumo. O período (data_inicio/data_fim) vale por mês.
+    ROOT pode informar entidade_id; demais perfis veem a própria entidade.
+    """
+    
+    if current_user.perfil != "ROOT":
+        if current_user.entidade_id is None:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Usuário não vinculado a nenhuma entidade."
+            )
+        entidade_id = current_user.entidade_id
+    
+    return PenalidadeService.resumo(
+        session, entidade_id, contrato_id, fornecedor_id, data_inicio, data_fim, top
+    )
 
-@router.get("/{penalidade_id}", response_model=PenalidadeRead)
+@router.get("/{penalidade_id}", response_model=PenalidadeRead, dependencies=[Depends(etag_condicional("penalidade"))])
 async def get_penalidade(
     penalidade_id: int,
     session: Session = Depends(get_session),
@@ -79,6 +121,9 @@ async def get_penalidade(
             detail="Penalidade não encontrada"
         )
     
+    # Verifica acesso ao tenant
+    check_tenant_access(penalidade, current_user)
+    
     return penalidade
 
 @router.put("/{penalidade_id}", response_model=PenalidadeRead)
@@ -97,11 +142,16 @@ async def update_penalidade(
             detail="Penalidade não encontrada"
         )
     
+    # Verifica acesso ao tenant
+    check_tenant_access(penalidade, current_user)
+    
     update_data = penalidade_data.model_dump(exclude_unset=True)
     for key, value in update_data.items():
         setattr(penalidade, key, value)
     
     session.add(penalidade)
+    PenalidadeService.atualizar_resumo_contrato(session, penalidade.contrato_id)
+    FornecedorScoreService.recalcular_por_contrato(session, penalidade.contrato_id)
     session.commit()
     session.refresh(penalidade)
     
@@ -0,0 +1,76 @@
+import asyncio
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi.responses import JSONResponse
+from app.core.auth import get_current_user
+from app.core.cache import cache
+from app.core.config import settings
+from app.core.guards import RootGuard
+from app.core.perfilador import CHAVE_PERFIL, AmostradorPilhas, SessaoOcupada, emitir_token
+from app.models.usuario import Usuario
+
+router = APIRouter(prefix="/admin/perfil", tags=["Administração - Perfil"])
+
+
+@router.post("/amostragem")
+async def amostrar_worker(
+    segundos: float = Query(10, gt=0),
+    intervalo_ms: float = Query(None, ge=1, le=100),
+    current_user: Usuario = Depends(get_current_user)
+):
+    """
+    Amostra as pilhas de todas as threads deste worker por `segundos` e
+    retorna o arquivo do speedscope (abrir em https://www.speedscope.app).
+    Só o worker que atender a chamada é perfilado; uma sessão por vez.
+    """
+    RootGuard.require_root(current_user)
+
+    if segundos > settings.PERFIL_MAX_SEGUNDOS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Duração máxima: {settings.PERFIL_MAX_SEGUNDOS} segundos"
+        )
+
+    amostrador = AmostradorPilhas((intervalo_ms or settings.PERFIL_INTERVALO_MS) / 1000)
+    try:
+        amostrador.iniciar()
+    except SessaoOcupada as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    try:
+        # Libera o event loop para as requisições que se quer observar
+        await asyncio.sleep(segundos)
+    finally:
+        amostrador.parar()
+
+    return JSONResponse(
+        content=amostrador.speedscope(f"worker {segundos:g}s"),
+        headers={"Content-Disposition": 'attachment; filename="worker.speedscope.json"'}
+    )
+
+
+@router.post("/token")
+async def emitir_token_perfil(current_user: Usuario = Depends(get_current_user)):
+    """
+    Token assinado para perfilar requisições: envie-o no cabeçalho
+    X-Perfil-Token e baixe o perfil em /admin/perfil/{X-Perfil-Id da resposta}
+    """
+    RootGuard.require_root(current_user)
+
+    token, expira_em = emitir_token(current_user.id)
+    return {"token": token, "cabecalho": "X-Perfil-Token", "expira_em": expira_em}
+
+
+@router.get("/{perfil_id}")
+async def get_perfil_requisicao(perfil_id: str, current_user: Usuario = Depends(get_current_user)):
+    """Perfil (speedscope) de uma requisição feita com X-Perfil-Token"""
+    RootGuard.require_root(current_user)
+
+    perfil = cache.get(CHAVE_PERFIL.format(perfil_id))
+    if perfil is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Perfil não encontrado ou expirado"
+        )
+    return JSONResponse(
+        content=perfil,
+        headers={"Content-Disposition": f'attachment; filename="{perfil_id}.speedscope.json"'}
+    )
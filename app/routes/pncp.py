@@ -4,6 +4,7 @@ from sqlmodel import Session, select
 from app.core.database import get_session
 from app.core.auth import get_current_user, require_perfil
 from app.services.pncp_service import PNCPService
+from app.services.fornecedor_score_service import FornecedorScoreService
 from app.models.fornecedor import Fornecedor, FornecedorRead
 from app.models.contrato import Contrato, ContratoRead
 from app.models.usuario import Usuario
@@ -248,6 +249,7 @@ async def verificar_certidoes_fornecedor_pncp(
             fornecedor.regularidade_geral = resultado.get("regularidade_geral", "REGULAR")
             fornecedor.total_certidoes_vencidas = resultado.get("certidoes_vencidas", 0)
             fornecedor.data_ultima_verificacao = datetime.utcnow()
+            FornecedorScoreService.recalcular(session, fornecedor_ids=[fornecedor.id])
             session.commit()
 
         return {
@@ -1,8 +1,10 @@
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
 from sqlmodel import Session, select
 from app.core.database import get_session
 from app.core.auth import get_current_user, require_perfil
+from app.core.etag import etag_condicional
+from app.core.serializacao import colunas_read, projecao_campos, resposta_linhas
 from app.models.tipo_certidao import TipoCertidao, TipoCertidaoCreate, TipoCertidaoRead
 from app.models.usuario import Usuario
 
@@ -31,18 +33,20 @@ async def create_tipo_certidao(
     
     return tipo_certidao
 
-@router.get("", response_model=List[TipoCertidaoRead])
+@router.get("", response_model=List[TipoCertidaoRead], dependencies=[Depends(etag_condicional("tipo_certidao"))])
 async def list_tipos_certidao(
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=100),
     obrigatoria_licitacao: Optional[bool] = None,
     obrigatoria_contratacao: Optional[bool] = None,
+    campos: Optional[List[str]] = Depends(projecao_campos(TipoCertidaoRead)),
     session: Session = Depends(get_session),
     current_user: Usuario = Depends(get_current_user)
 ):
     """Lista tipos de certidão"""
     
-    statement = select(TipoCertidao)
+    statement = select(*colunas_read(TipoCertidaoRead, TipoCertidao, campos))
     
     if obrigatoria_licitacao is not None:
         statement = statement.where(TipoCertidao.obrigatoria_licitacao == obrigatoria_licitacao)
@@ -51,11 +55,11 @@ async def list_tipos_certidao(
         statement = statement.where(TipoCertidao.obrigatoria_contratacao == obrigatoria_contratacao)
     
     statement = statement.offset(skip).limit(limit)
-    tipos = session.exec(statement).all()
+    tipos = session.execute(statement).all()
     
-    return tipos
+    return resposta_linhas(tipos, response)
 
-@router.get("/{tipo_id}", response_model=TipoCertidaoRead)
+@router.get("/{tipo_id}", response_model=TipoCertidaoRead, dependencies=[Depends(etag_condicional("tipo_certidao"))])
 async def get_tipo_certidao(
     tipo_id: int,
     session: Session = Depends(get_session),
@@ -1,8 +1,10 @@
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
 from sqlmodel import Session, select
 from app.core.database import get_session
 from app.core.auth import get_current_user, require_perfil
+from app.core.etag import etag_condicional
+from app.core.serializacao import colunas_read, projecao_campos, resposta_linhas
 from app.core.guards import (
     apply_tenant_filter,
     check_tenant_access,
@@ -61,19 +63,21 @@ async def create_usuario(
     
     return usuario
 
-@router.get("", response_model=List[UsuarioRead])
+@router.get("", response_model=List[UsuarioRead], dependencies=[Depends(etag_condicional("usuario"))])
 async def list_usuarios(
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=100),
     entidade_id: Optional[int] = None,
     perfil: Optional[str] = None,
     ativo: Optional[bool] = None,
+    campos: Optional[List[str]] = Depends(projecao_campos(UsuarioRead)),
     session: Session = Depends(get_session),
     current_user: Usuario = Depends(get_current_user)
 ):
     """Lista usuários"""
     
-    statement = select(Usuario)
+    statement = select(*colunas_read(UsuarioRead, Usuario, campos))
     
     # Aplica filtro de tenant
     statement = apply_tenant_filter(statement, Usuario, current_user)
@@ -89,11 +93,11 @@ async def list_usuarios(
         statement = statement.where(Usuario.ativo == ativo)
     
     statement = statement.offset(skip).limit(limit)
-    usuarios = session.exec(statement).all()
+    usuarios = session.execute(statement).all()
     
-    return usuarios
+    return resposta_linhas(usuarios, response)
 
-@router.get("/{usuario_id}", response_model=UsuarioRead)
+@router.get("/{usuario_id}", response_model=UsuarioRead, dependencies=[Depends(etag_condicional("usuario"))])
 async def get_usuario(
     usuario_id: int,
     session: Session = Depends(get_session),
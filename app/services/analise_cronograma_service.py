@@ -0,0 +1,234 @@
+import logging
+from datetime import datetime, date, timedelta
+from typing import Any, Dict, List, Optional
+import numpy as np
+from sqlalchemy import Float, String, cast, func
+from sqlmodel import Session, select
+from app.core.cache import cache
+from app.core.config import settings
+from app.models.contrato import Contrato
+from app.models.cronograma_fisico_fin import CronogramaFisicoFin
+
+logger = logging.getLogger(__name__)
+
+_EPOCA = date(1970, 1, 1)
+
+
+def _datas(valores) -> np.ndarray:
+    """Converte uma coluna de datas ISO (com None) em datetime64[D]; None vira NaT"""
+    return np.array(valores, dtype="datetime64[D]")
+
+
+def _data(dias) -> Optional[str]:
+    if dias is None or np.isnan(dias):
+        return None
+    return (_EPOCA + timedelta(days=int(round(dias)))).isoformat()
+
+
+def _numero(valor) -> Optional[float]:
+    if valor is None or np.isnan(valor):
+        return None
+    return round(float(valor), 2)
+
+
+class AnaliseCronogramaService:
+    """
+    Análise de atraso dos cronogramas em lote, por entidade.
+
+    As etapas são lidas em uma única consulta e transformadas em colunas
+    NumPy; os indicadores por contrato saem de agregações vetorizadas
+    (bincount / ufunc.at sobre o índice do contrato), sem iterar etapas
+    em Python. O resultado fica em cache por entidade e dia de referência
+    e é invalidado nas escritas do cronograma.
+    """
+
+    @staticmethod
+    def chave(entidade_id: Optional[int], hoje: date) -> str:
+        return f"cronograma:atrasos:{entidade_id if entidade_id is not None else 'todas'}:{hoje.isoformat()}"
+
+    @staticmethod
+    def _colunas(session: Session, entidade_id: Optional[int]) -> Dict[str, np.ndarray]:
+        """
+        Lê as etapas em uma consulta, já com tipos primitivos: percentuais como
+        float e datas como texto ISO, que o NumPy converte em lote para
+        datetime64 (evita criar Decimal/date linha a linha)
+        """
+        statement = (
+            select(
+                CronogramaFisicoFin.contrato_id,
+                func.coalesce(cast(CronogramaFisicoFin.percentual_planejado, Float), 0.0),
+                func.coalesce(cast(CronogramaFisicoFin.percentual_executado, Float), 0.0),
+                cast(CronogramaFisicoFin.data_prevista, String),
+                cast(CronogramaFisicoFin.data_realizada, String),
+                cast(Contrato.data_inicio, String)
+            )
+            .join(Contrato, Contrato.id == CronogramaFisicoFin.contrato_id)
+            .where(Contrato.status != "CANCELADO")
+        )
+        if entidade_id is not None:
+            statement = statement.where(CronogramaFisicoFin.entidade_id == entidade_id)
+        linhas = session.connection().execute(statement).fetchall()
+
+        contrato, planejado, executado, prevista, realizada, inicio = zip(*linhas) if linhas else ([],) * 6
+        return {
+            "contrato_id": np.array(contrato, dtype=np.int64),
+            "planejado": np.array(planejado, dtype=np.float64),
+            "executado": np.array(executado, dtype=np.float64),
+            "data_prevista": _datas(prevista),
+            "data_realizada": _datas(realizada),
+            "data_inicio": _datas(inicio),
+        }
+
+    @staticmethod
+    def calcular(colunas: Dict[str, np.ndarray], hoje: date) -> List[Dict[str, Any]]:
+        """
+        Indicadores por contrato:
+          - planejado_ate_hoje: soma do peso das etapas com data_prevista <= hoje
+          - executado: soma de peso × percentual_executado / 100
+          - desvio_pontos: planejado_ate_hoje - executado
+          - etapas_vencidas / atraso_max_dias: etapas com data_prevista < hoje,
+            sem data_realizada e abaixo de 100%
+          - deslizamento_medio_dias: média de data_realizada - data_prevista
+            das etapas concluídas
+          - spi e previsao_conclusao: índice de desempenho de prazo
+            (executado / planejado_ate_hoje) aplicado à duração planejada
+        """
+        ids = colunas["contrato_id"]
+        if ids.size == 0:
+            return []
+
+        contratos, grupo = np.unique(ids, return_inverse=True)
+        n = contratos.size
+        hoje_dias = np.datetime64(hoje, "D").astype(np.int64)
+
+        peso = colunas["planejado"]
+        feito = peso * colunas["executado"] / 100
+        prevista = colunas["data_prevista"]
+        realizada = colunas["data_realizada"]
+        tem_prevista = ~np.isnat(prevista)
+        tem_realizada = ~np.isnat(realizada)
+        prevista_dias = np.where(tem_prevista, prevista.astype(np.int64), 0)
+        realizada_dias = np.where(tem_realizada, realizada.astype(np.int64), 0)
+
+        def soma(valores):
+            return np.bincount(grupo, weights=valores, minlength=n)
+
+        peso_total = soma(peso)
+        devido = tem_prevista & (prevista_dias <= hoje_dias)
+        planejado_ate_hoje = soma(np.where(devido, peso, 0.0))
+        executado = soma(feito)
+        desvio = planejado_ate_hoje - executado
+
+        vencida = tem_prevista & (prevista_dias < hoje_dias) & ~tem_realizada & (colunas["executado"] < 100)
+        etapas_vencidas = np.bincount(grupo, weights=vencida, minlength=n).astype(np.int64)
+        atraso_max = np.zeros(n, dtype=np.int64)
+        np.maximum.at(atraso_max, grupo, np.where(vencida, hoje_dias - prevista_dias, 0))
+
+        concluida = tem_prevista & tem_realizada
+        qtd_concluidas = np.bincount(grupo, weights=concluida, minlength=n)
+        deslizamento_total = soma(np.where(concluida, realizada_dias - prevista_dias, 0))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            deslizamento_medio = np.where(qtd_concluidas > 0, deslizamento_total / qtd_concluidas, np.nan)
+
+        # Janela planejada: início do contrato (ou primeira etapa) até a última data prevista
+        sem_data = np.iinfo(np.int64).max
+        primeira = np.full(n, sem_data, dtype=np.int64)
+        ultima = np.full(n, -sem_data, dtype=np.int64)
+        np.minimum.at(primeira, grupo, np.where(tem_prevista, prevista_dias, sem_data))
+        np.maximum.at(ultima, grupo, np.where(tem_prevista, prevista_dias, -sem_data))
+        inicio = colunas["data_inicio"]
+        inicio_dias = np.full(n, sem_data, dtype=np.int64)
+        np.minimum.at(inicio_dias, grupo, np.where(np.isnat(inicio), sem_data, inicio.astype(np.int64)))
+        inicio_dias = np.minimum(inicio_dias, primeira)
+        tem_janela = ultima > -sem_data
+        fim_planejado = np.where(tem_janela, ultima, np.nan)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            spi = np.where(planejado_ate_hoje > 0, executado / planejado_ate_hoje, np.nan)
+            duracao = (ultima - inicio_dias).astype(np.float64)
+            previsao = np.where(
+                tem_janela & (spi > 0),
+                inicio_dias + duracao / spi,
+                np.nan
+            )
+        # Sem nada vencido ainda, a previsão é o próprio fim planejado;
+        # contrato concluído termina na última data realizada
+        previsao = np.where(tem_janela & np.isnan(spi), fim_planejado, previsao)
+        ultima_realizada = np.full(n, -sem_data, dtype=np.int64)
+        np.maximum.at(ultima_realizada, grupo, np.where(tem_realizada, realizada_dias, -sem_data))
+        concluido = (peso_total > 0) & (executado >= peso_total)
+        previsao = np.where(concluido & (ultima_realizada > -sem_data), ultima_realizada, previsao)
+
+        etapas = np.bincount(grupo, minlength=n)
+        return [
+            {
+                "contrato_id": int(contratos[i]),
+                "etapas": int(etapas[i]),
+                "planejado_ate_hoje": _numero(planejado_ate_hoje[i]),
+                "executado": _numero(executado[i]),
+                "desvio_pontos": _numero(desvio[i]),
+                "etapas_vencidas": int(etapas_vencidas[i]),
+                "atraso_max_dias": int(atraso_max[i]),
+                "deslizamento_medio_dias": _numero(deslizamento_medio[i]),
+                "spi": _numero(spi[i]),
+                "fim_planejado": _data(fim_planejado[i]),
+                "previsao_conclusao": _data(previsao[i]),
+            }
+            for i in range(n)
+        ]
+
+    @staticmethod
+    def analisar(
+        session: Session,
+        entidade_id: Optional[int],
+        limite_pontos: float = 10,
+        apenas_sinalizados: bool = True,
+        hoje: Optional[date] = None
+    ) -> Dict[str, Any]:
+        """
+        Retorna os indicadores por contrato (do cache da entidade ou recalculados)
+        e sinaliza os contratos com desvio acima de `limite_pontos` ou etapas vencidas.
+        O limite é aplicado sobre o resultado em cache, sem nova leitura do banco.
+        """
+        hoje = hoje or date.today()
+        chave = AnaliseCronogramaService.chave(entidade_id, hoje)
+        analise = cache.get(chave)
+        em_cache = analise is not None
+        if not em_cache:
+            analise = {
+                "contratos": AnaliseCronogramaService.calcular(
+                    AnaliseCronogramaService._colunas(session, entidade_id), hoje
+                ),
+                "atualizado_em": datetime.utcnow().isoformat(),
+            }
+            cache.set(chave, analise, settings.ANALISE_CACHE_TTL)
+
+        contratos = []
+        for contrato in analise["contratos"]:
+            motivos = []
+            if (contrato["desvio_pontos"] or 0) > limite_pontos:
+                motivos.append("DESVIO_PLANEJADO")
+            if contrato["etapas_vencidas"]:
+                motivos.append("ETAPA_VENCIDA")
+            if motivos or not apenas_sinalizados:
+                contratos.append({**contrato, "sinalizado": bool(motivos), "motivos": motivos})
+
+        return {
+            "entidade_id": entidade_id,
+            "data_referencia": hoje.isoformat(),
+            "limite_pontos": limite_pontos,
+            "total_contratos": len(analise["contratos"]),
+            "contratos_sinalizados": sum(1 for c in contratos if c["sinalizado"]),
+            "contratos": contratos,
+            "atualizado_em": analise["atualizado_em"],
+            "em_cache": em_cache,
+        }
+
+    @staticmethod
+    def invalidar(entidade_id: Optional[int], hoje: Optional[date] = None):
+        """Descarta a análise em cache da entidade (e a consolidada do ROOT)"""
+        hoje = hoje or date.today()
+        cache.delete(
+            AnaliseCronogramaService.chave(entidade_id, hoje),
+            AnaliseCronogramaService.chave(None, hoje)
+        )
@@ -0,0 +1,71 @@
+import logging
+import time
+from typing import Dict
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+logger = logging.getLogger(__name__)
+
+# Tabelas filhas de contrato que carregam entidade_id desnormalizado
+TABELAS_FILHAS_CONTRATO = (
+    "matriz_riscos",
+    "cronograma_fisico_fin",
+    "penalidade",
+    "ocorrencia_fiscalizacao",
+    "fiscal_designado",
+)
+
+class BackfillService:
+    """
+    Preenchimento em lote de colunas desnormalizadas, sem bloquear a tabela inteira
+    """
+
+    @staticmethod
+    def preencher_entidade_id(
+        connection: Connection,
+        tabela: str,
+        tamanho_lote: int = 5000,
+        pausa: float = 0.0
+    ) -> int:
+        """
+        Copia contrato.entidade_id para tabela.entidade_id, percorrendo a chave
+        primária em faixas de `tamanho_lote` ids. Cada faixa é um UPDATE curto,
+        confirmado isoladamente quando a conexão está em autocommit.
+        Retorna a quantidade de linhas preenchidas.
+        """
+        if tabela not in TABELAS_FILHAS_CONTRATO:
+            raise ValueError(f"Tabela não suportada para backfill: {tabela}")
+
+        limites = connection.execute(
+            text(f"SELECT MIN(id), MAX(id) FROM {tabela} WHERE entidade_id IS NULL")
+        ).first()
+        if not limites or limites[0] is None:
+            return 0
+
+        inicio, fim = limites
+        total = 0
+        atualizar = text(
+            f"UPDATE {tabela} SET entidade_id = "
+            f"(SELECT contrato.entidade_id FROM contrato WHERE contrato.id = {tabela}.contrato_id) "
+            f"WHERE id >= :inicio AND id < :fim AND entidade_id IS NULL"
+        )
+
+        while inicio <= fim:
+            result = connection.execute(atualizar, {"inicio": inicio, "fim": inicio + tamanho_lote})
+            total += result.rowcount or 0
+            inicio += tamanho_lote
+            if pausa:
+                time.sleep(pausa)
+
+        logger.info(f"Backfill de entidade_id em {tabela}: {total} linhas")
+        return total
+
+    @staticmethod
+    def preencher_entidade_id_filhas(connection: Connection, tamanho_lote: int = 5000) -> Dict[str, int]:
+        """
+        Executa o backfill de entidade_id em todas as tabelas filhas de contrato
+        """
+        return {
+            tabela: BackfillService.preencher_entidade_id(connection, tabela, tamanho_lote)
+            for tabela in TABELAS_FILHAS_CONTRATO
+        }
@@ -0,0 +1,91 @@
+import re
+from typing import Any, Dict, List, Optional
+from sqlalchemy import func, literal_column, table
+from sqlmodel import Session, select
+from app.core.busca_textual import TABELAS_BUSCA, TEXTO_BUSCA, tabela_fts
+from app.models.contrato import Contrato
+from app.models.fornecedor import Fornecedor
+
+# Palavras consideradas por consulta (as demais são ignoradas)
+MAX_TERMOS = 8
+
+# Peso de cada classe de coluna no bm25 do SQLite (equivalente ao setweight do PostgreSQL)
+PESOS_BM25 = {"A": 10.0, "B": 1.0}
+
+
+def termos_busca(texto: str) -> List[str]:
+    """Palavras da consulta, sem pontuação (nada do texto chega cru à sintaxe de busca)"""
+    return re.findall(r"[^\W_]+", texto.lower())[:MAX_TERMOS]
+
+
+class BuscaService:
+    """
+    Busca textual ranqueada em contratos (número e objeto) e fornecedores
+    (razão social e nome fantasia).
+
+    Todas as palavras devem aparecer (E), cada uma casando por prefixo
+    ("manut" encontra "manutenção"), sem diferenciar acentos. No PostgreSQL
+    usa os vetores tsvector e o índice GIN (entidade_id, busca_vetor) de
+    app.core.busca_textual, com ranking ts_rank_cd; no SQLite, as tabelas
+    FTS5 com ranking bm25.
+    """
+
+    @staticmethod
+    def _buscar(session: Session, modelo, colunas: List, termos: List[str], entidade_id: Optional[int], limite: int):
+        tabela = modelo.__tablename__
+        if session.get_bind().dialect.name == "postgresql":
+            vetor = literal_column(f"{tabela}.busca_vetor")
+            consulta = func.to_tsquery(
+                literal_column(f"'{TEXTO_BUSCA}'::regconfig"), " & ".join(f"{termo}:*" for termo in termos)
+            )
+            relevancia = func.ts_rank_cd(vetor, consulta)
+            statement = select(*colunas, relevancia.label("relevancia")).where(vetor.op("@@")(consulta))
+        else:
+            fts = tabela_fts(tabela)
+            # bm25 é menor quanto mais relevante
+            pesos = [PESOS_BM25[peso] for peso in TABELAS_BUSCA[tabela].values()]
+            relevancia = -func.bm25(literal_column(fts), *pesos)
+            statement = (
+                select(*colunas, relevancia.label("relevancia"))
+                .select_from(modelo)
+                .join(table(fts), literal_column(f"{fts}.rowid") == modelo.id)
+                .where(literal_column(fts).op("MATCH")(" ".join(f'"{termo}"*' for termo in termos)))
+            )
+
+        if entidade_id is not None:
+            statement = statement.where(modelo.entidade_id == entidade_id)
+        statement = statement.order_by(literal_column("relevancia").desc(), modelo.id).limit(limite)
+        return [
+            {**linha._asdict(), "relevancia": round(float(linha.relevancia), 6)}
+            for linha in session.exec(statement).all()
+        ]
+
+    @staticmethod
+    def buscar(
+        session: Session,
+        texto: str,
+        entidade_id: Optional[int],
+        tipos: List[str],
+        limite: int = 20
+    ) -> Dict[str, Any]:
+        """Resultados por tipo ("contratos", "fornecedores"), do mais para o menos relevante"""
+        termos = termos_busca(texto)
+        resultado: Dict[str, Any] = {"termo": texto, "termos": termos}
+
+        if "contratos" in tipos:
+            resultado["contratos"] = BuscaService._buscar(
+                session, Contrato,
+                [Contrato.id, Contrato.entidade_id, Contrato.numero_contrato, Contrato.objeto,
+                 Contrato.fornecedor_id, Contrato.status],
+                termos, entidade_id, limite
+            ) if termos else []
+
+        if "fornecedores" in tipos:
+            resultado["fornecedores"] = BuscaService._buscar(
+                session, Fornecedor,
+                [Fornecedor.id, Fornecedor.entidade_id, Fornecedor.cnpj, Fornecedor.razao_social,
+                 Fornecedor.nome_fantasia],
+                termos, entidade_id, limite
+            ) if termos else []
+
+        return resultado
@@ -0,0 +1,335 @@
+import logging
+from datetime import datetime, date
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from sqlalchemy import tuple_
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlmodel import Session, select
+from app.core.guards import TenantGuard
+from app.models.certidao_fornecedor import CertidaoFornecedor, CertidaoFornecedorCreate
+from app.models.contrato import Contrato, ContratoCreate
+from app.models.fornecedor import Fornecedor, FornecedorCreate
+from app.models.tipo_certidao import TipoCertidao
+from app.models.usuario import Usuario
+from app.services.fornecedor_score_service import FornecedorScoreService
+
+logger = logging.getLogger(__name__)
+
+# Máximo de itens aceitos por requisição de carga
+LIMITE_LOTE = 10000
+
+# Linhas por INSERT ... ON CONFLICT (mantém o comando abaixo do limite de parâmetros do SQLite)
+TAMANHO_BLOCO = 500
+
+# Colunas regravadas quando o registro já existe
+ATUALIZAVEIS_FORNECEDOR = ["cpf", "razao_social", "nome_fantasia"]
+ATUALIZAVEIS_CONTRATO = [
+    "numero_processo", "objeto", "valor_global", "data_assinatura", "data_inicio",
+    "data_termino", "vigencia_meses", "modalidade", "tipo_contrato", "gestor_id"
+]
+ATUALIZAVEIS_CERTIDAO = ["data_emissao", "data_validade", "situacao", "origem", "arquivo_pdf"]
+
+
+class _Resultado:
+    """Acumula o resultado por item (na ordem do lote) e os totais"""
+
+    def __init__(self, total: int):
+        self.itens: List[Optional[Dict[str, Any]]] = [None] * total
+
+    def erro(self, indice: int, mensagem: str):
+        self.itens[indice] = {"indice": indice, "status": "ERRO", "id": None, "erro": mensagem}
+
+    def gravado(self, indice: int, registro_id: Optional[int], existente: bool):
+        self.itens[indice] = {
+            "indice": indice,
+            "status": "ATUALIZADO" if existente else "CRIADO",
+            "id": registro_id,
+            "erro": None
+        }
+
+    def resumo(self) -> Dict[str, Any]:
+        contagem = {"CRIADO": 0, "ATUALIZADO": 0, "ERRO": 0}
+        for item in self.itens:
+            contagem[item["status"]] += 1
+        return {
+            "total": len(self.itens),
+            "criados": contagem["CRIADO"],
+            "atualizados": contagem["ATUALIZADO"],
+            "erros": contagem["ERRO"],
+            "itens": self.itens,
+        }
+
+
+class CargaLoteService:
+    """
+    Carga em lote de fornecedores, contratos e certidões.
+
+    Cada lote é validado com uma consulta por verificação (registros já
+    existentes, fornecedores e tipos referenciados) em vez de um SELECT por
+    item, e gravado com INSERT ... ON CONFLICT em blocos de TAMANHO_BLOCO
+    linhas sobre o índice único natural de cada tabela. O resultado informa,
+    por item, se foi criado, atualizado ou recusado (com o motivo).
+    """
+
+    @staticmethod
+    def _insert(session: Session, modelo):
+        """INSERT com suporte a ON CONFLICT do dialeto em uso (PostgreSQL ou SQLite)"""
+        if session.get_bind().dialect.name == "postgresql":
+            return postgresql.insert(modelo)
+        return sqlite.insert(modelo)
+
+    @staticmethod
+    def gravar(
+        session: Session,
+        modelo,
+        linhas: List[Dict[str, Any]],
+        chave: Sequence[str],
+        atualizaveis: Optional[Sequence[str]],
+        indice_where=None
+    ) -> int:
+        """
+        Grava as linhas em blocos. Com `atualizaveis`, o conflito na chave
+        regrava essas colunas (e updated_at); sem, o conflito é ignorado.
+        Retorna quantas linhas o banco incluiu ou atualizou (rowcount).
+        """
+        gravadas = 0
+        for inicio in range(0, len(linhas), TAMANHO_BLOCO):
+            statement = CargaLoteService._insert(session, modelo).values(linhas[inicio:inicio + TAMANHO_BLOCO])
+            if atualizaveis:
+                colunas = {coluna: statement.excluded[coluna] for coluna in atualizaveis}
+                colunas["updated_at"] = statement.excluded.updated_at
+                statement = statement.on_conflict_do_update(
+                    index_elements=list(chave), index_where=indice_where, set_=colunas
+                )
+            else:
+                statement = statement.on_conflict_do_nothing(index_elements=list(chave), index_where=indice_where)
+            gravadas += session.exec(statement).rowcount
+        return gravadas
+
+    @staticmethod
+    def _ids_por_chave(session: Session, modelo, chave: Sequence[str], valores: List[Tuple]) -> Dict[Tuple, int]:
+        """Mapa chave natural -> id, em uma consulta por bloco"""
+        colunas = [getattr(modelo, coluna) for coluna in chave]
+        ids: Dict[Tuple, int] = {}
+        for inicio in range(0, len(valores), TAMANHO_BLOCO):
+            bloco = valores[inicio:inicio + TAMANHO_BLOCO]
+            for linha in session.exec(select(modelo.id, *colunas).where(tuple_(*colunas).in_(bloco))).all():
+                ids[tuple(linha[1:])] = linha[0]
+        return ids
+
+    @staticmethod
+    def fornecedores(
+        session: Session,
+        itens: List[FornecedorCreate],
+        current_user: Usuario,
+        atualizar_existentes: bool = True
+    ) -> Dict[str, Any]:
+        """
+        Cria ou atualiza fornecedores pela chave (entidade_id, cnpj).
+        Fornecedores sem CNPJ são sempre incluídos. Recalcula o score de
+        risco dos fornecedores gravados na mesma transação.
+        """
+        resultado = _Resultado(len(itens))
+        agora = datetime.utcnow()
+        chave = ("entidade_id", "cnpj")
+
+        linhas: Dict[int, Dict[str, Any]] = {}
+        vistos = set()
+        for indice, item in enumerate(itens):
+            dados = TenantGuard.validate_tenant_on_create(item.model_dump(), current_user)
+            if dados["cnpj"]:
+                if (dados["entidade_id"], dados["cnpj"]) in vistos:
+                    resultado.erro(indice, "CNPJ repetido no lote")
+                    continue
+                vistos.add((dados["entidade_id"], dados["cnpj"]))
+            linhas[indice] = {**dados, "created_at": agora, "updated_at": agora}
+
+        existentes = CargaLoteService._ids_por_chave(session, Fornecedor, chave, sorted(vistos))
+        if not atualizar_existentes:
+            for indice, linha in list(linhas.items()):
+                if (linha["entidade_id"], linha["cnpj"]) in existentes:
+                    resultado.erro(indice, "Fornecedor com este CNPJ já cadastrado nesta entidade")
+                    del linhas[indice]
+
+        com_cnpj = [linha for linha in linhas.values() if linha["cnpj"]]
+        sem_cnpj = [(indice, linha) for indice, linha in linhas.items() if not linha["cnpj"]]
+        CargaLoteService.gravar(
+            session, Fornecedor, com_cnpj, chave,
+            ATUALIZAVEIS_FORNECEDOR if atualizar_existentes else None
+        )
+        ids = CargaLoteService._ids_por_chave(
+            session, Fornecedor, chave, [(linha["entidade_id"], linha["cnpj"]) for linha in com_cnpj]
+        )
+        for indice, linha in linhas.items():
+            if linha["cnpj"]:
+                resultado.gravado(indice, ids.get((linha["entidade_id"], linha["cnpj"])), (linha["entidade_id"], linha["cnpj"]) in existentes)
+
+        # Sem chave natural, os fornecedores sem CNPJ são incluídos pelo ORM para obter os ids
+        novos = [(indice, Fornecedor(**linha)) for indice, linha in sem_cnpj]
+        session.add_all([fornecedor for _, fornecedor in novos])
+        session.flush()
+        for indice, fornecedor in novos:
+            resultado.gravado(indice, fornecedor.id, False)
+
+        gravados = [item["id"] for item in resultado.itens if item["status"] != "ERRO"]
+        for inicio in range(0, len(gravados), TAMANHO_BLOCO):
+            FornecedorScoreService.recalcular(session, fornecedor_ids=gravados[inicio:inicio + TAMANHO_BLOCO])
+        return resultado.resumo()
+
+    @staticmethod
+    def contratos(
+        session: Session,
+        itens: List[ContratoCreate],
+        current_user: Usuario,
+        atualizar_existentes: bool = True
+    ) -> Dict[str, Any]:
+        """
+        Cria ou atualiza contratos pela chave (entidade_id, numero_contrato).
+        O fornecedor deve existir na mesma entidade do contrato. Fornecedor e
+        valor executado de contratos existentes não são alterados pela carga
+        (o executado só muda pelo livro de execução financeira). Recalcula, na
+        mesma transação, o score dos fornecedores anteriores e informados dos
+        contratos gravados.
+        """
+        resultado = _Resultado(len(itens))
+        agora = datetime.utcnow()
+        chave = ("entidade_id", "numero_contrato")
+
+        dados_itens = [TenantGuard.validate_tenant_on_create(item.model_dump(), current_user) for item in itens]
+        fornecedor_ids = sorted({dados["fornecedor_id"] for dados in dados_itens})
+        entidade_fornecedor = {}
+        for inicio in range(0, len(fornecedor_ids), TAMANHO_BLOCO):
+            entidade_fornecedor.update(session.exec(
+                select(Fornecedor.id, Fornecedor.entidade_id)
+                .where(Fornecedor.id.in_(fornecedor_ids[inicio:inicio + TAMANHO_BLOCO]))
+            ).all())
+        existentes = CargaLoteService._ids_por_chave(
+            session, Contrato, chave,
+            sorted({(dados["entidade_id"], dados["numero_contrato"]) for dados in dados_itens})
+        )
+
+        linhas: Dict[int, Dict[str, Any]] = {}
+        vistos = set()
+        for indice, dados in enumerate(dados_itens):
+            numero = (dados["entidade_id"], dados["numero_contrato"])
+            if numero in vistos:
+                resultado.erro(indice, "Número de contrato repetido no lote")
+            elif entidade_fornecedor.get(dados["fornecedor_id"]) != dados["entidade_id"]:
+                resultado.erro(indice, "Fornecedor não encontrado nesta entidade")
+            elif numero in existentes and not atualizar_existentes:
+                resultado.erro(indice, "Contrato com este número já existe nesta entidade")
+            else:
+                linhas[indice] = {**dados, "created_at": agora, "updated_at": agora}
+            vistos.add(numero)
+
+        afetados = {linha["fornecedor_id"] for linha in linhas.values()}
+        regravados = sorted(
+            existentes[(linha["entidade_id"], linha["numero_contrato"])] for linha in linhas.values()
+            if (linha["entidade_id"], linha["numero_contrato"]) in existentes
+        )
+        for inicio in range(0, len(regravados), TAMANHO_BLOCO):
+            afetados.update(session.exec(
+                select(Contrato.fornecedor_id).where(Contrato.id.in_(regravados[inicio:inicio + TAMANHO_BLOCO]))
+            ).all())
+
+        CargaLoteService.gravar(
+            session, Contrato, list(linhas.values()), chave,
+            ATUALIZAVEIS_CONTRATO if atualizar_existentes else None
+        )
+        ids = CargaLoteService._ids_por_chave(
+            session, Contrato, chave, [(linha["entidade_id"], linha["numero_contrato"]) for linha in linhas.values()]
+        )
+        for indice, linha in linhas.items():
+            numero = (linha["entidade_id"], linha["numero_contrato"])
+            resultado.gravado(indice, ids.get(numero), numero in existentes)
+
+        afetados = sorted(afetados)
+        for inicio in range(0, len(afetados), TAMANHO_BLOCO):
+            FornecedorScoreService.recalcular(session, fornecedor_ids=afetados[inicio:inicio + TAMANHO_BLOCO])
+
+        return {**resultado.resumo(), "entidades": sorted({linha["entidade_id"] for linha in linhas.values()})}
+
+    @staticmethod
+    def certidoes(
+        session: Session,
+        itens: List[CertidaoFornecedorCreate],
+        current_user: Usuario,
+        atualizar_existentes: bool = True,
+        hoje: Optional[date] = None
+    ) -> Dict[str, Any]:
+        """
+        Cria ou atualiza certidões pela chave (fornecedor_id, tipo_certidao_id,
+        numero_protocolo). Certidões sem protocolo são sempre incluídas. A
+        situação é VENCIDA quando a validade já passou, como no cadastro unitário.
+        """
+        hoje = hoje or date.today()
+        resultado = _Resultado(len(itens))
+        agora = datetime.utcnow()
+        chave = ("fornecedor_id", "tipo_certidao_id", "numero_protocolo")
+        com_protocolo = CertidaoFornecedor.numero_protocolo.is_not(None)
+
+        fornecedor_ids = sorted({item.fornecedor_id for item in itens})
+        entidade_fornecedor = {}
+        for inicio in range(0, len(fornecedor_ids), TAMANHO_BLOCO):
+            entidade_fornecedor.update(session.exec(
+                select(Fornecedor.id, Fornecedor.entidade_id)
+                .where(Fornecedor.id.in_(fornecedor_ids[inicio:inicio + TAMANHO_BLOCO]))
+            ).all())
+        tipos = set(session.exec(
+            select(TipoCertidao.id).where(TipoCertidao.id.in_({item.tipo_certidao_id for item in itens}))
+        ).all())
+        existentes = CargaLoteService._ids_por_chave(
+            session, CertidaoFornecedor, chave,
+            sorted({
+                (item.fornecedor_id, item.tipo_certidao_id, item.numero_protocolo)
+                for item in itens if item.numero_protocolo
+            })
+        )
+
+        linhas: Dict[int, Dict[str, Any]] = {}
+        vistos = set()
+        for indice, item in enumerate(itens):
+            documento = (item.fornecedor_id, item.tipo_certidao_id, item.numero_protocolo)
+            entidade_id = entidade_fornecedor.get(item.fornecedor_id)
+            if entidade_id is None:
+                resultado.erro(indice, "Fornecedor não encontrado")
+            elif current_user.perfil != "ROOT" and entidade_id != current_user.entidade_id:
+                resultado.erro(indice, "Sem permissão para criar certidão para este fornecedor")
+            elif item.tipo_certidao_id not in tipos:
+                resultado.erro(indice, "Tipo de certidão não encontrado")
+            elif item.numero_protocolo and documento in vistos:
+                resultado.erro(indice, "Protocolo repetido no lote")
+            elif item.numero_protocolo and documento in existentes and not atualizar_existentes:
+                resultado.erro(indice, "Certidão com este protocolo já cadastrada")
+            else:
+                dados = item.model_dump()
+                if dados["data_validade"] < hoje:
+                    dados["situacao"] = "VENCIDA"
+                linhas[indice] = {**dados, "created_at": agora, "updated_at": agora}
+            if item.numero_protocolo:
+                vistos.add(documento)
+
+        CargaLoteService.gravar(
+            session, CertidaoFornecedor,
+            [linha for linha in linhas.values() if linha["numero_protocolo"]], chave,
+            ATUALIZAVEIS_CERTIDAO if atualizar_existentes else None,
+            indice_where=com_protocolo
+        )
+        ids = CargaLoteService._ids_por_chave(
+            session, CertidaoFornecedor, chave,
+            [tuple(linha[coluna] for coluna in chave) for linha in linhas.values() if linha["numero_protocolo"]]
+        )
+        novos = []
+        for indice, linha in linhas.items():
+            if linha["numero_protocolo"]:
+                documento = tuple(linha[coluna] for coluna in chave)
+                resultado.gravado(indice, ids.get(documento), documento in existentes)
+            else:
+                novos.append((indice, CertidaoFornecedor(**linha)))
+
+        # Sem chave natural, as certidões sem protocolo são incluídas pelo ORM para obter os ids
+        session.add_all([certidao for _, certidao in novos])
+        session.flush()
+        for indice, certidao in novos:
+            resultado.gravado(indice, certidao.id, False)
+
+        return resultado.resumo()
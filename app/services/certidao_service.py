@@ -0,0 +1,196 @@
+import logging
+from typing import Dict, List, Any, Optional
+from datetime import datetime, date
+from sqlalchemy import update, select, func, case, insert, exists
+from sqlmodel import Session
+from app.models.certidao_fornecedor import CertidaoFornecedor
+from app.models.fornecedor import Fornecedor
+from app.models.auditoria_global import AuditoriaGlobal
+from app.services.fornecedor_score_service import FornecedorScoreService
+
+logger = logging.getLogger(__name__)
+
+class CertidaoService:
+    """
+    Serviço de manutenção em lote das certidões de fornecedores
+    """
+
+    @staticmethod
+    def marcar_vencidas(session: Session, hoje: Optional[date] = None) -> int:
+        """
+        Marca como VENCIDA, em um único UPDATE, toda certidão com validade expirada.
+        Retorna a quantidade de certidões alteradas.
+        """
+        hoje = hoje or date.today()
+
+        statement = (
+            update(CertidaoFornecedor)
+            .where(
+                CertidaoFornecedor.data_validade < hoje,
+                CertidaoFornecedor.situacao != "VENCIDA"
+            )
+            .values(situacao="VENCIDA", updated_at=datetime.utcnow())
+        )
+        result = session.exec(statement)
+        return result.rowcount or 0
+
+    @staticmethod
+    def recalcular_regularidade(
+        session: Session,
+        hoje: Optional[date] = None,
+        fornecedor_ids: Optional[List[int]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Recalcula total de certidões vencidas e regularidade dos fornecedores
+        com certidões cadastradas, em um único UPDATE agregado. Apenas
+        fornecedores cuja situação mudou são atualizados e retornados (feed de
+        alterações).
+
+        Sem `fornecedor_ids` (varredura noturna), fornecedor sem certidão
+        local não é tocado: sua regularidade pode vir da consulta ao PNCP.
+        Com `fornecedor_ids`, só esses são recalculados e os que ficaram sem
+        nenhuma certidão voltam a zero/REGULAR; passar apenas fornecedores
+        cujas certidões acabaram de mudar (exclusão ou mesclagem).
+        """
+        hoje = hoje or date.today()
+        if fornecedor_ids is not None and not fornecedor_ids:
+            return []
+
+        # Contagem por fornecedor: percorre idx_certidao_fornecedor_validade (fornecedor_id, data_validade)
+        vencidas = func.sum(case((CertidaoFornecedor.data_validade < hoje, 1), else_=0))
+        contagem = (
+            select(
+                CertidaoFornecedor.fornecedor_id.label("fornecedor_id"),
+                vencidas.label("vencidas"),
+                case((vencidas > 0, "IRREGULAR"), else_="REGULAR").label("regularidade")
+            )
+            .group_by(CertidaoFornecedor.fornecedor_id)
+        )
+        if fornecedor_ids is not None:
+            contagem = contagem.where(CertidaoFornecedor.fornecedor_id.in_(fornecedor_ids))
+        contagem = contagem.subquery()
+
+        diferente = (
+            (Fornecedor.total_certidoes_vencidas != contagem.c.vencidas)
+            | (Fornecedor.regularidade_geral != contagem.c.regularidade)
+        )
+
+        # Feed de alterações: fornecedores cuja situação vai mudar, com o antes/depois
+        # (na recontagem dirigida, LEFT JOIN: sem certidões, o novo valor é zero/REGULAR)
+        nova_vencidas = func.coalesce(contagem.c.vencidas, 0)
+        nova_regularidade = func.coalesce(contagem.c.regularidade, "REGULAR")
+        feed = select(
+            Fornecedor.id,
+            Fornecedor.entidade_id,
+            Fornecedor.total_certidoes_vencidas,
+            Fornecedor.regularidade_geral,
+            nova_vencidas,
+            nova_regularidade
+        )
+        if fornecedor_ids is None:
+            feed = feed.join(contagem, Fornecedor.id == contagem.c.fornecedor_id)
+        else:
+            feed = (
+                feed.select_from(Fornecedor)
+                .outerjoin(contagem, Fornecedor.id == contagem.c.fornecedor_id)
+                .where(Fornecedor.id.in_(fornecedor_ids))
+            )
+        feed = feed.where(
+            (Fornecedor.total_certidoes_vencidas != nova_vencidas)
+            | (Fornecedor.regularidade_geral != nova_regularidade)
+        )
+
+        alteracoes = []
+        for row in session.exec(feed).all():
+            alteracoes.append({
+                "fornecedor_id": row[0],
+                "entidade_id": row[1],
+                "antes": {"total_certidoes_vencidas": row[2], "regularidade_geral": row[3]},
+                "depois": {"total_certidoes_vencidas": int(row[4]), "regularidade_geral": row[5]},
+            })
+
+        if not alteracoes:
+            return alteracoes
+
+        statement = (
+            update(Fornecedor)
+            .where(Fornecedor.id == contagem.c.fornecedor_id, diferente)
+            .values(
+                total_certidoes_vencidas=contagem.c.vencidas,
+                regularidade_geral=contagem.c.regularidade,
+                data_ultima_verificacao=datetime.utcnow(),
+                updated_at=datetime.utcnow()
+            )
+        )
+        session.exec(statement)
+
+        if fornecedor_ids is not None:
+            # Fornecedores indicados que ficaram sem nenhuma certidão
+            statement = (
+                update(Fornecedor)
+                .where(
+                    Fornecedor.id.in_(fornecedor_ids),
+                    ~exists().where(CertidaoFornecedor.fornecedor_id == Fornecedor.id),
+                    (Fornecedor.total_certidoes_vencidas != 0) | (Fornecedor.regularidade_geral != "REGULAR")
+                )
+                .values(
+                    total_certidoes_vencidas=0,
+                    regularidade_geral="REGULAR",
+                    data_ultima_verificacao=datetime.utcnow(),
+                    updated_at=datetime.utcnow()
+                )
+            )
+            session.exec(statement)
+
+        return alteracoes
+
+    @staticmethod
+    def registrar_alteracoes(session: Session, alteracoes: List[Dict[str, Any]], usuario_id: Optional[int] = None):
+        """
+        Registra o feed de alterações de regularidade na auditoria global
+        """
+        if not alteracoes:
+            return
+
+        session.exec(
+            insert(AuditoriaGlobal),
+            params=[
+                {
+                    "entidade_id": alteracao["entidade_id"],
+                    "usuario_id": usuario_id,
+                    "acao": "VARREDURA_CERTIDOES",
+                    "tabela_afetada": "fornecedor",
+                    "registro_id": alteracao["fornecedor_id"],
+                    "dados_antes": alteracao["antes"],
+                    "dados_depois": alteracao["depois"],
+                    "timestamp": datetime.utcnow(),
+                }
+                for alteracao in alteracoes
+            ]
+        )
+
+    @staticmethod
+    def varrer_vencimentos(session: Session, hoje: Optional[date] = None) -> Dict[str, Any]:
+        """
+        Executa a varredura completa: marca certidões vencidas, recalcula a
+        regularidade dos fornecedores, registra quem mudou de situação e
+        atualiza o score de risco desses fornecedores. Tudo em uma única transação.
+        """
+        hoje = hoje or date.today()
+
+        certidoes_vencidas = CertidaoService.marcar_vencidas(session, hoje)
+        alteracoes = CertidaoService.recalcular_regularidade(session, hoje)
+        CertidaoService.registrar_alteracoes(session, alteracoes)
+        FornecedorScoreService.recalcular(session, fornecedor_ids=[a["fornecedor_id"] for a in alteracoes])
+        session.commit()
+
+        logger.info(
+            f"Varredura de certidões: {certidoes_vencidas} vencidas, "
+            f"{len(alteracoes)} fornecedores alterados"
+        )
+
+        return {
+            "data_referencia": hoje.isoformat(),
+            "certidoes_vencidas": certidoes_vencidas,
+            "fornecedores_alterados": alteracoes,
+        }
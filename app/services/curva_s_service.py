@@ -0,0 +1,217 @@
+import logging
+from collections import defaultdict
+from datetime import datetime, date
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional
+from sqlalchemy import delete, insert
+from sqlmodel import Session, select
+from app.models.contrato import Contrato
+from app.models.cronograma_fisico_fin import CronogramaFisicoFin
+from app.models.curva_s_contrato import CurvaSContrato
+
+logger = logging.getLogger(__name__)
+
+CENTAVO = Decimal("0.01")
+
+
+def _competencia(data: date) -> date:
+    return data.replace(day=1)
+
+
+def _proximo_mes(competencia: date) -> date:
+    if competencia.month == 12:
+        return competencia.replace(year=competencia.year + 1, month=1)
+    return competencia.replace(month=competencia.month + 1)
+
+
+class CurvaSService:
+    """
+    Curva S (planejado x executado acumulado) por contrato e por carteira.
+
+    Cada etapa pesa `percentual_planejado` pontos do contrato:
+      - planejado: o peso inteiro entra no mês de `data_prevista`;
+      - executado: peso × percentual_executado / 100 entra no mês de
+        `data_realizada`, ou no mês da medição (hoje) se a etapa está em andamento.
+    As séries ficam materializadas em curva_s_contrato e são refeitas por
+    contrato a cada escrita no cronograma, na mesma transação.
+    """
+
+    @staticmethod
+    def calcular_serie(etapas: Iterable, hoje: Optional[date] = None) -> List[Dict]:
+        """
+        Monta a série mensal contígua a partir das etapas (objetos com
+        percentual_planejado, percentual_executado, data_prevista e data_realizada)
+        """
+        hoje = hoje or date.today()
+        planejado = defaultdict(Decimal)
+        executado = defaultdict(Decimal)
+
+        for etapa in etapas:
+            peso = Decimal(etapa.percentual_planejado or 0)
+            if etapa.data_prevista:
+                planejado[_competencia(etapa.data_prevista)] += peso
+            concluido = peso * Decimal(etapa.percentual_executado or 0) / 100
+            if concluido:
+                executado[_competencia(etapa.data_realizada or hoje)] += concluido
+
+        meses = set(planejado) | set(executado)
+        if not meses:
+            return []
+
+        serie = []
+        planejado_acumulado = executado_acumulado = Decimal("0")
+        competencia, fim = min(meses), max(meses)
+        while competencia <= fim:
+            planejado_acumulado += planejado[competencia]
+            executado_acumulado += executado[competencia]
+            serie.append({
+                "competencia": competencia,
+                "planejado_mes": planejado[competencia].quantize(CENTAVO),
+                "executado_mes": executado[competencia].quantize(CENTAVO),
+                "planejado_acumulado": planejado_acumulado.quantize(CENTAVO),
+                "executado_acumulado": executado_acumulado.quantize(CENTAVO),
+            })
+            competencia = _proximo_mes(competencia)
+        return serie
+
+    @staticmethod
+    def _etapas(session: Session, entidade_id: Optional[int], contrato_id: Optional[int] = None):
+        statement = select(
+            CronogramaFisicoFin.contrato_id,
+            CronogramaFisicoFin.entidade_id,
+            CronogramaFisicoFin.percentual_planejado,
+            CronogramaFisicoFin.percentual_executado,
+            CronogramaFisicoFin.data_prevista,
+            CronogramaFisicoFin.data_realizada
+        )
+        if entidade_id is not None:
+            statement = statement.where(CronogramaFisicoFin.entidade_id == entidade_id)
+        if contrato_id is not None:
+            statement = statement.where(CronogramaFisicoFin.contrato_id == contrato_id)
+        return session.exec(statement.order_by(CronogramaFisicoFin.contrato_id)).all()
+
+    @staticmethod
+    def _gravar(session: Session, entidade_id: int, contrato_id: int, serie: List[Dict], agora: datetime):
+        if serie:
+            session.exec(insert(CurvaSContrato), params=[
+                {**ponto, "entidade_id": entidade_id, "contrato_id": contrato_id, "updated_at": agora}
+                for ponto in serie
+            ])
+
+    @staticmethod
+    def atualizar_contrato(session: Session, contrato_id: int, entidade_id: int, hoje: Optional[date] = None):
+        """
+        Refaz a série de um contrato a partir das suas etapas. Não faz commit:
+        deve ser chamado na transação que alterou o cronograma.
+
+        A linha do contrato é bloqueada (FOR NO KEY UPDATE, compatível com as
+        FKs das etapas) antes de ler as etapas: duas escritas no mesmo
+        cronograma refazem a série uma depois da outra, sem colidir no índice
+        único de competência nem gravar uma série calculada sem a outra etapa.
+        """
+        session.exec(select(Contrato.id).where(Contrato.id == contrato_id).with_for_update(key_share=True))
+        etapas = CurvaSService._etapas(session, entidade_id, contrato_id)
+        session.exec(delete(CurvaSContrato).where(
+            CurvaSContrato.entidade_id == entidade_id,
+            CurvaSContrato.contrato_id == contrato_id
+        ))
+        CurvaSService._gravar(
+            session, entidade_id, contrato_id,
+            CurvaSService.calcular_serie(etapas, hoje), datetime.utcnow()
+        )
+
+    @staticmethod
+    def reconstruir(session: Session, entidade_id: Optional[int] = None, hoje: Optional[date] = None) -> int:
+        """
+        Recalcula as séries de todos os contratos (da entidade, se informada)
+        com uma leitura das etapas. Retorna a quantidade de contratos.
+        """
+        etapas_por_contrato = defaultdict(list)
+        for etapa in CurvaSService._etapas(session, entidade_id):
+            etapas_por_contrato[(etapa.entidade_id, etapa.contrato_id)].append(etapa)
+
+        statement = delete(CurvaSContrato)
+        if entidade_id is not None:
+            statement = statement.where(CurvaSContrato.entidade_id == entidade_id)
+        session.exec(statement)
+
+        agora = datetime.utcnow()
+        for (entidade, contrato_id), etapas in etapas_por_contrato.items():
+            if entidade is None:
+                continue
+            CurvaSService._gravar(session, entidade, contrato_id, CurvaSService.calcular_serie(etapas, hoje), agora)
+        session.commit()
+
+        logger.info(f"Curva S reconstruída para {len(etapas_por_contrato)} contratos")
+        return len(etapas_por_contrato)
+
+    @staticmethod
+    def series_contratos(
+        session: Session,
+        entidade_id: Optional[int],
+        contrato_ids: Optional[List[int]] = None
+    ) -> Dict[int, List[Dict]]:
+        """Lê as séries materializadas dos contratos em uma consulta indexada"""
+        statement = select(CurvaSContrato)
+        if entidade_id is not None:
+            statement = statement.where(CurvaSContrato.entidade_id == entidade_id)
+        if contrato_ids:
+            statement = statement.where(CurvaSContrato.contrato_id.in_(contrato_ids))
+        statement = statement.order_by(CurvaSContrato.contrato_id, CurvaSContrato.competencia)
+
+        series = defaultdict(list)
+        for ponto in session.exec(statement).all():
+            series[ponto.contrato_id].append({
+                "competencia": ponto.competencia,
+                "planejado_mes": ponto.planejado_mes,
+                "executado_mes": ponto.executado_mes,
+                "planejado_acumulado": ponto.planejado_acumulado,
+                "executado_acumulado": ponto.executado_acumulado,
+            })
+        return dict(series)
+
+    @staticmethod
+    def serie_carteira(session: Session, entidade_id: Optional[int]) -> Dict:
+        """
+        Curva S da carteira: média dos acumulados dos contratos ponderada pelo
+        valor_global. Após o último mês de um contrato, vale o seu último acumulado;
+        antes do primeiro, zero. Contratos cancelados ficam de fora.
+        """
+        statement = (
+            select(
+                CurvaSContrato.contrato_id,
+                CurvaSContrato.competencia,
+                CurvaSContrato.planejado_acumulado,
+                CurvaSContrato.executado_acumulado,
+                Contrato.valor_global
+            )
+            .join(Contrato, Contrato.id == CurvaSContrato.contrato_id)
+            .where(Contrato.status != "CANCELADO")
+            .order_by(CurvaSContrato.competencia)
+        )
+        if entidade_id is not None:
+            statement = statement.where(CurvaSContrato.entidade_id == entidade_id)
+        linhas = session.exec(statement).all()
+
+        pesos = {linha.contrato_id: Decimal(linha.valor_global or 0) for linha in linhas}
+        peso_total = sum(pesos.values())
+        atual = {}
+        serie = []
+        for indice, linha in enumerate(linhas):
+            atual[linha.contrato_id] = (linha.planejado_acumulado, linha.executado_acumulado)
+            ultima_do_mes = indice + 1 == len(linhas) or linhas[indice + 1].competencia != linha.competencia
+            if not ultima_do_mes:
+                continue
+            if peso_total:
+                planejado = sum(p * pesos[c] for c, (p, _) in atual.items()) / peso_total
+                executado = sum(e * pesos[c] for c, (_, e) in atual.items()) / peso_total
+            else:
+                planejado = sum(p for p, _ in atual.values()) / len(pesos)
+                executado = sum(e for _, e in atual.values()) / len(pesos)
+            serie.append({
+                "competencia": linha.competencia,
+                "planejado_acumulado": Decimal(planejado).quantize(CENTAVO),
+                "executado_acumulado": Decimal(executado).quantize(CENTAVO),
+            })
+
+        return {"entidade_id": entidade_id, "contratos": len(pesos), "serie": serie}
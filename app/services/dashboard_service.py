@@ -0,0 +1,138 @@
+import logging
+from datetime import datetime, date
+from typing import Any, Dict, Optional
+from sqlalchemy import and_, case, func, select
+from sqlmodel import Session
+from app.core.cache import cache
+from app.core.config import settings
+from app.models.contrato import Contrato
+from app.models.cronograma_fisico_fin import CronogramaFisicoFin
+
+logger = logging.getLogger(__name__)
+
+
+def _numero(valor) -> float:
+    return round(float(valor), 2) if valor is not None else 0.0
+
+
+class DashboardService:
+    """
+    Agregados dos painéis, calculados no banco e mantidos em cache por entidade
+    """
+
+    @staticmethod
+    def chave_gestor(entidade_id: Optional[int]) -> str:
+        return f"dashboard:gestor:{entidade_id if entidade_id is not None else 'todas'}"
+
+    @staticmethod
+    def calcular_resumo_gestor(session: Session, entidade_id: Optional[int], hoje: Optional[date] = None) -> Dict[str, Any]:
+        """
+        Calcula os indicadores do painel do gestor em uma única consulta.
+
+        A subconsulta percorre contrato LEFT JOIN cronograma_fisico_fin e usa
+        funções de janela particionadas por contrato para obter, em cada linha,
+        a média física executada/planejada, a quantidade de etapas e se há
+        etapa atrasada; row_number() elege uma linha por contrato, sobre a qual
+        a consulta externa agrega a carteira. Contratos cancelados ficam de fora.
+        """
+        hoje = hoje or date.today()
+        contrato = Contrato.__table__
+        cronograma = CronogramaFisicoFin.__table__
+
+        por_contrato = {"partition_by": contrato.c.id}
+        etapa_atrasada = case(
+            (
+                and_(
+                    cronograma.c.data_prevista < hoje,
+                    cronograma.c.data_realizada.is_(None),
+                    func.coalesce(cronograma.c.percentual_executado, 0) < 100
+                ),
+                1
+            ),
+            else_=0
+        )
+
+        linhas = (
+            select(
+                contrato.c.status,
+                contrato.c.valor_global,
+                contrato.c.valor_executado,
+                func.avg(cronograma.c.percentual_executado).over(**por_contrato).label("fisico_executado"),
+                func.avg(cronograma.c.percentual_planejado).over(**por_contrato).label("fisico_planejado"),
+                func.count(cronograma.c.id).over(**por_contrato).label("etapas"),
+                func.max(etapa_atrasada).over(**por_contrato).label("atrasado"),
+                func.row_number().over(**por_contrato).label("ordem"),
+            )
+            .select_from(
+                contrato.outerjoin(
+                    cronograma,
+                    and_(
+                        cronograma.c.entidade_id == contrato.c.entidade_id,
+                        cronograma.c.contrato_id == contrato.c.id
+                    )
+                )
+            )
+            .where(contrato.c.status != "CANCELADO")
+        )
+        if entidade_id is not None:
+            linhas = linhas.where(contrato.c.entidade_id == entidade_id)
+        linhas = linhas.subquery()
+
+        execucao_financeira = case(
+            (linhas.c.valor_global > 0, linhas.c.valor_executado * 100 / linhas.c.valor_global)
+        )
+        statement = select(
+            func.count().label("total_contratos"),
+            func.sum(case((linhas.c.status == "VIGENTE", 1), else_=0)).label("contratos_vigentes"),
+            func.sum(case((linhas.c.etapas > 0, 1), else_=0)).label("contratos_com_cronograma"),
+            func.sum(linhas.c.atrasado).label("contratos_atrasados"),
+            func.sum(linhas.c.etapas).label("total_etapas"),
+            func.avg(linhas.c.fisico_executado).label("media_execucao_fisica"),
+            func.avg(linhas.c.fisico_planejado).label("media_planejado_fisico"),
+            func.avg(execucao_financeira).label("media_execucao_financeira"),
+            func.sum(linhas.c.valor_global).label("valor_global_total"),
+            func.sum(linhas.c.valor_executado).label("valor_executado_total"),
+        ).where(linhas.c.ordem == 1)
+
+        resultado = session.exec(statement).one()
+
+        total = resultado.total_contratos or 0
+        atrasados = int(resultado.contratos_atrasados or 0)
+        return {
+            "entidade_id": entidade_id,
+            "data_referencia": hoje.isoformat(),
+            "total_contratos": total,
+            "contratos_vigentes": int(resultado.contratos_vigentes or 0),
+            "contratos_com_cronograma": int(resultado.contratos_com_cronograma or 0),
+            "contratos_atrasados": atrasados,
+            "contratos_no_prazo": total - atrasados,
+            "total_etapas": int(resultado.total_etapas or 0),
+            "media_execucao_fisica": _numero(resultado.media_execucao_fisica),
+            "media_planejado_fisico": _numero(resultado.media_planejado_fisico),
+            "media_execucao_financeira": _numero(resultado.media_execucao_financeira),
+            "valor_global_total": _numero(resultado.valor_global_total),
+            "valor_executado_total": _numero(resultado.valor_executado_total),
+            "atualizado_em": datetime.utcnow().isoformat(),
+        }
+
+    @staticmethod
+    def resumo_gestor(session: Session, entidade_id: Optional[int], forcar: bool = False) -> Dict[str, Any]:
+        """
+        Retorna o resumo do gestor do cache da entidade ou recalcula e grava.
+        `atualizado_em` indica quando os números foram calculados e `em_cache`
+        se a resposta veio do cache.
+        """
+        chave = DashboardService.chave_gestor(entidade_id)
+        if not forcar:
+            resumo = cache.get(chave)
+            if resumo is not None:
+                return {**resumo, "em_cache": True}
+
+        resumo = DashboardService.calcular_resumo_gestor(session, entidade_id)
+        cache.set(chave, resumo, settings.DASHBOARD_CACHE_TTL)
+        return {**resumo, "em_cache": False}
+
+    @staticmethod
+    def invalidar(entidade_id: Optional[int]):
+        """Descarta os agregados em cache da entidade (e a visão consolidada do ROOT)"""
+        cache.delete(DashboardService.chave_gestor(entidade_id), DashboardService.chave_gestor(None))
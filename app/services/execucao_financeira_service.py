@@ -0,0 +1,266 @@
+import logging
+from datetime import datetime, date, timedelta
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, Optional
+from sqlalchemy import delete, extract, func, insert, update
+from sqlmodel import Session, select
+from app.models.contrato import Contrato
+from app.models.execucao_financeira import ExecucaoFinanceira
+from app.models.execucao_financeira_mensal import ExecucaoFinanceiraMensal
+
+logger = logging.getLogger(__name__)
+
+# Tipos aceitos pela API; SALDO_INICIAL é gravado apenas na migração do total existente
+TIPOS_LANCAMENTO = {"MEDICAO", "PAGAMENTO", "ESTORNO", "AJUSTE"}
+
+# Meses fechados usados na média do ritmo de execução (burn rate)
+MESES_RITMO = 3
+
+DIAS_POR_MES = 30.4375
+
+# Acima deste horizonte (em meses) a previsão de esgotamento não é informada
+HORIZONTE_PREVISAO_MESES = 1200
+
+
+def _numero(valor) -> Optional[float]:
+    return round(float(valor), 2) if valor is not None else None
+
+
+def _mes_anterior(competencia: date, meses: int = 1) -> date:
+    indice = competencia.year * 12 + competencia.month - 1 - meses
+    return date(indice // 12, indice % 12 + 1, 1)
+
+
+class ExecucaoFinanceiraService:
+    """
+    Livro de execução financeira dos contratos.
+
+    Cada lançamento é incluído (nunca alterado, exceto pela marca de
+    consolidação) e soma atomicamente o seu valor
+    em contrato.valor_executado, de modo que saldo e percentual executado são
+    lidos de uma única linha. A série mensal (execucao_financeira_mensal) é
+    gerada pela rotina de consolidação; ritmo e previsão de esgotamento leem
+    apenas os últimos meses consolidados, independentemente do tamanho do livro.
+    """
+
+    @staticmethod
+    def lancar(
+        session: Session,
+        contrato: Contrato,
+        tipo: str,
+        valor: Decimal,
+        data_lancamento: Optional[date] = None,
+        documento: Optional[str] = None,
+        descricao: Optional[str] = None,
+        origem: str = "MANUAL",
+        usuario_id: Optional[int] = None
+    ) -> ExecucaoFinanceira:
+        """
+        Inclui o lançamento e atualiza o total executado do contrato com
+        UPDATE ... SET valor_executado = valor_executado + :valor (seguro sob
+        escritas concorrentes). Estorno é sempre gravado com valor negativo.
+        Não faz commit: deve rodar na transação da rota.
+        """
+        if tipo == "ESTORNO" and valor > 0:
+            valor = -valor
+
+        lancamento = ExecucaoFinanceira(
+            entidade_id=contrato.entidade_id,
+            contrato_id=contrato.id,
+            tipo=tipo,
+            data_lancamento=data_lancamento or date.today(),
+            valor=valor,
+            documento=documento,
+            descricao=descricao,
+            origem=origem,
+            usuario_id=usuario_id
+        )
+        session.add(lancamento)
+        session.exec(
+            update(Contrato)
+            .where(Contrato.id == contrato.id)
+            .values(
+                valor_executado=func.coalesce(Contrato.valor_executado, 0) + valor,
+                updated_at=datetime.utcnow()
+            )
+            .execution_options(synchronize_session=False)
+        )
+        session.expire(contrato, ["valor_executado", "updated_at"])
+        return lancamento
+
+    @staticmethod
+    def ajustar_total(
+        session: Session,
+        contrato: Contrato,
+        valor_executado: Decimal,
+        origem: str = "MANUAL",
+        usuario_id: Optional[int] = None
+    ) -> Optional[ExecucaoFinanceira]:
+        """
+        Converte a gravação direta de um novo total executado (PUT do
+        contrato) em um lançamento AJUSTE com a diferença, preservando o
+        histórico. Sem diferença, nada é lançado.
+
+        O total atual é relido com SELECT ... FOR UPDATE, e não do objeto em
+        memória: a linha do contrato fica bloqueada até o commit, então um
+        lançamento concorrente não entra entre a leitura e o AJUSTE.
+        """
+        atual = session.exec(
+            select(Contrato.valor_executado).where(Contrato.id == contrato.id).with_for_update()
+        ).one()
+        diferenca = Decimal(valor_executado) - (atual or Decimal("0"))
+        if not diferenca:
+            return None
+        return ExecucaoFinanceiraService.lancar(
+            session, contrato, "AJUSTE", diferenca,
+            descricao="Ajuste do valor executado total", origem=origem, usuario_id=usuario_id
+        )
+
+    @staticmethod
+    def consolidar_mensal(session: Session, contrato_ids: Optional[Iterable[int]] = None) -> int:
+        """
+        Regrava a série mensal dos contratos com lançamentos não consolidados
+        (ou dos contratos informados) e marca como consolidados os lançamentos
+        lidos aqui. Um lançamento que só fica visível depois da leitura (commit
+        tardio de um id menor) continua pendente e entra na próxima execução,
+        o que uma marca d'água por id não garantiria. Cada contrato é refeito
+        por inteiro, então lançamentos com data retroativa entram no mês
+        correto. Faz commit e retorna quantos contratos foram consolidados.
+        """
+        pendentes = select(ExecucaoFinanceira.contrato_id, ExecucaoFinanceira.id).where(
+            ExecucaoFinanceira.consolidado == False  # noqa: E712
+        )
+        if contrato_ids is not None:
+            contrato_ids = sorted(set(contrato_ids))
+            if not contrato_ids:
+                return 0
+            pendentes = pendentes.where(ExecucaoFinanceira.contrato_id.in_(contrato_ids))
+
+        lancamentos_pendentes: Dict[int, List[int]] = {}
+        for contrato_id, lancamento_id in session.exec(pendentes).all():
+            lancamentos_pendentes.setdefault(contrato_id, []).append(lancamento_id)
+        if contrato_ids is None:
+            contrato_ids = sorted(lancamentos_pendentes)
+        if not contrato_ids:
+            return 0
+
+        ano = extract("year", ExecucaoFinanceira.data_lancamento)
+        mes = extract("month", ExecucaoFinanceira.data_lancamento)
+        agora = datetime.utcnow()
+        for inicio in range(0, len(contrato_ids), 500):
+            lote = contrato_ids[inicio:inicio + 500]
+            meses = session.exec(
+                select(
+                    ExecucaoFinanceira.entidade_id,
+                    ExecucaoFinanceira.contrato_id,
+                    ano,
+                    mes,
+                    func.sum(ExecucaoFinanceira.valor),
+                    func.count(),
+                    func.max(ExecucaoFinanceira.id)
+                )
+                .where(ExecucaoFinanceira.contrato_id.in_(lote))
+                .group_by(ExecucaoFinanceira.entidade_id, ExecucaoFinanceira.contrato_id, ano, mes)
+                .order_by(ExecucaoFinanceira.contrato_id, ano, mes)
+            ).all()
+
+            linhas: List[Dict[str, Any]] = []
+            acumulado: Dict[int, Decimal] = {}
+            for entidade_id, contrato_id, a, m, valor_mes, quantidade, ultimo_id in meses:
+                valor_mes = Decimal(str(valor_mes or 0))
+                acumulado[contrato_id] = acumulado.get(contrato_id, Decimal("0")) + valor_mes
+                linhas.append({
+                    "entidade_id": entidade_id,
+                    "contrato_id": contrato_id,
+                    "competencia": date(int(a), int(m), 1),
+                    "valor_mes": valor_mes,
+                    "valor_acumulado": acumulado[contrato_id],
+                    "lancamentos": quantidade,
+                    "ultimo_lancamento_id": ultimo_id,
+                    "updated_at": agora,
+                })
+
+            session.exec(delete(ExecucaoFinanceiraMensal).where(ExecucaoFinanceiraMensal.contrato_id.in_(lote)))
+            if linhas:
+                session.exec(insert(ExecucaoFinanceiraMensal), params=linhas)
+
+            lidos = [i for contrato_id in lote for i in lancamentos_pendentes.get(contrato_id, [])]
+            for parte in range(0, len(lidos), 1000):
+                session.exec(
+                    update(ExecucaoFinanceira)
+                    .where(ExecucaoFinanceira.id.in_(lidos[parte:parte + 1000]))
+                    .values(consolidado=True)
+                    .execution_options(synchronize_session=False)
+                )
+        session.commit()
+        logger.info(f"Execução financeira consolidada para {len(contrato_ids)} contratos")
+        return len(contrato_ids)
+
+    @staticmethod
+    def resumo(session: Session, contrato: Contrato, meses: int = 12, hoje: Optional[date] = None) -> Dict[str, Any]:
+        """
+        Saldo, ritmo mensal e previsão de esgotamento do contrato.
+
+        O saldo vem de contrato.valor_executado; o ritmo é a média dos últimos
+        MESES_RITMO meses fechados da série consolidada (meses sem lançamento
+        contam como zero) e a previsão divide o saldo por esse ritmo. `meses`
+        limita quantas competências da série são devolvidas.
+        """
+        hoje = hoje or date.today()
+        mes_atual = hoje.replace(day=1)
+        valor_global = contrato.valor_global or Decimal("0")
+        valor_executado = contrato.valor_executado or Decimal("0")
+        saldo = valor_global - valor_executado
+
+        serie = list(reversed(session.exec(
+            select(ExecucaoFinanceiraMensal)
+            .where(ExecucaoFinanceiraMensal.contrato_id == contrato.id)
+            .order_by(ExecucaoFinanceiraMensal.competencia.desc())
+            .limit(meses)
+        ).all()))
+
+        executado_janela = session.exec(
+            select(func.coalesce(func.sum(ExecucaoFinanceiraMensal.valor_mes), 0))
+            .where(
+                ExecucaoFinanceiraMensal.contrato_id == contrato.id,
+                ExecucaoFinanceiraMensal.competencia >= _mes_anterior(mes_atual, MESES_RITMO),
+                ExecucaoFinanceiraMensal.competencia < mes_atual
+            )
+        ).one()
+        ritmo = Decimal(str(executado_janela)) / MESES_RITMO
+
+        meses_restantes = None
+        previsao_esgotamento = None
+        if ritmo > 0 and saldo > 0:
+            meses_restantes = float(saldo / ritmo)
+            if meses_restantes <= HORIZONTE_PREVISAO_MESES:
+                previsao_esgotamento = hoje + timedelta(days=round(meses_restantes * DIAS_POR_MES))
+        esgota_antes_termino = (
+            previsao_esgotamento is not None
+            and contrato.data_termino is not None
+            and previsao_esgotamento < contrato.data_termino
+        )
+
+        return {
+            "contrato_id": contrato.id,
+            "data_referencia": hoje.isoformat(),
+            "valor_global": _numero(valor_global),
+            "valor_executado": _numero(valor_executado),
+            "saldo": _numero(saldo),
+            "percentual_executado": _numero(valor_executado * 100 / valor_global) if valor_global else None,
+            "ritmo_mensal": _numero(ritmo),
+            "meses_restantes": round(meses_restantes, 1) if meses_restantes is not None else None,
+            "previsao_esgotamento": previsao_esgotamento.isoformat() if previsao_esgotamento else None,
+            "data_termino": contrato.data_termino.isoformat() if contrato.data_termino else None,
+            "esgota_antes_termino": esgota_antes_termino,
+            "serie_mensal": [
+                {
+                    "competencia": linha.competencia.isoformat(),
+                    "valor_mes": _numero(linha.valor_mes),
+                    "valor_acumulado": _numero(linha.valor_acumulado),
+                    "lancamentos": linha.lancamentos,
+                }
+                for linha in serie
+            ],
+            "consolidado_em": serie[-1].updated_at.isoformat() if serie else None,
+        }
@@ -0,0 +1,385 @@
+import logging
+import re
+import unicodedata
+from collections import defaultdict
+from datetime import datetime
+from itertools import combinations, groupby
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+from sqlalchemy import delete, func, insert, text, update
+from sqlalchemy.orm import aliased
+from sqlmodel import Session, select
+from app.core.busca_textual import NORMALIZAR_NOME, SUFIXOS_SOCIETARIOS
+from app.models.auditoria_global import AuditoriaGlobal
+from app.models.certidao_fornecedor import CertidaoFornecedor
+from app.models.contrato import Contrato
+from app.models.fornecedor import Fornecedor
+from app.models.fornecedor_duplicidade import FornecedorDuplicidade
+from app.models.fornecedor_score import FornecedorScore
+from app.services.certidao_service import CertidaoService
+from app.services.fornecedor_score_service import FornecedorScoreService
+
+logger = logging.getLogger(__name__)
+
+# Similaridade mínima de trigramas (0 a 1) entre razões sociais normalizadas
+SIMILARIDADE_MINIMA = 0.6
+
+# Palavra presente em mais fornecedores que isto (na entidade) não forma bloco
+# de comparação: limita cada bloco e mantém a detecção quase linear
+MAX_BLOCO = 200
+
+_SUFIXOS = re.compile(r"\b(" + "|".join(s.replace(" ", r"\s") for s in SUFIXOS_SOCIETARIOS) + r")\b")
+
+
+def normalizar_nome(nome: Optional[str]) -> str:
+    """Mesma normalização de NORMALIZAR_NOME: minúsculas, sem acentos, pontuação e sufixos societários"""
+    texto = unicodedata.normalize("NFKD", nome or "").encode("ascii", "ignore").decode().lower()
+    texto = re.sub(r"[^a-z0-9]+", " ", texto)
+    return _SUFIXOS.sub("", texto).strip()
+
+
+def trigramas(texto: str) -> Set[str]:
+    """Trigramas como no pg_trgm: cada palavra com dois espaços antes e um depois"""
+    resultado = set()
+    for palavra in texto.split():
+        palavra = f"  {palavra} "
+        resultado.update(palavra[i:i + 3] for i in range(len(palavra) - 2))
+    return resultado
+
+
+def similaridade(a: Set[str], b: Set[str]) -> float:
+    """similarity() do pg_trgm: trigramas em comum sobre o total distinto"""
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+class FornecedorDuplicidadeService:
+    """
+    Detecção e mesclagem de fornecedores duplicados dentro de cada entidade.
+
+    A detecção só compara fornecedores que compartilham um bloco, em vez de
+    todos os pares:
+      - CNPJ_RAIZ: mesma raiz de CNPJ (8 primeiros dígitos, matriz e
+        filiais), agrupada pelo índice (entidade_id, substr(cnpj, 1, 8));
+      - NOME: razões sociais normalizadas com similaridade de trigramas
+        >= SIMILARIDADE_MINIMA. No PostgreSQL, junção com o operador % do
+        pg_trgm sobre o índice GIN da razão social normalizada; nos demais
+        bancos, blocos por palavra da razão social (palavras muito comuns,
+        acima de MAX_BLOCO fornecedores, são ignoradas).
+    Os pares encontrados ficam em fornecedor_duplicidade como PENDENTE até a
+    revisão (mesclar ou descartar); pares descartados não voltam a ser sugeridos.
+    """
+
+    @staticmethod
+    def _ativos(entidade_id: Optional[int]):
+        filtro = [Fornecedor.ativo == True]  # noqa: E712
+        if entidade_id is not None:
+            filtro.append(Fornecedor.entidade_id == entidade_id)
+        return filtro
+
+    @staticmethod
+    def _pares_cnpj(session: Session, entidade_id: Optional[int]) -> Iterable[Tuple[int, int, int]]:
+        """(entidade, id, id) ligando cada fornecedor ao primeiro de mesma raiz de CNPJ"""
+        raiz = func.substr(Fornecedor.cnpj, 1, 8)
+        statement = (
+            select(Fornecedor.entidade_id, raiz, Fornecedor.id)
+            .where(Fornecedor.cnpj.is_not(None), func.length(Fornecedor.cnpj) == 14,
+                   *FornecedorDuplicidadeService._ativos(entidade_id))
+            .order_by(Fornecedor.entidade_id, raiz, Fornecedor.id)
+        )
+        for (entidade, _), grupo in groupby(session.exec(statement), key=lambda linha: (linha[0], linha[1])):
+            ids = [linha[2] for linha in grupo]
+            for outro in ids[1:]:
+                yield entidade, ids[0], outro
+
+    @staticmethod
+    def _pares_nome_postgresql(session: Session, entidade_id: Optional[int]) -> Iterable[Tuple[int, int, int, float]]:
+        """Junção por similaridade (%) usando o índice GIN de trigramas (idx_fornecedor_nome_trgm)"""
+        session.connection().execute(
+            text("SELECT set_config('pg_trgm.similarity_threshold', :limite, true)"),
+            {"limite": str(SIMILARIDADE_MINIMA)}
+        )
+        a = aliased(Fornecedor)
+        b = aliased(Fornecedor)
+        nome_a = getattr(func, NORMALIZAR_NOME)(a.razao_social)
+        nome_b = getattr(func, NORMALIZAR_NOME)(b.razao_social)
+        statement = (
+            select(a.entidade_id, a.id, b.id, func.similarity(nome_a, nome_b))
+            .join(b, (b.entidade_id == a.entidade_id) & (b.id > a.id) & nome_b.op("%")(nome_a))
+            .where(a.ativo == True, b.ativo == True)  # noqa: E712
+        )
+        if entidade_id is not None:
+            statement = statement.where(a.entidade_id == entidade_id)
+        return session.exec(statement).all()
+
+    @staticmethod
+    def _pares_nome_blocos(session: Session, entidade_id: Optional[int]) -> Iterable[Tuple[int, int, int, float]]:
+        """Blocos por palavra da razão social normalizada, entidade a entidade"""
+        statement = (
+            select(Fornecedor.entidade_id, Fornecedor.id, Fornecedor.razao_social)
+            .where(*FornecedorDuplicidadeService._ativos(entidade_id))
+            .order_by(Fornecedor.entidade_id, Fornecedor.id)
+        )
+        for entidade, linhas in groupby(session.exec(statement), key=lambda linha: linha[0]):
+            grams: Dict[int, Set[str]] = {}
+            blocos: Dict[str, List[int]] = defaultdict(list)
+            for _, fornecedor_id, razao_social in linhas:
+                nome = normalizar_nome(razao_social)
+                grams[fornecedor_id] = trigramas(nome)
+                for palavra in set(nome.split()):
+                    if len(palavra) > 2:
+                        blocos[palavra].append(fornecedor_id)
+
+            comparados = set()
+            for ids in blocos.values():
+                if len(ids) > MAX_BLOCO:
+                    continue
+                for par in combinations(ids, 2):
+                    if par in comparados:
+                        continue
+                    comparados.add(par)
+                    valor = similaridade(grams[par[0]], grams[par[1]])
+                    if valor >= SIMILARIDADE_MINIMA:
+                        yield entidade, par[0], par[1], valor
+
+    @staticmethod
+    def detectar(session: Session, entidade_id: Optional[int] = None) -> Dict[str, int]:
+        """
+        Regrava os pares PENDENTE da entidade (ou de todas) a partir dos
+        blocos de CNPJ e nome, preservando os já revisados. Faz commit.
+        """
+        pares: Dict[Tuple[int, int], Dict[str, Any]] = {}
+        if session.get_bind().dialect.name == "postgresql":
+            por_nome = FornecedorDuplicidadeService._pares_nome_postgresql(session, entidade_id)
+        else:
+            por_nome = FornecedorDuplicidadeService._pares_nome_blocos(session, entidade_id)
+        for entidade, a, b, valor in por_nome:
+            pares[(a, b)] = {"entidade_id": entidade, "similaridade": round(float(valor), 4), "motivo": "NOME"}
+        for entidade, a, b in FornecedorDuplicidadeService._pares_cnpj(session, entidade_id):
+            par = pares.setdefault((a, b), {"entidade_id": entidade, "similaridade": None})
+            par["motivo"] = "CNPJ_RAIZ"
+
+        # Similaridade dos pares só de CNPJ, para exibição na revisão
+        sem_similaridade = sorted({i for par, dados in pares.items() if dados["similaridade"] is None for i in par})
+        nomes = {}
+        for inicio in range(0, len(sem_similaridade), 500):
+            nomes.update(session.exec(
+                select(Fornecedor.id, Fornecedor.razao_social)
+                .where(Fornecedor.id.in_(sem_similaridade[inicio:inicio + 500]))
+            ).all())
+        for (a, b), dados in pares.items():
+            if dados["similaridade"] is None:
+                dados["similaridade"] = round(similaridade(
+                    trigramas(normalizar_nome(nomes[a])), trigramas(normalizar_nome(nomes[b]))
+                ), 4)
+
+        apagar = delete(FornecedorDuplicidade).where(FornecedorDuplicidade.status == "PENDENTE")
+        revisados = select(FornecedorDuplicidade.fornecedor_id, FornecedorDuplicidade.fornecedor_duplicado_id)
+        if entidade_id is not None:
+            apagar = apagar.where(FornecedorDuplicidade.entidade_id == entidade_id)
+            revisados = revisados.where(FornecedorDuplicidade.entidade_id == entidade_id)
+        session.exec(apagar)
+        ja_revisados = set(session.exec(revisados).all())
+
+        agora = datetime.utcnow()
+        linhas = [
+            {
+                "entidade_id": dados["entidade_id"],
+                "fornecedor_id": a,
+                "fornecedor_duplicado_id": b,
+                "similaridade": dados["similaridade"],
+                "motivo": dados["motivo"],
+                "status": "PENDENTE",
+                "created_at": agora,
+                "updated_at": agora,
+            }
+            for (a, b), dados in sorted(pares.items())
+            if (a, b) not in ja_revisados
+        ]
+        if linhas:
+            session.exec(insert(FornecedorDuplicidade), params=linhas)
+        session.commit()
+        logger.info(f"Detecção de fornecedores duplicados: {len(linhas)} pares pendentes")
+        grupos = FornecedorDuplicidadeService._agrupar(
+            (linha["fornecedor_id"], linha["fornecedor_duplicado_id"]) for linha in linhas
+        )
+        return {"pares": len(linhas), "grupos": len(grupos)}
+
+    @staticmethod
+    def _agrupar(pares: Iterable[Tuple[int, int]]) -> List[List[int]]:
+        """Componentes conexos dos pares (union-find), cada um ordenado por id"""
+        pai: Dict[int, int] = {}
+
+        def raiz(x):
+            pai.setdefault(x, x)
+            while pai[x] != x:
+                pai[x] = pai[pai[x]]
+                x = pai[x]
+            return x
+
+        for a, b in pares:
+            ra, rb = raiz(a), raiz(b)
+            if ra != rb:
+                pai[max(ra, rb)] = min(ra, rb)
+
+        grupos: Dict[int, List[int]] = defaultdict(list)
+        for x in pai:
+            grupos[raiz(x)].append(x)
+        return sorted(sorted(ids) for ids in grupos.values())
+
+    @staticmethod
+    def grupos(session: Session, entidade_id: Optional[int]) -> Dict[str, Any]:
+        """
+        Grupos de fornecedores possivelmente duplicados (pares PENDENTE ligados
+        entre si), com o principal sugerido: o de mais contratos (empate: menor id)
+        """
+        statement = select(FornecedorDuplicidade).where(FornecedorDuplicidade.status == "PENDENTE")
+        if entidade_id is not None:
+            statement = statement.where(FornecedorDuplicidade.entidade_id == entidade_id)
+        pares = session.exec(statement).all()
+        grupos = FornecedorDuplicidadeService._agrupar(
+            (par.fornecedor_id, par.fornecedor_duplicado_id) for par in pares
+        )
+
+        ids = sorted({i for grupo in grupos for i in grupo})
+        fornecedores = {}
+        contratos = {}
+        for inicio in range(0, len(ids), 500):
+            bloco = ids[inicio:inicio + 500]
+            fornecedores.update({f.id: f for f in session.exec(select(Fornecedor).where(Fornecedor.id.in_(bloco))).all()})
+            contratos.update(session.exec(
+                select(Contrato.fornecedor_id, func.count(Contrato.id))
+                .where(Contrato.fornecedor_id.in_(bloco))
+                .group_by(Contrato.fornecedor_id)
+            ).all())
+
+        pares_por_fornecedor = defaultdict(list)
+        for par in pares:
+            pares_por_fornecedor[par.fornecedor_id].append(par)
+
+        resultado = []
+        for grupo in grupos:
+            resultado.append({
+                "entidade_id": fornecedores[grupo[0]].entidade_id,
+                "principal_sugerido": min(grupo, key=lambda i: (-contratos.get(i, 0), i)),
+                "fornecedores": [
+                    {
+                        "id": i,
+                        "cnpj": fornecedores[i].cnpj,
+                        "razao_social": fornecedores[i].razao_social,
+                        "nome_fantasia": fornecedores[i].nome_fantasia,
+                        "contratos": contratos.get(i, 0),
+                    }
+                    for i in grupo
+                ],
+                "pares": [
+                    {
+                        "fornecedor_id": par.fornecedor_id,
+                        "fornecedor_duplicado_id": par.fornecedor_duplicado_id,
+                        "similaridade": par.similaridade,
+                        "motivo": par.motivo,
+                    }
+                    for i in grupo for par in pares_por_fornecedor[i]
+                ],
+            })
+        resultado.sort(key=lambda g: -len(g["fornecedores"]))
+        return {"total_grupos": len(resultado), "grupos": resultado}
+
+    @staticmethod
+    def _marcar(session: Session, fornecedor_ids: List[int], status: str, agora: datetime):
+        session.exec(
+            update(FornecedorDuplicidade)
+            .where(
+                FornecedorDuplicidade.fornecedor_id.in_(fornecedor_ids),
+                FornecedorDuplicidade.fornecedor_duplicado_id.in_(fornecedor_ids),
+                FornecedorDuplicidade.status == "PENDENTE"
+            )
+            .values(status=status, updated_at=agora)
+        )
+
+    @staticmethod
+    def descartar(session: Session, fornecedor_ids: List[int]):
+        """Marca como DESCARTADO os pares pendentes entre esses fornecedores. Não faz commit."""
+        FornecedorDuplicidadeService._marcar(session, fornecedor_ids, "DESCARTADO", datetime.utcnow())
+
+    @staticmethod
+    def mesclar(session: Session, principal: Fornecedor, duplicados: List[Fornecedor], usuario_id: Optional[int] = None):
+        """
+        Transfere contratos e certidões dos duplicados para o principal e
+        desativa os duplicados. Certidão do duplicado com o mesmo tipo e
+        protocolo de uma do principal é descartada. Recalcula regularidade e
+        score e registra a mesclagem na auditoria (com os ids das certidões
+        descartadas de cada duplicado). Não faz commit.
+        """
+        agora = datetime.utcnow()
+        ids = [fornecedor.id for fornecedor in duplicados]
+
+        session.exec(
+            update(Contrato)
+            .where(Contrato.fornecedor_id.in_(ids))
+            .values(fornecedor_id=principal.id, updated_at=agora)
+        )
+
+        # Certidão com tipo e protocolo já presentes no principal (ou em outro duplicado) é descartada
+        vistos = set(session.exec(
+            select(CertidaoFornecedor.tipo_certidao_id, CertidaoFornecedor.numero_protocolo)
+            .where(CertidaoFornecedor.fornecedor_id == principal.id, CertidaoFornecedor.numero_protocolo.is_not(None))
+        ).all())
+        descartar = []
+        descartadas_por_fornecedor: Dict[int, List[int]] = defaultdict(list)
+        for certidao_id, fornecedor_id, tipo_certidao_id, numero_protocolo in session.exec(
+            select(
+                CertidaoFornecedor.id, CertidaoFornecedor.fornecedor_id,
+                CertidaoFornecedor.tipo_certidao_id, CertidaoFornecedor.numero_protocolo
+            )
+            .where(CertidaoFornecedor.fornecedor_id.in_(ids), CertidaoFornecedor.numero_protocolo.is_not(None))
+            .order_by(CertidaoFornecedor.id)
+        ).all():
+            if (tipo_certidao_id, numero_protocolo) in vistos:
+                descartar.append(certidao_id)
+                descartadas_por_fornecedor[fornecedor_id].append(certidao_id)
+            vistos.add((tipo_certidao_id, numero_protocolo))
+        # Duplicados que perdem certidões (transferidas ou descartadas) têm a regularidade recalculada
+        perderam_certidoes = list(session.exec(
+            select(CertidaoFornecedor.fornecedor_id)
+            .where(CertidaoFornecedor.fornecedor_id.in_(ids))
+            .distinct()
+        ).all())
+        if descartar:
+            session.exec(delete(CertidaoFornecedor).where(CertidaoFornecedor.id.in_(descartar)))
+        session.exec(
+            update(CertidaoFornecedor)
+            .where(CertidaoFornecedor.fornecedor_id.in_(ids))
+            .values(fornecedor_id=principal.id, updated_at=agora)
+        )
+
+        for fornecedor in duplicados:
+            fornecedor.ativo = False
+            fornecedor.updated_at = agora
+            session.add(fornecedor)
+        session.exec(delete(FornecedorScore).where(FornecedorScore.fornecedor_id.in_(ids)))
+        FornecedorDuplicidadeService._marcar(session, [principal.id, *ids], "MESCLADO", agora)
+
+        session.exec(insert(AuditoriaGlobal), params=[
+            {
+                "entidade_id": principal.entidade_id,
+                "usuario_id": usuario_id,
+                "acao": "MESCLAGEM_FORNECEDOR",
+                "tabela_afetada": "fornecedor",
+                "registro_id": fornecedor.id,
+                "dados_antes": {"cnpj": fornecedor.cnpj, "razao_social": fornecedor.razao_social},
+                "dados_depois": {
+                    "mesclado_em": principal.id,
+                    "certidoes_descartadas": descartadas_por_fornecedor.get(fornecedor.id, []),
+                },
+                "timestamp": agora,
+            }
+            for fornecedor in duplicados
+        ])
+
+        session.flush()
+        if perderam_certidoes:
+            CertidaoService.recalcular_regularidade(
+                session, fornecedor_ids=[principal.id, *perderam_certidoes]
+            )
+        FornecedorScoreService.recalcular(session, fornecedor_ids=[principal.id])
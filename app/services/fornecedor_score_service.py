@@ -0,0 +1,232 @@
+import logging
+from datetime import datetime
+from typing import Any, Dict, Iterable, Optional
+from sqlalchemy import and_, case, func, literal, or_, true
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlmodel import Session, select
+from app.models.contrato import Contrato
+from app.models.fornecedor import Fornecedor
+from app.models.fornecedor_score import FornecedorScore
+from app.models.matriz_riscos_resumo import MatrizRiscosResumo
+from app.models.penalidade import Penalidade
+
+logger = logging.getLogger(__name__)
+
+# Pontos por ocorrência e teto de cada componente (somam no máximo 100)
+PONTOS_CERTIDAO_VENCIDA, TETO_CERTIDOES = 10, 30
+PONTOS_IMPEDIMENTO = 30
+PONTOS_PENALIDADE, TETO_PENALIDADES = 5, 25
+PONTOS_RISCO_ALTO, TETO_RISCOS = 5, 15
+
+# nivel_score acima deste valor é risco ALTO (ver NIVEL_RISCO_SQL)
+SCORE_RISCO_ALTO = 15
+
+
+def _limitado(expressao, teto: int):
+    return case((expressao > teto, teto), else_=expressao)
+
+
+class FornecedorScoreService:
+    """
+    Score composto de risco dos fornecedores, calculado em lote no banco.
+
+    Um único INSERT ... SELECT junta o fornecedor (certidões vencidas e
+    impedimento) aos agregados de penalidades aplicadas e de riscos ativos
+    (via matriz_riscos_resumo) dos seus contratos. O mesmo comando serve para
+    a entidade inteira ou para fornecedores específicos (atualização incremental).
+    """
+
+    @staticmethod
+    def _filtros(entidade_id: Optional[int], fornecedor_ids: Optional[Iterable[int]]):
+        fornecedor = true()
+        contrato = true()
+        if entidade_id is not None:
+            fornecedor = and_(fornecedor, Fornecedor.entidade_id == entidade_id)
+            contrato = and_(contrato, Contrato.entidade_id == entidade_id)
+        if fornecedor_ids is not None:
+            fornecedor = and_(fornecedor, Fornecedor.id.in_(fornecedor_ids))
+            contrato = and_(contrato, Contrato.fornecedor_id.in_(fornecedor_ids))
+        return fornecedor, contrato
+
+    @staticmethod
+    def _consulta(entidade_id: Optional[int], fornecedor_ids: Optional[Iterable[int]]):
+        filtro_fornecedor, filtro_contrato = FornecedorScoreService._filtros(entidade_id, fornecedor_ids)
+
+        penalidades = (
+            select(
+                Contrato.fornecedor_id,
+                func.count(Penalidade.id).label("quantidade"),
+                func.sum(Penalidade.valor_multa).label("valor")
+            )
+            .join(Contrato, Contrato.id == Penalidade.contrato_id)
+            .where(filtro_contrato, Penalidade.status == "APLICADA")
+            .group_by(Contrato.fornecedor_id)
+            .subquery("penalidades")
+        )
+
+        score_celula = MatrizRiscosResumo.probabilidade * MatrizRiscosResumo.impacto
+        riscos = (
+            select(
+                Contrato.fornecedor_id,
+                func.sum(MatrizRiscosResumo.quantidade).label("ativos"),
+                func.sum(case((score_celula > SCORE_RISCO_ALTO, MatrizRiscosResumo.quantidade), else_=0)).label("altos"),
+                func.sum(MatrizRiscosResumo.quantidade * score_celula).label("exposicao")
+            )
+            .join(Contrato, Contrato.id == MatrizRiscosResumo.contrato_id)
+            .where(filtro_contrato)
+            .group_by(Contrato.fornecedor_id)
+            .subquery("riscos")
+        )
+
+        certidoes_vencidas = func.coalesce(Fornecedor.total_certidoes_vencidas, 0)
+        impedido = or_(
+            and_(Fornecedor.motivo_impedimento.is_not(None), Fornecedor.motivo_impedimento != ""),
+            Fornecedor.situacao_cadastral != "ATIVO"
+        )
+        penalidades_aplicadas = func.coalesce(penalidades.c.quantidade, 0)
+        riscos_altos = func.coalesce(riscos.c.altos, 0)
+
+        pontos_certidoes = _limitado(certidoes_vencidas * PONTOS_CERTIDAO_VENCIDA, TETO_CERTIDOES)
+        pontos_impedimento = case((impedido, PONTOS_IMPEDIMENTO), else_=0)
+        pontos_penalidades = _limitado(penalidades_aplicadas * PONTOS_PENALIDADE, TETO_PENALIDADES)
+        pontos_riscos = _limitado(riscos_altos * PONTOS_RISCO_ALTO, TETO_RISCOS)
+
+        return (
+            select(
+                Fornecedor.id,
+                Fornecedor.entidade_id,
+                pontos_certidoes + pontos_impedimento + pontos_penalidades + pontos_riscos,
+                pontos_certidoes,
+                pontos_impedimento,
+                pontos_penalidades,
+                pontos_riscos,
+                certidoes_vencidas,
+                case((impedido, True), else_=False),
+                penalidades_aplicadas,
+                func.coalesce(penalidades.c.valor, 0),
+                func.coalesce(riscos.c.ativos, 0),
+                riscos_altos,
+                func.coalesce(riscos.c.exposicao, 0),
+                literal(datetime.utcnow())
+            )
+            .outerjoin(penalidades, penalidades.c.fornecedor_id == Fornecedor.id)
+            .outerjoin(riscos, riscos.c.fornecedor_id == Fornecedor.id)
+            .where(filtro_fornecedor)
+        )
+
+    @staticmethod
+    def recalcular(
+        session: Session,
+        entidade_id: Optional[int] = None,
+        fornecedor_ids: Optional[Iterable[int]] = None
+    ):
+        """
+        Regrava os scores da entidade (ou só dos fornecedores informados) com
+        um INSERT ... SELECT ... ON CONFLICT (fornecedor_id) DO UPDATE, de modo
+        que recálculos concorrentes do mesmo fornecedor não colidem no índice
+        único. Não faz commit: deve rodar na transação que alterou os dados
+        de origem.
+        """
+        if fornecedor_ids is not None:
+            fornecedor_ids = sorted({f for f in fornecedor_ids if f is not None})
+            if not fornecedor_ids:
+                return
+
+        colunas = [
+            "fornecedor_id", "entidade_id", "score",
+            "pontos_certidoes", "pontos_impedimento", "pontos_penalidades", "pontos_riscos",
+            "certidoes_vencidas", "impedido", "penalidades_aplicadas", "valor_multas",
+            "riscos_ativos", "riscos_altos", "exposicao_riscos", "calculado_em"
+        ]
+        dialeto = postgresql if session.get_bind().dialect.name == "postgresql" else sqlite
+        statement = dialeto.insert(FornecedorScore).from_select(
+            colunas, FornecedorScoreService._consulta(entidade_id, fornecedor_ids)
+        )
+        session.exec(statement.on_conflict_do_update(
+            index_elements=["fornecedor_id"],
+            set_={coluna: statement.excluded[coluna] for coluna in colunas if coluna != "fornecedor_id"}
+        ))
+
+    @staticmethod
+    def recalcular_por_contrato(session: Session, contrato_id: int):
+        """Atualiza o score do fornecedor do contrato (penalidades e riscos)"""
+        fornecedor_id = session.exec(select(Contrato.fornecedor_id).where(Contrato.id == contrato_id)).first()
+        FornecedorScoreService.recalcular(session, fornecedor_ids=[fornecedor_id])
+
+    @staticmethod
+    def recalcular_entidade(session: Session, entidade_id: Optional[int] = None) -> int:
+        """Passada completa (de uma entidade ou de todas), com commit"""
+        FornecedorScoreService.recalcular(session, entidade_id)
+        session.commit()
+        statement = select(func.count(FornecedorScore.id))
+        if entidade_id is not None:
+            statement = statement.where(FornecedorScore.entidade_id == entidade_id)
+        total = session.exec(statement).one()
+        logger.info(f"Scores de fornecedores recalculados: {total}")
+        return total
+
+    @staticmethod
+    def ranking(
+        session: Session,
+        entidade_id: Optional[int],
+        limit: int = 50,
+        apos_score: Optional[int] = None,
+        apos_id: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Fornecedores do maior para o menor score, paginados por cursor
+        (score desc, fornecedor_id asc) sobre idx_fornecedor_score_ranking
+        """
+        statement = (
+            select(FornecedorScore, Fornecedor.razao_social, Fornecedor.cnpj)
+            .join(Fornecedor, Fornecedor.id == FornecedorScore.fornecedor_id)
+        )
+        if entidade_id is not None:
+            statement = statement.where(FornecedorScore.entidade_id == entidade_id)
+        if apos_score is not None and apos_id is not None:
+            statement = statement.where(or_(
+                FornecedorScore.score < apos_score,
+                and_(FornecedorScore.score == apos_score, FornecedorScore.fornecedor_id > apos_id)
+            ))
+        statement = statement.order_by(
+            FornecedorScore.score.desc(), FornecedorScore.fornecedor_id
+        ).limit(limit + 1)
+        rows = session.exec(statement).all()
+
+        fornecedores = [
+            {
+                "fornecedor_id": score.fornecedor_id,
+                "razao_social": razao_social,
+                "cnpj": cnpj,
+                "score": score.score,
+                "componentes": {
+                    "certidoes": score.pontos_certidoes,
+                    "impedimento": score.pontos_impedimento,
+                    "penalidades": score.pontos_penalidades,
+                    "riscos": score.pontos_riscos,
+                },
+                "origem": {
+                    "certidoes_vencidas": score.certidoes_vencidas,
+                    "impedido": score.impedido,
+                    "penalidades_aplicadas": score.penalidades_aplicadas,
+                    "valor_multas": score.valor_multas,
+                    "riscos_ativos": score.riscos_ativos,
+                    "riscos_altos": score.riscos_altos,
+                    "exposicao_riscos": score.exposicao_riscos,
+                },
+                "calculado_em": score.calculado_em,
+            }
+            for score, razao_social, cnpj in rows
+        ]
+
+        proximo_cursor = None
+        if len(fornecedores) > limit:
+            fornecedores = fornecedores[:limit]
+            ultimo = fornecedores[-1]
+            proximo_cursor = {"apos_score": ultimo["score"], "apos_id": ultimo["fornecedor_id"]}
+
+        return {
+            "entidade_id": entidade_id,
+            "fornecedores": fornecedores,
+            "proximo_cursor": proximo_cursor
+        }
@@ -0,0 +1,466 @@
+import csv
+import io
+import json
+import logging
+import re
+import unicodedata
+from collections import OrderedDict
+from datetime import datetime, date
+from decimal import Decimal, InvalidOperation
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from sqlalchemy import insert, tuple_
+from sqlmodel import Session, select
+from app.core.config import settings
+from app.models.contrato import Contrato, ContratoCreate
+from app.models.cronograma_fisico_fin import CronogramaFisicoFin
+from app.models.fiscal_designado import FiscalDesignado
+from app.models.fornecedor import Fornecedor
+from app.models.importacao_arquivo import ImportacaoArquivo
+from app.models.usuario import Usuario
+from app.services.analise_cronograma_service import AnaliseCronogramaService
+from app.services.carga_lote_service import CargaLoteService
+from app.services.curva_s_service import CurvaSService
+from app.services.dashboard_service import DashboardService
+
+logger = logging.getLogger(__name__)
+
+TIPOS_IMPORTACAO = {"CONTRATOS", "FISCAIS", "CRONOGRAMAS"}
+FORMATOS_IMPORTACAO = {".csv": "CSV", ".xlsx": "XLSX"}
+
+# Colunas obrigatórias de cada tipo (nomes normalizados do cabeçalho)
+COLUNAS_OBRIGATORIAS = {
+    "CONTRATOS": {"numero_contrato", "objeto", "cnpj_fornecedor", "valor_global"},
+    "FISCAIS": {"numero_contrato", "cpf_fiscal", "tipo_fiscal", "data_designacao"},
+    "CRONOGRAMAS": {"numero_contrato"},
+}
+
+# Variações comuns de cabeçalho nas planilhas legadas
+SINONIMOS_COLUNAS = {
+    "no_contrato": "numero_contrato",
+    "numero_do_contrato": "numero_contrato",
+    "contrato": "numero_contrato",
+    "cnpj": "cnpj_fornecedor",
+    "cnpj_do_fornecedor": "cnpj_fornecedor",
+    "cpf": "cpf_fiscal",
+    "cpf_do_fiscal": "cpf_fiscal",
+}
+
+# Entradas mantidas em cada cache de consulta (CNPJ, CPF, número de contrato)
+TAMANHO_CACHE_CONSULTA = 50000
+
+
+class ErroLinha(ValueError):
+    """Valor inválido em uma linha da planilha"""
+
+
+class ErroCabecalho(ValueError):
+    """Cabeçalho da planilha sem as colunas obrigatórias do tipo"""
+
+
+def normalizar_cabecalho(nome: Any) -> str:
+    """'Número do Contrato ' -> 'numero_contrato' (minúsculas, sem acentos, separador _, sinônimos)"""
+    texto = unicodedata.normalize("NFKD", str(nome or "")).encode("ascii", "ignore").decode()
+    coluna = re.sub(r"[^a-z0-9]+", "_", texto.lower()).strip("_")
+    return SINONIMOS_COLUNAS.get(coluna, coluna)
+
+
+def _texto(valor: Any) -> Optional[str]:
+    if valor is None:
+        return None
+    texto = str(valor).strip()
+    return texto or None
+
+
+def _documento(valor: Any, digitos: int) -> Optional[str]:
+    """CNPJ/CPF só com dígitos, completando zeros à esquerda perdidos pela planilha"""
+    texto = _texto(valor)
+    if texto is None:
+        return None
+    if isinstance(valor, float) and valor.is_integer():
+        texto = str(int(valor))
+    numeros = re.sub(r"\D", "", texto)
+    if not numeros or len(numeros) > digitos:
+        raise ErroLinha(f"Documento inválido: {texto}")
+    return numeros.zfill(digitos)
+
+
+def _decimal(valor: Any) -> Optional[Decimal]:
+    """Aceita número da planilha, '1234.56' e o formato brasileiro '1.234,56'"""
+    if valor is None or isinstance(valor, Decimal):
+        return valor
+    if isinstance(valor, (int, float)):
+        return Decimal(str(valor))
+    texto = _texto(valor)
+    if texto is None:
+        return None
+    texto = texto.replace("R$", "").replace(" ", "")
+    if "," in texto:
+        texto = texto.replace(".", "").replace(",", ".")
+    try:
+        return Decimal(texto)
+    except InvalidOperation:
+        raise ErroLinha(f"Valor numérico inválido: {valor}")
+
+
+def _data(valor: Any) -> Optional[date]:
+    """Aceita data da planilha, 'AAAA-MM-DD' e 'DD/MM/AAAA'"""
+    if valor is None or (isinstance(valor, date) and not isinstance(valor, datetime)):
+        return valor
+    if isinstance(valor, datetime):
+        return valor.date()
+    texto = _texto(valor)
+    if texto is None:
+        return None
+    for formato in ("%Y-%m-%d", "%d/%m/%Y"):
+        try:
+            return datetime.strptime(texto[:10], formato).date()
+        except ValueError:
+            continue
+    raise ErroLinha(f"Data inválida: {valor}")
+
+
+def _codificacao_csv(amostra: bytes) -> str:
+    """
+    utf-8-sig quando o início do arquivo é UTF-8 válido; senão cp1252, a
+    codificação das planilhas legadas salvas pelo Excel no Windows
+    """
+    try:
+        amostra.decode("utf-8-sig")
+    except UnicodeDecodeError as e:
+        # Caractere multibyte cortado no fim da amostra não invalida o UTF-8
+        if e.reason != "unexpected end of data":
+            return "cp1252"
+    return "utf-8-sig"
+
+
+def _inteiro(valor: Any) -> Optional[int]:
+    numero = _decimal(valor)
+    return int(numero) if numero is not None else None
+
+
+class _CacheConsulta:
+    """
+    Cache LRU de chave -> id (ou None para chave inexistente), preenchido por
+    lote com uma consulta IN só para as chaves ainda desconhecidas.
+    """
+
+    def __init__(self, consultar: Callable[[List[Any]], Dict[Any, int]], tamanho: int = TAMANHO_CACHE_CONSULTA):
+        self._consultar = consultar
+        self._tamanho = tamanho
+        self._valores: "OrderedDict[Any, Optional[int]]" = OrderedDict()
+
+    def carregar(self, chaves: Iterable[Any]):
+        faltantes = sorted({chave for chave in chaves if chave is not None and chave not in self._valores})
+        if not faltantes:
+            return
+        encontrados = self._consultar(faltantes)
+        for chave in faltantes:
+            self._valores[chave] = encontrados.get(chave)
+        while len(self._valores) > self._tamanho:
+            self._valores.popitem(last=False)
+
+    def get(self, chave: Any) -> Optional[int]:
+        if chave in self._valores:
+            self._valores.move_to_end(chave)
+        return self._valores.get(chave)
+
+
+class _Leitor:
+    """
+    Leitura incremental de CSV/XLSX como (número da linha, dict por coluna
+    normalizada). O cabeçalho é conferido com `obrigatorias` logo ao ser lido
+    (ErroCabecalho), antes da primeira linha de dados.
+    """
+
+    def __init__(self, caminho: str, formato: str, obrigatorias: Iterable[str] = ()):
+        self.caminho = caminho
+        self.formato = formato
+        self.obrigatorias = set(obrigatorias)
+        self._arquivo = None
+
+    def bytes_lidos(self) -> int:
+        """Posição no arquivo (CSV); para XLSX é 0 e o progresso é por linhas lidas"""
+        if self._arquivo is None or self._arquivo.closed:
+            return 0
+        return self._arquivo.tell()
+
+    def _validar_cabecalho(self, cabecalho: List[str]):
+        faltantes = self.obrigatorias - set(cabecalho)
+        if faltantes:
+            raise ErroCabecalho(f"Colunas obrigatórias ausentes: {', '.join(sorted(faltantes))}")
+
+    def linhas(self) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        if self.formato == "XLSX":
+            yield from self._linhas_xlsx()
+        else:
+            yield from self._linhas_csv()
+
+    def _linhas_csv(self):
+        with open(self.caminho, "rb") as binario:
+            self._arquivo = binario
+            amostra = binario.read(64 * 1024)
+            codificacao = _codificacao_csv(amostra)
+            binario.seek(0)
+            # Separador pelo cabeçalho, sempre completo; linhas de dados curtas confundiriam o Sniffer
+            cabecalho_bruto = amostra.decode(codificacao, errors="replace").lstrip("\ufeff").partition("\n")[0]
+            try:
+                dialeto = csv.Sniffer().sniff(cabecalho_bruto, delimiters=";,\t|")
+            except csv.Error:
+                dialeto = csv.excel
+            # Bytes inválidos adiante da amostra viram U+FFFD e a linha é recusada em processar
+            texto = io.TextIOWrapper(binario, encoding=codificacao, errors="replace", newline="")
+            leitor = csv.reader(texto, dialeto)
+            cabecalho = [normalizar_cabecalho(nome) for nome in next(leitor, [])]
+            self._validar_cabecalho(cabecalho)
+            for numero, valores in enumerate(leitor, start=2):
+                if any(valor.strip() for valor in valores):
+                    yield numero, dict(zip(cabecalho, valores))
+
+    def _linhas_xlsx(self):
+        # openpyxl em modo read_only lê a planilha em fluxo, sem carregá-la inteira
+        from openpyxl import load_workbook
+
+        planilha = load_workbook(self.caminho, read_only=True, data_only=True)
+        try:
+            linhas = planilha.worksheets[0].iter_rows(values_only=True)
+            cabecalho = [normalizar_cabecalho(nome) for nome in next(linhas, ())]
+            self._validar_cabecalho(cabecalho)
+            for numero, valores in enumerate(linhas, start=2):
+                if any(valor not in (None, "") for valor in valores):
+                    yield numero, dict(zip(cabecalho, valores))
+        finally:
+            planilha.close()
+
+
+class ImportacaoService:
+    """
+    Importação de planilhas legadas (contratos, fiscais e cronogramas) em fluxo.
+
+    O arquivo é lido linha a linha e processado em lotes de IMPORTACAO_LOTE:
+    cada lote resolve CNPJs, CPFs e números de contrato com uma consulta por
+    cache (_CacheConsulta, limitado em TAMANHO_CACHE_CONSULTA entradas),
+    converte e valida as linhas e grava tudo em bloco, com commit por lote.
+    Memória fica limitada ao lote, aos caches e aos primeiros
+    IMPORTACAO_MAX_ERROS erros, independentemente do tamanho do arquivo.
+    """
+
+    def __init__(self, session: Session, importacao: ImportacaoArquivo, usuario: Usuario):
+        self.session = session
+        self.importacao = importacao
+        self.usuario = usuario
+        self.entidade_id = importacao.entidade_id
+        self.erros: List[Dict[str, Any]] = []
+        self.contratos_cronograma = set()
+
+        self.fornecedores = _CacheConsulta(lambda cnpjs: dict(session.exec(
+            select(Fornecedor.cnpj, Fornecedor.id)
+            .where(Fornecedor.entidade_id == self.entidade_id, Fornecedor.cnpj.in_(cnpjs))
+        ).all()))
+        self.usuarios = _CacheConsulta(lambda cpfs: dict(session.exec(
+            select(Usuario.cpf, Usuario.id)
+            .where(Usuario.entidade_id == self.entidade_id, Usuario.cpf.in_(cpfs))
+        ).all()))
+        self.contratos = _CacheConsulta(lambda numeros: dict(session.exec(
+            select(Contrato.numero_contrato, Contrato.id)
+            .where(Contrato.entidade_id == self.entidade_id, Contrato.numero_contrato.in_(numeros))
+        ).all()))
+
+    def _erro(self, linha: int, mensagem: str):
+        self.importacao.linhas_com_erro += 1
+        if len(self.erros) < settings.IMPORTACAO_MAX_ERROS:
+            self.erros.append({"linha": linha, "erro": mensagem})
+
+    def _contrato_id(self, linha: Dict[str, Any]) -> int:
+        numero = _texto(linha.get("numero_contrato"))
+        contrato_id = self.contratos.get(numero)
+        if contrato_id is None:
+            raise ErroLinha(f"Contrato não encontrado: {numero}")
+        return contrato_id
+
+    def _lote_contratos(self, lote: List[Tuple[int, Dict[str, Any]]]) -> int:
+        self.fornecedores.carregar(_documento_seguro(linha.get("cnpj_fornecedor"), 14) for _, linha in lote)
+        numeros, itens = [], []
+        for numero, linha in lote:
+            try:
+                cnpj = _documento(linha.get("cnpj_fornecedor"), 14)
+                fornecedor_id = self.fornecedores.get(cnpj)
+                if fornecedor_id is None:
+                    raise ErroLinha(f"Fornecedor não cadastrado: {cnpj}")
+                itens.append(ContratoCreate(
+                    entidade_id=self.entidade_id,
+                    numero_contrato=_texto(linha.get("numero_contrato")),
+                    numero_processo=_texto(linha.get("numero_processo")),
+                    objeto=_texto(linha.get("objeto")),
+                    fornecedor_id=fornecedor_id,
+                    valor_global=_decimal(linha.get("valor_global")),
+                    data_assinatura=_data(linha.get("data_assinatura")),
+                    data_inicio=_data(linha.get("data_inicio")),
+                    data_termino=_data(linha.get("data_termino")),
+                    vigencia_meses=_inteiro(linha.get("vigencia_meses")),
+                    modalidade=_texto(linha.get("modalidade")),
+                    tipo_contrato=_texto(linha.get("tipo_contrato")),
+                ))
+                numeros.append(numero)
+            except (ErroLinha, ValueError) as e:
+                self._erro(numero, str(e))
+
+        # Planilha só inclui: contrato com número já cadastrado não é sobrescrito, a linha sai com erro
+        resultado = CargaLoteService.contratos(self.session, itens, self.usuario, atualizar_existentes=False)
+        for numero, item in zip(numeros, resultado["itens"]):
+            if item["status"] == "ERRO":
+                self._erro(numero, item["erro"])
+        return len(itens) - resultado["erros"]
+
+    def _lote_fiscais(self, lote: List[Tuple[int, Dict[str, Any]]]) -> int:
+        self.contratos.carregar(_texto(linha.get("numero_contrato")) for _, linha in lote)
+        self.usuarios.carregar(_documento_seguro(linha.get("cpf_fiscal"), 11) for _, linha in lote)
+        linhas, vistos = [], set()
+        for numero, linha in lote:
+            try:
+                contrato_id = self._contrato_id(linha)
+                cpf = _documento(linha.get("cpf_fiscal"), 11)
+                usuario_id = self.usuarios.get(cpf)
+                if usuario_id is None:
+                    raise ErroLinha(f"Usuário não encontrado na entidade: {cpf}")
+                tipo_fiscal = (_texto(linha.get("tipo_fiscal")) or "").upper()
+                if tipo_fiscal not in ("TITULAR", "SUPLENTE"):
+                    raise ErroLinha(f"Tipo de fiscal inválido: {tipo_fiscal}")
+                data_designacao = _data(linha.get("data_designacao"))
+                if data_designacao is None:
+                    raise ErroLinha("Data de designação obrigatória")
+                if (contrato_id, usuario_id) in vistos:
+                    raise ErroLinha("Fiscal repetido para o contrato")
+                vistos.add((contrato_id, usuario_id))
+                linhas.append((numero, {
+                    "contrato_id": contrato_id,
+                    "entidade_id": self.entidade_id,
+                    "usuario_id": usuario_id,
+                    "tipo_fiscal": tipo_fiscal,
+                    "data_designacao": data_designacao,
+                    "portaria": _texto(linha.get("portaria")),
+                    "ativo": True,
+                }))
+            except (ErroLinha, ValueError) as e:
+                self._erro(numero, str(e))
+
+        # Designação já existente é mantida e a linha sai como erro (mesma
+        # regra do cadastro unitário)
+        designados = set()
+        if linhas:
+            chaves = [(dados["contrato_id"], dados["usuario_id"]) for _, dados in linhas]
+            designados = set(self.session.exec(
+                select(FiscalDesignado.contrato_id, FiscalDesignado.usuario_id)
+                .where(tuple_(FiscalDesignado.contrato_id, FiscalDesignado.usuario_id).in_(chaves))
+            ).all())
+        novas = []
+        for numero, dados in linhas:
+            if (dados["contrato_id"], dados["usuario_id"]) in designados:
+                self._erro(numero, "Fiscal já designado para este contrato")
+            else:
+                novas.append(dados)
+
+        # O rowcount também desconta designações gravadas por outra transação desde a consulta
+        return CargaLoteService.gravar(self.session, FiscalDesignado, novas, ("contrato_id", "usuario_id"), None)
+
+    def _lote_cronogramas(self, lote: List[Tuple[int, Dict[str, Any]]]) -> int:
+        self.contratos.carregar(_texto(linha.get("numero_contrato")) for _, linha in lote)
+        linhas = []
+        for numero, linha in lote:
+            try:
+                contrato_id = self._contrato_id(linha)
+                linhas.append({
+                    "contrato_id": contrato_id,
+                    "entidade_id": self.entidade_id,
+                    "etapa": _texto(linha.get("etapa")),
+                    "percentual_planejado": _decimal(linha.get("percentual_planejado")),
+                    "percentual_executado": _decimal(linha.get("percentual_executado")) or Decimal("0.00"),
+                    "data_prevista": _data(linha.get("data_prevista")),
+                    "data_realizada": _data(linha.get("data_realizada")),
+                    "status": _texto(linha.get("status")),
+                })
+                self.contratos_cronograma.add(contrato_id)
+            except (ErroLinha, ValueError) as e:
+                self._erro(numero, str(e))
+
+        if linhas:
+            self.session.exec(insert(CronogramaFisicoFin), params=linhas)
+        return len(linhas)
+
+    def _finalizar(self):
+        """Atualiza os derivados dos dados importados e descarta os caches de agregados"""
+        for contrato_id in sorted(self.contratos_cronograma):
+            CurvaSService.atualizar_contrato(self.session, contrato_id, self.entidade_id)
+        self.session.commit()
+        DashboardService.invalidar(self.entidade_id)
+        AnaliseCronogramaService.invalidar(self.entidade_id)
+
+    def _salvar_progresso(self, leitor: _Leitor):
+        self.importacao.bytes_processados = leitor.bytes_lidos() or self.importacao.bytes_processados
+        self.importacao.erros = json.dumps(self.erros, ensure_ascii=False) if self.erros else None
+        self.session.add(self.importacao)
+        self.session.commit()
+
+    def processar(self, progresso: Optional[Callable[[ImportacaoArquivo], None]] = None):
+        """
+        Lê o arquivo em lotes e grava cada lote com commit, salvando o
+        progresso na importação e repassando-o a `progresso` (ex.: update_state
+        da tarefa Celery). Cabeçalho sem as colunas obrigatórias encerra a
+        importação com status FALHOU. CSV em UTF-8 ou cp1252 (detectado pelo
+        início do arquivo); linhas com bytes inválidos na codificação
+        detectada são recusadas com erro.
+        """
+        importacao = self.importacao
+        importacao.status = "PROCESSANDO"
+        importacao.iniciado_em = datetime.utcnow()
+        self.session.add(importacao)
+        self.session.commit()
+
+        processar_lote = {
+            "CONTRATOS": self._lote_contratos,
+            "FISCAIS": self._lote_fiscais,
+            "CRONOGRAMAS": self._lote_cronogramas,
+        }[importacao.tipo]
+        leitor = _Leitor(importacao.caminho, importacao.formato, COLUNAS_OBRIGATORIAS[importacao.tipo])
+        linhas = leitor.linhas()
+
+        while True:
+            try:
+                lote = list(islice(linhas, settings.IMPORTACAO_LOTE))
+            except ErroCabecalho as e:
+                importacao.status = "FALHOU"
+                importacao.mensagem = str(e)
+                importacao.concluido_em = datetime.utcnow()
+                self._salvar_progresso(leitor)
+                return
+            if not lote:
+                break
+            importacao.linhas_lidas += len(lote)
+            validas = []
+            for numero, linha in lote:
+                if any(isinstance(valor, str) and "\ufffd" in valor for valor in linha.values()):
+                    self._erro(numero, "Caracteres inválidos para a codificação do arquivo")
+                else:
+                    validas.append((numero, linha))
+            importacao.linhas_importadas += processar_lote(validas)
+            self._salvar_progresso(leitor)
+            if progresso:
+                progresso(importacao)
+
+        self._finalizar()
+        importacao.status = "CONCLUIDA"
+        importacao.bytes_processados = importacao.tamanho_bytes
+        importacao.concluido_em = datetime.utcnow()
+        self._salvar_progresso(leitor)
+        logger.info(
+            f"Importação {importacao.id} concluída: {importacao.linhas_importadas} linhas importadas, "
+            f"{importacao.linhas_com_erro} com erro"
+        )
+
+
+def _documento_seguro(valor: Any, digitos: int) -> Optional[str]:
+    """_documento para o pré-carregamento do cache: inválido vira None (o erro sai na validação da linha)"""
+    try:
+        return _documento(valor, digitos)
+    except ErroLinha:
+        return None
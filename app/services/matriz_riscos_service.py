@@ -0,0 +1,135 @@
+import logging
+from typing import Any, Dict, Optional
+from sqlalchemy import delete, func, insert, true
+from sqlmodel import Session, select
+from app.models.contrato import Contrato
+from app.models.matriz_riscos import MatrizRiscos, classificar_nivel
+from app.models.matriz_riscos_resumo import MatrizRiscosResumo
+
+logger = logging.getLogger(__name__)
+
+# Dimensão da grade probabilidade x impacto
+ESCALA = 5
+
+
+class MatrizRiscosService:
+    """
+    Agregados da matriz de riscos sobre a tabela resumo matriz_riscos_resumo,
+    que guarda no máximo 25 linhas por contrato. O mapa de calor e a exposição
+    por contrato são lidos do resumo, sem varrer os riscos.
+    """
+
+    @staticmethod
+    def _agrupar(filtro):
+        """SELECT ... GROUP BY que gera as linhas do resumo a partir dos riscos ativos"""
+        return (
+            select(
+                MatrizRiscos.entidade_id,
+                MatrizRiscos.contrato_id,
+                MatrizRiscos.probabilidade,
+                MatrizRiscos.impacto,
+                func.count().label("quantidade")
+            )
+            .where(
+                filtro,
+                MatrizRiscos.status == "ATIVO",
+                MatrizRiscos.entidade_id.is_not(None),
+                MatrizRiscos.probabilidade.between(1, ESCALA),
+                MatrizRiscos.impacto.between(1, ESCALA)
+            )
+            .group_by(
+                MatrizRiscos.entidade_id,
+                MatrizRiscos.contrato_id,
+                MatrizRiscos.probabilidade,
+                MatrizRiscos.impacto
+            )
+        )
+
+    @staticmethod
+    def _inserir(session: Session, agrupado):
+        colunas = ["entidade_id", "contrato_id", "probabilidade", "impacto", "quantidade"]
+        session.exec(insert(MatrizRiscosResumo).from_select(colunas, agrupado))
+
+    @staticmethod
+    def atualizar_resumo_contrato(session: Session, contrato_id: int):
+        """
+        Refaz as células do contrato com um GROUP BY sobre os seus riscos.
+        Não faz commit: deve rodar na transação que alterou a matriz.
+
+        Antes, bloqueia a linha do contrato (FOR NO KEY UPDATE), para que
+        escritas concorrentes na matriz do mesmo contrato refaçam o resumo em
+        sequência, sem violar idx_matriz_riscos_resumo_celula.
+        """
+        session.exec(select(Contrato.id).where(Contrato.id == contrato_id).with_for_update(key_share=True))
+        session.exec(delete(MatrizRiscosResumo).where(MatrizRiscosResumo.contrato_id == contrato_id))
+        MatrizRiscosService._inserir(session, MatrizRiscosService._agrupar(MatrizRiscos.contrato_id == contrato_id))
+
+    @staticmethod
+    def reconstruir_resumo(session: Session, entidade_id: Optional[int] = None):
+        """Recalcula o resumo inteiro (ou de uma entidade) em um único GROUP BY"""
+        statement = delete(MatrizRiscosResumo)
+        filtro = true()
+        if entidade_id is not None:
+            statement = statement.where(MatrizRiscosResumo.entidade_id == entidade_id)
+            filtro = MatrizRiscos.entidade_id == entidade_id
+        session.exec(statement)
+        MatrizRiscosService._inserir(session, MatrizRiscosService._agrupar(filtro))
+        session.commit()
+
+    @staticmethod
+    def heatmap(session: Session, entidade_id: Optional[int], top: int = 10) -> Dict[str, Any]:
+        """
+        Grade 5x5 (grade[probabilidade-1][impacto-1]) com a quantidade de riscos
+        ativos, totais por nível e os `top` contratos de maior exposição
+        (soma de probabilidade × impacto dos riscos ativos).
+        """
+        filtro = MatrizRiscosResumo.entidade_id == entidade_id if entidade_id is not None else true()
+
+        celulas = session.exec(
+            select(
+                MatrizRiscosResumo.probabilidade,
+                MatrizRiscosResumo.impacto,
+                func.sum(MatrizRiscosResumo.quantidade)
+            )
+            .where(filtro)
+            .group_by(MatrizRiscosResumo.probabilidade, MatrizRiscosResumo.impacto)
+        ).all()
+
+        grade = [[0] * ESCALA for _ in range(ESCALA)]
+        por_nivel = {"BAIXO": 0, "MÉDIO": 0, "ALTO": 0}
+        for probabilidade, impacto, quantidade in celulas:
+            grade[probabilidade - 1][impacto - 1] = int(quantidade)
+            por_nivel[classificar_nivel(probabilidade * impacto)] += int(quantidade)
+
+        exposicao = func.sum(MatrizRiscosResumo.quantidade * MatrizRiscosResumo.probabilidade * MatrizRiscosResumo.impacto)
+        contratos = session.exec(
+            select(
+                MatrizRiscosResumo.contrato_id,
+                Contrato.numero_contrato,
+                func.sum(MatrizRiscosResumo.quantidade).label("riscos"),
+                exposicao.label("exposicao"),
+                func.max(MatrizRiscosResumo.probabilidade * MatrizRiscosResumo.impacto).label("score_maximo")
+            )
+            .join(Contrato, Contrato.id == MatrizRiscosResumo.contrato_id)
+            .where(filtro)
+            .group_by(MatrizRiscosResumo.contrato_id, Contrato.numero_contrato)
+            .order_by(exposicao.desc(), MatrizRiscosResumo.contrato_id)
+            .limit(top)
+        ).all()
+
+        return {
+            "entidade_id": entidade_id,
+            "grade": grade,
+            "total_riscos": sum(por_nivel.values()),
+            "por_nivel": por_nivel,
+            "contratos": [
+                {
+                    "contrato_id": c.contrato_id,
+                    "numero_contrato": c.numero_contrato,
+                    "riscos": int(c.riscos),
+                    "exposicao": int(c.exposicao),
+                    "score_maximo": int(c.score_maximo),
+                }
+                for c in contratos
+            ],
+        }
@@ -0,0 +1,173 @@
+import logging
+from datetime import date
+from typing import Any, Dict, Optional
+from sqlalchemy import delete, extract, func, insert, true
+from sqlmodel import Session, select
+from app.models.contrato import Contrato
+from app.models.fornecedor import Fornecedor
+from app.models.penalidade import Penalidade
+from app.models.penalidade_resumo import PenalidadeResumo
+
+logger = logging.getLogger(__name__)
+
+
+def _numero(valor) -> float:
+    return round(float(valor), 2) if valor is not None else 0.0
+
+
+class PenalidadeService:
+    """
+    Totais de penalidades e multas sobre a tabela resumo penalidade_resumo
+    (uma linha por contrato, mês, tipo e status). Os relatórios agregam o
+    resumo, sem varrer as penalidades.
+    """
+
+    @staticmethod
+    def _agrupar(filtro):
+        """
+        SELECT ... GROUP BY que gera as linhas do resumo. O mês é o de
+        data_aplicacao ou, na falta dela, o do registro da penalidade.
+        """
+        referencia = func.coalesce(Penalidade.data_aplicacao, Penalidade.created_at)
+        ano = extract("year", referencia)
+        mes = extract("month", referencia)
+        return (
+            select(
+                Penalidade.entidade_id,
+                Penalidade.contrato_id,
+                ano.label("ano"),
+                mes.label("mes"),
+                Penalidade.tipo,
+                Penalidade.status,
+                func.count().label("quantidade"),
+                func.coalesce(func.sum(Penalidade.valor_multa), 0).label("valor_total")
+            )
+            .where(filtro, Penalidade.entidade_id.is_not(None))
+            .group_by(Penalidade.entidade_id, Penalidade.contrato_id, ano, mes, Penalidade.tipo, Penalidade.status)
+        )
+
+    @staticmethod
+    def _inserir(session: Session, agrupado):
+        colunas = ["entidade_id", "contrato_id", "ano", "mes", "tipo", "status", "quantidade", "valor_total"]
+        session.exec(insert(PenalidadeResumo).from_select(colunas, agrupado))
+
+    @staticmethod
+    def atualizar_resumo_contrato(session: Session, contrato_id: int):
+        """
+        Refaz as linhas do contrato com um GROUP BY sobre as suas penalidades
+        (idx_penalidade_contrato_status_data). Não faz commit: deve rodar na
+        transação que alterou a penalidade.
+
+        O contrato fica bloqueado (FOR NO KEY UPDATE) até o commit: duas
+        penalidades gravadas ao mesmo tempo no contrato refazem o resumo uma
+        após a outra, e o GROUP BY da segunda já enxerga a primeira.
+        """
+        session.exec(select(Contrato.id).where(Contrato.id == contrato_id).with_for_update(key_share=True))
+        session.exec(delete(PenalidadeResumo).where(PenalidadeResumo.contrato_id == contrato_id))
+        PenalidadeService._inserir(session, PenalidadeService._agrupar(Penalidade.contrato_id == contrato_id))
+
+    @staticmethod
+    def reconstruir_resumo(session: Session, entidade_id: Optional[int] = None):
+        """Recalcula o resumo inteiro (ou de uma entidade) em um único GROUP BY"""
+        statement = delete(PenalidadeResumo)
+        filtro = true()
+        if entidade_id is not None:
+            statement = statement.where(PenalidadeResumo.entidade_id == entidade_id)
+            filtro = Penalidade.entidade_id == entidade_id
+        session.exec(statement)
+        PenalidadeService._inserir(session, PenalidadeService._agrupar(filtro))
+        session.commit()
+
+    @staticmethod
+    def resumo(
+        session: Session,
+        entidade_id: Optional[int],
+        contrato_id: Optional[int] = None,
+        fornecedor_id: Optional[int] = None,
+        data_inicio: Optional[date] = None,
+        data_fim: Optional[date] = None,
+        top: int = 10
+    ) -> Dict[str, Any]:
+        """
+        Quantidade e valor das penalidades: totais, por status, por tipo, por
+        mês e os `top` fornecedores e contratos de maior valor em multas.
+        O período é aplicado por mês (data_inicio e data_fim inclusive).
+        """
+        competencia = PenalidadeResumo.ano * 100 + PenalidadeResumo.mes
+        filtros = []
+        if entidade_id is not None:
+            filtros.append(PenalidadeResumo.entidade_id == entidade_id)
+        if contrato_id is not None:
+            filtros.append(PenalidadeResumo.contrato_id == contrato_id)
+        if fornecedor_id is not None:
+            filtros.append(Contrato.fornecedor_id == fornecedor_id)
+        if data_inicio is not None:
+            filtros.append(competencia >= data_inicio.year * 100 + data_inicio.month)
+        if data_fim is not None:
+            filtros.append(competencia <= data_fim.year * 100 + data_fim.month)
+
+        quantidade = func.sum(PenalidadeResumo.quantidade)
+        valor = func.sum(PenalidadeResumo.valor_total)
+
+        def agrupar(*colunas, ordem=None, limite=None):
+            statement = (
+                select(*colunas, quantidade, valor)
+                .select_from(PenalidadeResumo)
+                .join(Contrato, Contrato.id == PenalidadeResumo.contrato_id)
+                .where(*filtros)
+            )
+            if colunas:
+                statement = statement.group_by(*colunas)
+            if ordem is not None:
+                statement = statement.order_by(*ordem)
+            if limite is not None:
+                statement = statement.limit(limite)
+            return session.exec(statement).all()
+
+        total_quantidade, total_valor = agrupar()[0]
+        por_status = agrupar(PenalidadeResumo.status, ordem=[PenalidadeResumo.status])
+        por_tipo = agrupar(PenalidadeResumo.tipo, ordem=[PenalidadeResumo.tipo])
+        por_periodo = agrupar(
+            PenalidadeResumo.ano, PenalidadeResumo.mes,
+            ordem=[PenalidadeResumo.ano, PenalidadeResumo.mes]
+        )
+        por_contrato = agrupar(
+            PenalidadeResumo.contrato_id, Contrato.numero_contrato,
+            ordem=[valor.desc(), PenalidadeResumo.contrato_id], limite=top
+        )
+        por_fornecedor = session.exec(
+            select(Contrato.fornecedor_id, Fornecedor.razao_social, quantidade, valor)
+            .select_from(PenalidadeResumo)
+            .join(Contrato, Contrato.id == PenalidadeResumo.contrato_id)
+            .join(Fornecedor, Fornecedor.id == Contrato.fornecedor_id)
+            .where(*filtros)
+            .group_by(Contrato.fornecedor_id, Fornecedor.razao_social)
+            .order_by(valor.desc(), Contrato.fornecedor_id)
+            .limit(top)
+        ).all()
+
+        return {
+            "entidade_id": entidade_id,
+            "quantidade": int(total_quantidade or 0),
+            "valor_total": _numero(total_valor),
+            "por_status": [
+                {"status": s, "quantidade": int(q), "valor_total": _numero(v)}
+                for s, q, v in por_status
+            ],
+            "por_tipo": [
+                {"tipo": t, "quantidade": int(q), "valor_total": _numero(v)}
+                for t, q, v in por_tipo
+            ],
+            "por_periodo": [
+                {"periodo": f"{int(a):04d}-{int(m):02d}", "quantidade": int(q), "valor_total": _numero(v)}
+                for a, m, q, v in por_periodo
+            ],
+            "por_contrato": [
+                {"contrato_id": c, "numero_contrato": n, "quantidade": int(q), "valor_total": _numero(v)}
+                for c, n, q, v in por_contrato
+            ],
+            "por_fornecedor": [
+                {"fornecedor_id": f, "razao_social": r, "quantidade": int(q), "valor_total": _numero(v)}
+                for f, r, q, v in por_fornecedor
+            ],
+        }
@@ -1,9 +1,11 @@
 import httpx
 import json
 import logging
+import time
 from typing import Dict, List, Optional, Any
 from datetime import datetime, date
 from app.core.config import settings
+from app.core.metricas import PNCP_ERROS, PNCP_LATENCIA, recurso_pncp
 
 logger = logging.getLogger(__name__)
 
@@ -21,6 +23,8 @@ class PNCPService:
         Faz uma requisição para a API do PNCP
         """
         url = f"{PNCPService.BASE_URL}{endpoint}"
+        recurso = recurso_pncp(endpoint)
+        inicio = time.perf_counter()
 
         try:
             async with httpx.AsyncClient(timeout=PNCPService.TIMEOUT) as client:
@@ -28,11 +32,15 @@ class PNCPService:
                 response.raise_for_status()
                 return response.json()
         except httpx.HTTPError as e:
+            PNCP_ERROS.labels(recurso, type(e).__name__).inc()
             logger.error(f"Erro na requisição PNCP: {e}")
             raise Exception(f"Erro ao consultar PNCP: {str(e)}")
         except Exception as e:
+            PNCP_ERROS.labels(recurso, type(e).__name__).inc()
             logger.error(f"Erro inesperado no PNCP: {e}")
             raise Exception(f"Erro inesperado: {str(e)}")
+        finally:
+            PNCP_LATENCIA.labels(recurso).observe(time.perf_counter() - inicio)
 
     @staticmethod
     async def validar_fornecedor(cnpj: str) -> Dict[str, Any]:
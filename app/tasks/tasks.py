@@ -1,4 +1,7 @@
 from app.core.celery_app import celery_app
+from app.core.database import engine
+import app.core.etag  # noqa: F401 - registra a invalidação de ETags nas sessões do worker
+from sqlmodel import Session
 import logging
 
 logger = logging.getLogger(__name__)
@@ -51,4 +54,142 @@ def send_notification_task(self, user_id: int, message: str):
 
     except Exception as exc:
         logger.error(f"Erro ao enviar notificação: {str(exc)}")
-        raise self.retry(countdown=120, exc=exc)
\ No newline at end of file
+        raise self.retry(countdown=120, exc=exc)
+
+@celery_app.task(bind=True)
+def varrer_certidoes_vencidas(self):
+    """
+    Varredura noturna: marca certidões vencidas e atualiza a regularidade dos fornecedores
+    """
+    try:
+        from app.services.certidao_service import CertidaoService
+
+        logger.info("Iniciando varredura de certidões vencidas")
+
+        with Session(engine) as session:
+            resultado = CertidaoService.varrer_vencimentos(session)
+
+        return {
+            "status": "success",
+            "certidoes_vencidas": resultado["certidoes_vencidas"],
+            "fornecedores_alterados": resultado["fornecedores_alterados"]
+        }
+
+    except Exception as exc:
+        logger.error(f"Erro na varredura de certidões: {str(exc)}")
+        raise self.retry(countdown=600, exc=exc)
+
+@celery_app.task(bind=True)
+def recalcular_scores_fornecedores(self):
+    """
+    Passada completa do score de risco de todos os fornecedores.
+    As escritas já atualizam o score incrementalmente; esta tarefa corrige
+    qualquer divergência causada por alterações feitas fora da API.
+    """
+    try:
+        from app.services.fornecedor_score_service import FornecedorScoreService
+
+        with Session(engine) as session:
+            total = FornecedorScoreService.recalcular_entidade(session)
+
+        return {"status": "success", "fornecedores": total}
+
+    except Exception as exc:
+        logger.error(f"Erro no recálculo de scores de fornecedores: {str(exc)}")
+        raise self.retry(countdown=600, exc=exc)
+
+@celery_app.task(bind=True)
+def consolidar_execucao_financeira(self):
+    """
+    Consolida na série mensal os lançamentos de execução financeira
+    incluídos desde a última execução (apenas os contratos afetados).
+    """
+    try:
+        from app.services.execucao_financeira_service import ExecucaoFinanceiraService
+
+        with Session(engine) as session:
+            total = ExecucaoFinanceiraService.consolidar_mensal(session)
+
+        return {"status": "success", "contratos": total}
+
+    except Exception as exc:
+        logger.error(f"Erro na consolidação da execução financeira: {str(exc)}")
+        raise self.retry(countdown=300, exc=exc)
+
+@celery_app.task(bind=True)
+def importar_arquivo(self, importacao_id: int):
+    """
+    Processa uma planilha enviada em /importacoes: lê o arquivo em lotes,
+    grava cada lote e publica o progresso no estado da tarefa (PROGRESS),
+    consultável em /importacoes/task/{task_id}. Não há nova tentativa:
+    os lotes já gravados permanecem e a importação fica com status FALHOU.
+    O arquivo enviado é apagado ao final, com sucesso ou falha.
+    """
+    import os
+    from datetime import datetime
+    from app.models.importacao_arquivo import ImportacaoArquivo
+    from app.models.usuario import Usuario
+    from app.services.importacao_service import ImportacaoService
+
+    def progresso(importacao):
+        # XLSX é lido pelo openpyxl sem posição de bytes: o progresso é em linhas lidas
+        if importacao.formato == "XLSX":
+            unidade, atual, total = "linhas", importacao.linhas_lidas, None
+        else:
+            unidade, atual, total = "bytes", importacao.bytes_processados, importacao.tamanho_bytes
+        self.update_state(state="PROGRESS", meta={
+            "importacao_id": importacao.id,
+            "unidade": unidade,
+            "current": atual,
+            "total": total,
+            "linhas_lidas": importacao.linhas_lidas,
+            "linhas_importadas": importacao.linhas_importadas,
+            "linhas_com_erro": importacao.linhas_com_erro,
+        })
+
+    with Session(engine) as session:
+        importacao = session.get(ImportacaoArquivo, importacao_id)
+        if importacao is None:
+            return {"status": "not_found", "importacao_id": importacao_id}
+        caminho = importacao.caminho
+        try:
+            usuario = session.get(Usuario, importacao.usuario_id)
+            ImportacaoService(session, importacao, usuario).processar(progresso)
+        except Exception as exc:
+            logger.error(f"Erro na importação {importacao_id}: {str(exc)}")
+            session.rollback()
+            importacao.status = "FALHOU"
+            importacao.mensagem = str(exc)[:1000]
+            importacao.concluido_em = datetime.utcnow()
+            session.add(importacao)
+            session.commit()
+            raise
+        finally:
+            if os.path.exists(caminho):
+                os.remove(caminho)
+
+        return {
+            "status": importacao.status,
+            "importacao_id": importacao.id,
+            "linhas_lidas": importacao.linhas_lidas,
+            "linhas_importadas": importacao.linhas_importadas,
+            "linhas_com_erro": importacao.linhas_com_erro,
+        }
+
+@celery_app.task(bind=True)
+def detectar_fornecedores_duplicados(self, entidade_id: int = None):
+    """
+    Detecção em lote de fornecedores possivelmente duplicados (mesma raiz de
+    CNPJ ou razão social semelhante), para revisão em /fornecedores/duplicatas.
+    """
+    try:
+        from app.services.fornecedor_duplicidade_service import FornecedorDuplicidadeService
+
+        with Session(engine) as session:
+            resultado = FornecedorDuplicidadeService.detectar(session, entidade_id)
+
+        return {"status": "success", **resultado}
+
+    except Exception as exc:
+        logger.error(f"Erro na detecção de fornecedores duplicados: {str(exc)}")
+        raise self.retry(countdown=600, exc=exc)
@@ -0,0 +1,107 @@
+"""
+Benchmark da análise de atraso dos cronogramas.
+
+Compara, para uma entidade com milhares de etapas:
+  - orm: uma consulta ORM por contrato e cálculo etapa a etapa em Python;
+  - vetorizado: uma consulta colunar + agregações NumPy (AnaliseCronogramaService);
+  - cache: segunda chamada, servida do cache da entidade.
+
+Uso:
+    python benchmarks/bench_analise_cronograma.py
+"""
+import os
+import sys
+import time
+import random
+import tempfile
+from datetime import date, timedelta
+from decimal import Decimal
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy import insert, text
+from sqlmodel import SQLModel, Session, create_engine, select
+from app.models.entidade import Entidade
+from app.models.usuario import Usuario  # noqa: F401  (alvo de FKs de entidade e contrato)
+from app.models.fornecedor import Fornecedor
+from app.models.contrato import Contrato
+from app.models.cronograma_fisico_fin import CronogramaFisicoFin
+from app.services.analise_cronograma_service import AnaliseCronogramaService
+
+CONTRATOS = (500, 2000, 5000)
+ETAPAS_POR_CONTRATO = 10
+
+
+def popular(session: Session, contrato_inicial: int, contrato_final: int):
+    hoje = date.today()
+    random.seed(contrato_inicial)
+    contratos = []
+    etapas = []
+    for c in range(contrato_inicial, contrato_final):
+        contratos.append({
+            "id": c, "entidade_id": 1, "numero_contrato": f"B-{c}", "objeto": "Benchmark",
+            "fornecedor_id": 1, "valor_global": Decimal("1000.00"), "status": "VIGENTE",
+            "data_inicio": hoje - timedelta(days=365),
+        })
+        for e in range(ETAPAS_POR_CONTRATO):
+            prevista = hoje - timedelta(days=365) + timedelta(days=73 * e)
+            concluida = prevista < hoje and random.random() < 0.7
+            etapas.append({
+                "contrato_id": c, "entidade_id": 1, "etapa": f"Etapa {e}",
+                "percentual_planejado": Decimal("10.00"),
+                "percentual_executado": Decimal("100.00") if concluida else Decimal(random.randint(0, 90)),
+                "data_prevista": prevista,
+                "data_realizada": prevista + timedelta(days=random.randint(-5, 20)) if concluida else None,
+            })
+    session.exec(insert(Contrato), params=contratos)
+    session.exec(insert(CronogramaFisicoFin), params=etapas)
+    session.commit()
+
+
+def analise_orm(session: Session, hoje: date):
+    """Abordagem por requisição: etapas de cada contrato via ORM, laço em Python"""
+    resultado = []
+    contratos = session.exec(select(Contrato.id).where(Contrato.entidade_id == 1)).all()
+    for contrato_id in contratos:
+        etapas = session.exec(select(CronogramaFisicoFin).where(CronogramaFisicoFin.contrato_id == contrato_id)).all()
+        planejado = sum(e.percentual_planejado or 0 for e in etapas if e.data_prevista and e.data_prevista <= hoje)
+        executado = sum((e.percentual_planejado or 0) * e.percentual_executado / 100 for e in etapas)
+        vencidas = [e for e in etapas if e.data_prevista and e.data_prevista < hoje and not e.data_realizada]
+        resultado.append((contrato_id, planejado - executado, len(vencidas)))
+        session.expunge_all()
+    return resultado
+
+
+def medir(funcao):
+    inicio = time.perf_counter()
+    funcao()
+    return (time.perf_counter() - inicio) * 1000
+
+
+def main():
+    caminho = os.path.join(tempfile.mkdtemp(), "bench_analise.db")
+    engine = create_engine(f"sqlite:///{caminho}")
+    SQLModel.metadata.create_all(engine)
+    hoje = date.today()
+
+    with Session(engine) as session:
+        session.exec(insert(Entidade), params=[{"id": 1, "cnpj": "1".zfill(14), "razao_social": "Entidade", "status": "ATIVA"}])
+        session.exec(insert(Fornecedor), params=[{"id": 1, "entidade_id": 1, "cnpj": "2".zfill(14), "razao_social": "Fornecedor"}])
+        session.commit()
+
+        print(f"{'contratos':>10} {'etapas':>8} {'orm (ms)':>10} {'vetorizado (ms)':>16} {'cache (ms)':>11}")
+        criados = 1
+        for total in CONTRATOS:
+            popular(session, criados, total + 1)
+            criados = total + 1
+            session.exec(text("ANALYZE"))
+
+            AnaliseCronogramaService.invalidar(1, hoje)
+            ms_orm = medir(lambda: analise_orm(session, hoje))
+            ms_vetorizado = medir(lambda: AnaliseCronogramaService.analisar(session, 1, hoje=hoje))
+            ms_cache = medir(lambda: AnaliseCronogramaService.analisar(session, 1, hoje=hoje))
+            print(f"{total:>10} {total * ETAPAS_POR_CONTRATO:>8} {ms_orm:>10.1f} {ms_vetorizado:>16.1f} {ms_cache:>11.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Benchmark da carga em lote de fornecedores, contratos e certidões.
+
+Compara, pela API (TestClient, sem rede):
+  - item a item: um POST por registro (SELECT de unicidade, commit e refresh
+    em cada requisição), como numa implantação feita com os endpoints atuais;
+  - lote: um POST /bulk com todos os itens (validação por consulta única e
+    INSERT ... ON CONFLICT em blocos).
+O lote é medido também como reenvio (todos os itens já existem: upsert).
+
+Uso:
+    python benchmarks/bench_carga_lote.py
+"""
+import os
+import sys
+import time
+import tempfile
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench_carga.db')}"
+os.environ["ENVIRONMENT"] = "test"
+
+from fastapi.testclient import TestClient
+from sqlalchemy import insert
+from sqlmodel import Session
+from main import app
+from app.core.auth import get_current_user
+from app.core.database import create_db_and_tables, engine
+from app.models.entidade import Entidade
+from app.models.usuario import Usuario
+from app.models.tipo_certidao import TipoCertidao
+
+ITENS_POR_ITEM = 1000
+ITENS_LOTE = (1000, 10000)
+
+ROOT = Usuario(id=1, entidade_id=1, nome="Root", cpf="0", email="root@x", senha_hash="x", perfil="ROOT")
+
+
+def fornecedores(inicio, quantidade):
+    return [
+        {"entidade_id": 1, "cnpj": f"{inicio + i:014d}", "razao_social": f"Fornecedor {inicio + i}"}
+        for i in range(quantidade)
+    ]
+
+
+def contratos(inicio, quantidade, fornecedor_id):
+    return [
+        {
+            "entidade_id": 1, "numero_contrato": f"C-{inicio + i}", "objeto": "Benchmark",
+            "fornecedor_id": fornecedor_id, "valor_global": "1000.00"
+        }
+        for i in range(quantidade)
+    ]
+
+
+def certidoes(inicio, quantidade, fornecedor_id):
+    hoje = date.today()
+    return [
+        {
+            "fornecedor_id": fornecedor_id, "tipo_certidao_id": 1, "numero_protocolo": f"P-{inicio + i}",
+            "data_emissao": hoje.isoformat(), "data_validade": (hoje + timedelta(days=180)).isoformat()
+        }
+        for i in range(quantidade)
+    ]
+
+
+def por_item(client, rota, itens):
+    inicio = time.perf_counter()
+    for item in itens:
+        assert client.post(rota, json=item).status_code == 200
+    return (time.perf_counter() - inicio) * 1000
+
+
+def em_lote(client, rota, itens):
+    inicio = time.perf_counter()
+    response = client.post(f"{rota}/bulk", json=itens)
+    assert response.status_code == 200 and response.json()["erros"] == 0
+    return (time.perf_counter() - inicio) * 1000
+
+
+def main():
+    create_db_and_tables()
+    with Session(engine) as session:
+        session.exec(insert(Entidade), params=[{"id": 1, "cnpj": "1".zfill(14), "razao_social": "Entidade", "status": "ATIVA"}])
+        session.exec(insert(TipoCertidao), params=[{"id": 1, "codigo": "CND", "nome": "CND"}])
+        session.commit()
+    app.dependency_overrides[get_current_user] = lambda: ROOT
+    client = TestClient(app)
+
+    fornecedor_id = client.post("/fornecedores/bulk", json=fornecedores(10**9, 1)).json()["itens"][0]["id"]
+    cargas = (
+        ("/fornecedores", lambda inicio, n: fornecedores(inicio, n)),
+        ("/contratos", lambda inicio, n: contratos(inicio, n, fornecedor_id)),
+        ("/certidoes-fornecedor", lambda inicio, n: certidoes(inicio, n, fornecedor_id)),
+    )
+
+    print(f"{'rota':>22} {'itens':>6} {'item a item (ms)':>17} {'lote (ms)':>10} {'reenvio (ms)':>13} {'ms/item lote':>13}")
+    for rota, gerar in cargas:
+        ms_item = por_item(client, rota, gerar(0, ITENS_POR_ITEM))
+        print(f"{rota:>22} {ITENS_POR_ITEM:>6} {ms_item:>17.0f} {'':>10} {'':>13} {'':>13}")
+        base = ITENS_POR_ITEM
+        for quantidade in ITENS_LOTE:
+            itens = gerar(base, quantidade)
+            base += quantidade
+            ms_lote = em_lote(client, rota, itens)
+            ms_reenvio = em_lote(client, rota, itens)
+            print(f"{rota:>22} {quantidade:>6} {'':>17} {ms_lote:>10.0f} {ms_reenvio:>13.0f} {ms_lote / quantidade:>13.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Benchmark da listagem de certidões filtrada por tenant.
+
+Mantém fixo o tamanho de uma entidade e cresce o total de certidões das
+demais entidades. Com o filtro via join em fornecedor (idx_fornecedor_entidade_id
++ idx_certidao_fornecedor_validade) o tempo deve acompanhar o tamanho do
+tenant, e não o da tabela global.
+
+Uso:
+    python benchmarks/bench_certidoes_tenant.py
+"""
+import os
+import sys
+import time
+import tempfile
+from typing import Tuple
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy import insert, text
+from sqlmodel import SQLModel, Session, create_engine, select
+from app.core.guards import apply_tenant_filter
+from app.models.entidade import Entidade
+from app.models.usuario import Usuario
+from app.models.fornecedor import Fornecedor
+from app.models.tipo_certidao import TipoCertidao
+from app.models.certidao_fornecedor import CertidaoFornecedor
+
+FORNECEDORES_POR_ENTIDADE = 50
+CERTIDOES_POR_FORNECEDOR = 4
+TAMANHOS_GLOBAIS = (10, 100, 500)  # quantidade de entidades na base
+REPETICOES = 20
+
+
+def popular(session: Session, entidade_inicial: int, entidade_final: int):
+    """Insere entidades, fornecedores e certidões em lote"""
+    hoje = date.today()
+    entidades = [
+        {"id": e, "cnpj": f"{e:014d}", "razao_social": f"Entidade {e}", "status": "ATIVA"}
+        for e in range(entidade_inicial, entidade_final)
+    ]
+    fornecedores = []
+    certidoes = []
+    for e in range(entidade_inicial, entidade_final):
+        for f in range(FORNECEDORES_POR_ENTIDADE):
+            fornecedor_id = e * FORNECEDORES_POR_ENTIDADE + f
+            fornecedores.append({
+                "id": fornecedor_id,
+                "entidade_id": e,
+                "cnpj": f"{fornecedor_id:014d}",
+                "razao_social": f"Fornecedor {fornecedor_id}",
+            })
+            for c in range(CERTIDOES_POR_FORNECEDOR):
+                certidoes.append({
+                    "fornecedor_id": fornecedor_id,
+                    "tipo_certidao_id": 1,
+                    "data_emissao": hoje,
+                    "data_validade": hoje + timedelta(days=30 * c),
+                    "situacao": "VÁLIDA",
+                })
+    session.exec(insert(Entidade), params=entidades)
+    session.exec(insert(Fornecedor), params=fornecedores)
+    session.exec(insert(CertidaoFornecedor), params=certidoes)
+    session.commit()
+
+
+def statement_tenant(usuario: Usuario):
+    """Mesma consulta de list_certidoes, sem paginação"""
+    statement = select(CertidaoFornecedor).join(
+        Fornecedor, Fornecedor.id == CertidaoFornecedor.fornecedor_id
+    )
+    return apply_tenant_filter(statement, Fornecedor, usuario)
+
+
+def medir(session: Session, statement) -> Tuple[float, int]:
+    inicio = time.perf_counter()
+    for _ in range(REPETICOES):
+        linhas = session.exec(statement).all()
+    duracao = (time.perf_counter() - inicio) / REPETICOES
+    return duracao * 1000, len(linhas)
+
+
+def main():
+    caminho = os.path.join(tempfile.mkdtemp(), "bench_certidoes.db")
+    engine = create_engine(f"sqlite:///{caminho}")
+    SQLModel.metadata.create_all(engine)
+
+    usuario = Usuario(id=1, entidade_id=1, nome="Gestor", cpf="0", email="g@x", senha_hash="x", perfil="GESTOR")
+    statement = statement_tenant(usuario)
+    sem_filtro = select(CertidaoFornecedor).where(CertidaoFornecedor.situacao == "VÁLIDA")
+
+    with Session(engine) as session:
+        session.add(TipoCertidao(id=1, codigo="CND", nome="CND"))
+        session.commit()
+
+        print(f"{'entidades':>10} {'certidões':>10} {'tenant (ms)':>12} {'linhas':>7} {'sem filtro (ms)':>16}")
+        entidades_criadas = 1
+        for total in TAMANHOS_GLOBAIS:
+            popular(session, entidades_criadas, total + 1)
+            entidades_criadas = total + 1
+            session.exec(text("ANALYZE"))
+
+            ms_tenant, linhas = medir(session, statement)
+            ms_global, _ = medir(session, sem_filtro)
+            total_certidoes = total * FORNECEDORES_POR_ENTIDADE * CERTIDOES_POR_FORNECEDOR
+            print(f"{total:>10} {total_certidoes:>10} {ms_tenant:>12.2f} {linhas:>7} {ms_global:>16.2f}")
+
+        compilado = statement.compile(engine, compile_kwargs={"literal_binds": True})
+        print("\nPlano da consulta por tenant:")
+        for linha in session.exec(text(f"EXPLAIN QUERY PLAN {compilado}")).all():
+            print("  ", linha[-1])
+
+
+if __name__ == "__main__":
+    main()
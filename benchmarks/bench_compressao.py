@@ -0,0 +1,88 @@
+"""
+Benchmark da compressão das respostas (CompressaoMiddleware).
+
+Para o corpo de cada rota de listagem (100 linhas sintéticas, geradas como
+em bench_serializacao) e para /openapi.json, mede por algoritmo (br, zstd,
+gzip, nos níveis configurados):
+  - bytes na rede e razão em relação ao corpo original;
+  - CPU por resposta (ms), passando pelo middleware ASGI completo.
+
+Uso:
+    python benchmarks/bench_compressao.py
+"""
+import os
+import sys
+import time
+import asyncio
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+# Define DATABASE_URL e ENVIRONMENT antes de importar a aplicação
+from bench_serializacao import LINHAS, ROTAS, popular
+
+from sqlmodel import Session, select
+from main import app
+from app.core.compressao import CompressaoMiddleware, compressores_disponiveis
+from app.core.database import create_db_and_tables, engine
+from app.core.serializacao import colunas_read, resposta_linhas
+
+REPETICOES = 200
+
+
+def app_estatico(corpo: bytes):
+    """Aplicação ASGI que devolve sempre o mesmo corpo JSON (isola o custo da compressão)"""
+    async def aplicacao(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": [
+            (b"content-type", b"application/json"), (b"content-length", str(len(corpo)).encode())
+        ]})
+        await send({"type": "http.response.body", "body": corpo})
+    return aplicacao
+
+
+async def comprimir(middleware, algoritmo):
+    enviado = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(mensagem):
+        if mensagem["type"] == "http.response.body":
+            enviado.append(mensagem["body"])
+
+    scope = {"type": "http", "method": "GET", "headers": [(b"accept-encoding", algoritmo.encode())]}
+    await middleware(scope, receive, send)
+    return sum(len(parte) for parte in enviado)
+
+
+async def medir(corpos):
+    algoritmos = list(compressores_disponiveis())
+    cabecalho = f"{'rota':<28} {'original':>9}" + "".join(f" {nome + ' bytes':>11} {nome + ' ms':>8}" for nome in algoritmos)
+    print(cabecalho)
+    for caminho, corpo in corpos:
+        middleware = CompressaoMiddleware(app_estatico(corpo), minimo_bytes=0)
+        linha = f"{caminho:<28} {len(corpo):>9}"
+        for algoritmo in algoritmos:
+            tamanho = await comprimir(middleware, algoritmo)
+            inicio = time.perf_counter()
+            for _ in range(REPETICOES):
+                await comprimir(middleware, algoritmo)
+            ms = (time.perf_counter() - inicio) / REPETICOES * 1000
+            linha += f" {tamanho:>6} {len(corpo) / tamanho:>3.0f}x {ms:>8.3f}"
+        print(linha)
+
+
+def main_bench():
+    create_db_and_tables()
+    corpos = []
+    for caminho, modelo, modelo_read in ROTAS:
+        popular(modelo)
+        with Session(engine) as session:
+            linhas = session.execute(select(*colunas_read(modelo_read, modelo)).limit(LINHAS)).all()
+        corpos.append((caminho, resposta_linhas(linhas).body))
+    corpos.append(("/openapi.json", resposta_linhas([]).render(app.openapi())))
+    asyncio.run(medir(corpos))
+
+
+if __name__ == "__main__":
+    main_bench()
@@ -0,0 +1,121 @@
+"""
+Benchmark do saldo e da previsão de execução financeira de um contrato.
+
+Compara, à medida que o livro cresce:
+  - direto: SUM sobre execucao_financeira (saldo) e GROUP BY por mês
+    dos lançamentos do contrato (ritmo) a cada requisição;
+  - mantido: ExecucaoFinanceiraService.resumo, que lê o total de
+    contrato.valor_executado e os últimos meses de execucao_financeira_mensal.
+Meta: tempo do caminho mantido constante com o tamanho do livro.
+
+Uso:
+    python benchmarks/bench_execucao_financeira.py
+"""
+import os
+import sys
+import time
+import random
+import tempfile
+from datetime import date, timedelta
+from decimal import Decimal
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy import extract, func, insert, text, update
+from sqlmodel import SQLModel, Session, create_engine, select
+from app.models.entidade import Entidade
+from app.models.usuario import Usuario  # noqa: F401  (alvo de FKs de entidade e contrato)
+from app.models.fornecedor import Fornecedor
+from app.models.contrato import Contrato
+from app.models.execucao_financeira import ExecucaoFinanceira
+from app.models.execucao_financeira_mensal import ExecucaoFinanceiraMensal  # noqa: F401
+from app.services.execucao_financeira_service import ExecucaoFinanceiraService
+
+CONTRATOS = 100
+LANCAMENTOS_TOTAIS = (50_000, 200_000, 1_000_000)
+REPETICOES = 50
+HOJE = date(2026, 10, 19)
+
+
+def popular(session: Session, quantidade: int):
+    random.seed(quantidade)
+    lancamentos = [
+        {
+            "entidade_id": 1,
+            "contrato_id": random.randint(1, CONTRATOS),
+            "tipo": "MEDICAO",
+            "data_lancamento": HOJE - timedelta(days=random.randint(1, 3650)),
+            "valor": Decimal("10.00"),
+            "origem": "MANUAL",
+        }
+        for _ in range(quantidade)
+    ]
+    for inicio in range(0, quantidade, 50_000):
+        session.exec(insert(ExecucaoFinanceira), params=lancamentos[inicio:inicio + 50_000])
+    session.exec(
+        update(Contrato).values(valor_executado=(
+            select(func.sum(ExecucaoFinanceira.valor))
+            .where(ExecucaoFinanceira.contrato_id == Contrato.id)
+            .scalar_subquery()
+        ))
+    )
+    session.commit()
+
+
+def resumo_direto(session: Session, contrato_id: int):
+    """Mesma informação calculada sobre o livro inteiro do contrato"""
+    executado = session.exec(
+        select(func.sum(ExecucaoFinanceira.valor)).where(ExecucaoFinanceira.contrato_id == contrato_id)
+    ).one()
+    ano = extract("year", ExecucaoFinanceira.data_lancamento)
+    mes = extract("month", ExecucaoFinanceira.data_lancamento)
+    serie = session.exec(
+        select(ano, mes, func.sum(ExecucaoFinanceira.valor))
+        .where(ExecucaoFinanceira.contrato_id == contrato_id)
+        .group_by(ano, mes)
+    ).all()
+    return executado, serie
+
+
+def medir(funcao):
+    inicio = time.perf_counter()
+    for _ in range(REPETICOES):
+        funcao()
+    return (time.perf_counter() - inicio) * 1000 / REPETICOES
+
+
+def main():
+    caminho = os.path.join(tempfile.mkdtemp(), "bench_execucao.db")
+    engine = create_engine(f"sqlite:///{caminho}")
+    SQLModel.metadata.create_all(engine)
+
+    with Session(engine) as session:
+        session.exec(insert(Entidade), params=[{"id": 1, "cnpj": "1".zfill(14), "razao_social": "Entidade", "status": "ATIVA"}])
+        session.exec(insert(Fornecedor), params=[{"id": 1, "entidade_id": 1, "cnpj": "1".zfill(14), "razao_social": "Fornecedor"}])
+        session.exec(insert(Contrato), params=[
+            {
+                "id": c, "entidade_id": 1, "numero_contrato": f"E-{c}", "objeto": "Benchmark", "fornecedor_id": 1,
+                "valor_global": Decimal("1000000.00"), "status": "VIGENTE",
+            }
+            for c in range(1, CONTRATOS + 1)
+        ])
+        session.commit()
+
+        print(f"{'lançamentos':>12} {'direto (ms)':>12} {'mantido (ms)':>13} {'consolidação (ms)':>18}")
+        criados = 0
+        for total in LANCAMENTOS_TOTAIS:
+            popular(session, total - criados)
+            criados = total
+            inicio = time.perf_counter()
+            ExecucaoFinanceiraService.consolidar_mensal(session)
+            ms_consolidacao = (time.perf_counter() - inicio) * 1000
+            session.exec(text("ANALYZE"))
+
+            contrato = session.get(Contrato, 1)
+            ms_direto = medir(lambda: resumo_direto(session, 1))
+            ms_mantido = medir(lambda: ExecucaoFinanceiraService.resumo(session, contrato, hoje=HOJE))
+            print(f"{total:>12} {ms_direto:>12.2f} {ms_mantido:>13.2f} {ms_consolidacao:>18.1f}")
+
+
+if __name__ == "__main__":
+    main()
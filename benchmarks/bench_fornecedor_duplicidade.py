@@ -0,0 +1,109 @@
+"""
+Benchmark da detecção de fornecedores duplicados.
+
+Para entidades com N fornecedores (nomes sintéticos, ~5% quase duplicados),
+compara:
+  - blocos: FornecedorDuplicidadeService.detectar (blocos por raiz de CNPJ
+    e por palavra da razão social; no SQLite, a comparação de trigramas é
+    feita em Python, como o pg_trgm faria no banco);
+  - todos os pares: similaridade de trigramas entre cada par (O(n²)),
+    medida apenas até N_TODOS_PARES e extrapolada acima disso.
+
+Uso:
+    python benchmarks/bench_fornecedor_duplicidade.py
+"""
+import os
+import sys
+import time
+import random
+import tempfile
+from itertools import combinations
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench_duplicidade.db')}"
+os.environ["ENVIRONMENT"] = "test"
+
+from sqlalchemy import delete, insert
+from sqlmodel import Session
+import main  # noqa: F401  (registra todos os modelos)
+from app.core.database import create_db_and_tables, engine
+from app.models.entidade import Entidade
+from app.models.fornecedor import Fornecedor
+from app.models.fornecedor_duplicidade import FornecedorDuplicidade
+from app.services.fornecedor_duplicidade_service import (
+    FornecedorDuplicidadeService, SIMILARIDADE_MINIMA, normalizar_nome, similaridade, trigramas
+)
+
+TAMANHOS = (2000, 8000, 32000)
+N_TODOS_PARES = 2000
+
+RAMOS = ["Construtora", "Comercial", "Distribuidora", "Transportes", "Engenharia", "Serviços", "Papelaria",
+         "Farmácia", "Padaria", "Oficina", "Informática", "Limpeza", "Alimentos", "Materiais", "Gráfica"]
+NOMES = ["Silva", "Santos", "Oliveira", "Souza", "Horizonte", "Aurora", "Central", "Planalto", "Litoral",
+         "Vale", "Estrela", "União", "Progresso", "Atlântico", "Serra", "Pioneira", "Ipê", "Jatobá"]
+SUFIXOS = ["Ltda", "ME", "EPP", "S/A", "Eireli", ""]
+
+
+def gerar_nomes(n, semente=42):
+    random.seed(semente)
+    nomes = []
+    for i in range(n):
+        if nomes and random.random() < 0.05:
+            # Quase duplicado: mesmo nome com outro sufixo/caixa
+            base = random.choice(nomes).rsplit(" ", 1)[0]
+            nomes.append(f"{base.upper()} {random.choice(SUFIXOS)}".strip())
+        else:
+            nomes.append(
+                f"{random.choice(RAMOS)} {random.choice(NOMES)} {random.choice(NOMES)} {i} {random.choice(SUFIXOS)}".strip()
+            )
+    return nomes
+
+
+def popular(nomes):
+    with Session(engine) as session:
+        session.exec(delete(FornecedorDuplicidade))
+        session.exec(delete(Fornecedor))
+        session.exec(insert(Fornecedor), params=[
+            {"entidade_id": 1, "razao_social": nome, "cnpj": f"{(i // 3):08d}{i:06d}"}
+            for i, nome in enumerate(nomes)
+        ])
+        session.commit()
+
+
+def todos_pares(nomes):
+    grams = [trigramas(normalizar_nome(nome)) for nome in nomes]
+    return sum(
+        1 for a, b in combinations(range(len(grams)), 2)
+        if similaridade(grams[a], grams[b]) >= SIMILARIDADE_MINIMA
+    )
+
+
+def main_bench():
+    create_db_and_tables()
+    with Session(engine) as session:
+        session.add(Entidade(id=1, cnpj="00000000000100", razao_social="Entidade Benchmark", status="ATIVA"))
+        session.commit()
+
+    print(f"{'N':>7} {'blocos (s)':>11} {'pares':>7} {'todos os pares (s)':>19}")
+    tempo_base = None
+    for n in TAMANHOS:
+        nomes = gerar_nomes(n)
+        popular(nomes)
+        with Session(engine) as session:
+            inicio = time.perf_counter()
+            resultado = FornecedorDuplicidadeService.detectar(session, 1)
+            tempo_blocos = time.perf_counter() - inicio
+
+        if n <= N_TODOS_PARES:
+            inicio = time.perf_counter()
+            todos_pares(nomes)
+            tempo_base = (time.perf_counter() - inicio, n)
+            estimado = f"{tempo_base[0]:.2f}"
+        else:
+            estimado = f"~{tempo_base[0] * (n / tempo_base[1]) ** 2:.0f} (estimado)"
+        print(f"{n:>7} {tempo_blocos:>11.2f} {resultado['pares']:>7} {estimado:>19}")
+
+
+if __name__ == "__main__":
+    main_bench()
@@ -0,0 +1,117 @@
+"""
+Benchmark do mapa de calor da matriz de riscos.
+
+Compara, para uma entidade com dezenas de milhares de riscos:
+  - direto: GROUP BY sobre matriz_riscos a cada requisição;
+  - resumo: MatrizRiscosService.heatmap sobre matriz_riscos_resumo
+    (no máximo 25 linhas por contrato).
+Meta: resumo abaixo de 50 ms.
+
+Uso:
+    python benchmarks/bench_matriz_riscos_heatmap.py
+"""
+import os
+import sys
+import time
+import random
+import tempfile
+from decimal import Decimal
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy import func, insert, text
+from sqlmodel import SQLModel, Session, create_engine, select
+from app.models.entidade import Entidade
+from app.models.usuario import Usuario  # noqa: F401  (alvo de FKs de entidade e contrato)
+from app.models.fornecedor import Fornecedor
+from app.models.contrato import Contrato
+from app.models.matriz_riscos import MatrizRiscos
+from app.models.matriz_riscos_resumo import MatrizRiscosResumo  # noqa: F401
+from app.services.matriz_riscos_service import MatrizRiscosService
+
+ENTIDADES = 5
+CONTRATOS_POR_ENTIDADE = (200, 500, 1000)
+RISCOS_POR_CONTRATO = 40
+REPETICOES = 20
+
+
+def popular(session: Session, contrato_inicial: int, contrato_final: int):
+    random.seed(contrato_inicial)
+    contratos = []
+    riscos = []
+    for e in range(1, ENTIDADES + 1):
+        for c in range(contrato_inicial, contrato_final):
+            contrato_id = e * 100000 + c
+            contratos.append({
+                "id": contrato_id, "entidade_id": e, "numero_contrato": f"R-{contrato_id}", "objeto": "Benchmark",
+                "fornecedor_id": e, "valor_global": Decimal("1000.00"), "status": "VIGENTE",
+            })
+            for _ in range(RISCOS_POR_CONTRATO):
+                riscos.append({
+                    "contrato_id": contrato_id, "entidade_id": e, "risco_descricao": "Risco",
+                    "probabilidade": random.randint(1, 5), "impacto": random.randint(1, 5),
+                    "status": "ATIVO" if random.random() < 0.8 else "ENCERRADO",
+                })
+    session.exec(insert(Contrato), params=contratos)
+    session.exec(insert(MatrizRiscos), params=riscos)
+    session.commit()
+
+
+def heatmap_direto(session: Session, entidade_id: int):
+    """Mesma informação agregada diretamente sobre matriz_riscos"""
+    grade = session.exec(
+        select(MatrizRiscos.probabilidade, MatrizRiscos.impacto, func.count())
+        .where(MatrizRiscos.entidade_id == entidade_id, MatrizRiscos.status == "ATIVO")
+        .group_by(MatrizRiscos.probabilidade, MatrizRiscos.impacto)
+    ).all()
+    exposicao = func.sum(MatrizRiscos.probabilidade * MatrizRiscos.impacto)
+    top = session.exec(
+        select(MatrizRiscos.contrato_id, exposicao)
+        .where(MatrizRiscos.entidade_id == entidade_id, MatrizRiscos.status == "ATIVO")
+        .group_by(MatrizRiscos.contrato_id)
+        .order_by(exposicao.desc())
+        .limit(10)
+    ).all()
+    return grade, top
+
+
+def medir(funcao):
+    inicio = time.perf_counter()
+    for _ in range(REPETICOES):
+        funcao()
+    return (time.perf_counter() - inicio) * 1000 / REPETICOES
+
+
+def main():
+    caminho = os.path.join(tempfile.mkdtemp(), "bench_heatmap.db")
+    engine = create_engine(f"sqlite:///{caminho}")
+    SQLModel.metadata.create_all(engine)
+
+    with Session(engine) as session:
+        session.exec(insert(Entidade), params=[
+            {"id": e, "cnpj": f"{e:014d}", "razao_social": f"Entidade {e}", "status": "ATIVA"}
+            for e in range(1, ENTIDADES + 1)
+        ])
+        session.exec(insert(Fornecedor), params=[
+            {"id": e, "entidade_id": e, "cnpj": f"{e:014d}", "razao_social": f"Fornecedor {e}"}
+            for e in range(1, ENTIDADES + 1)
+        ])
+        session.commit()
+
+        print(f"{'riscos/entidade':>16} {'direto (ms)':>12} {'resumo (ms)':>12} {'rebuild (ms)':>13}")
+        criados = 0
+        for total in CONTRATOS_POR_ENTIDADE:
+            popular(session, criados, total)
+            criados = total
+            inicio = time.perf_counter()
+            MatrizRiscosService.reconstruir_resumo(session)
+            ms_rebuild = (time.perf_counter() - inicio) * 1000
+            session.exec(text("ANALYZE"))
+
+            ms_direto = medir(lambda: heatmap_direto(session, 1))
+            ms_resumo = medir(lambda: MatrizRiscosService.heatmap(session, 1))
+            print(f"{total * RISCOS_POR_CONTRATO:>16} {ms_direto:>12.2f} {ms_resumo:>12.2f} {ms_rebuild:>13.1f}")
+
+
+if __name__ == "__main__":
+    main()
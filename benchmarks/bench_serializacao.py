@@ -0,0 +1,155 @@
+"""
+Benchmark da serialização das listagens (páginas de 100 linhas).
+
+Para cada rota de listagem, compara:
+  - padrão: select(Modelo) com instâncias do ORM, validação no
+    response_model e jsonable_encoder (fastapi.routing.serialize_response,
+    o mesmo código que o FastAPI executa) e JSONResponse;
+  - rápido: select(*colunas_read(...)) em tuplas e resposta_linhas (orjson).
+Os bytes das duas respostas são comparados antes da medição.
+
+As linhas são sintéticas, geradas a partir dos tipos das colunas.
+
+Uso:
+    python benchmarks/bench_serializacao.py
+"""
+import os
+import sys
+import time
+import asyncio
+import tempfile
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench_serializacao.db')}"
+os.environ["ENVIRONMENT"] = "test"
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import APIRoute, serialize_response
+from sqlalchemy import JSON, insert
+from sqlmodel import Session, select
+from main import app
+from app.core.database import create_db_and_tables, engine
+from app.core.serializacao import colunas_read, resposta_linhas
+from app.models.auditoria_global import AuditoriaGlobal, AuditoriaGlobalRead
+from app.models.certidao_fornecedor import CertidaoFornecedor, CertidaoFornecedorRead
+from app.models.contrato import Contrato, ContratoRead
+from app.models.cronograma_fisico_fin import CronogramaFisicoFin, CronogramaFisicoFinRead
+from app.models.entidade import Entidade, EntidadeRead
+from app.models.fiscal_designado import FiscalDesignado, FiscalDesignadoRead
+from app.models.fornecedor import Fornecedor, FornecedorRead
+from app.models.matriz_riscos import MatrizRiscos, MatrizRiscosRead
+from app.models.ocorrencia_fiscalizacao import OcorrenciaFiscalizacao, OcorrenciaFiscalizacaoRead
+from app.models.penalidade import Penalidade, PenalidadeRead
+from app.models.tipo_certidao import TipoCertidao, TipoCertidaoRead
+from app.models.usuario import Usuario, UsuarioRead
+
+LINHAS = 100
+REPETICOES = 200
+
+ROTAS = [
+    ("/contratos", Contrato, ContratoRead),
+    ("/fornecedores", Fornecedor, FornecedorRead),
+    ("/usuarios", Usuario, UsuarioRead),
+    ("/entidades", Entidade, EntidadeRead),
+    ("/certidoes-fornecedor", CertidaoFornecedor, CertidaoFornecedorRead),
+    ("/cronogramas", CronogramaFisicoFin, CronogramaFisicoFinRead),
+    ("/penalidades", Penalidade, PenalidadeRead),
+    ("/fiscais-designados", FiscalDesignado, FiscalDesignadoRead),
+    ("/ocorrencias-fiscalizacao", OcorrenciaFiscalizacao, OcorrenciaFiscalizacaoRead),
+    ("/matriz-riscos", MatrizRiscos, MatrizRiscosRead),
+    ("/tipo-certidoes", TipoCertidao, TipoCertidaoRead),
+    ("/auditoria", AuditoriaGlobal, AuditoriaGlobalRead),
+]
+
+
+def valor_sintetico(coluna, i):
+    """Valor plausível para a coluna conforme o tipo Python dela"""
+    if isinstance(coluna.type, JSON):
+        tipo = dict
+    else:
+        try:
+            tipo = coluna.type.python_type
+        except NotImplementedError:  # AutoString do SQLModel
+            tipo = str
+    if tipo is bool:
+        return i % 2 == 0
+    if tipo is int:
+        return i + 1
+    if tipo is float:
+        return i * 1.5
+    if tipo is Decimal:
+        return Decimal(f"{1000 + i * 37}.{i % 100:02d}")
+    if tipo is datetime:
+        return datetime(2025, 1, 1, 8, 30) + timedelta(hours=i, microseconds=i)
+    if tipo is date:
+        return date(2025, 1, 1) + timedelta(days=i)
+    if tipo is dict:
+        return {"fotos": [f"foto_{i}_{n}.jpg" for n in range(3)], "legenda": "Medição em área de preservação"}
+    tamanho = getattr(coluna.type, "length", None) or 200
+    return f"{coluna.name} {i} — manutenção predial e serviços"[:tamanho]
+
+
+def popular(modelo):
+    linhas = [
+        {coluna.name: valor_sintetico(coluna, i) for coluna in modelo.__table__.columns
+         if coluna.name != "id" and coluna.computed is None}
+        for i in range(LINHAS)
+    ]
+    with Session(engine) as session:
+        session.execute(insert(modelo.__table__), linhas)
+        session.commit()
+
+
+def campo_resposta(caminho):
+    for rota in app.routes:
+        if isinstance(rota, APIRoute) and rota.path == caminho and "GET" in rota.methods:
+            return rota.secure_cloned_response_field or rota.response_field
+    raise LookupError(caminho)
+
+
+async def padrao(modelo, campo):
+    with Session(engine) as session:
+        linhas = session.exec(select(modelo).limit(LINHAS)).all()
+        conteudo = await serialize_response(field=campo, response_content=linhas)
+    return JSONResponse(conteudo).body
+
+
+def rapido(modelo, modelo_read):
+    with Session(engine) as session:
+        linhas = session.exec(select(*colunas_read(modelo_read, modelo)).limit(LINHAS)).all()
+    return resposta_linhas(linhas).body
+
+
+async def medir():
+    print(f"{'rota':<28} {'padrão (ms)':>12} {'rápido (ms)':>12} {'ganho':>7} {'bytes':>8}")
+    for caminho, modelo, modelo_read in ROTAS:
+        campo = campo_resposta(caminho)
+        corpo = await padrao(modelo, campo)
+        assert corpo == rapido(modelo, modelo_read), f"saídas diferentes em {caminho}"
+
+        inicio = time.perf_counter()
+        for _ in range(REPETICOES):
+            await padrao(modelo, campo)
+        tempo_padrao = (time.perf_counter() - inicio) / REPETICOES * 1000
+
+        inicio = time.perf_counter()
+        for _ in range(REPETICOES):
+            rapido(modelo, modelo_read)
+        tempo_rapido = (time.perf_counter() - inicio) / REPETICOES * 1000
+
+        print(f"{caminho:<28} {tempo_padrao:>12.2f} {tempo_rapido:>12.2f} "
+              f"{tempo_padrao / tempo_rapido:>6.1f}x {len(corpo):>8}")
+
+
+def main_bench():
+    create_db_and_tables()
+    for _, modelo, _ in ROTAS:
+        popular(modelo)
+    asyncio.run(medir())
+
+
+if __name__ == "__main__":
+    main_bench()
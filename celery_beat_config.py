@@ -9,6 +9,26 @@ beat_schedule = {
         "task": "app.tasks.tasks.cleanup_old_audits",
         "schedule": crontab(hour=2, minute=0),  # Todos os dias às 2:00
     },
+    # Varredura de certidões vencidas e regularidade de fornecedores
+    "varredura-certidoes-vencidas": {
+        "task": "app.tasks.tasks.varrer_certidoes_vencidas",
+        "schedule": crontab(hour=1, minute=0),  # Todos os dias à 1:00
+    },
+    # Recálculo completo do score de risco dos fornecedores
+    "recalculo-scores-fornecedores": {
+        "task": "app.tasks.tasks.recalcular_scores_fornecedores",
+        "schedule": crontab(hour=1, minute=30),  # Todos os dias à 1:30
+    },
+    # Consolidação mensal do livro de execução financeira dos contratos
+    "consolidacao-execucao-financeira": {
+        "task": "app.tasks.tasks.consolidar_execucao_financeira",
+        "schedule": crontab(minute=15),  # A cada hora, aos 15 minutos
+    },
+    # Detecção de fornecedores duplicados para revisão
+    "deteccao-fornecedores-duplicados": {
+        "task": "app.tasks.tasks.detectar_fornecedores_duplicados",
+        "schedule": crontab(hour=2, minute=30),  # Todos os dias às 2:30
+    },
     # Outras tarefas agendadas podem ser adicionadas aqui
     # "generate-monthly-reports": {
     #     "task": "app.tasks.tasks.generate_monthly_reports",
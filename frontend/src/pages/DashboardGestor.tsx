@@ -52,9 +52,16 @@ interface CronogramaData {
   valor_realizado: number;
 }
 
+interface CurvaSPonto {
+  competencia: string;
+  planejado_acumulado: string;
+  executado_acumulado: string;
+}
+
 interface ExecutionStats {
   totalContratos: number;
   mediaExecucaoFisica: number;
+  mediaPlanejadoFisico: number;
   mediaExecucaoFinanceira: number;
   contratosAtrasados: number;
   contratosNoPrazo: number;
@@ -66,48 +73,44 @@ const DashboardGestor: React.FC = () => {
   const [stats, setStats] = useState<ExecutionStats>({
     totalContratos: 0,
     mediaExecucaoFisica: 0,
+    mediaPlanejadoFisico: 0,
     mediaExecucaoFinanceira: 0,
     contratosAtrasados: 0,
     contratosNoPrazo: 0,
   });
+  const [curvaS, setCurvaS] = useState<CurvaSPonto[]>([]);
+  const [atualizadoEm, setAtualizadoEm] = useState<string | null>(null);
   const [isLoading, setIsLoading] = useState(true);
 
   useEffect(() => {
     const loadCronogramasData = async () => {
       try {
-        const cronogramasData = await apiService.getCronogramas();
+        // Agregados calculados no backend (resposta de tamanho constante)
+        // e apenas as etapas exibidas na tabela
+        const [resumo, cronogramasData, carteira] = await Promise.all([
+          apiService.getDashboardGestor(),
+          apiService.getCronogramas({ limit: 5 }),
+          apiService.getCurvaSCarteira(),
+        ]);
+
+        if (carteira && Array.isArray(carteira.serie)) {
+          setCurvaS(carteira.serie);
+        }
 
         if (cronogramasData && Array.isArray(cronogramasData)) {
           setCronogramas(cronogramasData);
+        }
 
-          // Calcular estatísticas
-          const contratosUnicos = new Set(cronogramasData.map(c => c.contrato_id));
-          const totalContratos = contratosUnicos.size;
-
-          const mediaExecucaoFisica = cronogramasData.reduce((acc, c) =>
-            acc + (c.percentual_fisico_realizado / c.percentual_fisico_previsto) * 100, 0
-          ) / cronogramasData.length;
-
-          const mediaExecucaoFinanceira = cronogramasData.reduce((acc, c) =>
-            acc + (c.percentual_financeiro_realizado / c.percentual_financeiro_previsto) * 100, 0
-          ) / cronogramasData.length;
-
-          // Contar contratos atrasados (simplificado - baseado em data)
-          const hoje = new Date();
-          const contratosAtrasados = cronogramasData.filter(c => {
-            const dataPrevista = new Date(c.data_prevista);
-            return dataPrevista < hoje && c.percentual_fisico_realizado < c.percentual_fisico_previsto;
-          }).length;
-
-          const contratosNoPrazo = totalContratos - contratosAtrasados;
-
+        if (resumo) {
           setStats({
-            totalContratos,
-            mediaExecucaoFisica: isNaN(mediaExecucaoFisica) ? 0 : mediaExecucaoFisica,
-            mediaExecucaoFinanceira: isNaN(mediaExecucaoFinanceira) ? 0 : mediaExecucaoFinanceira,
-            contratosAtrasados,
-            contratosNoPrazo,
+            totalContratos: resumo.total_contratos,
+            mediaExecucaoFisica: resumo.media_execucao_fisica,
+            mediaPlanejadoFisico: resumo.media_planejado_fisico,
+            mediaExecucaoFinanceira: resumo.media_execucao_financeira,
+            contratosAtrasados: resumo.contratos_atrasados,
+            contratosNoPrazo: resumo.contratos_no_prazo,
           });
+          setAtualizadoEm(resumo.atualizado_em);
         }
       } catch (error) {
         console.error('Erro ao carregar dados dos cronogramas:', error);
@@ -126,8 +129,8 @@ const DashboardGestor: React.FC = () => {
       {
         label: 'Previsto (%)',
         data: [
-          stats.mediaExecucaoFisica,
-          stats.mediaExecucaoFinanceira
+          stats.mediaPlanejadoFisico,
+          100 // Valor global contratado
         ],
         backgroundColor: 'rgba(59, 130, 246, 0.5)',
         borderColor: 'rgba(59, 130, 246, 1)',
@@ -136,8 +139,8 @@ const DashboardGestor: React.FC = () => {
       {
         label: 'Realizado (%)',
         data: [
-          stats.mediaExecucaoFisica * 0.85, // Simulação de dados realizados
-          stats.mediaExecucaoFinanceira * 0.82
+          stats.mediaExecucaoFisica,
+          stats.mediaExecucaoFinanceira
         ],
         backgroundColor: 'rgba(16, 185, 129, 0.5)',
         borderColor: 'rgba(16, 185, 129, 1)',
@@ -169,20 +172,23 @@ const DashboardGestor: React.FC = () => {
     }
   };
 
-  // Dados para gráfico de linha - Progressão temporal
+  // Dados para gráfico de linha - Curva S da carteira (acumulado mensal)
   const timelineData = {
-    labels: ['Jan', 'Fev', 'Mar', 'Abr', 'Mai', 'Jun', 'Jul', 'Ago', 'Set', 'Out', 'Nov', 'Dez'],
+    labels: curvaS.map(p => {
+      const [ano, mes] = p.competencia.split('-');
+      return `${mes}/${ano}`;
+    }),
     datasets: [
       {
-        label: 'Execução Física (%)',
-        data: [15, 25, 35, 45, 55, 65, 75, 80, 85, 90, 95, 98],
+        label: 'Planejado Acumulado (%)',
+        data: curvaS.map(p => Number(p.planejado_acumulado)),
         borderColor: 'rgb(59, 130, 246)',
         backgroundColor: 'rgba(59, 130, 246, 0.5)',
         tension: 0.1,
       },
       {
-        label: 'Execução Financeira (%)',
-        data: [12, 22, 32, 42, 52, 58, 68, 75, 82, 88, 92, 95],
+        label: 'Executado Acumulado (%)',
+        data: curvaS.map(p => Number(p.executado_acumulado)),
         borderColor: 'rgb(16, 185, 129)',
         backgroundColor: 'rgba(16, 185, 129, 0.5)',
         tension: 0.1,
@@ -198,7 +204,7 @@ const DashboardGestor: React.FC = () => {
       },
       title: {
         display: true,
-        text: 'Progressão da Execução ao Longo do Tempo',
+        text: 'Curva S - Execução Física Acumulada',
       },
     },
     scales: {
@@ -263,6 +269,11 @@ const DashboardGestor: React.FC = () => {
         <p className="mt-1 text-sm text-gray-600">
           Acompanhe a execução físico-financeira dos contratos
         </p>
+        {atualizadoEm && (
+          <p className="mt-1 text-xs text-gray-400">
+            Indicadores calculados em {new Date(atualizadoEm + 'Z').toLocaleString('pt-BR')}
+          </p>
+        )}
       </div>
 
       {/* Cards de Estatísticas */}
@@ -81,8 +81,19 @@ class ApiService {
     return response.data;
   }
 
-  async getCronogramas() {
-    const response = await this.api.get('/cronogramas');
+  async getCronogramas(params?: { limit?: number; contrato_id?: number }) {
+    const response = await this.api.get('/cronogramas', { params });
+    return response.data;
+  }
+
+  async getCurvaSCarteira() {
+    const response = await this.api.get('/cronogramas/curva-s/carteira');
+    return response.data;
+  }
+
+  // Dashboard
+  async getDashboardGestor() {
+    const response = await this.api.get('/dashboard/gestor');
     return response.data;
   }
 
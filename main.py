@@ -1,6 +1,6 @@
 from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 from sqlmodel import Session
 from app.core.database import engine
 import redis
@@ -13,6 +13,11 @@ from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import settings
 from app.core.database import create_db_and_tables
 from app.core.middleware import AuditoriaMiddleware
+from app.core.compressao import CompressaoMiddleware
+from app.core.consultas import ConsultasMiddleware
+from app.core.rastreamento import configurar_rastreamento
+from app.core.perfilador import PerfilRequisicaoMiddleware
+from app.core.metricas import CONTENT_TYPE_LATEST, MetricasMiddleware, gerar_metricas
 from app.routes import (
     auth, 
     entidades, 
@@ -27,7 +32,11 @@ from app.routes import (
     penalidades,
     matriz_riscos,
     auditoria,
-    pncp
+    pncp,
+    dashboard,
+    importacoes,
+    busca,
+    perfil
 )
 
 # Importar modelos para criar tabelas
@@ -43,6 +52,14 @@ from app.models.cronograma_fisico_fin import CronogramaFisicoFin
 from app.models.penalidade import Penalidade
 from app.models.matriz_riscos import MatrizRiscos
 from app.models.auditoria_global import AuditoriaGlobal
+from app.models.curva_s_contrato import CurvaSContrato
+from app.models.matriz_riscos_resumo import MatrizRiscosResumo
+from app.models.fornecedor_score import FornecedorScore
+from app.models.penalidade_resumo import PenalidadeResumo
+from app.models.execucao_financeira import ExecucaoFinanceira
+from app.models.execucao_financeira_mensal import ExecucaoFinanceiraMensal
+from app.models.importacao_arquivo import ImportacaoArquivo
+from app.models.fornecedor_duplicidade import FornecedorDuplicidade
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -104,6 +121,21 @@ app.add_middleware(CSRFMiddleware)
 # Middleware de auditoria
 app.add_middleware(AuditoriaMiddleware)
 
+# Consultas SQL por requisição (Server-Timing), inclusive as da auditoria
+app.add_middleware(ConsultasMiddleware)
+
+# Compressão br/zstd/gzip (o último adicionado é o mais externo: comprime a resposta final)
+app.add_middleware(CompressaoMiddleware)
+
+# Métricas Prometheus (mais externo: mede o tempo total, inclusive a compressão)
+app.add_middleware(MetricasMiddleware)
+
+# Perfil por requisição com X-Perfil-Token (sem o cabeçalho, só repassa)
+app.add_middleware(PerfilRequisicaoMiddleware)
+
+# Rastreamento OpenTelemetry (só com TRACING_HABILITADO)
+configurar_rastreamento(app)
+
 # Rotas
 app.include_router(auth.router)
 app.include_router(entidades.router)
@@ -119,6 +151,10 @@ app.include_router(penalidades.router)
 app.include_router(matriz_riscos.router)
 app.include_router(auditoria.router)
 app.include_router(pncp.router)
+app.include_router(dashboard.router)
+app.include_router(importacoes.router)
+app.include_router(busca.router)
+app.include_router(perfil.router)
 
 
 # Exemplo de uso de rate limit em endpoint
@@ -151,6 +187,13 @@ def health_check():
         "environment": settings.ENVIRONMENT
     }
 
+@app.get("/metrics", include_in_schema=False)
+def metrics(request: Request):
+    """Métricas no formato de exposição do Prometheus"""
+    if settings.METRICAS_TOKEN and request.headers.get("authorization") != f"Bearer {settings.METRICAS_TOKEN}":
+        return JSONResponse(status_code=401, content={"detail": "Token de métricas inválido"})
+    return Response(content=gerar_metricas(), media_type=CONTENT_TYPE_LATEST)
+
 @app.get("/ready")
 def ready_check():
     """Health check do banco de dados"""
@@ -72,3 +72,110 @@ def test_auth_login():
     assert "access_token" in response.json()
 
 # Adicione mais testes para guards, auditoria, PNCP conforme necessário
+
+def test_compressao_negociacao():
+    respostas = {}
+    for algoritmo in ("br", "zstd", "gzip"):
+        response = client.get("/openapi.json", headers={"Accept-Encoding": algoritmo})
+        assert response.headers["content-encoding"] == algoritmo
+        assert "Accept-Encoding" in response.headers["vary"]
+        respostas[algoritmo] = response
+    # O httpx descomprime os três formatos
+    assert respostas["br"].json() == respostas["zstd"].json() == respostas["gzip"].json()
+
+    # Maior q vence; empate fica com a preferência do servidor (br)
+    response = client.get("/openapi.json", headers={"Accept-Encoding": "gzip;q=1.0, br;q=0.5"})
+    assert response.headers["content-encoding"] == "gzip"
+    response = client.get("/openapi.json", headers={"Accept-Encoding": "gzip, deflate, br, zstd"})
+    assert response.headers["content-encoding"] == "br"
+    response = client.get("/openapi.json", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in response.headers
+
+    # Abaixo do tamanho mínimo segue sem compressão
+    response = client.get("/health", headers={"Accept-Encoding": "br, gzip"})
+    assert "content-encoding" not in response.headers
+
+def test_compressao_streaming_e_tipos_comprimidos():
+    import asyncio
+    import zlib
+    from fastapi import FastAPI
+    from fastapi.responses import Response, StreamingResponse
+    from app.core.compressao import CompressaoMiddleware
+
+    app_teste = FastAPI()
+    partes = [f"linha {i};valor {i * 10}\n".encode() * 50 for i in range(20)]
+
+    @app_teste.get("/exportacao")
+    def exportacao():
+        return StreamingResponse(iter(partes), media_type="text/csv")
+
+    @app_teste.get("/planilha")
+    def planilha():
+        return Response(b"PK" + b"\x00" * 5000, media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
+
+    middleware = CompressaoMiddleware(app_teste, minimo_bytes=1024)
+
+    def requisitar(caminho):
+        # Chamada ASGI direta: o TestClient juntaria as partes do corpo
+        mensagens = []
+        scope = {
+            "type": "http", "method": "GET", "path": caminho, "raw_path": caminho.encode(), "query_string": b"",
+            "root_path": "", "scheme": "http", "server": ("teste", 80), "client": ("teste", 1),
+            "http_version": "1.1", "headers": [(b"accept-encoding", b"gzip")],
+        }
+
+        recebido = []
+
+        async def receive():
+            if recebido:
+                # Cliente conectado até o fim da resposta
+                await asyncio.Event().wait()
+            recebido.append(True)
+            return {"type": "http.request", "body": b"", "more_body": False}
+
+        async def send(mensagem):
+            mensagens.append(mensagem)
+
+        asyncio.run(middleware(scope, receive, send))
+        return dict(mensagens[0]["headers"]), [m["body"] for m in mensagens[1:] if m.get("body")]
+
+    cabecalhos, corpo = requisitar("/exportacao")
+    assert cabecalhos[b"content-encoding"] == b"gzip"
+    assert b"content-length" not in cabecalhos
+    # Cada parte é enviada comprimida assim que gerada
+    assert len(corpo) > 1
+    assert zlib.decompressobj(31).decompress(corpo[0])
+    assert zlib.decompress(b"".join(corpo), 31) == b"".join(partes)
+
+    cabecalhos, corpo = requisitar("/planilha")
+    assert b"content-encoding" not in cabecalhos
+    assert len(b"".join(corpo)) == 5002
+
+def test_metrics():
+    from app.core.cache import cache
+    from app.core.metricas import recurso_pncp
+
+    client.get("/health")
+    client.get("/rota-inexistente/123")
+    cache.get("metricas:teste")
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    texto = response.text
+    # Rótulo pelo template da rota; URLs sem rota não geram uma série cada
+    assert 'sentinela_http_requisicoes_total{metodo="GET",rota="/health",status="200"}' in texto
+    assert 'rota="desconhecida",status="404"' in texto
+    assert "/rota-inexistente/123" not in texto
+    assert 'sentinela_http_requisicao_segundos_bucket{le="0.005",metodo="GET",rota="/health",status="200"}' in texto
+    assert "sentinela_db_pool_conexoes_em_uso" in texto
+    assert 'sentinela_cache_consultas_total{backend=' in texto
+    assert recurso_pncp("/fornecedores/12345678000199/contratos?pagina=2") == "/fornecedores/:id/contratos"
+
+    from app.core.config import settings
+    settings.METRICAS_TOKEN = "segredo"
+    try:
+        assert client.get("/metrics").status_code == 401
+        assert client.get("/metrics", headers={"Authorization": "Bearer segredo"}).status_code == 200
+    finally:
+        settings.METRICAS_TOKEN = ""
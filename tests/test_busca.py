@@ -0,0 +1,170 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+os.environ["DATABASE_URL"] = "sqlite:///./test.db"
+os.environ["ENVIRONMENT"] = "test"
+
+import pytest
+from fastapi.testclient import TestClient
+from main import app
+from app.core.database import create_db_and_tables
+from app.models.usuario import Usuario
+from app.models.entidade import Entidade
+from app.models.fornecedor import Fornecedor
+from app.models.contrato import Contrato
+from app.core.security import get_password_hash
+from sqlmodel import Session, select
+from app.core.database import engine
+from datetime import datetime
+from decimal import Decimal
+
+client = TestClient(app)
+
+def setup_module(module):
+    create_db_and_tables()
+    # Cria usuário admin de teste
+    with Session(engine) as session:
+        # Cria entidade fictícia se não existir
+        entidade = session.exec(select(Entidade).where(Entidade.id == 1)).first()
+        if not entidade:
+            entidade = Entidade(
+                id=1,
+                cnpj="12345678000199",
+                razao_social="Entidade Teste Ltda",
+                nome_fantasia="Entidade Teste",
+                ug_codigo="UG123",
+                status="ATIVA",
+                data_status=datetime.utcnow(),
+                motivo_status=None,
+                root_user_id=None,
+                logo_url=None,
+                config_json=None,
+                created_at=datetime.utcnow(),
+                updated_at=datetime.utcnow()
+            )
+            session.add(entidade)
+            session.commit()
+            session.refresh(entidade)
+        # Cria fornecedor e contrato de teste se não existirem (ids 1 usados pelos demais módulos)
+        if not session.exec(select(Fornecedor).where(Fornecedor.id == 1)).first():
+            session.add(Fornecedor(
+                id=1,
+                entidade_id=1,
+                cnpj="99999999000199",
+                razao_social="Fornecedor Busca Ltda",
+                nome_fantasia="Fornecedor Busca"
+            ))
+            session.commit()
+        if not session.exec(select(Contrato).where(Contrato.id == 1)).first():
+            session.add(Contrato(
+                id=1,
+                entidade_id=1,
+                numero_contrato="CT-BUSCA-001",
+                objeto="Contrato para testes de busca",
+                fornecedor_id=1,
+                valor_global=Decimal("100000.00")
+            ))
+            session.commit()
+        # Cria usuário admin vinculado à entidade
+        if not session.exec(select(Usuario).where(Usuario.email == "admin@sentinela.app")).first():
+            admin = Usuario(
+                nome="Admin Teste",
+                email="admin@sentinela.app",
+                cpf="00000000191",
+                senha_hash=get_password_hash("admin123"),
+                perfil="ROOT",
+                ativo=True,
+                entidade_id=entidade.id,
+                totp_enabled=False,
+                created_at=datetime.utcnow(),
+                updated_at=datetime.utcnow()
+            )
+            session.add(admin)
+            session.commit()
+            session.refresh(admin)
+
+def get_auth_token():
+    """Obtém token de autenticação para testes"""
+    response = client.post("/auth/login", json={"email": "admin@sentinela.app", "senha": "admin123"})
+    return response.json()["access_token"]
+
+def criar_entidade_com_dados():
+    """Entidade com dois fornecedores e contratos com textos acentuados"""
+    sufixo = int(datetime.utcnow().timestamp() * 1000000) % 10**11
+    with Session(engine) as session:
+        entidade = Entidade(cnpj=f"{sufixo:014d}", razao_social="Entidade Busca", status="ATIVA")
+        session.add(entidade)
+        session.commit()
+        session.refresh(entidade)
+        limpeza = Fornecedor(entidade_id=entidade.id, cnpj=f"{sufixo + 1:014d}", razao_social="Higiênica Serviços de Limpeza Ltda", nome_fantasia="Brilho Total")
+        obras = Fornecedor(entidade_id=entidade.id, cnpj=f"{sufixo + 2:014d}", razao_social="Construtora Horizonte SA")
+        session.add(limpeza)
+        session.add(obras)
+        session.commit()
+        contratos = [
+            Contrato(entidade_id=entidade.id, numero_contrato=f"B{sufixo}-1", objeto="Manutenção predial preventiva e corretiva", fornecedor_id=obras.id, valor_global=Decimal("1000.00")),
+            Contrato(entidade_id=entidade.id, numero_contrato=f"B{sufixo}-2", objeto="Serviços de limpeza e conservação predial", fornecedor_id=limpeza.id, valor_global=Decimal("1000.00")),
+            Contrato(entidade_id=entidade.id, numero_contrato=f"B{sufixo}-3", objeto="Aquisição de material de expediente", fornecedor_id=limpeza.id, valor_global=Decimal("1000.00")),
+        ]
+        for contrato in contratos:
+            session.add(contrato)
+        session.commit()
+        return entidade.id, [contrato.id for contrato in contratos], limpeza.id
+
+def test_busca_textual():
+    """Testa busca por prefixo, sem acentos, com ranking, filtro por entidade e atualização do índice"""
+    token = get_auth_token()
+    headers = {"Authorization": f"Bearer {token}"}
+    entidade_id, contratos, limpeza_id = criar_entidade_com_dados()
+    outra_entidade_id, _, _ = criar_entidade_com_dados()
+
+    # Prefixo e acentos: "manut" encontra "Manutenção"; "PREDIAL" casa em dois contratos
+    data = client.get(f"/busca?q=manut&entidade_id={entidade_id}", headers=headers).json()
+    assert [c["id"] for c in data["contratos"]] == [contratos[0]]
+    data = client.get(f"/busca?q=PREDIAL&tipo=contratos&entidade_id={entidade_id}", headers=headers).json()
+    assert sorted(c["id"] for c in data["contratos"]) == contratos[:2]
+    assert "fornecedores" not in data
+
+    # Todas as palavras devem aparecer
+    data = client.get(f"/busca?q=servicos limpeza&entidade_id={entidade_id}", headers=headers).json()
+    assert [c["id"] for c in data["contratos"]] == [contratos[1]]
+    assert [f["id"] for f in data["fornecedores"]] == [limpeza_id]
+
+    # Nome fantasia também é indexado
+    data = client.get(f"/busca?q=brilho&tipo=fornecedores&entidade_id={entidade_id}", headers=headers).json()
+    assert [f["id"] for f in data["fornecedores"]] == [limpeza_id]
+
+    # Sem entidade_id, ROOT busca em todas as entidades
+    data = client.get("/busca?q=aquisicao expediente&tipo=contratos", headers=headers).json()
+    assert {c["entidade_id"] for c in data["contratos"]} >= {entidade_id, outra_entidade_id}
+
+    # Alteração do objeto é refletida no índice
+    response = client.put(f"/contratos/{contratos[2]}", json={"objeto": "Manutenção de elevadores"}, headers=headers)
+    assert response.status_code == 200
+    data = client.get(f"/busca?q=manutencao&tipo=contratos&entidade_id={entidade_id}", headers=headers).json()
+    assert sorted(c["id"] for c in data["contratos"]) == [contratos[0], contratos[2]]
+    data = client.get(f"/busca?q=expediente&tipo=contratos&entidade_id={entidade_id}", headers=headers).json()
+    assert data["contratos"] == []
+
+    # Pontuação é descartada; tipo inválido é recusado
+    data = client.get(f'/busca?q="predial*&tipo=contratos&entidade_id={entidade_id}', headers=headers).json()
+    assert data["termos"] == ["predial"]
+    assert client.get("/busca?q=predial&tipo=usuarios", headers=headers).status_code == 400
+
+def test_busca_usuario_sem_entidade():
+    """Testa que perfil não ROOT sem entidade não busca em todas as entidades"""
+    with Session(engine) as session:
+        if not session.exec(select(Usuario).where(Usuario.email == "sem.entidade@sentinela.app")).first():
+            session.add(Usuario(
+                nome="Gestor Sem Entidade",
+                email="sem.entidade@sentinela.app",
+                cpf="00000000272",
+                senha_hash=get_password_hash("gestor123"),
+                perfil="GESTOR",
+                entidade_id=None
+            ))
+            session.commit()
+    token = client.post("/auth/login", json={"email": "sem.entidade@sentinela.app", "senha": "gestor123"}).json()["access_token"]
+
+    response = client.get("/busca?q=predial", headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 403
@@ -0,0 +1,308 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+os.environ["DATABASE_URL"] = "sqlite:///./test.db"
+os.environ["ENVIRONMENT"] = "test"
+
+import pytest
+from fastapi.testclient import TestClient
+from main import app
+from app.core.database import create_db_and_tables
+from app.models.usuario import Usuario
+from app.models.entidade import Entidade
+from app.models.fornecedor import Fornecedor
+from app.models.tipo_certidao import TipoCertidao
+from app.models.certidao_fornecedor import CertidaoFornecedor
+from app.services.certidao_service import CertidaoService
+from app.core.security import get_password_hash
+from sqlmodel import Session, select
+from app.core.database import engine
+from datetime import datetime, date, timedelta
+
+client = TestClient(app)
+
+def setup_module(module):
+    create_db_and_tables()
+    # Cria usuário admin de teste
+    with Session(engine) as session:
+        # Cria entidade fictícia se não existir
+        entidade = session.exec(select(Entidade).where(Entidade.id == 1)).first()
+        if not entidade:
+            entidade = Entidade(
+                id=1,
+                cnpj="12345678000199",
+                razao_social="Entidade Teste Ltda",
+                nome_fantasia="Entidade Teste",
+                ug_codigo="UG123",
+                status="ATIVA",
+                data_status=datetime.utcnow(),
+                motivo_status=None,
+                root_user_id=None,
+                logo_url=None,
+                config_json=None,
+                created_at=datetime.utcnow(),
+                updated_at=datetime.utcnow()
+            )
+            session.add(entidade)
+            session.commit()
+            session.refresh(entidade)
+        # Cria tipo de certidão de teste se não existir
+        tipo = session.exec(select(TipoCertidao).where(TipoCertidao.codigo == "CND_TESTE")).first()
+        if not tipo:
+            tipo = TipoCertidao(
+                codigo="CND_TESTE",
+                nome="Certidão de Teste",
+                prazo_validade_dias=180
+            )
+            session.add(tipo)
+            session.commit()
+            session.refresh(tipo)
+        # Cria segunda entidade com gestor próprio para testes de isolamento
+        outra_entidade = session.exec(select(Entidade).where(Entidade.cnpj == "98765432000111")).first()
+        if not outra_entidade:
+            outra_entidade = Entidade(
+                cnpj="98765432000111",
+                razao_social="Outra Entidade Ltda",
+                status="ATIVA"
+            )
+            session.add(outra_entidade)
+            session.commit()
+            session.refresh(outra_entidade)
+        if not session.exec(select(Usuario).where(Usuario.email == "gestor.certidoes@sentinela.app")).first():
+            gestor = Usuario(
+                nome="Gestor Certidões",
+                email="gestor.certidoes@sentinela.app",
+                cpf="44444444444",
+                senha_hash=get_password_hash("gestor123"),
+                perfil="GESTOR",
+                ativo=True,
+                entidade_id=outra_entidade.id,
+                totp_enabled=False
+            )
+            session.add(gestor)
+            session.commit()
+        # Cria usuário admin vinculado à entidade
+        if not session.exec(select(Usuario).where(Usuario.email == "admin@sentinela.app")).first():
+            admin = Usuario(
+                nome="Admin Teste",
+                email="admin@sentinela.app",
+                cpf="00000000191",
+                senha_hash=get_password_hash("admin123"),
+                perfil="ROOT",
+                ativo=True,
+                entidade_id=entidade.id,
+                totp_enabled=False,
+                created_at=datetime.utcnow(),
+                updated_at=datetime.utcnow()
+            )
+            session.add(admin)
+            session.commit()
+            session.refresh(admin)
+
+def get_auth_token():
+    """Obtém token de autenticação para testes"""
+    response = client.post("/auth/login", json={"email": "admin@sentinela.app", "senha": "admin123"})
+    return response.json()["access_token"]
+
+def criar_fornecedor(session, entidade_id=1):
+    """Cria fornecedor com CNPJ único para os testes de certidões"""
+    import time
+    fornecedor = Fornecedor(
+        entidade_id=entidade_id,
+        cnpj=f"{int(time.time() * 1000000) % 100000000000000:014d}",
+        razao_social="Fornecedor Certidões Ltda"
+    )
+    session.add(fornecedor)
+    session.commit()
+    session.refresh(fornecedor)
+    return fornecedor
+
+def get_tipo_certidao_id(session):
+    return session.exec(select(TipoCertidao).where(TipoCertidao.codigo == "CND_TESTE")).first().id
+
+def test_certidoes_list():
+    """Testa listagem de certidões"""
+    token = get_auth_token()
+    response = client.get("/certidoes-fornecedor", headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 200
+    assert isinstance(response.json(), list)
+
+def test_varredura_certidoes_vencidas():
+    """Testa varredura que marca certidões vencidas e atualiza a regularidade"""
+    with Session(engine) as session:
+        fornecedor = criar_fornecedor(session)
+        tipo_id = get_tipo_certidao_id(session)
+        vencida = CertidaoFornecedor(
+            fornecedor_id=fornecedor.id,
+            tipo_certidao_id=tipo_id,
+            data_emissao=date.today() - timedelta(days=200),
+            data_validade=date.today() - timedelta(days=1),
+            situacao="VÁLIDA"
+        )
+        valida = CertidaoFornecedor(
+            fornecedor_id=fornecedor.id,
+            tipo_certidao_id=tipo_id,
+            data_emissao=date.today(),
+            data_validade=date.today() + timedelta(days=180),
+            situacao="VÁLIDA"
+        )
+        session.add(vencida)
+        session.add(valida)
+        session.commit()
+
+        resultado = CertidaoService.varrer_vencimentos(session)
+
+        alterados = {a["fornecedor_id"]: a for a in resultado["fornecedores_alterados"]}
+        assert fornecedor.id in alterados
+        assert alterados[fornecedor.id]["antes"]["regularidade_geral"] == "REGULAR"
+        assert alterados[fornecedor.id]["depois"]["regularidade_geral"] == "IRREGULAR"
+
+        session.refresh(vencida)
+        session.refresh(valida)
+        session.refresh(fornecedor)
+        assert vencida.situacao == "VENCIDA"
+        assert valida.situacao == "VÁLIDA"
+        assert fornecedor.total_certidoes_vencidas == 1
+        assert fornecedor.regularidade_geral == "IRREGULAR"
+
+        # Segunda execução não encontra mais nada a alterar para este fornecedor
+        resultado = CertidaoService.varrer_vencimentos(session)
+        assert fornecedor.id not in {a["fornecedor_id"] for a in resultado["fornecedores_alterados"]}
+
+        # Sem certidões (todas excluídas), a varredura não mexe; a recontagem dirigida volta a zero/REGULAR
+        session.delete(vencida)
+        session.delete(valida)
+        session.commit()
+        resultado = CertidaoService.varrer_vencimentos(session)
+        assert fornecedor.id not in {a["fornecedor_id"] for a in resultado["fornecedores_alterados"]}
+        alteracoes = CertidaoService.recalcular_regularidade(session, fornecedor_ids=[fornecedor.id])
+        session.commit()
+        assert alteracoes[0]["depois"] == {"total_certidoes_vencidas": 0, "regularidade_geral": "REGULAR"}
+        session.refresh(fornecedor)
+        assert fornecedor.total_certidoes_vencidas == 0
+        assert fornecedor.regularidade_geral == "REGULAR"
+
+def test_varredura_preserva_regularidade_pncp(monkeypatch):
+    """Testa que a varredura não desfaz a irregularidade vinda do PNCP para fornecedor sem certidões"""
+    from app.services.pncp_service import PNCPService
+
+    async def verificar_certidoes_fornecedor(cnpj):
+        return {"regularidade_geral": "IRREGULAR", "certidoes_vencidas": 2, "total_certidoes": 3, "certidoes": []}
+
+    monkeypatch.setattr(PNCPService, "verificar_certidoes_fornecedor", verificar_certidoes_fornecedor)
+    with Session(engine) as session:
+        fornecedor = criar_fornecedor(session)
+    headers = {"Authorization": f"Bearer {get_auth_token()}"}
+    response = client.get(f"/pncp/fornecedor/{fornecedor.cnpj}/certidoes", headers=headers)
+    assert response.json()["fornecedor_atualizado"] == fornecedor.id
+
+    with Session(engine) as session:
+        resultado = CertidaoService.varrer_vencimentos(session)
+        assert fornecedor.id not in {a["fornecedor_id"] for a in resultado["fornecedores_alterados"]}
+        fornecedor = session.get(Fornecedor, fornecedor.id)
+        assert fornecedor.regularidade_geral == "IRREGULAR"
+        assert fornecedor.total_certidoes_vencidas == 2
+
+def test_certidoes_vencendo():
+    """Testa calendário de vencimento com faixas e paginação por cursor"""
+    token = get_auth_token()
+    with Session(engine) as session:
+        fornecedor = criar_fornecedor(session)
+        tipo_id = get_tipo_certidao_id(session)
+        for dias in (3, 10, 20, 60):
+            session.add(CertidaoFornecedor(
+                fornecedor_id=fornecedor.id,
+                tipo_certidao_id=tipo_id,
+                data_emissao=date.today(),
+                data_validade=date.today() + timedelta(days=dias)
+            ))
+        session.commit()
+        fornecedor_id = fornecedor.id
+
+    response = client.get("/certidoes-fornecedor/vencendo?dias=30", headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 200
+    data = response.json()
+    assert set(data["faixas"].keys()) == {"7", "15", "30"}
+    assert data["faixas"]["7"] <= data["faixas"]["15"] <= data["faixas"]["30"] == data["total"]
+    assert all(0 <= c["dias_para_vencer"] <= 30 for c in data["certidoes"])
+    proprias = [c for c in data["certidoes"] if c["fornecedor_id"] == fornecedor_id]
+    assert len(proprias) == 3 or data["proximo_cursor"] is not None
+
+    # Percorre todas as páginas e confere a ordenação
+    vistos = []
+    params = {"dias": 30, "limit": 1}
+    while True:
+        response = client.get("/certidoes-fornecedor/vencendo", params=params, headers={"Authorization": f"Bearer {token}"})
+        assert response.status_code == 200
+        pagina = response.json()
+        vistos.extend((c["data_validade"], c["id"]) for c in pagina["certidoes"])
+        if not pagina["proximo_cursor"]:
+            break
+        params.update(pagina["proximo_cursor"])
+    assert vistos == sorted(vistos)
+    assert len(vistos) == data["total"]
+
+def test_certidoes_list_isolamento_tenant():
+    """Testa que gestor de outra entidade não vê certidões da entidade 1"""
+    with Session(engine) as session:
+        fornecedor = criar_fornecedor(session)
+        certidao = CertidaoFornecedor(
+            fornecedor_id=fornecedor.id,
+            tipo_certidao_id=get_tipo_certidao_id(session),
+            data_emissao=date.today(),
+            data_validade=date.today() + timedelta(days=90)
+        )
+        session.add(certidao)
+        session.commit()
+        session.refresh(certidao)
+        certidao_id = certidao.id
+        fornecedor_id = fornecedor.id
+
+    login = client.post("/auth/login", json={"email": "gestor.certidoes@sentinela.app", "senha": "gestor123"})
+    headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+
+    response = client.get(f"/certidoes-fornecedor?fornecedor_id={fornecedor_id}", headers=headers)
+    assert response.status_code == 200
+    assert response.json() == []
+
+    response = client.get(f"/certidoes-fornecedor/{certidao_id}", headers=headers)
+    assert response.status_code == 403
+
+    # ROOT continua vendo a certidão
+    token = get_auth_token()
+    response = client.get(f"/certidoes-fornecedor?fornecedor_id={fornecedor_id}", headers={"Authorization": f"Bearer {token}"})
+    assert [c["id"] for c in response.json()] == [certidao_id]
+
+def test_certidoes_bulk():
+    """Testa carga em lote de certidões com upsert pelo protocolo e situação calculada"""
+    token = get_auth_token()
+    headers = {"Authorization": f"Bearer {token}"}
+    with Session(engine) as session:
+        fornecedor_id = criar_fornecedor(session).id
+        tipo_id = get_tipo_certidao_id(session)
+    hoje = date.today()
+    itens = [
+        {"fornecedor_id": fornecedor_id, "tipo_certidao_id": tipo_id, "numero_protocolo": "P-1",
+         "data_emissao": (hoje - timedelta(days=200)).isoformat(), "data_validade": (hoje - timedelta(days=20)).isoformat()},
+        {"fornecedor_id": fornecedor_id, "tipo_certidao_id": tipo_id,
+         "data_emissao": hoje.isoformat(), "data_validade": (hoje + timedelta(days=90)).isoformat()},
+        {"fornecedor_id": fornecedor_id, "tipo_certidao_id": 999999, "numero_protocolo": "P-2",
+         "data_emissao": hoje.isoformat(), "data_validade": (hoje + timedelta(days=90)).isoformat()},
+        {"fornecedor_id": 999999, "tipo_certidao_id": tipo_id, "numero_protocolo": "P-3",
+         "data_emissao": hoje.isoformat(), "data_validade": (hoje + timedelta(days=90)).isoformat()},
+    ]
+    response = client.post("/certidoes-fornecedor/bulk", json=itens, headers=headers)
+    assert response.status_code == 200
+    data = response.json()
+    assert [item["status"] for item in data["itens"]] == ["CRIADO", "CRIADO", "ERRO", "ERRO"]
+    assert [item["erro"] for item in data["itens"][2:]] == ["Tipo de certidão não encontrado", "Fornecedor não encontrado"]
+    certidao_id = data["itens"][0]["id"]
+    assert client.get(f"/certidoes-fornecedor/{certidao_id}", headers=headers).json()["situacao"] == "VENCIDA"
+
+    # Renovação com o mesmo protocolo atualiza a certidão existente
+    itens[0]["data_validade"] = (hoje + timedelta(days=160)).isoformat()
+    data = client.post("/certidoes-fornecedor/bulk", json=itens[:1], headers=headers).json()
+    assert data["itens"][0] == {"indice": 0, "status": "ATUALIZADO", "id": certidao_id, "erro": None}
+    certidao = client.get(f"/certidoes-fornecedor/{certidao_id}", headers=headers).json()
+    assert certidao["situacao"] == "VÁLIDA"
+    assert certidao["data_validade"] == itens[0]["data_validade"]
@@ -1,5 +1,6 @@
 import sys
 import os
+import json
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 os.environ["DATABASE_URL"] = "sqlite:///./test.db"
 os.environ["ENVIRONMENT"] = "test"
@@ -218,4 +219,263 @@ def test_contratos_delete():
     read_response = client.get(f"/contratos/{contrato_id}", headers={"Authorization": f"Bearer {token}"})
     assert read_response.status_code == 200
     data = read_response.json()
-    assert data["status"] == "CANCELADO"
\ No newline at end of file
+    assert data["status"] == "CANCELADO"
+def test_contratos_execucao_financeira():
+    """Testa livro de execução, total mantido no contrato, consolidação mensal e previsão"""
+    from datetime import date, timedelta
+    from app.services.execucao_financeira_service import ExecucaoFinanceiraService
+    token = get_auth_token()
+    headers = {"Authorization": f"Bearer {token}"}
+    import time
+    contrato_data = {
+        "entidade_id": 1,
+        "numero_contrato": f"CT-EXEC-{int(time.time() * 1000 + 3)}",
+        "objeto": "Obra com medições mensais",
+        "fornecedor_id": 1,
+        "valor_global": "12000.00",
+        "data_termino": (date.today() + timedelta(days=3650)).isoformat()
+    }
+    create_response = client.post("/contratos/", json=contrato_data, headers=headers)
+    assert create_response.status_code == 200
+    contrato_id = create_response.json()["id"]
+
+    def dia_do_mes(meses_atras):
+        indice = date.today().year * 12 + date.today().month - 1 - meses_atras
+        return date(indice // 12, indice % 12 + 1, 10).isoformat()
+
+    for meses_atras, tipo, valor in ((3, "MEDICAO", "1000.00"), (2, "PAGAMENTO", "2000.00"), (1, "MEDICAO", "3000.00"), (1, "ESTORNO", "500.00")):
+        response = client.post(f"/contratos/{contrato_id}/execucao", json={
+            "tipo": tipo, "data_lancamento": dia_do_mes(meses_atras), "valor": valor
+        }, headers=headers)
+        assert response.status_code == 200
+    assert response.json()["valor"] == "-500.00"
+
+    response = client.post(f"/contratos/{contrato_id}/execucao", json={
+        "tipo": "OUTRO", "data_lancamento": dia_do_mes(0), "valor": "10.00"
+    }, headers=headers)
+    assert response.status_code == 400
+
+    assert client.get(f"/contratos/{contrato_id}", headers=headers).json()["valor_executado"] == "5500.00"
+
+    # Gravar o total direto no contrato gera um AJUSTE com a diferença
+    response = client.put(f"/contratos/{contrato_id}", json={"valor_executado": "6000.00"}, headers=headers)
+    assert response.json()["valor_executado"] == "6000.00"
+    lancamentos = client.get(f"/contratos/{contrato_id}/execucao/lancamentos", headers=headers).json()
+    assert len(lancamentos) == 5
+    assert (lancamentos[0]["tipo"], lancamentos[0]["valor"]) == ("AJUSTE", "500.00")
+
+    with Session(engine) as session:
+        assert ExecucaoFinanceiraService.consolidar_mensal(session) >= 1
+        # Sem lançamentos novos, nada a consolidar
+        assert ExecucaoFinanceiraService.consolidar_mensal(session) == 0
+
+    data = client.get(f"/contratos/{contrato_id}/execucao", headers=headers).json()
+    assert data["saldo"] == 6000.0
+    assert data["percentual_executado"] == 50.0
+    assert [m["valor_acumulado"] for m in data["serie_mensal"]] == [1000.0, 3000.0, 5500.0, 6000.0]
+    assert data["ritmo_mensal"] == 1833.33
+    assert data["meses_restantes"] == 3.3
+    assert data["esgota_antes_termino"] is True
+
+    # Lançamento de id menor que só fica visível depois da consolidação (commit
+    # tardio) continua pendente e entra na execução seguinte
+    from sqlalchemy import func
+    from app.models.contrato import Contrato
+    from app.models.execucao_financeira import ExecucaoFinanceira
+    with Session(engine) as session:
+        maior_id = session.exec(select(func.max(ExecucaoFinanceira.id))).one()
+        for deslocamento, valor in ((2, Decimal("100.00")), (1, Decimal("50.00"))):
+            contrato = session.get(Contrato, contrato_id)
+            lancamento = ExecucaoFinanceiraService.lancar(session, contrato, "MEDICAO", valor)
+            lancamento.id = maior_id + deslocamento
+            session.commit()
+            assert ExecucaoFinanceiraService.consolidar_mensal(session) >= 1
+
+    data = client.get(f"/contratos/{contrato_id}/execucao", headers=headers).json()
+    assert data["serie_mensal"][-1]["valor_acumulado"] == 6150.0
+    assert data["serie_mensal"][-1]["lancamentos"] == 3
+
+    # O AJUSTE parte do total gravado, não do contrato já carregado em memória
+    with Session(engine) as session, Session(engine) as outra:
+        contrato = session.get(Contrato, contrato_id)
+        assert contrato.valor_executado == Decimal("6150.00")
+        ExecucaoFinanceiraService.lancar(outra, outra.get(Contrato, contrato_id), "MEDICAO", Decimal("50.00"))
+        outra.commit()
+        lancamento = ExecucaoFinanceiraService.ajustar_total(session, contrato, Decimal("6300.00"))
+        assert lancamento.valor == Decimal("100.00")
+        session.commit()
+
+def test_contratos_bulk():
+    """Testa carga em lote de contratos com validação do fornecedor e upsert pelo número"""
+    import time
+    token = get_auth_token()
+    headers = {"Authorization": f"Bearer {token}"}
+    prefixo = f"CT-LOTE-{int(time.time() * 1000)}"
+    itens = [
+        {"entidade_id": 1, "numero_contrato": f"{prefixo}-1", "objeto": "Lote 1", "fornecedor_id": 1, "valor_global": "100.00"},
+        {"entidade_id": 1, "numero_contrato": f"{prefixo}-2", "objeto": "Lote 2", "fornecedor_id": 999999, "valor_global": "200.00"},
+        {"entidade_id": 1, "numero_contrato": f"{prefixo}-1", "objeto": "Lote 1 repetido", "fornecedor_id": 1, "valor_global": "300.00"},
+    ]
+    response = client.post("/contratos/bulk", json=itens, headers=headers)
+    assert response.status_code == 200
+    data = response.json()
+    assert [item["status"] for item in data["itens"]] == ["CRIADO", "ERRO", "ERRO"]
+    assert data["itens"][1]["erro"] == "Fornecedor não encontrado nesta entidade"
+    contrato_id = data["itens"][0]["id"]
+
+    itens[0]["valor_global"] = "150.00"
+    response = client.post("/contratos/bulk", json=[itens[0]], headers=headers)
+    assert response.json()["atualizados"] == 1
+    contrato = client.get(f"/contratos/{contrato_id}", headers=headers).json()
+    assert contrato["valor_global"] == "150.00"
+    assert contrato["valor_executado"] == "0.00"
+
+    response = client.post("/contratos/bulk", json=[itens[0]] * 2 + [{}], headers=headers)
+    assert response.status_code == 422
+
+def test_contratos_etag():
+    """Testa ETag/304 de leitura e invalidação após escrita na coleção"""
+    import time
+    token = get_auth_token()
+    headers = {"Authorization": f"Bearer {token}"}
+    numero_contrato = f"CT-ETAG-{int(time.time() * 1000)}"
+    response = client.post("/contratos/", json={
+        "entidade_id": 1,
+        "numero_contrato": numero_contrato,
+        "objeto": "Contrato para ETag",
+        "fornecedor_id": 1,
+        "valor_global": "1000.00"
+    }, headers=headers)
+    assert response.status_code == 200
+    contrato_id = response.json()["id"]
+
+    response = client.get(f"/contratos/{contrato_id}", headers=headers)
+    etag = response.headers["ETag"]
+    assert etag.startswith('W/"')
+
+    response = client.get(f"/contratos/{contrato_id}", headers={**headers, "If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.headers["ETag"] == etag
+    assert response.content == b""
+
+    # ETag depende da URL: a listagem tem o seu
+    lista = client.get("/contratos/", headers=headers)
+    assert lista.headers["ETag"] != etag
+
+    # Escrita pelo ORM invalida
+    client.put(f"/contratos/{contrato_id}", json={"objeto": "Contrato para ETag alterado"}, headers=headers)
+    response = client.get(f"/contratos/{contrato_id}", headers={**headers, "If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()["objeto"] == "Contrato para ETag alterado"
+    etag = response.headers["ETag"]
+
+    # UPDATE em massa (lançamento de execução) também invalida
+    response = client.post(f"/contratos/{contrato_id}/execucao", json={
+        "tipo": "PAGAMENTO", "data_lancamento": "2025-03-01", "valor": "10.00"
+    }, headers=headers)
+    assert response.status_code == 200
+    response = client.get(f"/contratos/{contrato_id}", headers={**headers, "If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()["valor_executado"] == "10.00"
+
+    response = client.get("/contratos/", headers={**headers, "If-None-Match": lista.headers["ETag"]})
+    assert response.status_code == 200
+
+    # Cache esvaziado (FLUSHDB/restart do Redis): versão nova, ETag antigo não vale mais
+    from app.core.cache import cache
+    from app.core.etag import chave_versao
+    etag = response.headers["ETag"]
+    cache.delete(chave_versao("contrato"))
+    response = client.get("/contratos/", headers={**headers, "If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+    response = client.get("/contratos/", headers={**headers, "If-None-Match": response.headers["ETag"]})
+    assert response.status_code == 304
+
+def test_etag_versao_gravada_durante_queda_do_redis():
+    """Testa que versão gravada só em memória na queda do Redis é apagada dele na reconexão"""
+    import redis
+    from app.core.cache import Cache
+
+    class RedisFalso:
+        fora = False
+
+        def __init__(self):
+            self.dados = {}
+
+        def _verificar(self):
+            if self.fora:
+                raise redis.ConnectionError("fora do ar")
+
+        def get(self, chave):
+            self._verificar()
+            return self.dados.get(chave)
+
+        def set(self, chave, valor, ex=None, nx=False):
+            self._verificar()
+            if nx and chave in self.dados:
+                return None
+            self.dados[chave] = valor
+            return True
+
+        def delete(self, *chaves):
+            self._verificar()
+            for chave in chaves:
+                self.dados.pop(chave, None)
+
+    cache = Cache("redis://localhost:1/0")
+    cache._redis = RedisFalso()
+    cache.set("versao:contrato", "antes", ttl=None)
+
+    # Queda: a nova versão fica só na memória deste processo
+    cache._redis.fora = True
+    cache.set("versao:contrato", "durante", ttl=None)
+    assert cache._redis.dados["versao:contrato"] == '"antes"'
+
+    # Reconexão: a versão anterior à queda sai do Redis e nenhum ETag antigo casa
+    cache._redis.fora = False
+    cache._redis_indisponivel_ate = 0.0
+    assert cache.get("versao:contrato") is None
+    assert "versao:contrato" not in cache._redis.dados
+
+def test_contratos_list_serializacao_rapida():
+    """Testa que a listagem (orjson a partir de tuplas) sai igual ao detalhe (response_model)"""
+    token = get_auth_token()
+    headers = {"Authorization": f"Bearer {token}"}
+    response = client.get("/contratos/", params={"limit": 5}, headers=headers)
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/json"
+    assert response.headers["ETag"].startswith('W/"')
+    itens = response.json()
+    assert itens
+    for item in itens:
+        detalhe = client.get(f"/contratos/{item['id']}", headers=headers)
+        assert detalhe.json() == item
+        assert detalhe.content == json.dumps(item, ensure_ascii=False, separators=(",", ":")).encode()
+
+def test_contratos_list_fields():
+    """Testa a projeção de colunas (fields) na listagem: SELECT e resposta reduzidos"""
+    from sqlalchemy import event
+    token = get_auth_token()
+    headers = {"Authorization": f"Bearer {token}"}
+
+    consultas = []
+    def registrar(conn, cursor, statement, parameters, context, executemany):
+        consultas.append(statement)
+    event.listen(engine, "before_cursor_execute", registrar)
+    try:
+        response = client.get("/contratos/", params={"fields": "valor_global, id,status"}, headers=headers)
+    finally:
+        event.remove(engine, "before_cursor_execute", registrar)
+    assert response.status_code == 200
+    assert response.json()
+    assert all(list(item) == ["id", "valor_global", "status"] for item in response.json())
+    select_contratos = [sql for sql in consultas if "FROM contrato" in sql]
+    assert select_contratos and all("objeto" not in sql for sql in select_contratos)
+
+    response = client.get("/contratos/", params={"fields": "id"}, headers=headers)
+    assert all(list(item) == ["id"] for item in response.json())
+
+    response = client.get("/contratos/", params={"fields": "id,senha_hash"}, headers=headers)
+    assert response.status_code == 400
+    assert "senha_hash" in response.json()["detail"]
@@ -0,0 +1,238 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+os.environ["DATABASE_URL"] = "sqlite:///./test.db"
+os.environ["ENVIRONMENT"] = "test"
+
+import pytest
+from fastapi.testclient import TestClient
+from main import app
+from app.core.database import create_db_and_tables
+from app.models.usuario import Usuario
+from app.models.entidade import Entidade
+from app.models.fornecedor import Fornecedor
+from app.models.contrato import Contrato
+from app.models.cronograma_fisico_fin import CronogramaFisicoFin
+from app.services.curva_s_service import CurvaSService
+from app.services.analise_cronograma_service import AnaliseCronogramaService
+import numpy as np
+from app.core.security import get_password_hash
+from sqlmodel import Session, select
+from app.core.database import engine
+from datetime import datetime, date, timedelta
+from decimal import Decimal
+
+client = TestClient(app)
+
+def setup_module(module):
+    create_db_and_tables()
+    # Cria usuário admin de teste
+    with Session(engine) as session:
+        # Cria entidade fictícia se não existir
+        entidade = session.exec(select(Entidade).where(Entidade.id == 1)).first()
+        if not entidade:
+            entidade = Entidade(
+                id=1,
+                cnpj="12345678000199",
+                razao_social="Entidade Teste Ltda",
+                nome_fantasia="Entidade Teste",
+                ug_codigo="UG123",
+                status="ATIVA",
+                data_status=datetime.utcnow(),
+                motivo_status=None,
+                root_user_id=None,
+                logo_url=None,
+                config_json=None,
+                created_at=datetime.utcnow(),
+                updated_at=datetime.utcnow()
+            )
+            session.add(entidade)
+            session.commit()
+            session.refresh(entidade)
+        # Cria usuário admin vinculado à entidade
+        if not session.exec(select(Usuario).where(Usuario.email == "admin@sentinela.app")).first():
+            admin = Usuario(
+                nome="Admin Teste",
+                email="admin@sentinela.app",
+                cpf="00000000191",
+                senha_hash=get_password_hash("admin123"),
+                perfil="ROOT",
+                ativo=True,
+                entidade_id=entidade.id,
+                totp_enabled=False,
+                created_at=datetime.utcnow(),
+                updated_at=datetime.utcnow()
+            )
+            session.add(admin)
+            session.commit()
+            session.refresh(admin)
+
+def get_auth_token():
+    """Obtém token de autenticação para testes"""
+    response = client.post("/auth/login", json={"email": "admin@sentinela.app", "senha": "admin123"})
+    return response.json()["access_token"]
+
+def criar_contrato():
+    """Cria fornecedor e contrato na entidade 1 para os testes de cronograma"""
+    import time
+    sufixo = int(time.time() * 1000000) % 100000000000000
+    with Session(engine) as session:
+        fornecedor = Fornecedor(entidade_id=1, cnpj=f"{sufixo:014d}", razao_social="Fornecedor Cronograma")
+        session.add(fornecedor)
+        session.commit()
+        session.refresh(fornecedor)
+        contrato = Contrato(
+            entidade_id=1,
+            numero_contrato=f"CRON-{sufixo}",
+            objeto="Contrato com cronograma",
+            fornecedor_id=fornecedor.id,
+            valor_global=Decimal("1000.00")
+        )
+        session.add(contrato)
+        session.commit()
+        session.refresh(contrato)
+        return contrato.id
+
+def test_curva_s_calcular_serie():
+    """Testa a série mensal acumulada a partir das etapas"""
+    class Etapa:
+        def __init__(self, planejado, executado, data_prevista, data_realizada=None):
+            self.percentual_planejado = Decimal(planejado)
+            self.percentual_executado = Decimal(executado)
+            self.data_prevista = data_prevista
+            self.data_realizada = data_realizada
+
+    serie = CurvaSService.calcular_serie([
+        Etapa("30", "100", date(2026, 1, 20), date(2026, 2, 5)),
+        Etapa("70", "50", date(2026, 4, 10)),
+    ], hoje=date(2026, 3, 15))
+
+    assert [p["competencia"] for p in serie] == [date(2026, m, 1) for m in (1, 2, 3, 4)]
+    assert [p["planejado_acumulado"] for p in serie] == [Decimal("30.00"), Decimal("30.00"), Decimal("30.00"), Decimal("100.00")]
+    assert [p["executado_acumulado"] for p in serie] == [Decimal("0.00"), Decimal("30.00"), Decimal("65.00"), Decimal("65.00")]
+    assert CurvaSService.calcular_serie([]) == []
+
+def test_curva_s_mantida_pelo_cronograma():
+    """Testa que criar/atualizar etapas mantém a série materializada do contrato"""
+    token = get_auth_token()
+    headers = {"Authorization": f"Bearer {token}"}
+    contrato_id = criar_contrato()
+    hoje = date.today()
+
+    ids = []
+    for planejado, dias in (("40.00", -40), ("60.00", 40)):
+        response = client.post("/cronogramas", json={
+            "contrato_id": contrato_id,
+            "etapa": "Etapa",
+            "percentual_planejado": planejado,
+            "data_prevista": str(hoje + timedelta(days=dias))
+        }, headers=headers)
+        assert response.status_code == 200
+        ids.append(response.json()["id"])
+
+    response = client.get(f"/cronogramas/curva-s?contrato_id={contrato_id}", headers=headers)
+    assert response.status_code == 200
+    serie = response.json()["contratos"][str(contrato_id)]
+    assert float(serie[-1]["planejado_acumulado"]) == 100.0
+    assert float(serie[-1]["executado_acumulado"]) == 0.0
+
+    response = client.put(f"/cronogramas/{ids[0]}", json={
+        "percentual_executado": "100.00",
+        "data_realizada": str(hoje)
+    }, headers=headers)
+    assert response.status_code == 200
+
+    serie = client.get(f"/cronogramas/curva-s?contrato_id={contrato_id}", headers=headers).json()["contratos"][str(contrato_id)]
+    assert float(serie[-1]["executado_acumulado"]) == 40.0
+    competencia_hoje = str(hoje.replace(day=1))
+    assert [float(p["executado_mes"]) for p in serie if p["competencia"] == competencia_hoje] == [40.0]
+
+    response = client.get("/cronogramas/curva-s/carteira", headers=headers)
+    assert response.status_code == 200
+    carteira = response.json()
+    assert carteira["contratos"] >= 1
+    acumulados = [float(p["planejado_acumulado"]) for p in carteira["serie"]]
+    assert acumulados == sorted(acumulados)
+
+def test_analise_atraso_calcular():
+    """Testa os indicadores vetorizados de atraso por contrato"""
+    hoje = date(2026, 6, 1)
+    colunas = {
+        "contrato_id": np.array([1, 1, 2, 2], dtype=np.int64),
+        "planejado": np.array([50.0, 50.0, 30.0, 70.0]),
+        "executado": np.array([100.0, 40.0, 100.0, 0.0]),
+        "data_prevista": np.array([date(2026, 2, 1), date(2026, 5, 1), date(2026, 3, 1), date(2026, 9, 1)], dtype="datetime64[D]"),
+        "data_realizada": np.array([date(2026, 2, 11), None, date(2026, 2, 25), None], dtype="datetime64[D]"),
+        "data_inicio": np.array([date(2026, 1, 1), date(2026, 1, 1), None, None], dtype="datetime64[D]"),
+    }
+    resultado = {c["contrato_id"]: c for c in AnaliseCronogramaService.calcular(colunas, hoje)}
+
+    atrasado = resultado[1]
+    assert atrasado["planejado_ate_hoje"] == 100.0
+    assert atrasado["executado"] == 70.0
+    assert atrasado["desvio_pontos"] == 30.0
+    assert atrasado["etapas_vencidas"] == 1
+    assert atrasado["atraso_max_dias"] == 31
+    assert atrasado["deslizamento_medio_dias"] == 10.0
+    assert atrasado["spi"] == 0.7
+    assert atrasado["previsao_conclusao"] > atrasado["fim_planejado"] == "2026-05-01"
+
+    em_dia = resultado[2]
+    assert em_dia["desvio_pontos"] == 0.0
+    assert em_dia["etapas_vencidas"] == 0
+    assert em_dia["deslizamento_medio_dias"] == -4.0
+    assert em_dia["previsao_conclusao"] == em_dia["fim_planejado"] == "2026-09-01"
+
+def test_atrasos_endpoint_invalidado_pelo_cronograma():
+    """Testa a sinalização de atraso e a invalidação do cache na escrita"""
+    token = get_auth_token()
+    headers = {"Authorization": f"Bearer {token}"}
+    contrato_id = criar_contrato()
+
+    response = client.post("/cronogramas", json={
+        "contrato_id": contrato_id,
+        "etapa": "Etapa vencida",
+        "percentual_planejado": "100.00",
+        "data_prevista": str(date.today() - timedelta(days=10))
+    }, headers=headers)
+    assert response.status_code == 200
+    cronograma_id = response.json()["id"]
+
+    data = client.get("/cronogramas/atrasos?limite_pontos=10", headers=headers).json()
+    sinalizados = {c["contrato_id"]: c for c in data["contratos"]}
+    assert set(sinalizados[contrato_id]["motivos"]) == {"DESVIO_PLANEJADO", "ETAPA_VENCIDA"}
+    assert sinalizados[contrato_id]["atraso_max_dias"] == 10
+    assert client.get("/cronogramas/atrasos", headers=headers).json()["em_cache"] is True
+
+    response = client.put(f"/cronogramas/{cronograma_id}", json={
+        "percentual_executado": "100.00",
+        "data_realizada": str(date.today())
+    }, headers=headers)
+    assert response.status_code == 200
+
+    data = client.get("/cronogramas/atrasos", headers=headers).json()
+    assert data["em_cache"] is False
+    assert contrato_id not in {c["contrato_id"] for c in data["contratos"]}
+
+def get_token_sem_entidade():
+    """Token de um GESTOR sem entidade vinculada"""
+    with Session(engine) as session:
+        if not session.exec(select(Usuario).where(Usuario.email == "sem.entidade@sentinela.app")).first():
+            session.add(Usuario(
+                nome="Gestor Sem Entidade",
+                email="sem.entidade@sentinela.app",
+                cpf="00000000272",
+                senha_hash=get_password_hash("gestor123"),
+                perfil="GESTOR",
+                entidade_id=None
+            ))
+            session.commit()
+    response = client.post("/auth/login", json={"email": "sem.entidade@sentinela.app", "senha": "gestor123"})
+    return response.json()["access_token"]
+
+def test_cronogramas_usuario_sem_entidade():
+    """Testa que perfil não ROOT sem entidade não consulta todas as entidades"""
+    headers = {"Authorization": f"Bearer {get_token_sem_entidade()}"}
+    assert client.get("/cronogramas/curva-s", headers=headers).status_code == 403
+    assert client.get("/cronogramas/curva-s/carteira", headers=headers).status_code == 403
+    assert client.get("/cronogramas/atrasos", headers=headers).status_code == 403
@@ -0,0 +1,185 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+os.environ["DATABASE_URL"] = "sqlite:///./test.db"
+os.environ["ENVIRONMENT"] = "test"
+
+import pytest
+from fastapi.testclient import TestClient
+from main import app
+from app.core.database import create_db_and_tables
+from app.models.usuario import Usuario
+from app.models.entidade import Entidade
+from app.models.fornecedor import Fornecedor
+from app.models.contrato import Contrato
+from app.models.cronograma_fisico_fin import CronogramaFisicoFin
+from app.core.security import get_password_hash
+from sqlmodel import Session, select
+from app.core.database import engine
+from datetime import datetime, date, timedelta
+from decimal import Decimal
+
+client = TestClient(app)
+
+def setup_module(module):
+    create_db_and_tables()
+    # Cria usuário admin de teste
+    with Session(engine) as session:
+        # Cria entidade fictícia se não existir
+        entidade = session.exec(select(Entidade).where(Entidade.id == 1)).first()
+        if not entidade:
+            entidade = Entidade(
+                id=1,
+                cnpj="12345678000199",
+                razao_social="Entidade Teste Ltda",
+                nome_fantasia="Entidade Teste",
+                ug_codigo="UG123",
+                status="ATIVA",
+                data_status=datetime.utcnow(),
+                motivo_status=None,
+                root_user_id=None,
+                logo_url=None,
+                config_json=None,
+                created_at=datetime.utcnow(),
+                updated_at=datetime.utcnow()
+            )
+            session.add(entidade)
+            session.commit()
+            session.refresh(entidade)
+        # Cria usuário admin vinculado à entidade
+        if not session.exec(select(Usuario).where(Usuario.email == "admin@sentinela.app")).first():
+            admin = Usuario(
+                nome="Admin Teste",
+                email="admin@sentinela.app",
+                cpf="00000000191",
+                senha_hash=get_password_hash("admin123"),
+                perfil="ROOT",
+                ativo=True,
+                entidade_id=entidade.id,
+                totp_enabled=False,
+                created_at=datetime.utcnow(),
+                updated_at=datetime.utcnow()
+            )
+            session.add(admin)
+            session.commit()
+            session.refresh(admin)
+
+def get_auth_token():
+    """Obtém token de autenticação para testes"""
+    response = client.post("/auth/login", json={"email": "admin@sentinela.app", "senha": "admin123"})
+    return response.json()["access_token"]
+
+def criar_carteira():
+    """Cria entidade isolada com três contratos e etapas de cronograma conhecidas"""
+    import time
+    sufixo = int(time.time() * 1000000) % 100000000000000
+    hoje = date.today()
+    with Session(engine) as session:
+        entidade = Entidade(cnpj=f"{sufixo:014d}", razao_social="Entidade Dashboard", status="ATIVA")
+        session.add(entidade)
+        session.commit()
+        session.refresh(entidade)
+        fornecedor = Fornecedor(entidade_id=entidade.id, cnpj=f"{sufixo + 1:014d}", razao_social="Fornecedor Dashboard")
+        session.add(fornecedor)
+        session.commit()
+        session.refresh(fornecedor)
+
+        contratos = []
+        for numero, valor_executado, status in (("D-1", "500.00", "VIGENTE"), ("D-2", "250.00", "VIGENTE"), ("D-3", "0.00", "CANCELADO")):
+            contrato = Contrato(
+                entidade_id=entidade.id,
+                numero_contrato=numero,
+                objeto="Contrato do painel",
+                fornecedor_id=fornecedor.id,
+                valor_global=Decimal("1000.00"),
+                valor_executado=Decimal(valor_executado),
+                status=status
+            )
+            session.add(contrato)
+            contratos.append(contrato)
+        session.commit()
+        for contrato in contratos:
+            session.refresh(contrato)
+
+        # D-1: duas etapas em dia (média física 50%); D-2: uma etapa vencida sem conclusão (20%)
+        etapas = [
+            (contratos[0], "40.00", "60.00", hoje + timedelta(days=10), None),
+            (contratos[0], "60.00", "40.00", hoje - timedelta(days=5), hoje - timedelta(days=6)),
+            (contratos[1], "20.00", "50.00", hoje - timedelta(days=1), None),
+            (contratos[2], "0.00", "50.00", hoje - timedelta(days=30), None),
+        ]
+        for contrato, executado, planejado, data_prevista, data_realizada in etapas:
+            session.add(CronogramaFisicoFin(
+                contrato_id=contrato.id,
+                entidade_id=entidade.id,
+                etapa="Etapa",
+                percentual_executado=Decimal(executado),
+                percentual_planejado=Decimal(planejado),
+                data_prevista=data_prevista,
+                data_realizada=data_realizada
+            ))
+        session.commit()
+        return entidade.id, contratos[0].id
+
+def test_dashboard_gestor_agregados():
+    """Testa os indicadores do painel do gestor calculados no banco"""
+    token = get_auth_token()
+    entidade_id, _ = criar_carteira()
+
+    response = client.get(f"/dashboard/gestor?entidade_id={entidade_id}", headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 200
+    data = response.json()
+    assert data["entidade_id"] == entidade_id
+    assert data["total_contratos"] == 2
+    assert data["contratos_vigentes"] == 2
+    assert data["contratos_com_cronograma"] == 2
+    assert data["total_etapas"] == 3
+    assert data["contratos_atrasados"] == 1
+    assert data["contratos_no_prazo"] == 1
+    assert data["media_execucao_fisica"] == 35.0
+    assert data["media_execucao_financeira"] == 37.5
+    assert data["valor_global_total"] == 2000.0
+    assert data["valor_executado_total"] == 750.0
+    assert data["atualizado_em"]
+
+def test_dashboard_gestor_cache():
+    """Testa que o resumo é servido do cache e invalidado por escrita no cronograma"""
+    token = get_auth_token()
+    headers = {"Authorization": f"Bearer {token}"}
+    entidade_id, contrato_id = criar_carteira()
+
+    primeiro = client.get(f"/dashboard/gestor?entidade_id={entidade_id}", headers=headers).json()
+    segundo = client.get(f"/dashboard/gestor?entidade_id={entidade_id}", headers=headers).json()
+    assert primeiro["em_cache"] is False
+    assert segundo["em_cache"] is True
+    assert segundo["atualizado_em"] == primeiro["atualizado_em"]
+
+    response = client.post("/cronogramas", json={
+        "contrato_id": contrato_id,
+        "etapa": "Nova etapa",
+        "percentual_planejado": "10.00",
+        "data_prevista": str(date.today() + timedelta(days=30))
+    }, headers=headers)
+    assert response.status_code == 200
+
+    terceiro = client.get(f"/dashboard/gestor?entidade_id={entidade_id}", headers=headers).json()
+    assert terceiro["em_cache"] is False
+    assert terceiro["total_etapas"] == 4
+
+def test_dashboard_usuario_sem_entidade():
+    """Testa que perfil não ROOT sem entidade não consulta todas as entidades"""
+    with Session(engine) as session:
+        if not session.exec(select(Usuario).where(Usuario.email == "sem.entidade@sentinela.app")).first():
+            session.add(Usuario(
+                nome="Gestor Sem Entidade",
+                email="sem.entidade@sentinela.app",
+                cpf="00000000272",
+                senha_hash=get_password_hash("gestor123"),
+                perfil="GESTOR",
+                entidade_id=None
+            ))
+            session.commit()
+    token = client.post("/auth/login", json={"email": "sem.entidade@sentinela.app", "senha": "gestor123"}).json()["access_token"]
+
+    response = client.get("/dashboard/gestor", headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 403
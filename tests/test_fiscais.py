@@ -282,4 +282,49 @@ def test_fiscais_delete():
     read_response = client.get(f"/fiscais-designados/{fiscal_id}", headers={"Authorization": f"Bearer {token}"})
     assert read_response.status_code == 200
     data = read_response.json()
-    assert data["ativo"] == False
\ No newline at end of file
+    assert data["ativo"] == False
+def test_fiscais_create_orcamento_consultas():
+    """Designação de fiscal dentro do orçamento de consultas, com Server-Timing"""
+    from app.core.consultas import OrcamentoExcedido, orcamento_consultas
+
+    token = get_auth_token()
+    fiscal_data = {
+        "contrato_id": 2,
+        "usuario_id": 3,
+        "tipo_fiscal": "SUPLENTE",
+        "data_designacao": "2025-01-20",
+        "portaria": f"PORT-ORCAMENTO-{int(datetime.utcnow().timestamp())}/2025"
+    }
+    # Usuário do token, contrato, usuário designado, duplicidade, INSERT,
+    # refresh e o registro da auditoria
+    with orcamento_consultas(7):
+        response = client.post("/fiscais-designados", json=fiscal_data, headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 200
+    assert response.headers["server-timing"].startswith("db;dur=")
+    assert 'desc="7 consultas"' in response.headers["server-timing"]
+
+    # Acima do orçamento falha, listando o SQL executado (a repetição para
+    # na verificação de duplicidade: 5 consultas)
+    with pytest.raises(OrcamentoExcedido, match="FROM fiscal_designado WHERE"):
+        with orcamento_consultas(4):
+            client.post("/fiscais-designados", json=fiscal_data, headers={"Authorization": f"Bearer {token}"})
+
+def test_consulta_com_erro_nao_deixa_inicio_na_conexao():
+    """Instrução que falha não deixa marca de início na conexão do pool nem entra na contagem"""
+    from sqlalchemy import text
+    from sqlalchemy.exc import OperationalError
+    from app.core.consultas import EstatisticasConsultas, _estatisticas
+
+    estatisticas = EstatisticasConsultas()
+    token = _estatisticas.set(estatisticas)
+    try:
+        with engine.connect() as conn:
+            with pytest.raises(OperationalError):
+                conn.execute(text("SELECT * FROM tabela_inexistente"))
+            conn.rollback()
+            assert conn.execute(text("SELECT 1")).scalar() == 1
+            assert not any(isinstance(valor, list) for valor in conn.info.values())
+    finally:
+        _estatisticas.reset(token)
+    assert estatisticas.total == 1
+    assert estatisticas.mais_lenta == "SELECT 1"
@@ -163,4 +163,239 @@ def test_fornecedores_delete():
     read_response = client.get(f"/fornecedores/{fornecedor_id}", headers={"Authorization": f"Bearer {token}"})
     assert read_response.status_code == 200
     data = read_response.json()
-    assert data["ativo"] == False
\ No newline at end of file
+    assert data["ativo"] == False
+def test_fornecedores_ranking_risco():
+    """Testa decomposição do score, atualização incremental e paginação do ranking"""
+    import time
+    from decimal import Decimal
+    from app.models.contrato import Contrato
+    token = get_auth_token()
+    headers = {"Authorization": f"Bearer {token}"}
+    sufixo = int(time.time() * 1000000) % 10**12
+    with Session(engine) as session:
+        entidade = Entidade(cnpj=f"{sufixo:014d}", razao_social="Entidade Ranking", status="ATIVA")
+        session.add(entidade)
+        session.commit()
+        session.refresh(entidade)
+        entidade_id = entidade.id
+
+    ids = []
+    for i in range(3):
+        response = client.post("/fornecedores/", json={
+            "entidade_id": entidade_id,
+            "cnpj": f"{sufixo + i + 1:014d}",
+            "razao_social": f"Fornecedor Ranking {i}"
+        }, headers=headers)
+        assert response.status_code == 200
+        ids.append(response.json()["id"])
+    penalizado, impedido, regular = ids
+
+    with Session(engine) as session:
+        contrato = Contrato(
+            entidade_id=entidade_id,
+            numero_contrato=f"RANK-{sufixo}",
+            objeto="Contrato do ranking",
+            fornecedor_id=penalizado,
+            valor_global=Decimal("1000.00")
+        )
+        session.add(contrato)
+        session.commit()
+        contrato_id = contrato.id
+
+    # Penalidade aplicada (5) + risco alto (5) para um; impedimento (30) para outro
+    response = client.post("/penalidades", json={
+        "contrato_id": contrato_id, "tipo": "MULTA", "valor_multa": "250.00"
+    }, headers=headers)
+    assert response.status_code == 200
+    response = client.post("/matriz-riscos", json={
+        "contrato_id": contrato_id, "risco_descricao": "Risco alto", "probabilidade": 5, "impacto": 5
+    }, headers=headers)
+    assert response.status_code == 200
+    client.put(f"/fornecedores/{impedido}", json={"situacao_cadastral": "SUSPENSO"}, headers=headers)
+
+    response = client.get(f"/fornecedores/ranking-risco?entidade_id={entidade_id}&limit=2", headers=headers)
+    assert response.status_code == 200
+    data = response.json()
+    assert [(f["fornecedor_id"], f["score"]) for f in data["fornecedores"]] == [(impedido, 30), (penalizado, 10)]
+    assert data["fornecedores"][1]["componentes"] == {"certidoes": 0, "impedimento": 0, "penalidades": 5, "riscos": 5}
+    assert data["fornecedores"][1]["origem"]["penalidades_aplicadas"] == 1
+    assert data["proximo_cursor"] == {"apos_score": 10, "apos_id": penalizado}
+
+    cursor = data["proximo_cursor"]
+    data = client.get(
+        f"/fornecedores/ranking-risco?entidade_id={entidade_id}&limit=2"
+        f"&apos_score={cursor['apos_score']}&apos_id={cursor['apos_id']}",
+        headers=headers
+    ).json()
+    assert [(f["fornecedor_id"], f["score"]) for f in data["fornecedores"]] == [(regular, 0)]
+    assert data["proximo_cursor"] is None
+
+def test_fornecedores_bulk():
+    """Testa carga em lote com inclusão, atualização e erros por item"""
+    import time
+    token = get_auth_token()
+    headers = {"Authorization": f"Bearer {token}"}
+    base = int(time.time() * 1000000) % 10**12
+    cnpj_a, cnpj_b = f"{base + 11:014d}", f"{base + 12:014d}"
+    itens = [
+        {"entidade_id": 1, "cnpj": cnpj_a, "razao_social": "Lote A"},
+        {"entidade_id": 1, "cnpj": cnpj_b, "razao_social": "Lote B"},
+        {"entidade_id": 1, "cnpj": cnpj_a, "razao_social": "Lote A repetido"},
+        {"entidade_id": 1, "cpf": "12345678901", "razao_social": "Lote pessoa física"},
+    ]
+    response = client.post("/fornecedores/bulk", json=itens, headers=headers)
+    assert response.status_code == 200
+    data = response.json()
+    assert (data["total"], data["criados"], data["atualizados"], data["erros"]) == (4, 3, 0, 1)
+    assert [item["status"] for item in data["itens"]] == ["CRIADO", "CRIADO", "ERRO", "CRIADO"]
+    assert data["itens"][2]["erro"] == "CNPJ repetido no lote"
+    id_a = data["itens"][0]["id"]
+
+    # Reenvio atualiza o existente; sem atualizar_existentes, recusa
+    response = client.post("/fornecedores/bulk", json=[{"entidade_id": 1, "cnpj": cnpj_a, "razao_social": "Lote A atualizado"}], headers=headers)
+    assert response.json()["itens"][0] == {"indice": 0, "status": "ATUALIZADO", "id": id_a, "erro": None}
+    assert client.get(f"/fornecedores/{id_a}", headers=headers).json()["razao_social"] == "Lote A atualizado"
+
+    response = client.post("/fornecedores/bulk?atualizar_existentes=false", json=[{"entidade_id": 1, "cnpj": cnpj_a, "razao_social": "X"}], headers=headers)
+    assert response.json()["itens"][0]["status"] == "ERRO"
+    assert client.get(f"/fornecedores/{id_a}", headers=headers).json()["razao_social"] == "Lote A atualizado"
+
+def test_fornecedores_duplicatas(monkeypatch):
+    """Testa detecção por raiz de CNPJ e por nome, revisão, descarte e mesclagem"""
+    import time
+    from datetime import date
+    from decimal import Decimal
+    from app.models.contrato import Contrato
+    from app.models.certidao_fornecedor import CertidaoFornecedor
+    from app.models.fornecedor import Fornecedor
+    from app.models.tipo_certidao import TipoCertidao
+    token = get_auth_token()
+    headers = {"Authorization": f"Bearer {token}"}
+    sufixo = int(time.time() * 1000000) % 10**6
+    raiz = f"{sufixo:08d}"
+    with Session(engine) as session:
+        entidade = Entidade(cnpj=f"9{sufixo:013d}", razao_social="Entidade Duplicatas", status="ATIVA")
+        session.add(entidade)
+        session.commit()
+        session.refresh(entidade)
+        entidade_id = entidade.id
+        nomes = [
+            ("Construtora Ação Ltda", f"{raiz}000101"),
+            ("CONSTRUTORA ACAO", f"7{sufixo:07d}000101"),
+            ("Construtora Horizonte", f"{raiz}000202"),
+            ("Padaria Pão Quente", None),
+            ("Padaria Pao Quente - ME", None),
+            ("Oficina Mecânica Central", None),
+        ]
+        fornecedores = [Fornecedor(entidade_id=entidade_id, razao_social=nome, cnpj=cnpj) for nome, cnpj in nomes]
+        for fornecedor in fornecedores:
+            session.add(fornecedor)
+        session.commit()
+        acao, acao_2, filial, padaria, padaria_2, oficina = [f.id for f in fornecedores]
+        # Irregularidade vinda do PNCP, sem certidões locais: a mesclagem de outros não mexe
+        fornecedores[5].regularidade_geral = "IRREGULAR"
+        fornecedores[5].total_certidoes_vencidas = 1
+        session.add(fornecedores[5])
+        session.add(Contrato(
+            entidade_id=entidade_id, numero_contrato=f"DUP-{sufixo}", objeto="Obra",
+            fornecedor_id=acao_2, valor_global=Decimal("1000.00")
+        ))
+        tipo = TipoCertidao(codigo=f"DUP-{sufixo}", nome="Certidão duplicatas")
+        session.add(tipo)
+        session.commit()
+        tipo_id = tipo.id
+        repetidas = [
+            CertidaoFornecedor(
+                fornecedor_id=fornecedor_id, tipo_certidao_id=tipo_id, numero_protocolo="P-1",
+                data_emissao=date(2026, 1, 1), data_validade=date(2099, 1, 1)
+            )
+            for fornecedor_id in (acao, acao_2)
+        ]
+        for certidao in repetidas:
+            session.add(certidao)
+        session.add(CertidaoFornecedor(
+            fornecedor_id=acao, tipo_certidao_id=tipo_id, numero_protocolo="P-2",
+            data_emissao=date(2026, 1, 1), data_validade=date(2099, 1, 1)
+        ))
+        session.commit()
+        certidao_repetida_id = repetidas[0].id
+
+    response = client.post(f"/fornecedores/duplicatas/detectar?entidade_id={entidade_id}", headers=headers)
+    assert response.status_code == 200
+    assert response.json() == {"pares": 3, "grupos": 2}
+
+    data = client.get(f"/fornecedores/duplicatas?entidade_id={entidade_id}", headers=headers).json()
+    assert data["total_grupos"] == 2
+    grupo_acao, grupo_padaria = data["grupos"]
+    assert [f["id"] for f in grupo_acao["fornecedores"]] == [acao, acao_2, filial]
+    assert grupo_acao["principal_sugerido"] == acao_2
+    assert {(p["fornecedor_duplicado_id"], p["motivo"]) for p in grupo_acao["pares"]} == {
+        (acao_2, "NOME"), (filial, "CNPJ_RAIZ")
+    }
+    assert [f["id"] for f in grupo_padaria["fornecedores"]] == [padaria, padaria_2]
+
+    # Descartado não volta a ser sugerido na próxima detecção
+    response = client.post("/fornecedores/duplicatas/descartar", json={
+        "fornecedor_id": padaria, "duplicados": [padaria_2]
+    }, headers=headers)
+    assert response.status_code == 200
+    assert client.post(f"/fornecedores/duplicatas/detectar?entidade_id={entidade_id}", headers=headers).json() == {"pares": 2, "grupos": 1}
+
+    # Mesclagem: contratos e certidões passam ao principal; protocolo repetido é descartado
+    from app.models.auditoria_global import AuditoriaGlobal
+    from app.services.dashboard_service import DashboardService
+    from app.services.analise_cronograma_service import AnaliseCronogramaService
+    invalidadas = []
+    monkeypatch.setattr(DashboardService, "invalidar", lambda entidade_id: invalidadas.append(("dashboard", entidade_id)))
+    monkeypatch.setattr(AnaliseCronogramaService, "invalidar", lambda entidade_id: invalidadas.append(("cronograma", entidade_id)))
+    response = client.post("/fornecedores/duplicatas/mesclar", json={
+        "fornecedor_id": acao_2, "duplicados": [acao, filial]
+    }, headers=headers)
+    assert response.status_code == 200
+    assert response.json()["mesclados"] == [acao, filial]
+    with Session(engine) as session:
+        certidoes = session.exec(select(CertidaoFornecedor).where(CertidaoFornecedor.tipo_certidao_id == tipo_id)).all()
+        assert sorted((c.fornecedor_id, c.numero_protocolo) for c in certidoes) == [(acao_2, "P-1"), (acao_2, "P-2")]
+        assert not session.get(Fornecedor, acao).ativo
+        assert session.get(Fornecedor, acao_2).ativo
+        assert session.get(Fornecedor, oficina).regularidade_geral == "IRREGULAR"
+        auditorias = {
+            a.registro_id: a.dados_depois
+            for a in session.exec(select(AuditoriaGlobal).where(
+                AuditoriaGlobal.acao == "MESCLAGEM_FORNECEDOR", AuditoriaGlobal.entidade_id == entidade_id
+            )).all()
+        }
+        assert auditorias[acao] == {"mesclado_em": acao_2, "certidoes_descartadas": [certidao_repetida_id]}
+        assert auditorias[filial] == {"mesclado_em": acao_2, "certidoes_descartadas": []}
+    assert invalidadas == [("dashboard", entidade_id), ("cronograma", entidade_id)]
+    assert client.get(f"/fornecedores/duplicatas?entidade_id={entidade_id}", headers=headers).json()["total_grupos"] == 0
+
+    # Duplicado já mesclado (inativo) ou de outra entidade é recusado
+    response = client.post("/fornecedores/duplicatas/mesclar", json={
+        "fornecedor_id": acao_2, "duplicados": [acao]
+    }, headers=headers)
+    assert response.status_code == 400
+    response = client.post("/fornecedores/duplicatas/mesclar", json={
+        "fornecedor_id": acao_2, "duplicados": [1]
+    }, headers=headers)
+    assert response.status_code == 400
+
+def test_fornecedores_usuario_sem_entidade():
+    """Testa que perfil não ROOT sem entidade não consulta todas as entidades"""
+    with Session(engine) as session:
+        if not session.exec(select(Usuario).where(Usuario.email == "sem.entidade@sentinela.app")).first():
+            session.add(Usuario(
+                nome="Gestor Sem Entidade",
+                email="sem.entidade@sentinela.app",
+                cpf="00000000272",
+                senha_hash=get_password_hash("gestor123"),
+                perfil="GESTOR",
+                entidade_id=None
+            ))
+            session.commit()
+    token = client.post("/auth/login", json={"email": "sem.entidade@sentinela.app", "senha": "gestor123"}).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    assert client.get("/fornecedores/ranking-risco", headers=headers).status_code == 403
+    assert client.get("/fornecedores/duplicatas", headers=headers).status_code == 403
+    assert client.post("/fornecedores/duplicatas/detectar", headers=headers).status_code == 403
@@ -0,0 +1,271 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+os.environ["DATABASE_URL"] = "sqlite:///./test.db"
+os.environ["ENVIRONMENT"] = "test"
+
+import pytest
+from fastapi.testclient import TestClient
+from main import app
+from app.core.database import create_db_and_tables
+from app.models.usuario import Usuario
+from app.models.entidade import Entidade
+from app.models.fornecedor import Fornecedor
+from app.models.contrato import Contrato
+from app.models.cronograma_fisico_fin import CronogramaFisicoFin
+from app.models.fiscal_designado import FiscalDesignado
+from app.core.config import settings
+from app.tasks.tasks import importar_arquivo
+from app.core.security import get_password_hash
+from sqlmodel import Session, select
+from app.core.database import engine
+import io
+import json
+from datetime import datetime, date
+from decimal import Decimal
+from openpyxl import Workbook
+
+client = TestClient(app)
+
+def setup_module(module):
+    create_db_and_tables()
+    # Cria usuário admin de teste
+    with Session(engine) as session:
+        # Cria entidade fictícia se não existir
+        entidade = session.exec(select(Entidade).where(Entidade.id == 1)).first()
+        if not entidade:
+            entidade = Entidade(
+                id=1,
+                cnpj="12345678000199",
+                razao_social="Entidade Teste Ltda",
+                nome_fantasia="Entidade Teste",
+                ug_codigo="UG123",
+                status="ATIVA",
+                data_status=datetime.utcnow(),
+                motivo_status=None,
+                root_user_id=None,
+                logo_url=None,
+                config_json=None,
+                created_at=datetime.utcnow(),
+                updated_at=datetime.utcnow()
+            )
+            session.add(entidade)
+            session.commit()
+            session.refresh(entidade)
+        # Cria usuário admin vinculado à entidade
+        if not session.exec(select(Usuario).where(Usuario.email == "admin@sentinela.app")).first():
+            admin = Usuario(
+                nome="Admin Teste",
+                email="admin@sentinela.app",
+                cpf="00000000191",
+                senha_hash=get_password_hash("admin123"),
+                perfil="ROOT",
+                ativo=True,
+                entidade_id=entidade.id,
+                totp_enabled=False,
+                created_at=datetime.utcnow(),
+                updated_at=datetime.utcnow()
+            )
+            session.add(admin)
+            session.commit()
+            session.refresh(admin)
+
+def get_auth_token():
+    """Obtém token de autenticação para testes"""
+    response = client.post("/auth/login", json={"email": "admin@sentinela.app", "senha": "admin123"})
+    return response.json()["access_token"]
+
+@pytest.fixture
+def importacao_sincrona(monkeypatch, tmp_path):
+    """Executa a tarefa de importação na hora, registrando o progresso publicado"""
+    progresso = []
+    monkeypatch.setattr(settings, "IMPORTACAO_DIR", str(tmp_path))
+    monkeypatch.setattr(settings, "IMPORTACAO_LOTE", 2)
+    monkeypatch.setattr(importar_arquivo, "delay", lambda importacao_id: importar_arquivo.apply(args=(importacao_id,)))
+    monkeypatch.setattr(importar_arquivo, "update_state", lambda state, meta: progresso.append((state, meta)))
+    return progresso
+
+def criar_dados_base():
+    """Entidade com fornecedor e um usuário fiscal (CPF conhecido)"""
+    sufixo = int(datetime.utcnow().timestamp() * 1000000) % 10**11
+    with Session(engine) as session:
+        entidade = Entidade(cnpj=f"{sufixo:014d}", razao_social="Entidade Importação", status="ATIVA")
+        session.add(entidade)
+        session.commit()
+        session.refresh(entidade)
+        fornecedor = Fornecedor(entidade_id=entidade.id, cnpj=f"{sufixo + 1:014d}", razao_social="Fornecedor Importação")
+        fiscal = Usuario(
+            nome="Fiscal Importação",
+            email=f"fiscal{sufixo}@sentinela.app",
+            cpf=f"{sufixo:011d}",
+            senha_hash=get_password_hash("fiscal123"),
+            perfil="FISCAL",
+            entidade_id=entidade.id
+        )
+        session.add(fornecedor)
+        session.add(fiscal)
+        session.commit()
+        return entidade.id, fornecedor.cnpj, fiscal.cpf, fiscal.id
+
+def enviar(headers, entidade_id, tipo, nome, conteudo):
+    response = client.post(
+        "/importacoes",
+        data={"tipo": tipo, "entidade_id": str(entidade_id)},
+        files={"arquivo": (nome, conteudo)},
+        headers=headers
+    )
+    assert response.status_code == 202
+    data = response.json()
+    assert data["status_url"] == f"/importacoes/task/{data['task_id']}"
+    importacao = client.get(f"/importacoes/{data['importacao_id']}", headers=headers)
+    assert importacao.status_code == 200
+    return importacao.json()
+
+def test_importacao_csv_e_xlsx(importacao_sincrona):
+    """Testa a importação em lotes de contratos (CSV), fiscais (CSV) e cronogramas (XLSX)"""
+    token = get_auth_token()
+    headers = {"Authorization": f"Bearer {token}"}
+    entidade_id, cnpj, cpf, fiscal_id = criar_dados_base()
+    cnpj_formatado = f"{cnpj[:2]}.{cnpj[2:5]}.{cnpj[5:8]}/{cnpj[8:12]}-{cnpj[12:]}"
+
+    # Contratos: separador ';', valores no formato brasileiro, uma linha com fornecedor desconhecido
+    csv_contratos = (
+        "Número Contrato;Objeto;CNPJ Fornecedor;Valor Global;Data Início\n"
+        f"IMP-1;Manutenção predial;{cnpj_formatado};1.234,56;01/02/2025\n"
+        f"IMP-2;Limpeza;{cnpj};1000.00;2025-03-01\n"
+        "IMP-3;Vigilância;99999999000199;500,00;\n"
+        "\n"
+        f"IMP-4;Jardinagem;{cnpj};10,00;data errada\n"
+    )
+    importacao = enviar(headers, entidade_id, "contratos", "contratos.csv", csv_contratos.encode("utf-8-sig"))
+    assert importacao["status"] == "CONCLUIDA"
+    assert importacao["linhas_lidas"] == 4
+    assert importacao["linhas_importadas"] == 2
+    assert importacao["linhas_com_erro"] == 2
+    assert importacao["bytes_processados"] == importacao["tamanho_bytes"]
+    assert [erro["linha"] for erro in json.loads(importacao["erros"])] == [4, 6]
+    assert [state for state, _ in importacao_sincrona] == ["PROGRESS", "PROGRESS"]
+    assert importacao_sincrona[-1][1]["linhas_importadas"] == 2
+    assert importacao_sincrona[-1][1]["unidade"] == "bytes"
+    assert os.listdir(settings.IMPORTACAO_DIR) == []
+
+    with Session(engine) as session:
+        contratos = {c.numero_contrato: c for c in session.exec(select(Contrato).where(Contrato.entidade_id == entidade_id)).all()}
+    assert set(contratos) == {"IMP-1", "IMP-2"}
+    assert contratos["IMP-1"].valor_global == Decimal("1234.56")
+    assert contratos["IMP-1"].data_inicio == date(2025, 2, 1)
+
+    # Contrato já cadastrado não é sobrescrito pela planilha
+    importacao = enviar(headers, entidade_id, "CONTRATOS", "contratos.csv", (
+        "numero_contrato;objeto;cnpj_fornecedor;valor_global\n"
+        f"IMP-1;Objeto sobrescrito;{cnpj};1,00\n"
+    ).encode())
+    assert (importacao["linhas_importadas"], importacao["linhas_com_erro"]) == (0, 1)
+    assert json.loads(importacao["erros"]) == [{"linha": 2, "erro": "Contrato com este número já existe nesta entidade"}]
+    with Session(engine) as session:
+        assert session.get(Contrato, contratos["IMP-1"].id).objeto == "Manutenção predial"
+
+    # Fiscais: designação repetida e CPF de outra entidade são recusados
+    csv_fiscais = (
+        "numero_contrato,cpf_fiscal,tipo_fiscal,data_designacao,portaria\n"
+        f"IMP-1,{cpf},titular,2025-02-01,P-1\n"
+        f"IMP-1,{cpf},SUPLENTE,2025-02-01,P-2\n"
+        "IMP-2,00000000191,TITULAR,2025-03-01,P-3\n"
+    )
+    importacao = enviar(headers, entidade_id, "FISCAIS", "fiscais.csv", csv_fiscais.encode())
+    assert (importacao["linhas_importadas"], importacao["linhas_com_erro"]) == (1, 2)
+    with Session(engine) as session:
+        fiscais = session.exec(select(FiscalDesignado).where(FiscalDesignado.contrato_id == contratos["IMP-1"].id)).all()
+    assert [(f.usuario_id, f.tipo_fiscal) for f in fiscais] == [(fiscal_id, "TITULAR")]
+
+    # Designação já gravada não conta como importada
+    importacao = enviar(headers, entidade_id, "FISCAIS", "fiscais.csv", csv_fiscais.encode())
+    assert (importacao["linhas_importadas"], importacao["linhas_com_erro"]) == (0, 3)
+    assert {"linha": 2, "erro": "Fiscal já designado para este contrato"} in json.loads(importacao["erros"])
+
+    # Cronogramas: planilha XLSX com datas e números nativos
+    planilha = Workbook()
+    aba = planilha.active
+    aba.append(["Nº Contrato", "Etapa", "Percentual Planejado", "Percentual Executado", "Data Prevista"])
+    aba.append(["IMP-1", "Mobilização", 40, 100, datetime(2025, 3, 1)])
+    aba.append(["IMP-1", "Execução", 60, 0, datetime(2025, 6, 1)])
+    aba.append(["IMP-9", "Etapa órfã", 100, 0, datetime(2025, 6, 1)])
+    conteudo = io.BytesIO()
+    planilha.save(conteudo)
+    importacao = enviar(headers, entidade_id, "CRONOGRAMAS", "cronograma.xlsx", conteudo.getvalue())
+    assert importacao["status"] == "CONCLUIDA"
+    assert (importacao["linhas_importadas"], importacao["linhas_com_erro"]) == (2, 1)
+    assert json.loads(importacao["erros"]) == [{"linha": 4, "erro": "Contrato não encontrado: IMP-9"}]
+    assert [(meta["unidade"], meta["current"], meta["total"]) for _, meta in importacao_sincrona[-2:]] == [
+        ("linhas", 2, None), ("linhas", 3, None)
+    ]
+    with Session(engine) as session:
+        etapas = session.exec(
+            select(CronogramaFisicoFin).where(CronogramaFisicoFin.contrato_id == contratos["IMP-1"].id)
+        ).all()
+    assert sorted((e.etapa, e.percentual_planejado, e.data_prevista) for e in etapas) == [
+        ("Execução", Decimal("60.00"), date(2025, 6, 1)),
+        ("Mobilização", Decimal("40.00"), date(2025, 3, 1)),
+    ]
+
+def test_importacao_validacoes(importacao_sincrona):
+    """Testa tipo e formato inválidos e colunas obrigatórias ausentes"""
+    token = get_auth_token()
+    headers = {"Authorization": f"Bearer {token}"}
+    entidade_id, _, _, _ = criar_dados_base()
+
+    response = client.post("/importacoes", data={"tipo": "PAGAMENTOS", "entidade_id": str(entidade_id)},
+                           files={"arquivo": ("x.csv", b"a")}, headers=headers)
+    assert response.status_code == 400
+    response = client.post("/importacoes", data={"tipo": "CONTRATOS", "entidade_id": str(entidade_id)},
+                           files={"arquivo": ("x.pdf", b"a")}, headers=headers)
+    assert response.status_code == 400
+
+    importacao = enviar(headers, entidade_id, "CONTRATOS", "contratos.csv", b"numero_contrato;objeto\nX;Y\n")
+    assert importacao["status"] == "FALHOU"
+    assert importacao["mensagem"] == "Colunas obrigatórias ausentes: cnpj_fornecedor, valor_global"
+    assert importacao["linhas_importadas"] == 0
+    assert os.listdir(settings.IMPORTACAO_DIR) == []
+
+    # Arquivo só com cabeçalho incompleto também falha
+    importacao = enviar(headers, entidade_id, "CONTRATOS", "contratos.csv", b"numero_contrato;objeto\n")
+    assert importacao["status"] == "FALHOU"
+    assert importacao["mensagem"] == "Colunas obrigatórias ausentes: cnpj_fornecedor, valor_global"
+
+    # Cabeçalho completo com primeira linha curta: a linha sai com erro, a importação segue
+    importacao = enviar(
+        headers, entidade_id, "CONTRATOS", "contratos.csv",
+        b"numero_contrato;objeto;cnpj_fornecedor;valor_global\nX;Y\n"
+    )
+    assert importacao["status"] == "CONCLUIDA"
+    assert (importacao["linhas_importadas"], importacao["linhas_com_erro"]) == (0, 1)
+
+def test_importacao_csv_codificacao(importacao_sincrona, monkeypatch):
+    """Testa CSV em cp1252 e a recusa de linhas com bytes inválidos em UTF-8"""
+    monkeypatch.setattr(settings, "IMPORTACAO_LOTE", 100)
+    token = get_auth_token()
+    headers = {"Authorization": f"Bearer {token}"}
+    entidade_id, cnpj, _, _ = criar_dados_base()
+
+    csv_contratos = (
+        "Número Contrato;Objeto;CNPJ Fornecedor;Valor Global\n"
+        f"COD-1;Manutenção elétrica;{cnpj};100,00\n"
+    )
+    importacao = enviar(headers, entidade_id, "CONTRATOS", "cp1252.csv", csv_contratos.encode("cp1252"))
+    assert (importacao["linhas_importadas"], importacao["linhas_com_erro"]) == (1, 0)
+    with Session(engine) as session:
+        contrato = session.exec(select(Contrato).where(
+            Contrato.entidade_id == entidade_id, Contrato.numero_contrato == "COD-1"
+        )).one()
+    assert contrato.objeto == "Manutenção elétrica"
+
+    # UTF-8 na amostra inicial (64 KB) e um byte cp1252 perdido mais adiante
+    conteudo = (
+        "numero_contrato;objeto;cnpj_fornecedor;valor_global\n"
+        + "".join(f"COD-{i};Serviço {i} {'x' * 300};{cnpj};10,00\n" for i in range(2, 252))
+    ).encode("utf-8") + f"COD-X;Servi\xe7o;{cnpj};10,00\n".encode("latin-1")
+    importacao = enviar(headers, entidade_id, "CONTRATOS", "utf8.csv", conteudo)
+    assert (importacao["linhas_importadas"], importacao["linhas_com_erro"]) == (250, 1)
+    assert json.loads(importacao["erros"]) == [
+        {"linha": 252, "erro": "Caracteres inválidos para a codificação do arquivo"}
+    ]
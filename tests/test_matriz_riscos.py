@@ -0,0 +1,193 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+os.environ["DATABASE_URL"] = "sqlite:///./test.db"
+os.environ["ENVIRONMENT"] = "test"
+
+import pytest
+from fastapi.testclient import TestClient
+from main import app
+from app.core.database import create_db_and_tables
+from app.models.usuario import Usuario
+from app.models.entidade import Entidade
+from app.models.fornecedor import Fornecedor
+from app.models.contrato import Contrato
+from app.models.matriz_riscos import MatrizRiscos
+from app.services.matriz_riscos_service import MatrizRiscosService
+from app.core.security import get_password_hash
+from sqlmodel import Session, select
+from app.core.database import engine
+from datetime import datetime, date, timedelta
+from decimal import Decimal
+
+client = TestClient(app)
+
+def setup_module(module):
+    create_db_and_tables()
+    # Cria usuário admin de teste
+    with Session(engine) as session:
+        # Cria entidade fictícia se não existir
+        entidade = session.exec(select(Entidade).where(Entidade.id == 1)).first()
+        if not entidade:
+            entidade = Entidade(
+                id=1,
+                cnpj="12345678000199",
+                razao_social="Entidade Teste Ltda",
+                nome_fantasia="Entidade Teste",
+                ug_codigo="UG123",
+                status="ATIVA",
+                data_status=datetime.utcnow(),
+                motivo_status=None,
+                root_user_id=None,
+                logo_url=None,
+                config_json=None,
+                created_at=datetime.utcnow(),
+                updated_at=datetime.utcnow()
+            )
+            session.add(entidade)
+            session.commit()
+            session.refresh(entidade)
+        # Cria usuário admin vinculado à entidade
+        if not session.exec(select(Usuario).where(Usuario.email == "admin@sentinela.app")).first():
+            admin = Usuario(
+                nome="Admin Teste",
+                email="admin@sentinela.app",
+                cpf="00000000191",
+                senha_hash=get_password_hash("admin123"),
+                perfil="ROOT",
+                ativo=True,
+                entidade_id=entidade.id,
+                totp_enabled=False,
+                created_at=datetime.utcnow(),
+                updated_at=datetime.utcnow()
+            )
+            session.add(admin)
+            session.commit()
+            session.refresh(admin)
+
+def get_auth_token():
+    """Obtém token de autenticação para testes"""
+    response = client.post("/auth/login", json={"email": "admin@sentinela.app", "senha": "admin123"})
+    return response.json()["access_token"]
+
+def criar_contrato(entidade_id=1):
+    """Cria fornecedor e contrato na entidade 1 para os testes da matriz de riscos"""
+    import time
+    sufixo = int(time.time() * 1000000) % 100000000000000
+    with Session(engine) as session:
+        fornecedor = Fornecedor(entidade_id=entidade_id, cnpj=f"{sufixo:014d}", razao_social="Fornecedor Riscos")
+        session.add(fornecedor)
+        session.commit()
+        session.refresh(fornecedor)
+        contrato = Contrato(
+            entidade_id=entidade_id,
+            numero_contrato=f"RISCO-{sufixo}",
+            objeto="Contrato com riscos",
+            fornecedor_id=fornecedor.id,
+            valor_global=Decimal("1000.00")
+        )
+        session.add(contrato)
+        session.commit()
+        session.refresh(contrato)
+        return contrato.id
+
+def criar_risco(headers, contrato_id, probabilidade, impacto):
+    response = client.post("/matriz-riscos", json={
+        "contrato_id": contrato_id,
+        "risco_descricao": "Risco de teste",
+        "probabilidade": probabilidade,
+        "impacto": impacto
+    }, headers=headers)
+    assert response.status_code == 200
+    return response.json()
+
+def test_heatmap_mantido_pelas_escritas():
+    """Testa grade, exposição por contrato e atualização incremental do resumo"""
+    token = get_auth_token()
+    headers = {"Authorization": f"Bearer {token}"}
+    with Session(engine) as session:
+        entidade = Entidade(cnpj=f"{int(datetime.utcnow().timestamp() * 1000000) % 10**14:014d}", razao_social="Entidade Riscos", status="ATIVA")
+        session.add(entidade)
+        session.commit()
+        session.refresh(entidade)
+        entidade_id = entidade.id
+    contrato_a = criar_contrato(entidade_id)
+    contrato_b = criar_contrato(entidade_id)
+
+    criar_risco(headers, contrato_a, 5, 5)
+    criar_risco(headers, contrato_a, 5, 5)
+    risco = criar_risco(headers, contrato_b, 2, 3)
+    criar_risco(headers, contrato_b, 1, 1)
+
+    data = client.get(f"/matriz-riscos/heatmap?entidade_id={entidade_id}", headers=headers).json()
+    assert data["grade"][4][4] == 2
+    assert data["grade"][1][2] == 1
+    assert data["grade"][0][0] == 1
+    assert data["total_riscos"] == 4
+    assert data["por_nivel"] == {"BAIXO": 1, "MÉDIO": 1, "ALTO": 2}
+    assert [(c["contrato_id"], c["exposicao"]) for c in data["contratos"]] == [(contrato_a, 50), (contrato_b, 7)]
+
+    # Mudança de célula e encerramento refletem no resumo
+    client.put(f"/matriz-riscos/{risco['id']}", json={"probabilidade": 4}, headers=headers)
+    data = client.get(f"/matriz-riscos/heatmap?entidade_id={entidade_id}&top=1", headers=headers).json()
+    assert data["grade"][1][2] == 0
+    assert data["grade"][3][2] == 1
+    assert len(data["contratos"]) == 1
+
+    client.put(f"/matriz-riscos/{risco['id']}", json={"status": "ENCERRADO"}, headers=headers)
+    data = client.get(f"/matriz-riscos/heatmap?entidade_id={entidade_id}", headers=headers).json()
+    assert data["total_riscos"] == 3
+
+    # Reconstrução completa chega ao mesmo resultado
+    with Session(engine) as session:
+        MatrizRiscosService.reconstruir_resumo(session, entidade_id)
+    assert client.get(f"/matriz-riscos/heatmap?entidade_id={entidade_id}", headers=headers).json() == data
+
+def test_nivel_risco_gerado_pelo_banco():
+    """Testa que nivel_score/nivel_risco acompanham qualquer escrita, inclusive fora das rotas"""
+    token = get_auth_token()
+    headers = {"Authorization": f"Bearer {token}"}
+    contrato_id = criar_contrato()
+
+    risco = criar_risco(headers, contrato_id, 2, 2)
+    assert risco["nivel_score"] == 4
+    assert risco["nivel_risco"] == "BAIXO"
+
+    response = client.put(f"/matriz-riscos/{risco['id']}", json={"impacto": 5}, headers=headers)
+    assert response.json()["nivel_score"] == 10
+    assert response.json()["nivel_risco"] == "MÉDIO"
+
+    # Edição em lote direto no banco (ex.: importação) também recalcula
+    from sqlalchemy import update
+    with Session(engine) as session:
+        session.exec(update(MatrizRiscos).where(MatrizRiscos.id == risco["id"]).values(probabilidade=5))
+        session.commit()
+    criar_risco(headers, contrato_id, 1, 1)
+
+    response = client.get(
+        f"/matriz-riscos?contrato_id={contrato_id}&ordenar_por_nivel=true", headers=headers
+    )
+    riscos = response.json()
+    assert [r["nivel_score"] for r in riscos] == [25, 1]
+    assert riscos[0]["nivel_risco"] == "ALTO"
+
+    response = client.get(f"/matriz-riscos?contrato_id={contrato_id}&nivel_risco=ALTO&status=ATIVO", headers=headers)
+    assert [r["id"] for r in response.json()] == [risco["id"]]
+
+def test_matriz_riscos_usuario_sem_entidade():
+    """Testa que perfil não ROOT sem entidade não consulta todas as entidades"""
+    with Session(engine) as session:
+        if not session.exec(select(Usuario).where(Usuario.email == "sem.entidade@sentinela.app")).first():
+            session.add(Usuario(
+                nome="Gestor Sem Entidade",
+                email="sem.entidade@sentinela.app",
+                cpf="00000000272",
+                senha_hash=get_password_hash("gestor123"),
+                perfil="GESTOR",
+                entidade_id=None
+            ))
+            session.commit()
+    token = client.post("/auth/login", json={"email": "sem.entidade@sentinela.app", "senha": "gestor123"}).json()["access_token"]
+
+    response = client.get("/matriz-riscos/heatmap", headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 403
@@ -170,6 +170,8 @@ def test_ocorrencias_create():
     assert data["contrato_id"] == ocorrencia_data["contrato_id"]
     assert data["fiscal_id"] == ocorrencia_data["fiscal_id"]
     assert data["tipo_ocorrencia"] == ocorrencia_data["tipo_ocorrencia"]
+    # entidade_id é herdado do contrato
+    assert data["entidade_id"] == 1
 
 def test_ocorrencias_read():
     """Testa leitura de ocorrência específica"""
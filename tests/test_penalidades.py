@@ -0,0 +1,173 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+os.environ["DATABASE_URL"] = "sqlite:///./test.db"
+os.environ["ENVIRONMENT"] = "test"
+
+import pytest
+from fastapi.testclient import TestClient
+from main import app
+from app.core.database import create_db_and_tables
+from app.models.usuario import Usuario
+from app.models.entidade import Entidade
+from app.models.fornecedor import Fornecedor
+from app.models.contrato import Contrato
+from app.services.penalidade_service import PenalidadeService
+from app.core.security import get_password_hash
+from sqlmodel import Session, select
+from app.core.database import engine
+from datetime import datetime, date, timedelta
+from decimal import Decimal
+
+client = TestClient(app)
+
+def setup_module(module):
+    create_db_and_tables()
+    # Cria usuário admin de teste
+    with Session(engine) as session:
+        # Cria entidade fictícia se não existir
+        entidade = session.exec(select(Entidade).where(Entidade.id == 1)).first()
+        if not entidade:
+            entidade = Entidade(
+                id=1,
+                cnpj="12345678000199",
+                razao_social="Entidade Teste Ltda",
+                nome_fantasia="Entidade Teste",
+                ug_codigo="UG123",
+                status="ATIVA",
+                data_status=datetime.utcnow(),
+                motivo_status=None,
+                root_user_id=None,
+                logo_url=None,
+                config_json=None,
+                created_at=datetime.utcnow(),
+                updated_at=datetime.utcnow()
+            )
+            session.add(entidade)
+            session.commit()
+            session.refresh(entidade)
+        # Cria usuário admin vinculado à entidade
+        if not session.exec(select(Usuario).where(Usuario.email == "admin@sentinela.app")).first():
+            admin = Usuario(
+                nome="Admin Teste",
+                email="admin@sentinela.app",
+                cpf="00000000191",
+                senha_hash=get_password_hash("admin123"),
+                perfil="ROOT",
+                ativo=True,
+                entidade_id=entidade.id,
+                totp_enabled=False,
+                created_at=datetime.utcnow(),
+                updated_at=datetime.utcnow()
+            )
+            session.add(admin)
+            session.commit()
+            session.refresh(admin)
+
+def get_auth_token():
+    """Obtém token de autenticação para testes"""
+    response = client.post("/auth/login", json={"email": "admin@sentinela.app", "senha": "admin123"})
+    return response.json()["access_token"]
+
+def criar_contrato(entidade_id):
+    """Cria fornecedor e contrato na entidade informada para os testes de penalidades"""
+    import time
+    sufixo = int(time.time() * 1000000) % 100000000000000
+    with Session(engine) as session:
+        fornecedor = Fornecedor(entidade_id=entidade_id, cnpj=f"{sufixo:014d}", razao_social=f"Fornecedor Penalidades {sufixo}")
+        session.add(fornecedor)
+        session.commit()
+        session.refresh(fornecedor)
+        contrato = Contrato(
+            entidade_id=entidade_id,
+            numero_contrato=f"PEN-{sufixo}",
+            objeto="Contrato com penalidades",
+            fornecedor_id=fornecedor.id,
+            valor_global=Decimal("1000.00")
+        )
+        session.add(contrato)
+        session.commit()
+        session.refresh(contrato)
+        return contrato.id, fornecedor.id
+
+def criar_penalidade(headers, contrato_id, tipo, valor, data_aplicacao):
+    response = client.post("/penalidades", json={
+        "contrato_id": contrato_id,
+        "tipo": tipo,
+        "valor_multa": valor,
+        "data_aplicacao": data_aplicacao
+    }, headers=headers)
+    assert response.status_code == 200
+    return response.json()
+
+def test_resumo_penalidades_mantido_pelas_escritas():
+    """Testa totais por status, tipo, período, contrato e fornecedor e a atualização do resumo"""
+    token = get_auth_token()
+    headers = {"Authorization": f"Bearer {token}"}
+    with Session(engine) as session:
+        entidade = Entidade(cnpj=f"{int(datetime.utcnow().timestamp() * 1000000) % 10**14:014d}", razao_social="Entidade Penalidades", status="ATIVA")
+        session.add(entidade)
+        session.commit()
+        session.refresh(entidade)
+        entidade_id = entidade.id
+    contrato_a, fornecedor_a = criar_contrato(entidade_id)
+    contrato_b, fornecedor_b = criar_contrato(entidade_id)
+
+    criar_penalidade(headers, contrato_a, "MULTA", "100.00", "2026-01-10")
+    criar_penalidade(headers, contrato_a, "MULTA", "300.00", "2026-01-20")
+    penalidade = criar_penalidade(headers, contrato_b, "MULTA", "50.00", "2026-02-05")
+    criar_penalidade(headers, contrato_b, "ADVERTENCIA", None, "2026-02-06")
+
+    response = client.get(f"/penalidades/resumo?entidade_id={entidade_id}", headers=headers)
+    assert response.status_code == 200
+    data = response.json()
+    assert data["quantidade"] == 4
+    assert data["valor_total"] == 450.0
+    assert data["por_tipo"] == [
+        {"tipo": "ADVERTENCIA", "quantidade": 1, "valor_total": 0.0},
+        {"tipo": "MULTA", "quantidade": 3, "valor_total": 450.0},
+    ]
+    assert [(p["periodo"], p["valor_total"]) for p in data["por_periodo"]] == [("2026-01", 400.0), ("2026-02", 50.0)]
+    assert [(c["contrato_id"], c["valor_total"]) for c in data["por_contrato"]] == [(contrato_a, 400.0), (contrato_b, 50.0)]
+    assert [f["fornecedor_id"] for f in data["por_fornecedor"]] == [fornecedor_a, fornecedor_b]
+
+    # Mudança de status é refletida no resumo
+    client.put(f"/penalidades/{penalidade['id']}", json={"status": "CANCELADA"}, headers=headers)
+    data = client.get(
+        f"/penalidades/resumo?entidade_id={entidade_id}&data_inicio=2026-02-01&data_fim=2026-02-28",
+        headers=headers
+    ).json()
+    assert data["quantidade"] == 2
+    assert data["por_status"] == [
+        {"status": "APLICADA", "quantidade": 1, "valor_total": 0.0},
+        {"status": "CANCELADA", "quantidade": 1, "valor_total": 50.0},
+    ]
+
+    data = client.get(f"/penalidades/resumo?fornecedor_id={fornecedor_a}", headers=headers).json()
+    assert data["quantidade"] == 2
+    assert data["valor_total"] == 400.0
+
+    # Reconstrução completa produz o mesmo resultado
+    with Session(engine) as session:
+        PenalidadeService.reconstruir_resumo(session, entidade_id)
+    data = client.get(f"/penalidades/resumo?entidade_id={entidade_id}", headers=headers).json()
+    assert data["quantidade"] == 4
+    assert data["valor_total"] == 450.0
+
+def test_penalidades_usuario_sem_entidade():
+    """Testa que perfil não ROOT sem entidade não consulta todas as entidades"""
+    with Session(engine) as session:
+        if not session.exec(select(Usuario).where(Usuario.email == "sem.entidade@sentinela.app")).first():
+            session.add(Usuario(
+                nome="Gestor Sem Entidade",
+                email="sem.entidade@sentinela.app",
+                cpf="00000000272",
+                senha_hash=get_password_hash("gestor123"),
+                perfil="GESTOR",
+                entidade_id=None
+            ))
+            session.commit()
+    token = client.post("/auth/login", json={"email": "sem.entidade@sentinela.app", "senha": "gestor123"}).json()["access_token"]
+
+    response = client.get("/penalidades/resumo", headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 403
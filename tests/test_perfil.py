@@ -0,0 +1,101 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+os.environ["DATABASE_URL"] = "sqlite:///./test.db"
+os.environ["ENVIRONMENT"] = "test"
+
+import pytest
+from fastapi.testclient import TestClient
+from main import app
+from app.core.database import create_db_and_tables
+from app.models.usuario import Usuario
+from app.models.entidade import Entidade
+from app.core.security import get_password_hash
+from sqlmodel import Session, select
+from app.core.database import engine
+from datetime import datetime
+
+client = TestClient(app)
+
+def setup_module(module):
+    create_db_and_tables()
+    with Session(engine) as session:
+        # Cria entidade fictícia se não existir
+        entidade = session.exec(select(Entidade).where(Entidade.id == 1)).first()
+        if not entidade:
+            entidade = Entidade(
+                id=1,
+                cnpj="12345678000199",
+                razao_social="Entidade Teste Ltda",
+                nome_fantasia="Entidade Teste",
+                ug_codigo="UG123",
+                status="ATIVA",
+                data_status=datetime.utcnow(),
+                created_at=datetime.utcnow(),
+                updated_at=datetime.utcnow()
+            )
+            session.add(entidade)
+            session.commit()
+            session.refresh(entidade)
+        usuarios = [
+            ("Admin Teste", "admin@sentinela.app", "00000000191", "ROOT"),
+            ("Gestor Perfil", "gestor.perfil@sentinela.app", "52998224725", "GESTOR"),
+        ]
+        for nome, email, cpf, perfil in usuarios:
+            if not session.exec(select(Usuario).where(Usuario.email == email)).first():
+                session.add(Usuario(
+                    nome=nome,
+                    email=email,
+                    cpf=cpf,
+                    senha_hash=get_password_hash("admin123"),
+                    perfil=perfil,
+                    ativo=True,
+                    entidade_id=entidade.id,
+                    totp_enabled=False,
+                    created_at=datetime.utcnow(),
+                    updated_at=datetime.utcnow()
+                ))
+        session.commit()
+
+def get_auth_token(email="admin@sentinela.app"):
+    """Obtém token de autenticação para testes"""
+    response = client.post("/auth/login", json={"email": email, "senha": "admin123"})
+    return response.json()["access_token"]
+
+def test_perfil_amostragem_worker():
+    """Sessão de amostragem do worker retorna um arquivo do speedscope"""
+    headers = {"Authorization": f"Bearer {get_auth_token()}"}
+    response = client.post("/admin/perfil/amostragem?segundos=0.2&intervalo_ms=2", headers=headers)
+    assert response.status_code == 200
+    assert "speedscope.json" in response.headers["content-disposition"]
+    perfil = response.json()
+    assert perfil["$schema"] == "https://www.speedscope.app/file-format-schema.json"
+    assert perfil["profiles"] and all(p["type"] == "sampled" for p in perfil["profiles"])
+    amostras = [indice for p in perfil["profiles"] for pilha in p["samples"] for indice in pilha]
+    assert amostras and max(amostras) < len(perfil["shared"]["frames"])
+
+    response = client.post("/admin/perfil/amostragem?segundos=3600", headers=headers)
+    assert response.status_code == 400
+
+def test_perfil_somente_root():
+    """Perfilador restrito a ROOT"""
+    headers = {"Authorization": f"Bearer {get_auth_token('gestor.perfil@sentinela.app')}"}
+    assert client.post("/admin/perfil/amostragem?segundos=0.1", headers=headers).status_code == 403
+    assert client.post("/admin/perfil/token", headers=headers).status_code == 403
+
+def test_perfil_requisicao_token_assinado():
+    """Perfil de uma requisição com X-Perfil-Token; token adulterado é ignorado"""
+    headers = {"Authorization": f"Bearer {get_auth_token()}"}
+    token = client.post("/admin/perfil/token", headers=headers).json()["token"]
+
+    response = client.get("/auth/me", headers={**headers, "X-Perfil-Token": token})
+    assert response.status_code == 200
+    perfil_id = response.headers["x-perfil-id"]
+    perfil = client.get(f"/admin/perfil/{perfil_id}", headers=headers)
+    assert perfil.status_code == 200
+    assert perfil.json()["name"] == "GET /auth/me"
+
+    adulterado = token[:-1] + ("0" if token[-1] != "0" else "1")
+    response = client.get("/auth/me", headers={**headers, "X-Perfil-Token": adulterado})
+    assert "x-perfil-id" not in response.headers
+    assert client.get("/admin/perfil/inexistente", headers=headers).status_code == 404
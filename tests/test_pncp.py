@@ -122,3 +122,43 @@ def test_pncp_sync_contratos_cnpj_invalido(auth_token):
     response = client.post("/pncp/sync/contratos/123", headers=headers)
     assert response.status_code == 400
     assert "CNPJ inválido" in response.json()["detail"]
+
+def test_rastreamento_pncp_amostragem_cauda(auth_token, monkeypatch):
+    """Trace da consulta ao PNCP: FastAPI, SQL e httpx no mesmo trace; amostragem na cauda"""
+    from celery.signals import after_task_publish, before_task_publish
+    from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+    from opentelemetry.trace import SpanKind, StatusCode
+    from app.core.config import settings
+    from app.core.rastreamento import configurar_rastreamento, encerrar_rastreamento
+    from app.services.pncp_service import PNCPService
+    from app.tasks.tasks import detectar_fornecedores_duplicados
+
+    # Traces comuns descartados; só os com erro (ou lentos) são exportados
+    monkeypatch.setattr(settings, "TRACING_PROPORCAO", 0.0)
+    monkeypatch.setattr(settings, "TRACING_LENTO_MS", 60_000.0)
+    # PNCP inacessível: a chamada httpx falha rápido, sem rede
+    monkeypatch.setattr(PNCPService, "BASE_URL", "http://127.0.0.1:9")
+    exportador = InMemorySpanExporter()
+    provedor = configurar_rastreamento(app, exportador=exportador, forcar=True)
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    try:
+        client.post("/pncp/sync/fornecedor/99999", headers=headers)
+        assert exportador.get_finished_spans() == ()
+
+        client.get("/pncp/fornecedor/validar/00059311000126", headers=headers)
+        spans = exportador.get_finished_spans()
+        assert len({span.context.trace_id for span in spans}) == 1
+        servidor = [span for span in spans if span.kind == SpanKind.SERVER]
+        assert servidor and servidor[0].attributes["http.route"] == "/pncp/fornecedor/validar/{cnpj}"
+        assert any("db.statement" in span.attributes or "db.query.text" in span.attributes for span in spans)
+        cliente_http = [span for span in spans if span.kind == SpanKind.CLIENT and span.name.startswith("GET")]
+        assert cliente_http and cliente_http[0].status.status_code == StatusCode.ERROR
+
+        # O contexto do trace segue para o worker nos cabeçalhos da tarefa
+        cabecalhos = {"id": "tarefa-rastreada", "task": detectar_fornecedores_duplicados.name}
+        with provedor.get_tracer(__name__).start_as_current_span("sync") as span:
+            before_task_publish.send(sender=detectar_fornecedores_duplicados.name, headers=cabecalhos, body=((), {}, {}))
+            after_task_publish.send(sender=detectar_fornecedores_duplicados.name, headers=cabecalhos, body=((), {}, {}))
+        assert f"{span.get_span_context().trace_id:032x}" in cabecalhos["traceparent"]
+    finally:
+        encerrar_rastreamento(app)